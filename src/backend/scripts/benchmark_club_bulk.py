@@ -0,0 +1,134 @@
+# File: backend/scripts/benchmark_club_bulk.py
+"""
+Throughput of the bulk club import and export behind manage.py (services/club_bulk.py).
+
+Writes --records synthetic clubs (default 10,000, one in a thousand invalid) to a
+temporary JSONL or CSV file, then:
+  - dry run: validates the file without writing, which is the parsing cost alone;
+  - import: import_clubs with --batch-size writes per WriteBatch and --concurrency
+    batches in flight, into a `clubs` collection emptied beforehand;
+  - export: export_clubs pages the collection back out in --page-size pages.
+For each it reports docs/s, and checks the export holds every imported club. With
+--trace-memory it also reports each step's peak Python memory from tracemalloc, which
+should stay flat as --records grows; tracing slows everything down, so throughput from
+such a run isn't comparable.
+
+Requires the emulator (`firebase emulators:start --only firestore`):
+    FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 python scripts/benchmark_club_bulk.py \
+        [--records 10000] [--format jsonl] [--batch-size 500] [--concurrency 8] [--page-size 500] \
+        [--trace-memory]
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+os.environ.setdefault("FIREBASE_PROJECT_ID", "demo-slugscene")
+
+from services import firebase_service
+from services.club_bulk import CLUBS_COLLECTION, Checkpoint, export_clubs, import_clubs
+
+
+def _write_input(path: str, fmt: str, records: int) -> None:
+    fields = ("clubId", "name", "description", "category", "contactEmail", "memberCount")
+    with open(path, "w", newline="", encoding="utf-8") as out:
+        writer = csv.DictWriter(out, fieldnames=fields) if fmt == "csv" else None
+        if writer is not None:
+            writer.writeheader()
+        for i in range(records):
+            record = {
+                "clubId": f"bulk-club-{i:06d}", "name": f"Bulk Club {i}",
+                "description": "Weekly meetings, workshops and socials " * 3,
+                "category": ["music", "outdoors"], "contactEmail": [f"club{i}@ucsc.edu"],
+                "memberCount": "lots" if i % 1000 == 999 else i % 400,
+            }
+            if writer is not None:
+                writer.writerow({**record, "category": ";".join(record["category"]),
+                                 "contactEmail": ";".join(record["contactEmail"])})
+            else:
+                out.write(json.dumps(record) + "\n")
+
+
+async def _clear_clubs(db) -> None:
+    """Deletes every club, so the export counts only this run's."""
+    while True:
+        snapshots = [snapshot async for snapshot in db.collection(CLUBS_COLLECTION).limit(500).stream()]
+        if not snapshots:
+            return
+        batch = db.batch()
+        for snapshot in snapshots:
+            batch.delete(snapshot.reference)
+        await batch.commit()
+
+
+async def _timed(coroutine, trace_memory: bool):
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = await coroutine
+        seconds = time.perf_counter() - started
+        return result, seconds, tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        tracemalloc.stop()
+
+
+def _peak(peak) -> str:
+    return "" if peak is None else f", peak {peak / 2**20:5.1f} MiB"
+
+
+async def run(args) -> None:
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("Set FIRESTORE_EMULATOR_HOST; this benchmark writes to Firestore.")
+    await firebase_service.warm_up()
+    db = firebase_service.db
+    if db is None:
+        sys.exit("Firestore did not initialize; is the emulator running?")
+    await _clear_clubs(db)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        source = os.path.join(workdir, f"clubs.{args.format}")
+        _write_input(source, args.format, args.records)
+        print(f"{args.records:,} {args.format} records; batches of {args.batch_size}, "
+              f"{args.concurrency} in flight; export pages of {args.page_size}")
+
+        for label, dry_run in (("dry run", True), ("import", False)):
+            with open(source, newline="", encoding="utf-8") as stream:
+                report, seconds, peak = await _timed(import_clubs(
+                    None if dry_run else db, stream, args.format, Checkpoint(None),
+                    batch_size=args.batch_size, concurrency=args.concurrency, dry_run=dry_run,
+                ), args.trace_memory)
+            print(
+                f"  {label:>8}: {report.valid / seconds:8,.0f} docs/s ({seconds:.2f}s){_peak(peak)}; "
+                f"{report.valid:,} valid, {report.invalid} invalid, {report.written:,} written"
+            )
+
+        with open(os.path.join(workdir, f"export.{args.format}"), "w", newline="", encoding="utf-8") as out:
+            exported, seconds, peak = await _timed(
+                export_clubs(db, out, args.format, page_size=args.page_size), args.trace_memory
+            )
+        print(f"  {'export':>8}: {exported / seconds:8,.0f} docs/s ({seconds:.2f}s){_peak(peak)}; "
+              f"{exported:,} exported, all imported clubs present: {exported == report.written}")
+    await firebase_service.close_firestore()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=10_000)
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="jsonl")
+    parser.add_argument("--batch-size", type=int, default=500, help="Writes per batch (max 500)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Batches committed at once")
+    parser.add_argument("--page-size", type=int, default=500, help="Clubs per export page")
+    parser.add_argument("--trace-memory", action="store_true", help="Report peak memory too (slower)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
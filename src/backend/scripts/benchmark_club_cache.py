@@ -0,0 +1,145 @@
+# File: backend/scripts/benchmark_club_cache.py
+"""
+GET /api/users/me/joined-clubs with the shared club cache (services/club_cache.py)
+warm versus cold.
+
+Seeds --clubs clubs and --users users, each of whom has joined --joined of them, then
+sends --requests requests (at most --concurrency in flight):
+  - cold: the club cache is cleared before every request, so each one reads and
+    validates all of its clubs again;
+  - warm: the cache already holds every club, as it does once the `clubs` listener
+    has delivered the collection.
+For both it reports p50/p99 latency, throughput, batched Firestore reads per request
+and the cache's hit/miss counters from club_cache.stats(), and checks that both return
+the same clubs.
+
+Requires the emulator (`firebase emulators:start --only firestore`):
+    FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 python scripts/benchmark_club_cache.py \
+        [--clubs 500] [--users 200] [--joined 50] [--requests 2000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+os.environ.setdefault("FIREBASE_PROJECT_ID", "demo-slugscene")
+
+import httpx
+from fastapi import Request
+
+import main
+from api.deps import AuthenticatedUser, get_current_user
+from services import firebase_service
+from services.club_cache import club_cache
+from services.metrics import firestore_rpcs_total
+
+USER_HEADER = "X-Load-Test-User"
+
+
+def _rpc_count(method: str, code: str = "OK") -> int:
+    return int(firestore_rpcs_total.value(method, code))
+
+
+def _ms(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+def _club_id(i: int) -> str:
+    return f"cache-club-{i}"
+
+
+async def _seed(db, args):
+    rng = random.Random(13)
+    writes = [
+        (db.collection("clubs").document(_club_id(i)), {
+            "name": f"Club {i}", "description": "A club with a longer description " * 4,
+            "memberCount": rng.randrange(500), "tags": ["music", "outdoors"],
+        })
+        for i in range(args.clubs)
+    ]
+    users = [f"cache-user-{i}" for i in range(args.users)]
+    writes += [
+        (db.collection("users").document(uid),
+         {"joinedClubs": [_club_id(i) for i in rng.sample(range(args.clubs), args.joined)]})
+        for uid in users
+    ]
+    for first in range(0, len(writes), 500):
+        batch = db.batch()
+        for ref, data in writes[first:first + 500]:
+            batch.set(ref, data)
+        await batch.commit()
+    return users
+
+
+async def _load(client, users, args, cold: bool):
+    latencies, statuses, bodies = [], Counter(), {}
+    in_flight = asyncio.Semaphore(args.concurrency)
+
+    async def send(i):
+        uid = users[i % len(users)]
+        async with in_flight:
+            if cold:
+                club_cache.clear()
+            started = time.perf_counter()
+            response = await client.get("/api/users/me/joined-clubs", headers={USER_HEADER: uid})
+            latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] += 1
+        bodies[uid] = sorted(club["clubId"] for club in response.json())
+
+    reads = _rpc_count("BatchGetDocuments")
+    started = time.perf_counter()
+    await asyncio.gather(*(send(i) for i in range(args.requests)))
+    seconds = time.perf_counter() - started
+    return seconds, sorted(latencies), statuses, _rpc_count("BatchGetDocuments") - reads, bodies
+
+
+async def run(args) -> None:
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("Set FIRESTORE_EMULATOR_HOST; this benchmark writes to Firestore.")
+    await firebase_service.warm_up()
+    db = firebase_service.db
+    if db is None:
+        sys.exit("Firestore did not initialize; is the emulator running?")
+    users = await _seed(db, args)
+
+    async def current_user(request: Request) -> AuthenticatedUser:
+        return AuthenticatedUser(uid=request.headers[USER_HEADER])
+
+    main.app.dependency_overrides[get_current_user] = current_user
+    transport = httpx.ASGITransport(app=main.app)
+    print(f"{args.users} users in {args.joined} of {args.clubs} clubs each; {args.requests:,} requests, "
+          f"{args.concurrency} in flight")
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=120) as client:
+        for label, cold in (("cold", True), ("warm", False)):
+            if not cold:  # Fill the cache, as the listener's first snapshot would
+                await club_cache.get_many(db, [_club_id(i) for i in range(args.clubs)])
+            hits, misses = club_cache.hits, club_cache.misses
+            seconds, latencies, statuses, batch_gets, results[label] = await _load(client, users, args, cold)
+            print(
+                f"{label}: {args.requests / seconds:6,.0f} req/s, p50 {_ms(latencies, 0.5):6.1f} ms, "
+                f"p99 {_ms(latencies, 0.99):6.1f} ms; {batch_gets / args.requests:.2f} batched reads per request; "
+                f"cache hits {club_cache.hits - hits:,}, misses {club_cache.misses - misses:,}; "
+                f"statuses {dict(statuses)}"
+            )
+    print(f"same clubs warm and cold: {results['cold'] == results['warm']}; cache stats {club_cache.stats()}")
+    await firebase_service.close_firestore()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clubs", type=int, default=500)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--joined", type=int, default=50, help="Clubs each user has joined")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight at once")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,141 @@
+# File: backend/scripts/benchmark_club_search.py
+"""
+Query latency and memory of the club search index (services/club_search.py) at
+--sizes synthetic clubs (default 1,000, 10,000 and 100,000).
+
+Clubs get two to four name words and 15 to 40 description words, half of them from
+~40 common club words ("music", "robotics", ...) and half from a 20,000-word made-up
+vocabulary, plus two of eight categories. The common words each appear in about a
+quarter of all descriptions, so single-word queries for them are the worst case.
+For each size it reports:
+  - build: ClubSearchIndex.sync over every club, as on a worker's first catalog sync;
+  - memory: what the index holds, from tracemalloc while a copy is loaded from the
+    snapshot and answers its first query (which builds the sorted vocabulary);
+  - snapshot: the zlib-compressed size ClubSearch.save_snapshot writes, and how long
+    loading it takes, as a new worker does at startup;
+  - resync: sync after 10 clubs are edited, which re-indexes only those;
+  - queries: the median and p99 latency of each query in a mix of exact words,
+    several words, a prefix still being typed and misspellings.
+
+No Firestore needed:
+    python scripts/benchmark_club_search.py [--sizes 1000 10000 100000] [--runs 20]
+"""
+import argparse
+import gc
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import zlib
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+from models.clubs import ClubResponse
+from services.club_search import ClubSearchIndex
+
+COMMON_WORDS = (
+    "robotics coding hackathon music choir dance film photography chess debate climbing hiking surfing soccer "
+    "volleyball art painting writing poetry theater cooking volunteer service culture language engineering "
+    "biology chemistry physics math business finance marketing startup entrepreneurship gaming esports anime "
+    "design fashion"
+).split()
+SYLLABLES = "ba ko ri sa tu mel dor vin qua lex pho gra sten ul ari zen bro cle fin mo".split()
+CATEGORIES = ["tech", "arts", "sports", "culture", "service", "academic", "music", "games"]
+QUERIES = (
+    "robotics", "music choir", "debate chess", "climbing club",  # Exact words
+    "hacka", "surf",  # Prefixes, as typed
+    "photgraphy", "entrepreneurshp",  # Misspelled
+)
+
+
+def _ms(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+class ClubFactory:
+    def __init__(self, seed: int = 19):
+        self.rng = random.Random(seed)
+        made_up = {"".join(self.rng.choices(SYLLABLES, k=self.rng.randint(2, 4))) for _ in range(20_000)}
+        self.vocabulary = COMMON_WORDS + sorted(made_up)
+
+    def club(self, i: int) -> ClubResponse:
+        rng = self.rng
+        name = " ".join(rng.choice(self.vocabulary) for _ in range(rng.randint(2, 4)))
+        description = " ".join(
+            rng.choice(self.vocabulary if rng.random() < 0.5 else COMMON_WORDS) for _ in range(rng.randint(15, 40))
+        )
+        return ClubResponse(
+            clubId=f"search-club-{i:06d}", name=name.title(), description=description,
+            category=rng.sample(CATEGORIES, 2),
+        )
+
+
+def _index_memory(snapshot: bytes) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        index = ClubSearchIndex()
+        index.loads(zlib.decompress(snapshot))
+        index.search("warm up")
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def run(args) -> None:
+    factory = ClubFactory()
+    for size in args.sizes:
+        clubs = [factory.club(i) for i in range(size)]
+        gc.collect()
+        index = ClubSearchIndex()
+        started = time.perf_counter()
+        index.sync(clubs, "v1")
+        build = time.perf_counter() - started
+
+        index.search("warm up")  # Builds the sorted vocabulary and length norms, as the first query does
+        snapshot = zlib.compress(index.dumps(), 6)
+        started = time.perf_counter()
+        loaded = ClubSearchIndex()
+        loaded.loads(zlib.decompress(snapshot))
+        load = time.perf_counter() - started
+        same = all(loaded.search(query) == index.search(query) for query in QUERIES)
+        del loaded
+        memory = _index_memory(snapshot)
+
+        for i in factory.rng.sample(range(size), 10):
+            clubs[i] = factory.club(i)
+        started = time.perf_counter()
+        changes = index.sync(clubs, "v2")
+        resync = time.perf_counter() - started
+
+        print(
+            f"{size:,} clubs: build {build:.2f}s, memory {memory / 2**20:.1f} MiB, "
+            f"snapshot {len(snapshot) / 2**20:.1f} MiB loaded in {load:.2f}s (same results: {same}), "
+            f"resync after 10 edits {resync * 1000:.0f} ms ({changes} re-indexed)"
+        )
+        medians = []
+        for query in QUERIES:
+            timings = []
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                index.search(query, 20)
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            medians.append(statistics.median(timings))
+            print(f"  {query!r:>19}: p50 {_ms(timings, 0.5):6.2f} ms, p99 {_ms(timings, 0.99):6.2f} ms")
+        print(f"  {'all queries':>19}: median {statistics.median(medians) * 1000:.2f} ms, "
+              f"slowest {max(medians) * 1000:.2f} ms")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000], help="Club counts")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs of each query")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main_cli()
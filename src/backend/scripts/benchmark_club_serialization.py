@@ -0,0 +1,119 @@
+# File: backend/scripts/benchmark_club_serialization.py
+"""
+Microbenchmark for ClubResponse list serialization (models/clubs.py).
+
+Builds --clubs Firestore-style club dicts (default 1,000, each with a logo URL and a
+few tags; one in a hundred malformed) and times two ways of turning them into the
+joined-clubs response body:
+  - old: one ClubResponse(**data) per club with a try/except around each, then what
+    FastAPI does for response_model=List[ClubResponse] (serialize_response validates
+    the list again) and JSONResponse's json.dumps;
+  - new: validate_club_payloads (one TypeAdapter call that skips malformed records)
+    and dump_clubs_json straight to bytes.
+It times them with and without malformed records, times serializing already-validated
+clubs (the club cache's case), and checks both paths produce the same JSON.
+
+No Firestore needed:
+    python scripts/benchmark_club_serialization.py [--clubs 1000] [--runs 50]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import ValidationError
+
+from models.clubs import ClubResponse, dump_clubs_json, log, validate_club_payloads
+from services.structured_log import ROOT_LOGGER_NAME
+
+# What FastAPI builds for response_model=List[ClubResponse]
+RESPONSE_FIELD = create_model_field(
+    name="Response_get_my_joined_clubs", type_=List[ClubResponse], mode="serialization"
+)
+
+
+def _payloads(count: int, malformed: bool):
+    payloads = []
+    for i in range(count):
+        payload = {
+            "clubId": f"club{i}", "name": f"Club {i}", "description": "We meet on Thursdays " * 5,
+            "category": ["music", "outdoors"], "contactEmail": [f"club{i}@ucsc.edu"],
+            "logoURL": f"https://storage.example.com/logos/club{i}.png", "memberCount": i % 400,
+        }
+        if malformed and i % 100 == 99:
+            payload["memberCount"] = "lots"
+        payloads.append(payload)
+    return payloads
+
+
+async def old_path(payloads) -> bytes:
+    clubs = []
+    for payload in payloads:
+        try:
+            clubs.append(ClubResponse(**payload))
+        except ValidationError as e:  # Logged the same way as the new path, then skipped
+            log.warning("club.invalid", club_id=payload.get("clubId", "unknown_id"),
+                        errors=e.errors(include_url=False, include_input=False))
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=clubs)
+    return JSONResponse(content).body
+
+
+async def new_path(payloads) -> bytes:
+    return dump_clubs_json(validate_club_payloads(payloads))
+
+
+async def old_serialize(clubs) -> bytes:
+    return JSONResponse(await serialize_response(field=RESPONSE_FIELD, response_content=clubs)).body
+
+
+async def new_serialize(clubs) -> bytes:
+    return dump_clubs_json(clubs)
+
+
+async def _time(fn, arg, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        body = await fn(arg)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), body
+
+
+async def run(args) -> None:
+    logging.getLogger(ROOT_LOGGER_NAME).setLevel(logging.ERROR)  # Keep the malformed-record warnings quiet
+    print(f"{args.clubs:,} clubs, medians of {args.runs} runs")
+    cases = (
+        ("validate + respond, all valid", old_path, new_path, _payloads(args.clubs, malformed=False)),
+        ("validate + respond, 1% malformed", old_path, new_path, _payloads(args.clubs, malformed=True)),
+        ("respond from cached models", old_serialize, new_serialize,
+         validate_club_payloads(_payloads(args.clubs, malformed=False))),
+    )
+    for label, old, new, arg in cases:
+        old_seconds, old_body = await _time(old, arg, args.runs)
+        new_seconds, new_body = await _time(new, arg, args.runs)
+        print(
+            f"  {label:>32}: old {old_seconds * 1000:6.2f} ms, new {new_seconds * 1000:6.2f} ms "
+            f"({old_seconds / new_seconds:.1f}x); same JSON: {json.loads(old_body) == json.loads(new_body)}"
+        )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clubs", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
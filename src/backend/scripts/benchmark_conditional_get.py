@@ -0,0 +1,168 @@
+# File: backend/scripts/benchmark_conditional_get.py
+"""
+Bytes on the wire and handler runs saved by CompressionMiddleware and
+ConditionalGetMiddleware (api/middleware.py).
+
+Seeds --clubs clubs and --events events over the next two months, then has --clients
+clients poll GET /api/clubs, GET /api/events?from=...&to=... and
+GET /api/events/calendar?month=... for --rounds rounds. Every --change-every rounds one
+user joins or leaves a club, which changes the catalog. The same traffic is replayed
+three ways:
+  - plain: no Accept-Encoding, no If-None-Match;
+  - compressed: Accept-Encoding: br, gzip;
+  - compressed + conditional: also sending back each route's last ETag in If-None-Match.
+Per route it reports response body bytes received, 304s, and how many requests
+reached their handler, using the middleware's compression_stats and
+conditional_get_stats counters. The calendar only has a version stamp while the `events`
+listener is running; without one its requests always reach the handler.
+
+Requires the emulator (`firebase emulators:start --only firestore`):
+    FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 python scripts/benchmark_conditional_get.py \
+        [--clubs 500] [--events 2000] [--clients 50] [--rounds 20] [--change-every 5]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+os.environ.setdefault("FIREBASE_PROJECT_ID", "demo-slugscene")
+
+import httpx
+from fastapi import Request
+
+import main
+from api import middleware
+from api.deps import AuthenticatedUser, get_current_user
+from services import firebase_service
+from services.rate_limit import RateLimitBackend, membership_rate_limiter
+
+USER_HEADER = "X-Load-Test-User"
+JOINING_USER = "wire-user"
+
+
+class NoRateLimit(RateLimitBackend):
+    async def consume(self, buckets, tokens=1):
+        return 0.0
+
+
+async def _seed(db, args, now: datetime) -> None:
+    rng = random.Random(15)
+    writes = [
+        (db.collection("clubs").document(f"wire-club-{i}"), {
+            "name": f"Club {i}", "description": "Weekly meetings, workshops and socials " * 3,
+            "category": [rng.choice(["music", "outdoors", "tech", "arts"])], "memberCount": rng.randrange(300),
+        })
+        for i in range(args.clubs)
+    ]
+    for i in range(args.events):
+        start = now + timedelta(minutes=rng.randrange(60 * 24 * 60))
+        writes.append((db.collection("events").document(f"wire-event-{i}"), {
+            "clubId": f"wire-club-{rng.randrange(args.clubs)}", "name": "Meeting", "description": "Come along",
+            "location": "Baskin Engineering", "startTime": start, "endTime": start + timedelta(hours=1),
+        }))
+    writes.append((db.collection("users").document(JOINING_USER), {"joinedClubs": []}))
+    for first in range(0, len(writes), 500):
+        batch = db.batch()
+        for ref, data in writes[first:first + 500]:
+            batch.set(ref, data)
+        await batch.commit()
+
+
+def _routes(now: datetime):
+    week = now + timedelta(days=7)
+    return {
+        "/api/clubs": "/api/clubs?limit=200",
+        "/api/events": f"/api/events?from={week.date()}T00:00:00Z&to={(week + timedelta(days=7)).date()}T00:00:00Z",
+        "/api/events/calendar": f"/api/events/calendar?month={week:%Y-%m}",
+    }
+
+
+async def _replay(client, routes, args, compressed: bool, conditional: bool):
+    body_bytes, not_modified, requests = Counter(), Counter(), Counter()
+    etags = {}
+    in_flight = asyncio.Semaphore(args.clients)
+
+    async def poll(client_id, route, url):
+        headers = {"Accept-Encoding": "br, gzip" if compressed else "identity"}
+        if conditional and (client_id, route) in etags:
+            headers["If-None-Match"] = etags[(client_id, route)]
+        async with in_flight:
+            response = await client.get(url, headers=headers)
+        requests[route] += 1
+        body_bytes[route] += response.num_bytes_downloaded
+        if response.status_code == 304:
+            not_modified[route] += 1
+        if "etag" in response.headers:
+            etags[(client_id, route)] = response.headers["etag"]
+
+    started = time.perf_counter()
+    for round_number in range(args.rounds):
+        await asyncio.gather(*(
+            poll(client_id, route, url) for client_id in range(args.clients) for route, url in routes.items()
+        ))
+        if round_number % args.change_every == args.change_every - 1:
+            action = "join" if round_number // args.change_every % 2 == 0 else "leave"
+            await client.post(f"/api/clubs/wire-club-0/{action}", headers={USER_HEADER: JOINING_USER})
+    return time.perf_counter() - started, body_bytes, not_modified, requests
+
+
+async def run(args) -> None:
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("Set FIRESTORE_EMULATOR_HOST; this benchmark writes to Firestore.")
+    await firebase_service.warm_up()
+    db = firebase_service.db
+    if db is None:
+        sys.exit("Firestore did not initialize; is the emulator running?")
+    now = datetime.now(timezone.utc)
+    await _seed(db, args, now)
+
+    async def current_user(request: Request) -> AuthenticatedUser:
+        return AuthenticatedUser(uid=request.headers[USER_HEADER])
+
+    main.app.dependency_overrides[get_current_user] = current_user
+    membership_rate_limiter.backend = NoRateLimit()
+    routes = _routes(now)
+    print(f"{args.clients} clients x {len(routes)} routes x {args.rounds} rounds; "
+          f"the catalog changes every {args.change_every} rounds")
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=120) as client:
+        plain = None
+        for label, compressed, conditional in (
+            ("plain", False, False), ("compressed", True, False), ("compressed + conditional", True, True),
+        ):
+            middleware.compression_stats.update(responses=0, bytes_in=0, bytes_out=0)
+            middleware.conditional_get_stats.update(checked=0, not_modified=0)
+            seconds, body_bytes, not_modified, requests = await _replay(client, routes, args, compressed, conditional)
+            plain = plain or body_bytes
+            total = sum(body_bytes.values())
+            print(
+                f"{label}: {seconds:.1f}s, {total:,} body bytes ({total / sum(plain.values()):.1%} of plain); "
+                f"compressed {middleware.compression_stats['responses']:,} responses, "
+                f"304s {middleware.conditional_get_stats['not_modified']:,}"
+            )
+            for route in routes:
+                print(
+                    f"  {route:>21}: {body_bytes[route] / requests[route]:9,.0f} bytes/request, "
+                    f"handler ran for {requests[route] - not_modified[route]:,} of {requests[route]:,}"
+                )
+    await firebase_service.close_firestore()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clubs", type=int, default=500)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=50, help="Clients polling every route each round")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--change-every", type=int, default=5, help="Rounds between catalog changes")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,109 @@
+# File: backend/scripts/benchmark_event_index.py
+"""
+Benchmark for the time-sorted event index behind GET /api/events (services/event_index.py).
+
+Builds an EventIndex of --events synthetic events (default 100,000) across --clubs
+clubs, spread over the next 180 days, and times against a full scan of the same list:
+  - a one-week window (the calendar page),
+  - a one-week window for one club (clubId filter),
+  - the next 4 upcoming events (the dashboard),
+checking each answer matches the scan. It also times the bulk build, a single upsert,
+and expiring the events that ended during the first day.
+
+No Firestore needed:
+    python scripts/benchmark_event_index.py [--events 100000] [--clubs 500] [--runs 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+from models.event import Event
+from services.event_index import EventIndex
+
+HORIZON = timedelta(days=180)
+
+
+def _events(count: int, clubs: int, now: datetime):
+    rng = random.Random(42)
+    events = []
+    for i in range(count):
+        start = now + timedelta(minutes=rng.randrange(int(HORIZON.total_seconds() // 60)))
+        events.append(Event(
+            eventId=f"event{i}", clubId=f"club{rng.randrange(clubs)}", name="Meeting", description="",
+            startTime=start, endTime=start + timedelta(minutes=rng.choice([30, 60, 120])), location="",
+        ))
+    return events
+
+
+def _scan(events, start=None, end=None, club_id=None, limit=None):
+    found = sorted(
+        (e for e in events
+         if (start is None or e.startTime >= start) and (end is None or e.startTime < end)
+         and (club_id is None or e.clubId == club_id)),
+        key=lambda e: (e.startTime.timestamp(), e.eventId),
+    )
+    return found[:limit] if limit is not None else found
+
+
+def _time(fn, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def _us(seconds):
+    return f"{seconds * 1e6:,.1f} us"
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--clubs", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=200, help="Repetitions of each index query")
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    events = _events(args.events, args.clubs, now)
+    started = time.perf_counter()
+    index = EventIndex(events)
+    print(f"{len(index):,} events, {args.clubs} clubs; bulk build {time.perf_counter() - started:.2f} s")
+
+    week_start = now + timedelta(days=30)
+    week_end = week_start + timedelta(days=7)
+    queries = (
+        ("one-week window", dict(start=week_start, end=week_end)),
+        ("one week, one club", dict(start=week_start, end=week_end, club_id="club7")),
+        ("next 4 upcoming", dict(start=now, limit=4)),
+    )
+    scan_runs = max(1, args.runs // 50)
+    for label, query in queries:
+        indexed, result = _time(lambda: index.range(**query), args.runs)
+        scanned, expected = _time(lambda: _scan(events, **query), scan_runs)
+        print(
+            f"  {label:>18}: index {_us(indexed):>12}, full scan {_us(scanned):>14} "
+            f"({scanned / indexed:,.0f}x), {len(result)} events, same answer: {result == expected}"
+        )
+
+    moved = events[0]
+    edit = Event(**{**moved.__dict__, "startTime": moved.startTime + timedelta(hours=1),
+                    "endTime": moved.endTime + timedelta(hours=1)})
+    started = time.perf_counter()
+    index.upsert(edit)
+    print(f"  single upsert: {_us(time.perf_counter() - started)}")
+    started = time.perf_counter()
+    expired = index.expire_before(now + timedelta(days=1))
+    print(f"  expiring the first day: {expired:,} events in {(time.perf_counter() - started) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,134 @@
+# File: backend/scripts/benchmark_firestore_pool.py
+"""
+Throughput of the pooled Firestore clients (services/firestore_pool.py) under load.
+
+Seeds --users users, then for each pool size in --channels (default 1, 2, 4, 8) sends
+--requests GET /api/users/me/joined-clubs requests (one user-document read each) with
+--concurrency (default 500) in flight at once. For every pool size it reports
+throughput, p50/p99 latency, the most requests any one channel carried at once and
+how often at least one channel was at or over FIRESTORE_SATURATION_IN_FLIGHT, sampled
+from FirestoreClientPool.stats() every few milliseconds.
+
+Firestore allows ~100 concurrent streams per connection; the emulator has no such
+limit unless it is started with one, and local round trips are far shorter than
+production's. A single channel saturates once --concurrency exceeds the stream limit
+and requests queue on it, which shows up as latency that extra channels take away.
+
+Requires the emulator (`firebase emulators:start --only firestore`):
+    FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 python scripts/benchmark_firestore_pool.py \
+        [--users 1000] [--requests 10000] [--concurrency 500] [--channels 1 2 4 8]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+os.environ.setdefault("FIREBASE_PROJECT_ID", "demo-slugscene")
+
+import httpx
+from fastapi import Request
+
+import main
+from api.deps import AuthenticatedUser, get_current_user
+from services import firebase_service
+from services.firestore_pool import FirestoreClientPool
+
+USER_HEADER = "X-Load-Test-User"
+SAMPLE_SECONDS = 0.005
+
+
+def _ms(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+async def _seed(db, users) -> None:
+    for first in range(0, len(users), 500):
+        batch = db.batch()
+        for uid in users[first:first + 500]:
+            batch.set(db.collection("users").document(uid), {"joinedClubs": []})
+        await batch.commit()
+
+
+async def _use_pool(size: int) -> FirestoreClientPool:
+    old = firebase_service.client_pool
+    pool = FirestoreClientPool(project=old.primary.project, size=size)
+    firebase_service.client_pool, firebase_service.db = pool, pool.primary
+    await old.close()
+    # Open every channel before timing, as warm-up does at startup.
+    await asyncio.gather(*(client.collection("users").document("warm-up").get() for client in pool.clients))
+    return pool
+
+
+async def _load(client, pool, users, requests: int, concurrency: int):
+    latencies, statuses = [], Counter()
+    in_flight = asyncio.Semaphore(concurrency)
+    peak, samples, done = 0, [], asyncio.Event()
+
+    async def sample():
+        nonlocal peak
+        while not done.is_set():
+            stats = pool.stats()
+            peak = max(peak, *(channel["in_flight"] for channel in stats))
+            samples.append(any(channel["saturated"] for channel in stats))
+            await asyncio.sleep(SAMPLE_SECONDS)
+
+    async def send(i):
+        async with in_flight:
+            started = time.perf_counter()
+            response = await client.get("/api/users/me/joined-clubs", headers={USER_HEADER: users[i % len(users)]})
+            latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] += 1
+
+    sampler = asyncio.create_task(sample())
+    started = time.perf_counter()
+    await asyncio.gather(*(send(i) for i in range(requests)))
+    seconds = time.perf_counter() - started
+    done.set()
+    await sampler
+    return seconds, sorted(latencies), statuses, peak, sum(samples) / max(1, len(samples))
+
+
+async def run(args) -> None:
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("Set FIRESTORE_EMULATOR_HOST; this benchmark writes to Firestore.")
+    await firebase_service.warm_up()
+    if firebase_service.client_pool is None:
+        sys.exit("Firestore did not initialize; is the emulator running?")
+    users = [f"pool-user-{i}" for i in range(args.users)]
+    await _seed(firebase_service.db, users)
+
+    async def current_user(request: Request) -> AuthenticatedUser:
+        return AuthenticatedUser(uid=request.headers[USER_HEADER])
+
+    main.app.dependency_overrides[get_current_user] = current_user
+    transport = httpx.ASGITransport(app=main.app)
+    print(f"{args.requests:,} requests, {args.concurrency} in flight")
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=120) as client:
+        for size in args.channels:
+            pool = await _use_pool(size)
+            seconds, latencies, statuses, peak, saturated = await _load(
+                client, pool, users, args.requests, args.concurrency
+            )
+            print(
+                f"{size} channel(s): {args.requests / seconds:7,.0f} req/s, p50 {_ms(latencies, 0.5):6.1f} ms, "
+                f"p99 {_ms(latencies, 0.99):6.1f} ms; peak {peak} in flight on one channel, "
+                f"saturated in {saturated:4.0%} of samples; statuses {dict(statuses)}"
+            )
+    await firebase_service.close_firestore()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=500, help="Requests in flight at once")
+    parser.add_argument("--channels", type=int, nargs="+", default=[1, 2, 4, 8], help="Pool sizes to compare")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
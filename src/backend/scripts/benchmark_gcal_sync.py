@@ -0,0 +1,119 @@
+# File: backend/scripts/benchmark_gcal_sync.py
+"""
+Request counts for the Google Calendar sync (services/gcal_service.py).
+
+Runs the sync against the local fake of the Calendar API in tests/fake_calendar.py,
+which counts HTTP requests and calls, in four steps:
+  1. initial sync of N events (default 5,000) into an empty calendar;
+  2. restart: a fresh sync engine re-reads every document and must send nothing;
+  3. delta: 10 events are edited in Firestore;
+  4. one event is edited in the Calendar and must come back to Firestore.
+The fake fails a fraction of calls with 503 (--error-rate) to exercise the retries.
+
+Requires the emulator (`firebase emulators:start --only firestore`):
+    FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 python scripts/benchmark_gcal_sync.py \
+        [--events 5000] [--delta 10] [--error-rate 0.02]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND_DIR, "src"))
+sys.path.insert(0, os.path.join(BACKEND_DIR, "tests"))  # For the fake Calendar the tests use too
+os.environ.setdefault("FIREBASE_PROJECT_ID", "demo-slugscene")
+
+from google.auth.credentials import AnonymousCredentials
+
+from services import firebase_service, gcal_service
+from services.gcal_service import GoogleCalendarSync
+
+from fake_calendar import FakeCalendar, serve
+
+CALENDAR_ID = "benchmark@group.calendar.google.com"
+
+
+async def _documents(db, event_ids=None):
+    if event_ids is None:
+        return [(snapshot.id, snapshot.to_dict()) async for snapshot in db.collection("events").stream()]
+    refs = [db.collection("events").document(event_id) for event_id in event_ids]
+    return [(snapshot.id, snapshot.to_dict()) async for snapshot in db.get_all(refs)]
+
+
+async def _step(label, engine, db, calendar, changes):
+    calendar.reset_counts()
+    engine.enqueue(changes)
+    started = time.perf_counter()
+    report = await engine.sync_once(db)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label}: {elapsed:.2f}s, {dict(calendar.requests)} HTTP requests, calls {dict(calendar.calls)}; "
+        f"inserted {report.inserted}, updated {report.updated}, unchanged {report.unchanged}, "
+        f"failed {report.failed}, pulled {report.pulled}, applied {report.applied}"
+    )
+
+
+def _engine(calendar):
+    engine = GoogleCalendarSync(calendar_id=CALENDAR_ID, api_root=calendar.api_root, credentials=AnonymousCredentials())
+    engine.listening = True  # The documents are fed in directly instead of by the listener
+    return engine
+
+
+async def run(args) -> None:
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("Set FIRESTORE_EMULATOR_HOST; this benchmark writes to Firestore.")
+    await firebase_service.warm_up()
+    db = firebase_service.db
+    if db is None:
+        sys.exit("Firestore did not initialize; is the emulator running?")
+    gcal_service.GCAL_BACKOFF_BASE_SECONDS = 0.05  # Keep retries quick against the fake
+
+    start = datetime(2030, 1, 1, 18, tzinfo=timezone.utc)
+    for first in range(0, args.events, 500):
+        batch = db.batch()
+        for i in range(first, min(first + 500, args.events)):
+            batch.set(db.collection("events").document(f"bench-event-{i}"), {
+                "clubId": f"club-{i % 200}", "title": f"Event {i}", "description": "Benchmark event",
+                "location": "Quarry Plaza", "startTime": start + timedelta(hours=i), "endTime": start + timedelta(hours=i + 2),
+            })
+        await batch.commit()
+    await db.collection(gcal_service.SYNC_STATE_COLLECTION).document(gcal_service.SYNC_STATE_DOCUMENT).delete()
+
+    calendar = FakeCalendar(args.error_rate)
+    server = serve(calendar)
+    engine = _engine(calendar)
+    await _step(f"initial sync ({args.events} events)", engine, db, calendar, await _documents(db))
+
+    engine = _engine(calendar)
+    await _step("restart, nothing changed", engine, db, calendar, await _documents(db))
+
+    edited = [f"bench-event-{i}" for i in random.sample(range(args.events), args.delta)]
+    for event_id in edited:
+        await db.collection("events").document(event_id).update({"title": "Renamed"})
+    await _step(f"delta ({args.delta} edited)", engine, db, calendar, await _documents(db, edited))
+
+    gcal_id = gcal_service.gcal_event_id("bench-event-0")
+    with calendar.lock:
+        calendar.write({**calendar.events[gcal_id][1], "summary": "Edited in Calendar"})
+    await _step("one Calendar-side edit", engine, db, calendar, [])
+    title = (await db.collection("events").document("bench-event-0").get()).to_dict().get("title")
+    print(f"bench-event-0 title in Firestore: {title!r}")
+
+    server.shutdown()
+    await firebase_service.close_firestore()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--delta", type=int, default=10)
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Fraction of calls failed with 503.")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
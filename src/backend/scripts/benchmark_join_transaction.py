@@ -0,0 +1,161 @@
+# File: backend/scripts/benchmark_join_transaction.py
+"""
+Latency and correctness of the transactional join/leave (api/endpoints/clubs.py).
+
+Seeds --users users with a club each, then every user sends --duplicates identical
+POST /api/clubs/{club_id}/join requests for their club at once, followed by the same
+burst of leaves. Only a user's own duplicates compete for a club.
+Request coalescing and rate limiting are switched off, so every duplicate runs its own
+transaction and only the transaction itself keeps the membership change idempotent.
+For each burst it reports p50/p99 latency, the Firestore RPCs per request by method
+(the club and user checks are one batched read inside the transaction) and aborted
+commits, then checks that every club counts exactly one member (none after the leaves)
+and that no user lists their club twice.
+
+Requires the emulator (`firebase emulators:start --only firestore`):
+    FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 python scripts/benchmark_join_transaction.py \
+        [--users 100] [--duplicates 4]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+os.environ.setdefault("FIREBASE_PROJECT_ID", "demo-slugscene")
+
+import httpx
+from fastapi import Request
+
+import main
+from api.deps import AuthenticatedUser, get_current_user
+from api.endpoints import clubs as clubs_endpoints
+from services import firebase_service
+from services.member_counter import member_counter
+from services.metrics import firestore_rpcs_total
+from services.rate_limit import RateLimitBackend, membership_rate_limiter
+from services.single_flight import SingleFlight
+
+USER_HEADER = "X-Load-Test-User"
+METHODS = ("BatchGetDocuments", "BeginTransaction", "Commit", "Rollback")
+
+
+class NoCoalescing(SingleFlight):
+    """Runs every call, so duplicates reach Firestore as separate transactions."""
+
+    async def run(self, key, fn):
+        self.executions += 1
+        return await fn()
+
+
+class NoRateLimit(RateLimitBackend):
+    async def consume(self, buckets, tokens=1):
+        return 0.0
+
+
+def _rpc_counts() -> Counter:
+    return Counter({
+        (method, code): int(firestore_rpcs_total.value(method, code))
+        for method in METHODS for code in ("OK", "ABORTED")
+    })
+
+
+def _ms(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+def _club_id(uid: str) -> str:
+    return f"club-of-{uid}"
+
+
+async def _seed(db, users) -> None:
+    for first in range(0, len(users), 250):
+        batch = db.batch()
+        for uid in users[first:first + 250]:
+            batch.set(db.collection("users").document(uid), {"joinedClubs": []})
+            batch.set(db.collection("clubs").document(_club_id(uid)), {
+                "name": f"Club of {uid}", "description": "Duplicate joins", "memberCount": 0,
+            })
+        await batch.commit()
+
+
+async def _burst(client, action: str, users, duplicates: int):
+    latencies, statuses = [], Counter()
+
+    async def click(uid):
+        started = time.perf_counter()
+        response = await client.post(f"/api/clubs/{_club_id(uid)}/{action}", headers={USER_HEADER: uid})
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] += 1
+
+    before = _rpc_counts()
+    await asyncio.gather(*(click(uid) for uid in users for _ in range(duplicates)))
+    rpcs = _rpc_counts() - before
+    requests = len(users) * duplicates
+    per_request = ", ".join(
+        f"{method} {rpcs[(method, 'OK')] / requests:.2f}" for method in METHODS if rpcs[(method, "OK")]
+    )
+    aborted = sum(count for (_, code), count in rpcs.items() if code == "ABORTED")
+    print(
+        f"{action:>5}: {requests} requests, p50 {_ms(sorted(latencies), 0.5):.0f} ms, "
+        f"p99 {_ms(sorted(latencies), 0.99):.0f} ms; RPCs per request: {per_request}; "
+        f"{aborted} aborted; statuses {dict(sorted(statuses.items()))}"
+    )
+
+
+async def _check(db, users, expect_member: bool) -> None:
+    counts, listed = Counter(), Counter()
+    for uid in users:
+        club_id = _club_id(uid)
+        count = (await db.collection("clubs").document(club_id).get()).to_dict().get("memberCount", 0)
+        if member_counter.enabled:
+            member_counter._totals.pop(club_id, None)
+            count = (await member_counter.get_totals(db, [club_id])).get(club_id, 0)
+        counts[count] += 1
+        user = (await db.collection("users").document(uid).get()).to_dict()
+        listed[user.get("joinedClubs", []).count(club_id)] += 1
+    expected = 1 if expect_member else 0
+    print(
+        f"       clubs counting {expected} member(s): {counts[expected]}/{len(users)} "
+        f"(other counts: {dict(c for c in counts.items() if c[0] != expected)}); users listing "
+        f"their club 0x/1x/2x+: {listed[0]}/{listed[1]}/{sum(n for k, n in listed.items() if k > 1)}"
+    )
+
+
+async def run(args) -> None:
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("Set FIRESTORE_EMULATOR_HOST; this benchmark writes to Firestore.")
+    await firebase_service.warm_up()
+    db = firebase_service.db
+    if db is None:
+        sys.exit("Firestore did not initialize; is the emulator running?")
+
+    async def current_user(request: Request) -> AuthenticatedUser:
+        return AuthenticatedUser(uid=request.headers[USER_HEADER])
+
+    main.app.dependency_overrides[get_current_user] = current_user
+    clubs_endpoints.membership_flights = NoCoalescing()
+    membership_rate_limiter.backend = NoRateLimit()
+    users = [f"join-user-{i}" for i in range(args.users)]
+    await _seed(db, users)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=120) as client:
+        await _burst(client, "join", users, args.duplicates)
+        await _check(db, users, expect_member=True)
+        await _burst(client, "leave", users, args.duplicates)
+        await _check(db, users, expect_member=False)
+    await firebase_service.close_firestore()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--duplicates", type=int, default=4, help="Identical requests per user, sent at once")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,164 @@
+# File: backend/scripts/benchmark_metrics_overhead.py
+"""
+Overhead of the request instrumentation (MetricsMiddleware in api/middleware.py) on
+GET /api/health throughput; the target is under 2%.
+
+Starts two uvicorn servers on local ports, one serving main.app as configured and one
+serving the same app with MetricsMiddleware removed, then loads them in turn over
+--connections keep-alive connections, alternating for --rounds rounds of --seconds each.
+The load generator is a bare asyncio HTTP/1.1 client, to leave as much CPU as possible
+to the servers. It reports the median requests/s of each server and the overhead as the
+median of the per-round ratios, which cancels most of the drift between rounds.
+
+It also times both ASGI stacks in-process, with no server or client at all, and takes
+the fastest of many runs of each to cut scheduling noise. That makes the middleware's
+share of a request as large as it can get, an upper bound rather than what a deployment
+sees.
+
+No Firestore needed:
+    python scripts/benchmark_metrics_overhead.py [--rounds 30] [--seconds 1] [--connections 16]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+os.environ.setdefault("FIREBASE_PROJECT_ID", "demo-slugscene")
+
+import main
+from api.middleware import MetricsMiddleware
+
+VARIANTS = {"without metrics": ("without", 18461), "with metrics": ("with", 18462)}
+REQUEST = b"GET /api/health HTTP/1.1\r\nHost: bench\r\n\r\n"
+SCOPE = {
+    "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+    "path": "/api/health", "raw_path": b"/api/health", "root_path": "", "query_string": b"",
+    "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+}
+
+
+def _stack(with_metrics: bool):
+    """main.app's middleware stack, with or without MetricsMiddleware."""
+    user_middleware = main.app.user_middleware
+    if not with_metrics:
+        main.app.user_middleware = [m for m in user_middleware if m.cls is not MetricsMiddleware]
+    try:
+        return main.app.build_middleware_stack()
+    finally:
+        main.app.user_middleware = user_middleware
+
+
+def serve(variant: str, port: int) -> None:
+    import uvicorn
+
+    if variant == "without":
+        main.app.user_middleware = [m for m in main.app.user_middleware if m.cls is not MetricsMiddleware]
+    uvicorn.run(main.app, host="127.0.0.1", port=port, lifespan="off", log_level="warning", access_log=False)
+
+
+async def _wait_until_up(port: int) -> None:
+    deadline = time.perf_counter() + 30
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+async def _connection(port: int, deadline: float) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    responses = 0
+    while time.perf_counter() < deadline:
+        writer.write(REQUEST)
+        head = await reader.readuntil(b"\r\n\r\n")
+        if not head.startswith(b"HTTP/1.1 200"):
+            raise RuntimeError(f"/api/health answered {head.splitlines()[0]!r}")
+        length = next(line for line in head.split(b"\r\n") if line.lower().startswith(b"content-length"))
+        await reader.readexactly(int(length.split(b":")[1]))
+        responses += 1
+    writer.close()
+    return responses
+
+
+async def _served(port: int, seconds: float, connections: int) -> float:
+    deadline = time.perf_counter() + seconds
+    return sum(await asyncio.gather(*(_connection(port, deadline) for _ in range(connections)))) / seconds
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+async def _in_process(stack, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        await stack(dict(SCOPE), _receive, _send)
+    return (time.perf_counter() - started) / requests
+
+
+async def run(args) -> None:
+    servers = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", variant, "--port", str(port)])
+        for variant, port in VARIANTS.values()
+    ]
+    try:
+        for _, port in VARIANTS.values():
+            await _wait_until_up(port)
+            await _served(port, 1.0, args.connections)  # Warm up
+        rates = {label: [] for label in VARIANTS}
+        for round_number in range(args.rounds):
+            # Alternate which server goes first, so neither always follows the other.
+            for label, (_, port) in sorted(VARIANTS.items(), reverse=round_number % 2 == 1):
+                rates[label].append(await _served(port, args.seconds, args.connections))
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait()
+    print(f"uvicorn, {args.connections} keep-alive connections, {args.rounds} rounds of {args.seconds:g}s:")
+    for label in VARIANTS:
+        print(f"  {label:>16}: median {statistics.median(rates[label]):7,.0f} req/s "
+              f"(min {min(rates[label]):,.0f}, max {max(rates[label]):,.0f})")
+    ratios = [with_ / without for without, with_ in zip(*(rates[label] for label in VARIANTS))]
+    print(f"  overhead: {1 - statistics.median(ratios):.2%} of throughput (median of per-round ratios)")
+
+    stacks = {"without metrics": _stack(False), "with metrics": _stack(True)}
+    timings = {label: [] for label in stacks}
+    for _ in range(60):
+        for label, stack in stacks.items():
+            timings[label].append(await _in_process(stack, 2000))
+    without, with_ = (min(timings[label]) for label in stacks)
+    print(
+        f"in-process ASGI stack: {without * 1e6:.1f} us without, {with_ * 1e6:.1f} us with metrics "
+        f"(+{(with_ - without) * 1e6:.1f} us, {with_ / without - 1:.1%} per request)"
+    )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--seconds", type=float, default=1.0, help="Length of each round, per server")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--serve", choices=["with", "without"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve, args.port)
+    else:
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,230 @@
+# File: backend/scripts/benchmark_post_likes.py
+"""
+Load test for likes on one viral post (services/post_likes.py).
+
+Seeds one post, then sends --likes POST /api/posts/{postId}/like requests from distinct
+users, paced at --rate per minute (default 10,000/min), while the write-behind buffer
+flushes every LIKE_FLUSH_SECONDS the way the lifespan task does. Every tenth user
+clicks twice, which must not count twice. It reports the achieved rate, p50/p99
+latency and how many writes reached the post document, then checks the flushed
+likesCount against the likes sub-collection.
+
+The same load is replayed against likes kept on the post itself, for comparison: each
+click is a transaction that reads the post and adds to likedBy and likesCount, so every
+like rewrites one ever-growing document and contends with every other like. It reports
+transaction attempts, aborts and clicks that failed outright. The emulator doesn't
+enforce production's sustained write rate of about one per second per document, so
+that limit shows up here only as the write rate the post document would need.
+
+Finally it times GET /api/posts/{postId}/like ("did I like this") for 1,000 of the
+users with the like-state cache cold and then warm.
+
+Requires the emulator (`firebase emulators:start --only firestore`):
+    FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 python scripts/benchmark_post_likes.py \
+        [--likes 10000] [--rate 10000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+os.environ.setdefault("FIREBASE_PROJECT_ID", "demo-slugscene")
+
+import httpx
+from fastapi import Request
+
+import main
+from api.deps import AuthenticatedUser, get_current_user
+from services import firebase_service, post_likes as post_likes_module
+from services.metrics import firestore_rpcs_total
+from services.post_likes import post_likes
+
+USER_HEADER = "X-Load-Test-User"
+POST_ID = "bench-viral-post"
+OLD_POST_ID = "bench-viral-post-likedby"
+STATE_CHECKS = 1000
+
+
+def _rpc_count(method: str, code: str = "OK") -> int:
+    return int(firestore_rpcs_total.value(method, code))
+
+
+def _ms(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+async def _seed(db) -> None:
+    likes = db.collection("clubPosts").document(POST_ID).collection(post_likes_module.LIKES_SUBCOLLECTION)
+    batch, pending = db.batch(), 0
+    async for snapshot in likes.stream():  # Likes left over from an earlier run
+        batch.delete(snapshot.reference)
+        pending += 1
+        if pending == 500:
+            await batch.commit()
+            batch, pending = db.batch(), 0
+    if pending:
+        await batch.commit()
+    for post_id in (POST_ID, OLD_POST_ID):
+        await db.collection("clubPosts").document(post_id).set({
+            "clubId": "bench-club", "authorId": "author", "content": "Going viral",
+            "likesCount": 0, "likedBy": [],
+        })
+
+
+async def _paced(clicks, rate: float, send):
+    """Runs send(uid) for every click at its scheduled time; returns elapsed seconds and latencies."""
+    latencies = []
+
+    async def scheduled(i, uid):
+        await asyncio.sleep(max(0.0, started + i * 60 / rate - time.perf_counter()))
+        sent = time.perf_counter()
+        await send(uid)
+        latencies.append(time.perf_counter() - sent)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(scheduled(i, uid) for i, uid in enumerate(clicks)))
+    return time.perf_counter() - started, sorted(latencies)
+
+
+def _clicks(likes: int):
+    users = [f"like-user-{i}" for i in range(likes)]
+    clicks = []
+    for i, uid in enumerate(users):
+        clicks.append(uid)
+        if i % 10 == 9:
+            clicks.append(uid)
+    return users, clicks
+
+
+async def _write_behind(client, db, clicks, rate):
+    statuses, post_writes, stop = Counter(), 0, asyncio.Event()
+
+    async def like(uid):
+        response = await client.post(f"/api/posts/{POST_ID}/like", headers={USER_HEADER: uid})
+        statuses[(response.status_code, response.json().get("changed"))] += 1
+
+    async def flush_periodically():
+        nonlocal post_writes
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), post_likes_module.LIKE_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            post_writes += await post_likes.flush(db)
+
+    flusher = asyncio.create_task(flush_periodically())
+    seconds, latencies = await _paced(clicks, rate, like)
+    stop.set()
+    await flusher
+    return seconds, latencies, statuses, post_writes
+
+
+async def _likes_stored(db, post_id: str) -> int:
+    likes = 0
+    async for _ in db.collection("clubPosts").document(post_id).collection(
+        post_likes_module.LIKES_SUBCOLLECTION
+    ).stream():
+        likes += 1
+    return likes
+
+
+async def _old_design(db, clicks, rate):
+    from google.api_core import exceptions as google_exceptions
+    from google.cloud import firestore
+
+    post = db.collection("clubPosts").document(OLD_POST_ID)
+    failed = 0
+
+    @firestore.async_transactional
+    async def like_in_transaction(transaction, uid):
+        snapshot = await post.get(transaction=transaction)
+        if uid not in snapshot.to_dict().get("likedBy", []):
+            transaction.update(post, {"likedBy": firestore.ArrayUnion([uid]), "likesCount": firestore.Increment(1)})
+
+    async def like(uid):
+        # Likes kept on the post itself: every click is a transaction on that one document.
+        nonlocal failed
+        try:
+            await like_in_transaction(db.transaction(), uid)
+        except (google_exceptions.GoogleAPICallError, ValueError):  # ValueError: out of attempts
+            failed += 1
+
+    seconds, latencies = await _paced(clicks, rate, like)
+    return seconds, latencies, failed
+
+
+async def _like_state(client, users):
+    latencies = []
+    for uid in users:
+        started = time.perf_counter()
+        response = await client.get(f"/api/posts/{POST_ID}/like", headers={USER_HEADER: uid})
+        latencies.append(time.perf_counter() - started)
+        assert response.json()["liked"]
+    return sorted(latencies)
+
+
+async def run(args) -> None:
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("Set FIRESTORE_EMULATOR_HOST; this benchmark writes to Firestore.")
+    await firebase_service.warm_up()
+    db = firebase_service.db
+    if db is None:
+        sys.exit("Firestore did not initialize; is the emulator running?")
+    await _seed(db)
+
+    async def current_user(request: Request) -> AuthenticatedUser:
+        return AuthenticatedUser(uid=request.headers[USER_HEADER])
+
+    main.app.dependency_overrides[get_current_user] = current_user
+    users, clicks = _clicks(args.likes)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=120) as client:
+        seconds, latencies, statuses, post_writes = await _write_behind(client, db, clicks, args.rate)
+        stored = (await db.collection("clubPosts").document(POST_ID).get()).to_dict()["likesCount"]
+        print(
+            f"write-behind: {len(clicks):,} clicks by {len(users):,} users in {seconds:.1f}s "
+            f"({len(clicks) / seconds * 60:,.0f}/min); p50 {_ms(latencies, 0.5):.1f} ms, "
+            f"p99 {_ms(latencies, 0.99):.1f} ms; (status, changed) {dict(statuses)}"
+        )
+        print(
+            f"  {post_writes} writes to the post document ({post_writes / seconds:.2f}/s); "
+            f"likesCount {stored:,}, like documents {await _likes_stored(db, POST_ID):,}"
+        )
+
+        began, aborted = _rpc_count("BeginTransaction"), _rpc_count("Commit", "ABORTED")
+        seconds, latencies, failed = await _old_design(db, clicks, args.rate)
+        stored = (await db.collection("clubPosts").document(OLD_POST_ID).get()).to_dict()
+        print(
+            f"likedBy on the post: {len(clicks):,} clicks in {seconds:.1f}s; p50 {_ms(latencies, 0.5):.1f} ms, "
+            f"p99 {_ms(latencies, 0.99):.1f} ms; {_rpc_count('BeginTransaction') - began:,} transaction attempts, "
+            f"{_rpc_count('Commit', 'ABORTED') - aborted:,} aborted, {failed:,} clicks failed"
+        )
+        print(
+            f"  {stored['likesCount']:,} writes to the post document ({stored['likesCount'] / seconds:.1f}/s); "
+            f"the document now carries {len(stored['likedBy']):,} user IDs"
+        )
+
+        checked = users[:STATE_CHECKS]
+        post_likes._liked.clear()
+        cold = await _like_state(client, checked)
+        warm = await _like_state(client, checked)
+        print(
+            f"did-I-like-this for {len(checked):,} users: cached p50 {_ms(warm, 0.5):.2f} ms, "
+            f"uncached p50 {_ms(cold, 0.5):.2f} ms"
+        )
+    await firebase_service.close_firestore()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--likes", type=int, default=10_000, help="Distinct users liking the post")
+    parser.add_argument("--rate", type=float, default=10_000, help="Clicks per minute")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
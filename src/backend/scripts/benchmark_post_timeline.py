@@ -0,0 +1,163 @@
+# File: backend/scripts/benchmark_post_timeline.py
+"""
+Fan-out-on-read vs fan-out-on-write for GET /api/posts/feed (services/post_timeline.py).
+
+Generates --posts posts in each of 500 clubs over the last 30 days (every tenth one
+sharing its timestamp with the post before it, to exercise cursor ties). Every query
+costs a simulated round trip (--rtt-ms, default 5). For users in 5, 50 and 500 clubs
+it pages through --pages pages of 20:
+  - fan-out-on-read (what the service does): ClubPostTimeline's bounded k-way merge
+    over per-club queries, with a cold and then a warm per-club head cache;
+  - fan-out-on-write: one query against a per-user materialized timeline.
+It reports latency and queries per page, checks both return the same posts, and prints
+what fan-out-on-write costs on the write side: one timeline write per follower for
+every new post, for a club with --followers followers.
+
+No Firestore needed:
+    python scripts/benchmark_post_timeline.py [--posts 200] [--pages 5] [--rtt-ms 5] [--followers 2000]
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+import services.post_timeline as post_timeline
+from models.club_post import ClubPost
+from services.post_timeline import ClubPostTimeline, decode_cursor, encode_cursor
+
+CLUBS = 500
+PAGE_SIZE = 20
+MAX_BATCH_WRITES = 500
+
+
+def _posts(per_club: int, now: datetime):
+    rng = random.Random(42)
+    clubs = {}
+    for c in range(CLUBS):
+        club_id = f"club{c}"
+        posts = []
+        for p in range(per_club):
+            created_at = now - timedelta(seconds=rng.randrange(30 * 86400))
+            if p % 10 == 9:
+                created_at = posts[-1].createdAt
+            posts.append(ClubPost(postId=f"{club_id}-post{p}", clubId=club_id, authorId="u", content="",
+                                  createdAt=created_at))
+        clubs[club_id] = sorted(posts, key=lambda post: (post.createdAt, post.postId), reverse=True)
+    return clubs
+
+
+class SimulatedStore:
+    """Per-club post lists and per-user timelines, each read costing one round trip."""
+
+    def __init__(self, clubs, rtt):
+        self.clubs = clubs
+        self.rtt = rtt
+        self.queries = 0
+
+    async def club_posts_after(self, _db, club_id, after, limit):
+        self.queries += 1
+        await asyncio.sleep(self.rtt)
+        return _after(self.clubs[club_id], after)[:limit]
+
+    async def timeline_page(self, timeline, cursor):
+        self.queries += 1
+        await asyncio.sleep(self.rtt)
+        page = _after(timeline, decode_cursor(cursor) if cursor else None)[:PAGE_SIZE + 1]
+        next_cursor = encode_cursor(page[PAGE_SIZE - 1]) if len(page) > PAGE_SIZE else None
+        return page[:PAGE_SIZE], next_cursor
+
+
+def _after(posts, after):
+    """The newest-first `posts` past `after`, like start_after on (timestamp, __name__) descending."""
+    start = 0
+    if after is not None:
+        while start < len(posts) and (posts[start].createdAt, posts[start].postId) >= after:
+            start += 1
+    return posts[start:]
+
+
+async def _pages(fetch, pages):
+    timings, queries, seen, cursor = [], [], [], None
+    for _ in range(pages):
+        started, before = time.perf_counter(), STORE.queries
+        posts, cursor = await fetch(cursor)
+        timings.append(time.perf_counter() - started)
+        queries.append(STORE.queries - before)
+        seen += [post.postId for post in posts]
+        if cursor is None:
+            break
+    return timings, queries, seen
+
+
+STORE: SimulatedStore
+
+
+async def run(args) -> None:
+    global STORE
+    now = datetime.now(timezone.utc)
+    clubs = _posts(args.posts, now)
+    STORE = SimulatedStore(clubs, args.rtt_ms / 1000)
+    post_timeline.get_club_posts_after = STORE.club_posts_after
+    print(f"{CLUBS} clubs x {args.posts} posts, {args.rtt_ms} ms per query, {args.pages} pages of {PAGE_SIZE}")
+
+    for joined in (5, 50, 500):
+        club_ids = [f"club{c}" for c in range(joined)]
+        timeline = ClubPostTimeline()
+
+        async def read_page(cursor):
+            page = await timeline.page(None, club_ids, limit=PAGE_SIZE, cursor=cursor)
+            return page.posts, page.nextCursor
+
+        cold = await _pages(read_page, args.pages)
+        warm = await _pages(read_page, args.pages)
+
+        # Fan-out-on-write: the user's timeline was materialized as posts were written.
+        materialized = sorted(
+            (post for club_id in club_ids for post in clubs[club_id]),
+            key=lambda post: (post.createdAt, post.postId), reverse=True,
+        )
+
+        async def read_materialized(cursor):
+            return await STORE.timeline_page(materialized, cursor)
+
+        written = await _pages(read_materialized, args.pages)
+        print(f"user in {joined} clubs:")
+        for label, (timings, queries, _) in (
+            ("fan-out-on-read, cold", cold), ("fan-out-on-read, warm", warm), ("fan-out-on-write", written),
+        ):
+            print(
+                f"  {label:>22}: first page {timings[0] * 1000:6.1f} ms ({queries[0]} queries), "
+                f"later pages median {statistics.median(timings[1:] or timings) * 1000:6.1f} ms "
+                f"({statistics.median(queries[1:] or queries):.0f} queries)"
+            )
+        print(f"  same posts in the same order: {cold[2] == warm[2] == written[2]}; "
+              f"materialized timeline holds {len(materialized):,} entries for this user")
+
+    commits = math.ceil(args.followers / MAX_BATCH_WRITES)
+    print(
+        f"fan-out-on-write cost of one new post in a club with {args.followers:,} followers: "
+        f"{args.followers:,} timeline writes in {commits} batch commits "
+        f"(~{commits * args.rtt_ms:.0f} ms of round trips, more than that against per-database write limits); "
+        f"fan-out-on-read: 1 write"
+    )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=200, help="Posts per club")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--rtt-ms", type=float, default=5.0, help="Simulated round trip per query")
+    parser.add_argument("--followers", type=int, default=2000, help="Followers of the club a new post lands in")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
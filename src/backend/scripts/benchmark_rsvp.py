@@ -0,0 +1,165 @@
+# File: backend/scripts/benchmark_rsvp.py
+"""
+Burst test for event RSVPs (services/event_rsvp.py).
+
+Seeds one event with --capacity seats (default 200) and --users users (default 2,000),
+then sends every user's POST /api/events/{eventId}/rsvp at once (at most --concurrency
+in flight), the way registration opening for a popular event looks. It reports throughput and latency, how many seat
+transactions ran and aborted, and how many requests the admission gate sent straight
+to the waitlist; then checks the RSVP documents and counter shards against each other:
+exactly `capacity` seats taken, everyone else waitlisted, no user twice.
+
+Afterwards every user repeats the RSVP (all must be no-ops), and --cancel seated users
+cancel (each seat must go to the earliest waitlisted user).
+
+Requires the emulator (`firebase emulators:start --only firestore`):
+    FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 python scripts/benchmark_rsvp.py \
+        [--users 2000] [--capacity 200] [--cancel 20] [--concurrency 500]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+os.environ.setdefault("FIREBASE_PROJECT_ID", "demo-slugscene")
+
+import httpx
+from fastapi import Request
+
+import main
+from api.deps import AuthenticatedUser, get_current_user
+from services import event_rsvp, firebase_service
+from services.event_rsvp import event_rsvps
+from services.metrics import firestore_rpcs_total
+
+USER_HEADER = "X-Load-Test-User"
+EVENT_ID = "bench-rsvp-event"
+
+
+def _rpc_count(method: str, code: str = "OK") -> int:
+    return int(firestore_rpcs_total.value(method, code))
+
+
+async def _seed(db, args) -> None:
+    start = datetime.now(timezone.utc) + timedelta(days=7)
+    await db.collection("events").document(EVENT_ID).set({
+        "clubId": "bench-club", "title": "Popular event", "startTime": start,
+        "endTime": start + timedelta(hours=2), "capacity": args.capacity,
+    })
+    for first in range(0, args.users, 500):
+        batch = db.batch()
+        for i in range(first, min(first + 500, args.users)):
+            batch.set(db.collection("users").document(f"rsvp-user-{i}"), {"joinedClubs": [], "eventsAttend": []})
+        await batch.commit()
+
+
+async def _burst(client, users, concurrency):
+    latencies, statuses, results = [], Counter(), {}
+    in_flight = asyncio.Semaphore(concurrency)
+
+    async def send(uid):
+        started = time.perf_counter()
+        async with in_flight:
+            response = await client.post(f"/api/events/{EVENT_ID}/rsvp", headers={USER_HEADER: uid})
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] += 1
+        if response.status_code == 200:
+            results[uid] = response.json()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(uid) for uid in users))
+    return time.perf_counter() - started, sorted(latencies), statuses, results
+
+
+def _ms(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+async def _stored_rsvps(db):
+    rsvps = {}
+    async for snapshot in db.collection("events").document(EVENT_ID).collection("rsvps").stream():
+        rsvps[snapshot.id] = snapshot.to_dict()
+    return rsvps
+
+
+async def run(args) -> None:
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("Set FIRESTORE_EMULATOR_HOST; this benchmark writes to Firestore.")
+    await firebase_service.warm_up()
+    db = firebase_service.db
+    if db is None:
+        sys.exit("Firestore did not initialize; is the emulator running?")
+    await _seed(db, args)
+
+    async def current_user(request: Request) -> AuthenticatedUser:
+        return AuthenticatedUser(uid=request.headers[USER_HEADER])
+
+    main.app.dependency_overrides[get_current_user] = current_user
+    users = [f"rsvp-user-{i}" for i in range(args.users)]
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=120) as client:
+        began, aborted = _rpc_count("BeginTransaction"), _rpc_count("Commit", "ABORTED")
+        seconds, latencies, statuses, results = await _burst(client, users, args.concurrency)
+        print(
+            f"{args.users} simultaneous RSVPs for {args.capacity} seats ({event_rsvp.RSVP_COUNTER_SHARDS} shards): "
+            f"{seconds:.2f}s = {args.users / seconds:.0f} RSVPs/s; p50 {_ms(latencies, 0.5):.0f} ms, "
+            f"p99 {_ms(latencies, 0.99):.0f} ms; statuses {dict(statuses)}"
+        )
+        print(
+            f"  seat transactions {event_rsvps.seat_transactions} "
+            f"({_rpc_count('BeginTransaction') - began} attempts, {_rpc_count('Commit', 'ABORTED') - aborted} aborted), "
+            f"gated straight to the waitlist {event_rsvps.gated}; "
+            f"responses {dict(Counter(result['status'] for result in results.values()))}"
+        )
+
+        rsvps = await _stored_rsvps(db)
+        stored = Counter(data["status"] for data in rsvps.values())
+        going, waitlisted = await event_rsvps.get_counts(db, EVENT_ID, fresh=True)
+        agrees = all(rsvps[uid]["status"] == result["status"] for uid, result in results.items())
+        print(
+            f"  stored RSVPs {dict(stored)} for {len(rsvps)} users; shard totals going {going}, "
+            f"waitlisted {waitlisted}; overbooked: {stored['going'] > args.capacity or going > args.capacity}; "
+            f"responses match documents: {agrees}"
+        )
+
+        seconds, _, statuses, results = await _burst(client, users, args.concurrency)
+        changed = sum(1 for result in results.values() if result["changed"])
+        print(f"repeat of every RSVP: {seconds:.2f}s, statuses {dict(statuses)}, {changed} changed anything")
+
+        waitlist = sorted(
+            (uid for uid, data in rsvps.items() if data["status"] == "waitlisted"),
+            key=lambda uid: rsvps[uid]["waitlistedAt"],
+        )
+        seated = [uid for uid, data in rsvps.items() if data["status"] == "going"][:args.cancel]
+        for uid in seated:  # One at a time, so "earliest waitlisted" is well defined
+            await client.delete(f"/api/events/{EVENT_ID}/rsvp", headers={USER_HEADER: uid})
+        after = await _stored_rsvps(db)
+        promoted = [uid for uid in waitlist if after.get(uid, {}).get("status") == "going"]
+        going, waitlisted = await event_rsvps.get_counts(db, EVENT_ID, fresh=True)
+        print(
+            f"{len(seated)} cancellations: promoted {len(promoted)}, earliest first: "
+            f"{promoted == waitlist[:len(seated)]}; going {going}, waitlisted {waitlisted}"
+        )
+
+        await event_rsvps.flush(db)
+        event = (await db.collection("events").document(EVENT_ID).get()).to_dict()
+        print(f"event document: attendeeCount {event.get('attendeeCount')}, waitlistCount {event.get('waitlistCount')}")
+    await firebase_service.close_firestore()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--capacity", type=int, default=200)
+    parser.add_argument("--cancel", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=500, help="Requests in flight at once")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
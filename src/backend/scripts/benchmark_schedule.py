@@ -0,0 +1,114 @@
+# File: backend/scripts/benchmark_schedule.py
+"""
+Benchmark for GET /api/users/me/schedule (services/event_schedule.py).
+
+Builds an in-memory EventIndex of --clubs clubs (default 40) with --events events each
+(default 200), spread over the next 30 days, and times a schedule for a user in every
+club three ways:
+  - cold: the first request, which builds each club's interval list;
+  - warm: later requests, which reuse the cached lists (k-way merge + sweep line);
+  - pairwise: checking every pair of events, as a reference.
+It also checks that the sweep finds exactly the pairs the pairwise check does, and that
+editing one event only rebuilds that club's list.
+
+No Firestore needed:
+    python scripts/benchmark_schedule.py [--clubs 40] [--events 200] [--runs 20]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+from models.event import Event
+from services.event_index import EventIndex
+from services.event_schedule import build_schedule
+
+WINDOW = timedelta(days=30)
+
+
+def _events(clubs: int, per_club: int, now: datetime):
+    rng = random.Random(42)
+    events = []
+    for c in range(clubs):
+        for e in range(per_club):
+            start = now + timedelta(minutes=rng.randrange(int(WINDOW.total_seconds() // 60)))
+            events.append(Event(
+                eventId=f"club{c}-event{e}", clubId=f"club{c}", name="Meeting", description="",
+                startTime=start, endTime=start + timedelta(minutes=rng.choice([30, 60, 90, 120])),
+                location="",
+            ))
+    return events
+
+
+def _pairwise(events, start, end):
+    window = [e for e in events if e.endTime > start and e.startTime < end]
+    pairs = set()
+    for i, a in enumerate(window):
+        for b in window[i + 1:]:
+            if a.startTime < b.endTime and b.startTime < a.endTime:
+                pairs.add(frozenset((a.eventId, b.eventId)))
+    return pairs
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:.2f} ms"
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clubs", type=int, default=40)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    events = _events(args.clubs, args.events, now)
+    club_ids = [f"club{c}" for c in range(args.clubs)]
+    index = EventIndex(events)
+    start, end = now, now + WINDOW
+
+    began = time.perf_counter()
+    schedule = build_schedule(index, club_ids, start, end)
+    cold = time.perf_counter() - began
+
+    warm = []
+    for _ in range(args.runs):
+        began = time.perf_counter()
+        build_schedule(index, club_ids, start, end)
+        warm.append(time.perf_counter() - began)
+
+    began = time.perf_counter()
+    expected = _pairwise(events, start, end)
+    pairwise = time.perf_counter() - began
+
+    found = {frozenset((item.event.eventId, other)) for item in schedule.events for other in item.conflictsWith}
+    in_order = all(a.event.startTime <= b.event.startTime for a, b in zip(schedule.events, schedule.events[1:]))
+    print(
+        f"{args.clubs} clubs x {args.events} events = {len(schedule.events)} events, "
+        f"{schedule.conflictCount} overlapping pairs"
+    )
+    print(
+        f"  cold {_ms(cold)}, warm median {_ms(statistics.median(warm))} (min {_ms(min(warm))}), "
+        f"pairwise {_ms(pairwise)}"
+    )
+    print(f"  same pairs as pairwise: {found == expected and len(found) == schedule.conflictCount}; "
+          f"start order: {in_order}")
+
+    # An edit drops only that club's cached list.
+    moved = events[0]
+    index.upsert(Event(**{**moved.__dict__, "startTime": moved.startTime + timedelta(hours=1),
+                          "endTime": moved.endTime + timedelta(hours=1)}))
+    stale = sum(1 for club_id in club_ids if club_id not in index._club_intervals)
+    began = time.perf_counter()
+    build_schedule(index, club_ids, start, end)
+    print(f"  after editing one event: {_ms(time.perf_counter() - began)}, {stale} club list(s) rebuilt")
+
+
+if __name__ == "__main__":
+    main_cli()
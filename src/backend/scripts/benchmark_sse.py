@@ -0,0 +1,229 @@
+# File: backend/scripts/benchmark_sse.py
+"""
+Memory and fan-out latency of GET /api/stream (services/change_stream.py).
+
+Opens SSE connections straight against the ASGI app (no sockets, so what is measured
+is the server's own cost), the way uvicorn drives it:
+  1. N idle clients (default 5,000), following clubs that never change; the Python heap
+     growth (tracemalloc) divided by N is the memory per connection;
+  2. M active clients (default 500), all following one busy club, plus one stalled client
+     that never reads past its first frame;
+  3. event changes for the busy club are fed in through the same callback the `events`
+     listener calls, at --rate per second, and the time from the change arriving to each
+     client's frame being written is recorded;
+  4. one active client reconnects with its Last-Event-ID and must get exactly what it missed.
+
+Users and their joinedClubs are seeded in Firestore, since the endpoint reads them there.
+Requires the emulator (`firebase emulators:start --only firestore`):
+    FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 python scripts/benchmark_sse.py \
+        [--idle 5000] [--active 500] [--changes 400] [--rate 100]
+"""
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+os.environ.setdefault("FIREBASE_PROJECT_ID", "demo-slugscene")
+
+from fastapi import Request
+
+import main
+from api.deps import AuthenticatedUser, get_stream_user
+from services import firebase_service
+from services.change_stream import change_hub
+
+BUSY_CLUB = "bench-busy-club"
+
+
+class Client:
+    """One simulated EventSource: records when each message ID arrives."""
+
+    def __init__(self, uid: str, last_event_id: str = None, stall: bool = False):
+        self.uid = uid
+        self.last_event_id = last_event_id
+        self.stall = stall
+        self.status = None
+        self.frames = 0
+        self.received = {}  # seq -> perf_counter when written
+        self.opened = asyncio.Event()
+        self._disconnect = asyncio.Event()
+        self.task = None
+
+    async def receive(self):
+        if not hasattr(self, "_sent_request"):
+            self._sent_request = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self._disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        now = time.perf_counter()
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            return
+        body = message.get("body", b"")
+        if not body:
+            return
+        self.frames += 1
+        for line in body.split(b"\n"):
+            if line.startswith(b"id: "):
+                self.last_event_id = line[4:].decode()
+                seq = int(self.last_event_id.rpartition("-")[2])
+                self.received.setdefault(seq, now)
+        self.opened.set()
+        if self.stall:
+            await asyncio.Event().wait()  # A client that stopped reading: the write never completes
+
+    def open(self):
+        headers = [(b"authorization", f"Bearer {self.uid}".encode())]
+        if self.last_event_id:
+            headers.append((b"last-event-id", self.last_event_id.encode()))
+        scope = {
+            "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": "/api/stream", "raw_path": b"/api/stream",
+            "root_path": "", "query_string": b"", "headers": headers,
+            "client": ("127.0.0.1", 50000), "server": ("127.0.0.1", 8000),
+        }
+        self.task = asyncio.create_task(main.app(scope, self.receive, self.send))
+
+    async def close(self):
+        self._disconnect.set()
+        self.task.cancel()
+        try:
+            await self.task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+
+async def stream_user(request: Request) -> AuthenticatedUser:
+    # The benchmark passes the user ID as the bearer token.
+    return AuthenticatedUser(uid=request.headers["authorization"].split(" ", 1)[1])
+
+
+async def _seed(args) -> None:
+    db = firebase_service.db
+    users = [(f"bench-idle-{i}", [f"bench-quiet-{i % 500}"]) for i in range(args.idle)]
+    users += [(f"bench-active-{i}", [BUSY_CLUB, f"bench-quiet-{i % 500}"]) for i in range(args.active + 1)]
+    for first in range(0, len(users), 500):
+        batch = db.batch()
+        for uid, joined in users[first:first + 500]:
+            batch.set(db.collection("users").document(uid), {"joinedClubs": joined})
+        await batch.commit()
+
+
+async def _open(clients, concurrency=200):
+    for first in range(0, len(clients), concurrency):
+        chunk = clients[first:first + concurrency]
+        for client in chunk:
+            client.open()
+        await asyncio.wait_for(asyncio.gather(*(client.opened.wait() for client in chunk)), 60)
+
+
+def _percentiles(samples):
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return f"p50 {pick(0.5):.2f} ms, p99 {pick(0.99):.2f} ms, max {ordered[-1] * 1000:.2f} ms"
+
+
+async def run(args) -> None:
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("Set FIRESTORE_EMULATOR_HOST; this benchmark writes to Firestore.")
+    await firebase_service.warm_up()
+    if firebase_service.db is None:
+        sys.exit("Firestore did not initialize; is the emulator running?")
+    await _seed(args)
+    main.app.dependency_overrides[get_stream_user] = stream_user
+    # The hub's intake is fed directly below instead of by the listeners.
+    change_hub._primed.update(("club", "event", "post"))
+
+    idle = [Client(f"bench-idle-{i}") for i in range(args.idle)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    await _open(idle)
+    gc.collect()
+    grown = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(
+        f"{args.idle} idle connections opened in {time.perf_counter() - started:.2f}s; "
+        f"Python heap +{grown / 2**20:.1f} MiB = {grown / args.idle / 1024:.1f} KiB per connection"
+    )
+
+    active = [Client(f"bench-active-{i}") for i in range(args.active)]
+    stalled = Client(f"bench-active-{args.active}", stall=True)
+    await _open(active + [stalled])
+    print(f"{args.active} active + 1 stalled connections open; hub: {change_hub.stats()}")
+
+    published = {}
+    start_time = datetime(2030, 1, 1, 18, tzinfo=timezone.utc)
+    reconnecting = active[0]
+    for i in range(args.changes):
+        if i == args.changes // 2:
+            # Drop one client halfway; it reconnects after the run with its Last-Event-ID.
+            await reconnecting.close()
+        change = (f"bench-event-{i}", {
+            "clubId": BUSY_CLUB, "title": f"Event {i}", "description": "Benchmark event",
+            "location": "Quarry Plaza", "startTime": start_time + timedelta(hours=i),
+            "endTime": start_time + timedelta(hours=i + 2),
+        })
+        published[change_hub._seq + 1] = time.perf_counter()
+        change_hub.on_event_changes([change], False)
+        await asyncio.sleep(1 / args.rate)
+    await asyncio.sleep(0.5)
+
+    live = active[1:]
+    latencies = [
+        received - published[seq] for client in live for seq, received in client.received.items() if seq in published
+    ]
+    complete = sum(1 for client in live if all(seq in client.received for seq in published))
+    print(
+        f"{args.changes} changes at {args.rate}/s fanned out to {len(live)} clients: "
+        f"{len(latencies)} deliveries, {complete}/{len(live)} clients got every change; {_percentiles(latencies)}"
+    )
+    woken = [client for client in idle if len(client.received) > 1]
+    print(f"idle clients that received a change: {len(woken)}")
+    print(
+        f"stalled client: {len(stalled.received)} frame(s) written, "
+        f"{sum(s.dropped for subs in change_hub._by_user.values() for s in subs)} messages dropped, "
+        f"queue held {sum(len(s.queue) for s in change_hub._by_user.get(stalled.uid, ()))}"
+    )
+
+    resumed = Client(reconnecting.uid, last_event_id=reconnecting.last_event_id)
+    await _open([resumed])
+    await asyncio.sleep(0.1)
+    resumed_from = int(reconnecting.last_event_id.rpartition("-")[2])
+    missed = {seq for seq in published if seq > resumed_from}
+    replayed = set(resumed.received)
+    print(
+        f"reconnect with Last-Event-ID {reconnecting.last_event_id}: replayed {len(replayed & missed)}/{len(missed)} "
+        f"missed changes, {len(replayed - missed)} extra"
+    )
+
+    for client in idle + active[1:] + [stalled, resumed]:
+        await client.close()
+    await asyncio.sleep(0.1)
+    print(f"after closing: hub {change_hub.stats()}")
+    await firebase_service.close_firestore()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--idle", type=int, default=5000)
+    parser.add_argument("--active", type=int, default=500)
+    parser.add_argument("--changes", type=int, default=400)
+    parser.add_argument("--rate", type=float, default=100, help="Changes per second.")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,120 @@
+# File: backend/scripts/benchmark_token_cache.py
+"""
+Benchmark for ID token verification on GET /api/users/me (services/token_cache.py).
+
+Generates an RSA keypair locally as a stand-in for Google's signing certificates and
+mints --sessions RS256 ID tokens with it. firebase_admin.auth.verify_id_token is
+replaced by a verifier that checks signatures against that key, so every miss does the
+same RSA work as the real one, minus the network. Then --requests calls (at most
+--concurrency in flight) to /api/users/me are sent round-robin over the sessions, twice:
+  - uncached: every request verifies its token;
+  - cached: only the first request of each session does.
+It prints throughput, p50/p99 latency and the cache's hit/miss counters for each run.
+
+No Firestore needed:
+    python scripts/benchmark_token_cache.py [--sessions 50] [--requests 5000] [--concurrency 100]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+os.environ.setdefault("FIREBASE_PROJECT_ID", "demo-slugscene")
+
+import firebase_admin.auth
+import httpx
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from google.auth import crypt, jwt
+
+import main
+from services.token_cache import token_cache
+
+KEY_ID = "bench-key"
+
+
+def _keypair():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return crypt.RSASigner.from_string(private_pem, key_id=KEY_ID), public_pem
+
+
+def _tokens(signer, sessions: int, project_id: str):
+    now = int(time.time())
+    return [
+        jwt.encode(signer, {
+            "iss": f"https://securetoken.google.com/{project_id}", "aud": project_id,
+            "sub": f"bench-user-{i}", "uid": f"bench-user-{i}", "email": f"user{i}@ucsc.edu",
+            "iat": now, "exp": now + 3600,
+        }).decode("ascii")
+        for i in range(sessions)
+    ]
+
+
+async def _run(client, tokens, requests: int, concurrency: int):
+    latencies = []
+    in_flight = asyncio.Semaphore(concurrency)
+
+    async def send(i):
+        async with in_flight:
+            started = time.perf_counter()
+            response = await client.get("/api/users/me", headers={"Authorization": f"Bearer {tokens[i % len(tokens)]}"})
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(i) for i in range(requests)))
+    return time.perf_counter() - started, sorted(latencies)
+
+
+def _ms(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+async def run(args) -> None:
+    project_id = os.environ["FIREBASE_PROJECT_ID"]
+    signer, public_pem = _keypair()
+    tokens = _tokens(signer, args.sessions, project_id)
+
+    def verify_id_token(id_token, *_args, **_kwargs):
+        return jwt.decode(id_token, certs={KEY_ID: public_pem}, audience=project_id)
+
+    def always_miss(_id_token):
+        token_cache.misses += 1
+        return None
+
+    firebase_admin.auth.verify_id_token = verify_id_token
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, cached in (("uncached", False), ("cached", True)):
+            token_cache.clear()
+            token_cache.hits = token_cache.misses = 0
+            if cached:
+                token_cache.__dict__.pop("get", None)
+            else:
+                token_cache.get = always_miss
+            seconds, latencies = await _run(client, tokens, args.requests, args.concurrency)
+            print(
+                f"{label:>8}: {args.requests / seconds:,.0f} req/s, p50 {_ms(latencies, 0.5):.2f} ms, "
+                f"p99 {_ms(latencies, 0.99):.2f} ms; cache {token_cache.stats()}"
+            )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50, help="Distinct tokens (signed-in users)")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100, help="Requests in flight at once")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,135 @@
+# File: backend/scripts/load_test_membership.py
+"""
+Load test for duplicate join/leave traffic (double-clicks on Join in ExplorePage).
+
+Seeds users and clubs in the Firestore emulator, then sends bursts in which every
+user fires the same POST /api/clubs/{club_id}/join (or /leave) several times at
+once. The run is repeated with request coalescing disabled and enabled, and the
+report shows how many Firestore transactions each run started and committed,
+plus the HTTP status codes returned (429s come from the rate limiter).
+
+Requires the emulator (`firebase emulators:start --only firestore`):
+    FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 python scripts/load_test_membership.py \
+        [--users 50] [--clubs 5] [--duplicates 4] [--bursts 3] [--no-rate-limit]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+os.environ.setdefault("FIREBASE_PROJECT_ID", "demo-slugscene")
+
+import httpx
+from fastapi import Request
+
+import main
+from api.deps import AuthenticatedUser, get_current_user
+from api.endpoints import clubs as clubs_endpoints
+from services import firebase_service
+from services.metrics import firestore_rpcs_total
+from services.rate_limit import MemoryRateLimitBackend, RateLimitBackend, membership_rate_limiter
+from services.single_flight import SingleFlight
+
+USER_HEADER = "X-Load-Test-User"
+
+
+class NoCoalescing(SingleFlight):
+    """Runs every call; the baseline the coalesced run is compared against."""
+
+    async def run(self, key, fn):
+        self.executions += 1
+        return await fn()
+
+
+class NoRateLimit(RateLimitBackend):
+    async def consume(self, buckets, tokens=1):
+        return 0.0
+
+
+def _rpc_count(method: str) -> int:
+    return int(firestore_rpcs_total.value(method, "OK"))
+
+
+async def _seed(users: int, clubs: int) -> None:
+    db = firebase_service.db
+    batch = db.batch()
+    for i in range(clubs):
+        batch.set(db.collection("clubs").document(f"load-club-{i}"), {
+            "name": f"Load Club {i}", "description": "Load test club", "memberCount": 0,
+        })
+    for i in range(users):
+        batch.set(db.collection("users").document(f"load-user-{i}"), {"joinedClubs": []})
+    await batch.commit()
+
+
+async def _run(client: httpx.AsyncClient, args, coalesce: bool) -> dict:
+    clubs_endpoints.membership_flights = SingleFlight() if coalesce else NoCoalescing()
+    # Both runs start with full token buckets.
+    membership_rate_limiter.backend = NoRateLimit() if args.no_rate_limit else MemoryRateLimitBackend()
+    statuses: Counter = Counter()
+    began, committed = _rpc_count("BeginTransaction"), _rpc_count("Commit")
+    started = time.perf_counter()
+
+    async def click(action: str, user: int) -> None:
+        club_id = f"load-club-{user % args.clubs}"
+        response = await client.post(
+            f"/api/clubs/{club_id}/{action}", headers={USER_HEADER: f"load-user-{user}"}
+        )
+        statuses[response.status_code] += 1
+
+    for _ in range(args.bursts):
+        for action in ("join", "leave"):
+            await asyncio.gather(*(
+                click(action, user) for user in range(args.users) for _ in range(args.duplicates)
+            ))
+    return {
+        "requests": sum(statuses.values()),
+        "statuses": dict(sorted(statuses.items())),
+        "transactions": _rpc_count("BeginTransaction") - began,
+        "commits": _rpc_count("Commit") - committed,
+        "executions": clubs_endpoints.membership_flights.executions,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+async def run(args) -> None:
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("Set FIRESTORE_EMULATOR_HOST; this test writes to Firestore.")
+    await firebase_service.warm_up()
+    if firebase_service.db is None:
+        sys.exit("Firestore did not initialize; is the emulator running?")
+
+    async def current_user(request: Request) -> AuthenticatedUser:
+        return AuthenticatedUser(uid=request.headers[USER_HEADER])
+
+    main.app.dependency_overrides[get_current_user] = current_user
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+        for coalesce in (False, True):
+            await _seed(args.users, args.clubs)
+            result = await _run(client, args, coalesce)
+            label = "coalesced" if coalesce else "baseline "
+            print(
+                f"{label}: {result['requests']} requests in {result['seconds']:.2f}s, "
+                f"{result['executions']} executions, {result['transactions']} transactions begun, "
+                f"{result['commits']} commits, statuses {result['statuses']}"
+            )
+    await firebase_service.close_firestore()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--clubs", type=int, default=5)
+    parser.add_argument("--duplicates", type=int, default=4, help="Identical clicks per user per burst.")
+    parser.add_argument("--bursts", type=int, default=3, help="Join-then-leave rounds.")
+    parser.add_argument("--no-rate-limit", action="store_true", help="Measure coalescing on its own.")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
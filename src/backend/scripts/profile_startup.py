@@ -0,0 +1,101 @@
+# File: backend/scripts/profile_startup.py
+"""
+Startup profiling report for the backend.
+
+1. Runs `python -X importtime -c "import main"` and lists the slowest imports
+   by cumulative time.
+2. Boots the app under uvicorn and measures time-to-first-healthy-response,
+   i.e. how long until GET /api/health answers 200.
+
+Usage (from backend/):
+    python scripts/profile_startup.py [--top 25] [--runs 3] [--port 8765]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_imports(top: int):
+    """Returns (total_seconds, [(cumulative_us, self_us, module), ...]) for `import main`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"`import main` failed:\n{result.stderr}")
+
+    rows = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        rows.append((int(cumulative_us), int(self_us), module))
+        if len(indent) == 1:  # Top-level import
+            total_us += int(cumulative_us)
+    rows.sort(reverse=True)
+    return total_us / 1e6, rows[:top]
+
+
+def time_to_first_healthy_response(port: int, timeout: float = 60.0) -> float:
+    """Starts uvicorn and returns seconds until /api/health answers 200."""
+    url = f"http://127.0.0.1:{port}/api/health"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SRC_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError("uvicorn exited before becoming healthy")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, TimeoutError):
+                pass
+            time.sleep(0.02)
+        raise TimeoutError(f"/api/health was not healthy within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=25, help="How many imports to list.")
+    parser.add_argument("--runs", type=int, default=3, help="How many cold starts to time.")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    total, rows = profile_imports(args.top)
+    print(f"Import time for `import main`: {total:.3f}s")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for cumulative_us, self_us, module in rows:
+        print(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {module}")
+
+    timings = [time_to_first_healthy_response(args.port) for _ in range(args.runs)]
+    print()
+    print(
+        f"Time to first healthy /api/health over {args.runs} run(s): "
+        f"median {statistics.median(timings):.3f}s, min {min(timings):.3f}s, max {max(timings):.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
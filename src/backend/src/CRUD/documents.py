@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+
+# Firestore caps BatchGetDocuments at a few hundred references per call; staying
+# well below it keeps each response small enough to stream quickly.
+GET_ALL_CHUNK_SIZE = 100
+# Upper bound on batched reads in flight at once for a single lookup.
+MAX_CONCURRENT_GET_ALL = 4
+
+
+def as_utc(value: Any) -> Optional[datetime]:
+    """Normalizes Firestore timestamps (and naive datetimes, assumed UTC) to aware UTC."""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+async def get_snapshots(db: AsyncClient, refs: List[Any]) -> List[Any]:
+    """
+    Reads many documents, from any collections, with batched `get_all` calls, at most
+    MAX_CONCURRENT_GET_ALL in flight. Snapshots come back in arbitrary order; documents
+    that don't exist are included with `exists` False.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_GET_ALL)
+    snapshots: List[Any] = []
+
+    async def fetch_chunk(chunk: List[Any]) -> None:
+        async with semaphore:
+            async for snapshot in db.get_all(chunk):
+                snapshots.append(snapshot)
+
+    await asyncio.gather(*(
+        fetch_chunk(refs[i:i + GET_ALL_CHUNK_SIZE]) for i in range(0, len(refs), GET_ALL_CHUNK_SIZE)
+    ))
+    return snapshots
+
+
+async def get_documents_by_ids(
+    db: AsyncClient,
+    collection: str,
+    doc_ids: Iterable[str],
+    id_field: Optional[str] = None,
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Fetches many documents from one collection using batched `get_all` reads.
+    Repeated IDs are fetched once. The result lines up with `doc_ids`, with None
+    for IDs that are empty or whose document does not exist.
+    If `id_field` is given, the document ID is added to each dict under that key.
+    """
+    if isinstance(db, RequestDocumentCache):
+        return await db.get_documents(collection, doc_ids, id_field)
+    doc_ids = list(doc_ids)
+    unique_ids = list(dict.fromkeys(doc_id for doc_id in doc_ids if doc_id))
+    if not unique_ids:
+        return [None] * len(doc_ids)
+
+    collection_ref = db.collection(collection)
+    found: Dict[str, Dict[str, Any]] = {}
+    for snapshot in await get_snapshots(db, [collection_ref.document(doc_id) for doc_id in unique_ids]):
+        if not snapshot.exists:
+            continue
+        data = snapshot.to_dict() or {}
+        if id_field:
+            data[id_field] = snapshot.id
+        found[snapshot.id] = data
+
+    # Hand each caller position its own dict so repeated IDs can be mutated independently.
+    return [dict(found[doc_id]) if doc_id in found else None for doc_id in doc_ids]
+
+
+class RequestDocumentCache:
+    """
+    Request-scoped identity map over an AsyncClient.
+    Each document path is read from Firestore at most once per request: concurrent reads
+    share one in-flight future and repeat reads are served from memory. Everything else
+    (collection(), transaction(), batch(), ...) passes straight through to the client.
+    Call `invalidate` after writing a document so later reads in the request see the write.
+    """
+
+    def __init__(self, db: AsyncClient):
+        self.db = db
+        self._documents: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.rpcs = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.db, name)
+
+    def invalidate(self, collection: str, doc_id: str) -> None:
+        self._documents.pop(f"{collection}/{doc_id}", None)
+
+    async def get_documents(
+        self,
+        collection: str,
+        doc_ids: Iterable[str],
+        id_field: Optional[str] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Same contract as get_documents_by_ids, reading only paths this request hasn't seen."""
+        doc_ids = list(doc_ids)
+        loop = asyncio.get_running_loop()
+        futures: Dict[str, asyncio.Future] = {}
+        to_fetch: List[str] = []
+        for doc_id in dict.fromkeys(doc_id for doc_id in doc_ids if doc_id):
+            path = f"{collection}/{doc_id}"
+            future = self._documents.get(path)
+            if future is None:
+                future = self._documents[path] = loop.create_future()
+                to_fetch.append(doc_id)
+            else:
+                self.hits += 1
+            futures[doc_id] = future
+
+        if to_fetch:
+            self.rpcs += -(-len(to_fetch) // GET_ALL_CHUNK_SIZE)
+            try:
+                fetched = await get_documents_by_ids(self.db, collection, to_fetch)
+            except BaseException as e:
+                for doc_id in to_fetch:
+                    self._fail(f"{collection}/{doc_id}", futures[doc_id], e)
+                raise
+            for doc_id, data in zip(to_fetch, fetched):
+                futures[doc_id].set_result(data)
+
+        found: Dict[str, Dict[str, Any]] = {}
+        for doc_id, future in futures.items():
+            data = await future
+            if data is not None:
+                found[doc_id] = data
+        results: List[Optional[Dict[str, Any]]] = []
+        for doc_id in doc_ids:
+            if doc_id not in found:
+                results.append(None)
+                continue
+            # Callers get their own copy, so the cached document is never mutated.
+            data = copy.deepcopy(found[doc_id])
+            if id_field:
+                data[id_field] = doc_id
+            results.append(data)
+        return results
+
+    def _fail(self, path: str, future: asyncio.Future, error: BaseException) -> None:
+        # Forget the failed read so a later call in this request can retry it.
+        if self._documents.get(path) is future:
+            del self._documents[path]
+        if isinstance(error, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(error)
+            future.exception()  # Retrieved here; concurrent waiters still see it raised.
+
+    def stats(self) -> Dict[str, int]:
+        return {"documents": len(self._documents), "hits": self.hits, "rpcs": self.rpcs}
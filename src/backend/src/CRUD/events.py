@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+
+from CRUD.documents import as_utc
+from models.event import Event
+from services.structured_log import get_logger
+
+log = get_logger("events")
+
+
+def event_from_firestore(event_id: str, data: Dict[str, Any]) -> Optional[Event]:
+    """
+    Builds an Event from an `events` document, or returns None if it has no usable start time.
+    The frontend writes `title`; the model calls it `name`, so either is accepted.
+    A missing end time is treated as a zero-length event.
+    """
+    start_time = as_utc(data.get("startTime"))
+    if start_time is None:
+        log.warning("event.invalid_start_time", event_id=event_id)
+        return None
+    end_time = as_utc(data.get("endTime")) or start_time
+    return Event(
+        eventId=event_id,
+        clubId=data.get("clubId") or "",
+        name=data.get("name") or data.get("title") or "Untitled Event",
+        description=data.get("description") or "",
+        startTime=start_time,
+        endTime=max(end_time, start_time),
+        location=data.get("location") or "TBD",
+        gCalEventId=data.get("gCalEventId"),
+        createdAt=as_utc(data.get("createdAt")) or start_time,
+        organizerId=data.get("organizerId") or "",
+        clubName=data.get("clubName"),
+        clubLogo=data.get("clubLogo"),
+        capacity=data.get("capacity") if isinstance(data.get("capacity"), int) else None,
+        attendeeCount=data.get("attendeeCount") or 0,
+        waitlistCount=data.get("waitlistCount") or 0,
+    )
+
+
+async def get_events_ending_after(db: AsyncClient, end: datetime) -> List[Event]:
+    """Streams every event whose endTime is at or after `end` (still running or upcoming at that time)."""
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+    query = db.collection("events").where(filter=FieldFilter("endTime", ">=", end))
+    events: List[Event] = []
+    async for event_doc in query.stream():
+        event = event_from_firestore(event_doc.id, event_doc.to_dict() or {})
+        if event is not None:
+            events.append(event)
+    return events
+
+
+async def get_events_starting_between(db: AsyncClient, start: datetime, end: datetime) -> List[Event]:
+    """Streams every event whose startTime is in [start, end)."""
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+    query = (
+        db.collection("events")
+        .where(filter=FieldFilter("startTime", ">=", start))
+        .where(filter=FieldFilter("startTime", "<", end))
+    )
+    events: List[Event] = []
+    async for event_doc in query.stream():
+        event = event_from_firestore(event_doc.id, event_doc.to_dict() or {})
+        if event is not None:
+            events.append(event)
+    return events
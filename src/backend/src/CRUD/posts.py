@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+
+from CRUD.documents import as_utc
+from models.club_post import ClubPost
+from services.structured_log import get_logger
+
+# The frontend writes a post's creation time as `timestamp`.
+POST_TIME_FIELD = "timestamp"
+
+log = get_logger("posts")
+
+
+def post_from_firestore(
+    post_id: str,
+    data: Dict[str, Any],
+    time_field: Optional[str] = None,
+) -> Optional[ClubPost]:
+    """
+    Builds a ClubPost from a `clubPosts` document, or returns None if it has no timestamp.
+    Accepts the frontend's field names (`caption`, `imageURL`, `timestamp`) as well as the model's.
+    If `time_field` is given, `createdAt` is read from that field alone.
+    """
+    if time_field:
+        created_at = as_utc(data.get(time_field))
+    else:
+        created_at = as_utc(data.get("createdAt")) or as_utc(data.get(POST_TIME_FIELD))
+    if created_at is None:
+        log.warning("post.invalid_timestamp", post_id=post_id)
+        return None
+    return ClubPost(
+        postId=post_id,
+        clubId=data.get("clubId") or "",
+        authorId=data.get("authorId") or "",
+        content=data.get("content") or data.get("caption") or "",
+        imageUrl=data.get("imageUrl") or data.get("imageURL"),
+        videoUrl=data.get("videoUrl"),
+        createdAt=created_at,
+        updatedAt=as_utc(data.get("updatedAt")) or created_at,
+        likesCount=data.get("likesCount") or 0,
+        likedBy=data.get("likedBy") or [],
+        clubName=data.get("clubName"),
+        clubAvatar=data.get("clubAvatar"),
+    )
+
+
+async def get_club_posts_after(
+    db: AsyncClient,
+    club_id: str,
+    after: Optional[Tuple[datetime, str]],
+    limit: int,
+) -> List[ClubPost]:
+    """
+    One club's posts newest first, ordered by (timestamp, document ID) descending and
+    starting after the `after` position (or at the newest if None). Each post's
+    `createdAt` is the `timestamp` the query orders by, so it can be paged on.
+    Needs the composite index (clubId ASC, timestamp DESC) on `clubPosts`.
+    """
+    from google.cloud import firestore
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+    query = (
+        db.collection("clubPosts")
+        .where(filter=FieldFilter("clubId", "==", club_id))
+        .order_by(POST_TIME_FIELD, direction=firestore.Query.DESCENDING)
+        .order_by("__name__", direction=firestore.Query.DESCENDING)
+    )
+    if after is not None:
+        timestamp, post_id = after
+        query = query.start_after({POST_TIME_FIELD: timestamp, "__name__": post_id})
+    posts: List[ClubPost] = []
+    async for post_doc in query.limit(limit).stream():
+        post = post_from_firestore(post_doc.id, post_doc.to_dict() or {}, time_field=POST_TIME_FIELD)
+        if post is not None:
+            posts.append(post)
+    return posts
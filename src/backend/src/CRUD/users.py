@@ -1,14 +1,22 @@
-import asyncio  # Still needed for asyncio.gather
-from typing import List, Optional, Dict, Any
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Optional, Dict, Any
 
 # Import AsyncClient for asynchronous operations
-from google.cloud.firestore_v1.async_client import AsyncClient
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
 
 # Assuming 'models' is a top-level package relative to where Python executes
 # or backend/src is in PYTHONPATH.
 # If using relative imports from within 'src' package, it would be:
 # from ..models.clubs import ClubResponse
 from models.clubs import ClubResponse
+from CRUD.documents import get_documents_by_ids
+from services.club_cache import club_cache
+from services.member_counter import member_counter
+from services.structured_log import get_logger
+
+log = get_logger("users")
 
 
 async def get_user_firestore_document(
@@ -17,12 +25,10 @@ async def get_user_firestore_document(
     """Fetches a user document from Firestore by user ID using AsyncClient."""
     if not user_id:
         return None
-    user_doc_ref = db.collection("users").document(user_id)
-    # Directly await the .get() method from AsyncDocumentReference
-    user_doc = await user_doc_ref.get()
-    if user_doc.exists:
-        return user_doc.to_dict()
-    print(f"User document not found in Firestore for UID: {user_id}")
+    [user_data] = await get_documents_by_ids(db, "users", [user_id])
+    if user_data is not None:
+        return user_data
+    log.info("user.not_found", uid=user_id)
     return None
 
 
@@ -36,20 +42,27 @@ async def get_club_firestore_document(
     """
     if not club_id:
         return None
-    club_doc_ref = db.collection("clubs").document(club_id)
-    # Directly await the .get() method from AsyncDocumentReference
-    club_doc = await club_doc_ref.get()
-    if club_doc.exists:
-        club_data = club_doc.to_dict()
-        if club_data:  # Ensure club_data is not None
-            # Add the Firestore document ID as 'clubId' to the dictionary,
-            # as ClubResponse expects this field.
-            club_data["clubId"] = club_doc.id
+    [club_data] = await get_club_firestore_documents(db, [club_id])
+    if club_data is not None:
         return club_data
-    print(f"Club document not found in Firestore for club_id: {club_id}")
+    log.info("club.not_found", club_id=club_id)
     return None
 
 
+async def get_club_firestore_documents(
+    db: AsyncClient, club_ids: List[str]
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Fetches many club documents with batched reads, in the order of `club_ids`.
+    Each dict carries its document ID as 'clubId'; missing clubs come back as None.
+    """
+    entries = await club_cache.get_many(db, club_ids)
+    return [
+        {**entry.data, "clubId": club_id} if entry is not None else None
+        for club_id, entry in zip(club_ids, entries)
+    ]
+
+
 async def get_user_joined_club_details(
     db: AsyncClient, user_id: str  # Type hint db as AsyncClient
 ) -> List[ClubResponse]:
@@ -68,22 +81,16 @@ async def get_user_joined_club_details(
     if not valid_club_ids:
         return []
 
-    # get_club_firestore_document now returns a coroutine, so asyncio.gather will work correctly.
-    club_fetch_tasks = [
-        get_club_firestore_document(db, club_id) for club_id in valid_club_ids
+    # Served from the shared club cache; only clubs it doesn't hold are read, in one batch.
+    # Entries carry an already-validated ClubResponse, and malformed clubs are cached as None.
+    entries = await club_cache.get_many(db, valid_club_ids)
+    my_clubs_list: List[ClubResponse] = [
+        entry.club for entry in entries if entry is not None and entry.club is not None
     ]
-    fetched_club_data_list = await asyncio.gather(*club_fetch_tasks)
-
-    my_clubs_list: List[ClubResponse] = []
-    for club_data_from_firestore in fetched_club_data_list:
-        if club_data_from_firestore:
-            try:
-                # Firestore data keys should match the ClubResponse attributes.
-                my_clubs_list.append(ClubResponse(**club_data_from_firestore))
-            except Exception as e:
-                club_id_for_error = club_data_from_firestore.get('clubId', 'unknown_id')
-                print(
-                    f"Error parsing club data for clubId '{club_id_for_error}': {e}."
-                    f" Data: {club_data_from_firestore}"
-                )
+    if member_counter.enabled and my_clubs_list:
+        totals = await member_counter.get_totals(db, [club.clubId for club in my_clubs_list])
+        my_clubs_list = [
+            club.model_copy(update={"memberCount": totals[club.clubId]}) if club.clubId in totals else club
+            for club in my_clubs_list
+        ]
     return my_clubs_list
@@ -1,18 +1,27 @@
 # File: backend/src/api/deps.py
-from typing import Optional, Dict, Any
+from __future__ import annotations
 
-from fastapi import Depends, HTTPException, status
+from typing import TYPE_CHECKING, AsyncIterator, Optional, Dict, Any
+
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-import firebase_admin.auth
-from google.cloud.firestore_v1.async_client import AsyncClient  # Ensure this is imported
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
 
 # Using "global" style import as per your preference for project structure
-# This imports 'db' from backend/src/services/firebase_service.py
+# This imports the Firestore client pool from backend/src/services/firebase_service.py
 from services import firebase_service  # Ensure this path is correct for your setup
+from services.stream_ticket import stream_tickets
+from services.token_cache import verify_id_token_cached
+from CRUD.documents import RequestDocumentCache
+from services.structured_log import get_logger
 
 # Scheme for Bearer token authentication
 oauth2_scheme = HTTPBearer(auto_error=False)  # auto_error=False allows the route to run if no token is provided, useful for optional auth
 
+log = get_logger("auth")
+
 
 class AuthenticatedUser:
     """Represents an authenticated user's data from ID token."""
@@ -34,6 +43,7 @@ async def get_current_user(
 ) -> AuthenticatedUser:
     """
     Dependency to verify Firebase ID token and return authenticated user data.
+    Verified tokens are cached until they expire, so repeat calls skip the signature check.
     """
     if token_cred is None or token_cred.scheme != "Bearer":
         raise HTTPException(
@@ -41,41 +51,89 @@ async def get_current_user(
             detail="Not authenticated or Bearer token missing",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return await _authenticate(token_cred.credentials)
+
+
+async def get_stream_user(
+    token_cred: Optional[HTTPAuthorizationCredentials] = Depends(oauth2_scheme),
+    ticket: Optional[str] = Query(default=None, description="Ticket from POST /api/stream/ticket."),
+) -> AuthenticatedUser:
+    """
+    Like get_current_user, but also accepts a stream ticket in the `ticket` query parameter:
+    the browser's EventSource can't send an Authorization header, and an ID token in the URL
+    would end up in access logs and browser history. A ticket is single-use and short-lived.
+    """
+    if token_cred is not None and token_cred.scheme == "Bearer":
+        return await _authenticate(token_cred.credentials)
+    if ticket:
+        uid = stream_tickets.redeem(ticket)
+        if uid is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Stream ticket is invalid, expired or already used.",
+            )
+        return AuthenticatedUser(uid=uid)
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Not authenticated or Bearer token missing",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def _authenticate(id_token: str) -> AuthenticatedUser:
+    from firebase_admin import exceptions as firebase_exceptions
+
     try:
-        id_token = token_cred.credentials
-        decoded_token = firebase_admin.auth.verify_id_token(id_token)
+        decoded_token = await verify_id_token_cached(id_token)
         return AuthenticatedUser(
             uid=decoded_token.get("uid"),
             email=decoded_token.get("email"),
             name=decoded_token.get("name"),
             claims=decoded_token
         )
-    except firebase_admin.auth.FirebaseAuthError as e:
-        print(f"Firebase auth error during token verification: {e}")
+    except (firebase_exceptions.FirebaseError, ValueError) as e:
+        # Invalid/expired/revoked tokens raise FirebaseError subclasses; malformed ones raise ValueError.
+        log.info("auth.invalid_token", error=str(e))
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer error=\"invalid_token\""},
         )
     except Exception as e:
-        print(f"Unexpected error during token verification: {e}")
+        log.exception("auth.verification_failed", error=str(e))
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Could not process authentication credentials.",
         )
 
 
-async def get_firestore_db() -> AsyncClient:  # <<< This is the missing function
+async def get_firestore_db() -> AsyncIterator[AsyncClient]:
     """
     Dependency to provide the Firestore client.
-    Checks if the client was initialized.
+    Leases a client (one gRPC channel) from the pool for the duration of the request.
+    Requests that arrive while startup warm-up is still running wait for it here.
     """
-    # 'db' should be an initialized Firestore client in firebase_service.py
-    db_client = firebase_service.db
-    if db_client is None:
-        print("CRITICAL: Firestore client (firebase_service.db) is None. Firestore might not have initialized correctly.")
+    await firebase_service.wait_until_ready()
+    pool = firebase_service.client_pool
+    if pool is None:
+        log.warning("firestore.unavailable", detail="client pool is None; Firestore may not have initialized")
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Firestore service is not available. Check backend server logs for initialization errors.",
         )
-    return db_client
+    async with pool.lease() as db_client:
+        yield db_client
+
+
+async def get_request_db(
+    request: Request,
+    db_client: AsyncClient = Depends(get_firestore_db),
+) -> RequestDocumentCache:
+    """
+    Dependency to provide the Firestore client wrapped in a request-scoped document cache.
+    FastAPI resolves a dependency once per request, so every dependency and endpoint that
+    asks for it shares the same cache and each document is fetched at most once.
+    """
+    request_db = RequestDocumentCache(db_client)
+    request.state.document_cache = request_db  # Read by the debug header middleware in main.py
+    return request_db
@@ -1,41 +1,179 @@
 # File: backend/src/api/endpoints/clubs.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from google.cloud.firestore_v1.async_client import AsyncClient  # For type hinting
-from google.cloud import firestore  # For ArrayUnion, ArrayRemove, and Increment
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
 
 # Assuming your deps.py is one level up in an 'api' directory,
 # and this 'endpoints' directory is also in 'api'.
 # If your structure is src/api/deps.py and src/api/endpoints/clubs.py
 # then this relative import is correct.
-from ..deps import get_firestore_db, get_current_user, AuthenticatedUser
+from ..deps import get_firestore_db, get_request_db, get_current_user, AuthenticatedUser
+from CRUD.documents import RequestDocumentCache
+from models.clubs import (
+    ClubListResponse,
+    ClubSearchResponse,
+    club_list_response_adapter,
+    club_search_response_adapter,
+)
+from services.club_cache import club_cache
+from services.club_catalog import club_catalog, etag_matches
+from services.change_stream import change_hub
+from services.club_search import club_search
+from services.member_counter import member_counter
+from services.rate_limit import membership_buckets, membership_rate_limiter
+from services.single_flight import SingleFlight
+from services.structured_log import get_logger
 
 router = APIRouter()
+log = get_logger("clubs")
+# Identical join/leave calls already in flight (e.g. a double-click) share one transaction.
+membership_flights = SingleFlight()
+
+
+# --- Club Catalog ---
+def catalog_version(request: Request) -> Optional[str]:
+    """Version stamp for GET /api/clubs, used by ConditionalGetMiddleware."""
+    return club_catalog.current_version()
+
+
+@router.get(
+    "",
+    response_model=ClubListResponse,
+    summary="List clubs in the catalog",
+    description="Returns a page of clubs, optionally filtered by category and a text query. "
+                "Responses carry an ETag; send it back in If-None-Match to get a 304 when nothing changed.",
+)
+async def list_clubs_endpoint(
+    category: Optional[str] = Query(default=None, description="Only clubs tagged with this category."),
+    q: Optional[str] = Query(default=None, description="Clubs where every word starts a word of the name or description (case-insensitive)."),
+    limit: int = Query(default=50, ge=1, le=200),
+    after: Optional[str] = Query(default=None, description="Cursor: the nextCursor of the previous page."),
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncClient = Depends(get_firestore_db),
+):
+    snapshot = await club_catalog.get_snapshot(db)
+    if etag_matches(if_none_match, snapshot.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": snapshot.etag})
+
+    clubs, next_cursor = snapshot.query(category=category, q=q, limit=limit, after=after)
+    # The snapshot's clubs are already validated, so skip response_model re-validation
+    # and serialize straight to JSON bytes.
+    page = ClubListResponse.model_construct(clubs=clubs, nextCursor=next_cursor)
+    return Response(
+        content=club_list_response_adapter.dump_json(page),
+        media_type="application/json",
+        headers={"ETag": snapshot.etag},
+    )
+
+
+@router.get(
+    "/search",
+    response_model=ClubSearchResponse,
+    summary="Search clubs",
+    description="Ranked full-text search over club names, categories and descriptions. "
+                "The last word matches as a prefix, and misspelled words match similar ones.",
+)
+async def search_clubs_endpoint(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text."),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: AsyncClient = Depends(get_firestore_db),
+):
+    snapshot = await club_catalog.get_snapshot(db)
+    clubs = club_search.search(snapshot, q, limit)
+    results = ClubSearchResponse.model_construct(query=q, clubs=clubs)
+    return Response(content=club_search_response_adapter.dump_json(results), media_type="application/json")
+
+
+# --- Shared Transaction Helpers ---
+async def _get_club_and_user_in_transaction(
+    db: AsyncClient,
+    transaction,
+    club_doc_ref,
+    user_doc_ref,
+):
+    """
+    Reads the club and user documents in one batched read inside `transaction`.
+    Returns (club_snapshot, user_snapshot); either may be missing (exists=False).
+    """
+    snapshots = {}
+    async for snapshot in db.get_all([club_doc_ref, user_doc_ref], transaction=transaction):
+        snapshots[snapshot.reference.path] = snapshot
+    return snapshots.get(club_doc_ref.path), snapshots.get(user_doc_ref.path)
+
+
+def _snapshot_exists(snapshot) -> bool:
+    return snapshot is not None and snapshot.exists
+
+
+async def _run_transaction(callback, db: AsyncClient, *args):
+    """Runs `callback(transaction, db, *args)` in a Firestore transaction, retrying on contention."""
+    from google.cloud import firestore  # Deferred so the SDK isn't imported at startup
+
+    return await firestore.async_transactional(callback)(db.transaction(), db, *args)
+
+
+async def _enforce_membership_rate_limit(user_uid: str, club_id: str) -> None:
+    """Raises 429 when the user or the club is out of join/leave tokens."""
+    retry_after = await membership_rate_limiter.check(membership_buckets(user_uid, club_id))
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many membership changes. Please try again shortly.",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
 
 
 # --- Join Club Functionality ---
 async def _join_club_transaction_callback(
-    transaction,  # This will be an AsyncTransaction object
+    transaction,  # AsyncTransaction, supplied by _run_transaction
+    db: AsyncClient,
     user_doc_ref_arg,
     club_doc_ref_arg,
     club_id_to_add_arg: str
 ):
     """
     Atomically adds clubId to user's joinedClubs array and increments memberCount.
+    Both documents are read inside the transaction, so the existence checks can't go stale,
+    and a user who is already a member leaves memberCount untouched.
+    Returns (club_name, joined) where `joined` is False if the user was already a member.
     """
-    print(f"DEBUG: JOIN_TRANSACTION_CALLBACK_START for club_id: {club_id_to_add_arg}")
-    # print(f"DEBUG: Transaction object type in callback: {type(transaction)}")
-    # print(f"DEBUG: user_doc_ref_arg type in callback: {type(user_doc_ref_arg)}")
-    # print(f"DEBUG: club_doc_ref_arg type in callback: {type(club_doc_ref_arg)}")
+    from google.cloud import firestore  # For ArrayUnion and Increment
+
+    log.debug("join_club.transaction_start", club_id=club_id_to_add_arg)
+    club_snapshot, user_snapshot = await _get_club_and_user_in_transaction(
+        db, transaction, club_doc_ref_arg, user_doc_ref_arg
+    )
+    if not _snapshot_exists(club_snapshot):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Club with ID '{club_id_to_add_arg}' not found."
+        )
+    if not _snapshot_exists(user_snapshot):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"User with ID '{user_doc_ref_arg.id}' not found."
+        )
+
+    club_name = (club_snapshot.to_dict() or {}).get("name") or club_id_to_add_arg
+    if club_id_to_add_arg in ((user_snapshot.to_dict() or {}).get("joinedClubs") or []):
+        return club_name, False
 
     # Perform updates using the passed transaction object
     transaction.update(user_doc_ref_arg, {
         "joinedClubs": firestore.ArrayUnion([club_id_to_add_arg])
     })
-    transaction.update(club_doc_ref_arg, {
-        "memberCount": firestore.Increment(1)
-    })
-    print(f"DEBUG: JOIN_TRANSACTION_CALLBACK_UPDATES_STAGED for club_id: {club_id_to_add_arg}")
-    return "JOIN_CALLBACK_SUCCESS"
+    if member_counter.enabled:
+        member_counter.increment(transaction, club_doc_ref_arg, 1)
+    else:
+        transaction.update(club_doc_ref_arg, {
+            "memberCount": firestore.Increment(1)
+        })
+    log.debug("join_club.updates_staged", club_id=club_id_to_add_arg)
+    return club_name, True
 
 
 @router.post(
@@ -45,53 +183,50 @@ async def _join_club_transaction_callback(
 )
 async def join_club_endpoint(
     club_id: str,
-    db: AsyncClient = Depends(get_firestore_db),  # db is AsyncClient
+    db: RequestDocumentCache = Depends(get_request_db),
     current_user: AuthenticatedUser = Depends(get_current_user)
 ):
-    print(f"DEBUG: JOIN_CLUB_ENDPOINT_START for club_id: {club_id}, user_uid: {current_user.uid}")
+    log.debug("join_club.start", club_id=club_id, uid=current_user.uid)
     user_uid = current_user.uid
+    try:
+        return await membership_flights.run(
+            ("join", user_uid, club_id), lambda: _join_club(db, user_uid, club_id)
+        )
+    finally:
+        # Whichever request ran the transaction, it may have written both documents;
+        # later reads in this request must refetch them.
+        db.invalidate("users", user_uid)
+        db.invalidate("clubs", club_id)
+
+
+async def _join_club(db: RequestDocumentCache, user_uid: str, club_id: str):
+    """Runs one join for every coalesced request; rate limits are charged once."""
+    await _enforce_membership_rate_limit(user_uid, club_id)
     user_doc_ref = db.collection("users").document(user_uid)
     club_doc_ref = db.collection("clubs").document(club_id)
 
     try:
-        # 1. Check if club exists
-        print("DEBUG: JOIN_CLUB - Attempting to get club_snapshot...")
-        club_snapshot = await club_doc_ref.get()
-        # print(f"DEBUG: club_snapshot object type: {type(club_snapshot)}, exists: {club_snapshot.exists}")
-        if not club_snapshot.exists:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Club with ID '{club_id}' not found.")
-
-        # 2. Check if user exists
-        print("DEBUG: JOIN_CLUB - Attempting to get user_snapshot...")
-        user_snapshot = await user_doc_ref.get()
-        # print(f"DEBUG: user_snapshot object type: {type(user_snapshot)}, exists: {user_snapshot.exists}")
-        if not user_snapshot.exists:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"User with ID '{user_uid}' not found.")
-
-        # 3. Run the join operations in a transaction
-        print("DEBUG: JOIN_CLUB - Attempting to start 'async with db.transaction()'...")
-        async with db.transaction() as transaction_obj:
-            # print(f"DEBUG: Inside 'async with' block for JOIN. Transaction object type: {type(transaction_obj)}")
-            await _join_club_transaction_callback(
-                transaction_obj,
-                user_doc_ref,
-                club_doc_ref,
-                club_id
-            )
-            # print(f"DEBUG: JOIN_CLUB - Transaction callback result: {callback_result}")
-
-        print(f"DEBUG: JOIN_CLUB - Transaction completed successfully for club_id: {club_id}")
-        club_name = club_snapshot.get("name") or club_id
+        # Existence checks and updates run in one transaction, which retries on contention.
+        club_name, joined = await _run_transaction(
+            _join_club_transaction_callback,
+            db,
+            user_doc_ref,
+            club_doc_ref,
+            club_id
+        )
+        log.debug("join_club.committed", club_id=club_id, joined=joined)
+        club_cache.invalidate(club_id)
+
+        change_hub.follow(user_uid, club_id)  # The user's open streams start carrying the club
+        if not joined:
+            return {"message": f"Already a member of club: {club_name}"}
+        club_catalog.adjust_member_count(club_id, 1)
         return {"message": f"Successfully joined club: {club_name}"}
 
     except HTTPException:
-        # print(f"DEBUG: HTTPException caught in join_club_endpoint for club_id: {club_id}")
         raise
-    except Exception as e:
-        import traceback
-        print(f"DEBUG: UNEXPECTED EXCEPTION in join_club_endpoint for club_id: {club_id}")
-        traceback.print_exc()
-        print(f"Error encountered while user {user_uid} attempted to join club {club_id}: {e}")
+    except Exception:
+        log.exception("join_club.failed", club_id=club_id, uid=user_uid)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred while trying to join the club."
@@ -100,30 +235,51 @@ async def join_club_endpoint(
 
 # --- Leave Club Functionality ---
 async def _leave_club_transaction_callback(
-    transaction,  # AsyncTransaction object
+    transaction,  # AsyncTransaction, supplied by _run_transaction
+    db: AsyncClient,
     user_doc_ref_arg,
     club_doc_ref_arg,
     club_id_to_remove_arg: str
 ):
     """
     Atomically removes club from user's list and decrements memberCount.
+    A user who isn't a member is left alone, so repeated leaves never over-decrement.
+    Returns (club_name, left) where `left` is False if the user wasn't a member.
     """
-    print(f"DEBUG: LEAVE_TRANSACTION_CALLBACK_START for club_id: {club_id_to_remove_arg}")
+    from google.cloud import firestore  # For ArrayRemove and Increment
+
+    log.debug("leave_club.transaction_start", club_id=club_id_to_remove_arg)
+    club_snapshot, user_snapshot = await _get_club_and_user_in_transaction(
+        db, transaction, club_doc_ref_arg, user_doc_ref_arg
+    )
+    if not _snapshot_exists(user_snapshot):
+        # If user doesn't exist, they can't leave a club.
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"User with ID '{user_doc_ref_arg.id}' not found."
+        )
+
+    # Not raising an error if club doesn't exist, as user might want to ensure
+    # they are unlinked even if club data is faulty.
+    club_exists = _snapshot_exists(club_snapshot)
+    club_name = ((club_snapshot.to_dict() or {}).get("name") if club_exists else None) or club_id_to_remove_arg
+    if club_id_to_remove_arg not in ((user_snapshot.to_dict() or {}).get("joinedClubs") or []):
+        return club_name, False
 
     # 1. Remove clubId from user's joinedClubs array
     transaction.update(user_doc_ref_arg, {
         "joinedClubs": firestore.ArrayRemove([club_id_to_remove_arg])
     })
 
-    # 2. Decrement memberCount for the club
-    # Note: This assumes the club document exists. If it might not, a check could be added
-    # or ensure this operation is safe if club_doc_ref_arg points to a non-existent doc.
-    # Firestore's Increment is generally safe but won't create the doc/field.
-    transaction.update(club_doc_ref_arg, {
-        "memberCount": firestore.Increment(-1)
-    })
-    print(f"DEBUG: LEAVE_TRANSACTION_CALLBACK_UPDATES_STAGED for club_id: {club_id_to_remove_arg}")
-    return "LEAVE_CALLBACK_SUCCESS"
+    # 2. Decrement memberCount for the club, if it still exists
+    if club_exists:
+        if member_counter.enabled:
+            member_counter.increment(transaction, club_doc_ref_arg, -1)
+        else:
+            transaction.update(club_doc_ref_arg, {
+                "memberCount": firestore.Increment(-1)
+            })
+    log.debug("leave_club.updates_staged", club_id=club_id_to_remove_arg)
+    return club_name, True
 
 
 @router.post(
@@ -133,55 +289,50 @@ async def _leave_club_transaction_callback(
 )
 async def leave_club_endpoint(
     club_id: str,
-    db: AsyncClient = Depends(get_firestore_db),
+    db: RequestDocumentCache = Depends(get_request_db),
     current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     user_uid = current_user.uid
+    log.debug("leave_club.start", club_id=club_id, uid=user_uid)
+    try:
+        return await membership_flights.run(
+            ("leave", user_uid, club_id), lambda: _leave_club(db, user_uid, club_id)
+        )
+    finally:
+        # Whichever request ran the transaction, it may have written both documents;
+        # later reads in this request must refetch them.
+        db.invalidate("users", user_uid)
+        db.invalidate("clubs", club_id)
+
+
+async def _leave_club(db: RequestDocumentCache, user_uid: str, club_id: str):
+    """Runs one leave for every coalesced request; rate limits are charged once."""
+    await _enforce_membership_rate_limit(user_uid, club_id)
     user_doc_ref = db.collection("users").document(user_uid)
     club_doc_ref = db.collection("clubs").document(club_id)
 
-    print(f"DEBUG: LEAVE_CLUB_ENDPOINT_START for club_id: {club_id}, user_uid: {user_uid}")
-
     try:
-        # 1. Check if club exists (primarily for getting club name for response)
-        #    The main logic will attempt to remove/decrement regardless.
-        print("DEBUG: LEAVE_CLUB - Attempting to get club_snapshot...")
-        club_snapshot = await club_doc_ref.get()
-        # Not raising an error if club doesn't exist, as user might want to ensure
-        # they are unlinked even if club data is faulty.
-
-        # 2. Check if user exists
-        print("DEBUG: LEAVE_CLUB - Attempting to get user_snapshot...")
-        user_snapshot = await user_doc_ref.get()
-        if not user_snapshot.exists:
-            # If user doesn't exist, they can't leave a club.
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"User with ID '{user_uid}' not found.")
-
-        # 3. Run the leave operations in a transaction
-        print(f"DEBUG: LEAVE_CLUB - Attempting to start 'async with db.transaction()' for club {club_id}...")
-        async with db.transaction() as transaction_obj:
-            # print(f"DEBUG: Inside 'async with' block for LEAVE. Transaction object type: {type(transaction_obj)}")
-            await _leave_club_transaction_callback(
-                transaction_obj,
-                user_doc_ref,
-                club_doc_ref,  # Pass even if it might not exist; transaction.update is somewhat idempotent
-                club_id
-            )
-            # print(f"DEBUG: LEAVE_CLUB - Transaction callback result: {callback_result}")
-
-            print(f"DEBUG: LEAVE_CLUB - Transaction completed successfully for club_id: {club_id}")
-
-        club_name_for_message = club_snapshot.get("name") if club_snapshot.exists else club_id
-        return {"message": f"Successfully left club: {club_name_for_message}"}
+        # Existence checks and updates run in one transaction, which retries on contention.
+        club_name, left = await _run_transaction(
+            _leave_club_transaction_callback,
+            db,
+            user_doc_ref,
+            club_doc_ref,
+            club_id
+        )
+        log.debug("leave_club.committed", club_id=club_id, left=left)
+        club_cache.invalidate(club_id)
+
+        change_hub.unfollow(user_uid, club_id)
+        if not left:
+            return {"message": f"Not a member of club: {club_name}"}
+        club_catalog.adjust_member_count(club_id, -1)
+        return {"message": f"Successfully left club: {club_name}"}
 
     except HTTPException:
-        # print(f"DEBUG: HTTPException caught in leave_club_endpoint for club_id: {club_id}")
         raise
-    except Exception as e:
-        import traceback
-        print(f"DEBUG: UNEXPECTED EXCEPTION in leave_club_endpoint for club_id: {club_id}")
-        traceback.print_exc()
-        print(f"Error encountered while user {user_uid} attempted to leave club {club_id}: {e}")
+    except Exception:
+        log.exception("leave_club.failed", club_id=club_id, uid=user_uid)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred while trying to leave the club."
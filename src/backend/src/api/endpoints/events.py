@@ -1,37 +1,167 @@
-from fastapi import APIRouter
-# from typing import List, Optional # Add other necessary types
+from __future__ import annotations
 
-# Import your Pydantic models for events (e.g., EventCreate, EventResponse, EventUpdate)
-# from models.events import EventResponse, EventCreate # Adjust path as needed
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, List, Optional
 
-# Import dependencies
-# from api.deps import AuthenticatedUser, get_current_user # Adjust path as needed
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+
+from api.deps import AuthenticatedUser, get_current_user, get_firestore_db
+from api.middleware import PROCESS_TAG
+from models.event import CalendarMonth, Event, EventRsvp
+from services.event_calendar import event_calendar
+from services.event_index import event_feed
+from services.event_rsvp import NOT_GOING, event_rsvps
+from services.single_flight import SingleFlight
 
 router = APIRouter()
+# Identical RSVP calls already in flight (e.g. a double-click) share one transaction.
+rsvp_flights = SingleFlight()
+
+
+# --- Event Feed ---
+def events_version(request: Request) -> Optional[str]:
+    """Version stamp for GET /api/events, used by ConditionalGetMiddleware."""
+    # Without `from` the window starts at "now", so the response changes with the clock.
+    if "from" not in request.query_params:
+        return None
+    version = event_feed.current_version()
+    return f"{PROCESS_TAG}.{version}" if version is not None else None
+
+
+def calendar_version(request: Request) -> Optional[str]:
+    """Version stamp for GET /api/events/calendar, used by ConditionalGetMiddleware."""
+    month = request.query_params.get("month")
+    version = event_calendar.current_version(month) if month else None
+    return f"{PROCESS_TAG}.{version}" if version is not None else None
+
+
+@router.get(
+    "",
+    response_model=List[Event],
+    summary="List events by start time",
+    description="Returns events starting in the [from, to) window, soonest first. "
+                "Without `from`, returns upcoming events starting now.",
+)
+async def list_events(
+    from_: Optional[datetime] = Query(default=None, alias="from", description="Window start (ISO 8601)."),
+    to: Optional[datetime] = Query(default=None, description="Window end, exclusive (ISO 8601)."),
+    clubId: Optional[str] = Query(default=None, description="Only events hosted by this club."),
+    limit: int = Query(default=100, ge=1, le=1000),
+    db: AsyncClient = Depends(get_firestore_db),
+):
+    # Times without an offset are taken as UTC.
+    from_ = from_.replace(tzinfo=timezone.utc) if from_ and from_.tzinfo is None else from_
+    to = to.replace(tzinfo=timezone.utc) if to and to.tzinfo is None else to
+    if from_ is not None and to is not None and to <= from_:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must be later than 'from'.",
+        )
+    index = await event_feed.get_index(db)
+    if from_ is None:
+        if to is None:
+            return index.upcoming(limit, club_id=clubId)
+        from_ = datetime.now(timezone.utc)
+    return index.range(start=from_, end=to, club_id=clubId, limit=limit)
+
+
+@router.get(
+    "/calendar",
+    response_model=CalendarMonth,
+    summary="Events for a calendar month, bucketed by day",
+    description="Returns the month's events grouped by local (campus time zone) day with per-day counts. "
+                "Multi-day events appear on every day they span.",
+)
+async def get_event_calendar_month(
+    month: str = Query(..., pattern=r"^\d{4}-(0[1-9]|1[0-2])$", description="Month as YYYY-MM."),
+    db: AsyncClient = Depends(get_firestore_db),
+):
+    return await event_calendar.get_month(db, month)
+
+
+# --- RSVPs ---
+async def _require_capacity(db: AsyncClient, event_id: str):
+    """The event's capacity (None = unlimited); 404 if there is no such event."""
+    if not await event_rsvps.event_exists(db, event_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Event with ID '{event_id}' not found.")
+    return await event_rsvps.event_capacity(db, event_id)
+
+
+async def _rsvp_response(db: AsyncClient, event_id: str, rsvp_status: str, changed: bool, capacity) -> EventRsvp:
+    attendees, waitlisted = await event_rsvps.get_counts(db, event_id)
+    return EventRsvp(
+        eventId=event_id, status=rsvp_status, changed=changed,
+        capacity=capacity, attendeeCount=attendees, waitlistCount=waitlisted,
+    )
+
+
+@router.get("/{event_id}/rsvp", response_model=EventRsvp, summary="Get the current user's RSVP for an event")
+async def get_event_rsvp(
+    event_id: str,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncClient = Depends(get_firestore_db),
+):
+    capacity = await _require_capacity(db, event_id)
+    rsvp_status = await event_rsvps.get_status(db, event_id, current_user.uid)
+    return await _rsvp_response(db, event_id, rsvp_status, False, capacity)
+
 
-# --- CRUD Endpoints for Events ---
+@router.post(
+    "/{event_id}/rsvp",
+    response_model=EventRsvp,
+    summary="RSVP to an event",
+    description="Takes a seat, or a place on the waitlist once the event is at capacity. "
+                "Repeating it is harmless: `changed` is false and the existing RSVP is returned.",
+)
+async def rsvp_to_event(
+    event_id: str,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncClient = Depends(get_firestore_db),
+):
+    capacity = await _require_capacity(db, event_id)
+    try:
+        rsvp_status, changed = await rsvp_flights.run(
+            ("rsvp", current_user.uid, event_id), lambda: event_rsvps.rsvp(db, event_id, current_user.uid, capacity)
+        )
+    except ValueError:
+        # The seat transaction kept losing to concurrent RSVPs.
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many RSVPs for this event right now. Please try again.",
+            headers={"Retry-After": "1"},
+        )
+    return await _rsvp_response(db, event_id, rsvp_status, changed, capacity)
 
-# Example: List all events
-# @router.get("/", response_model=List[EventResponse], summary="List all events")
-# async def list_events(skip: int = 0, limit: int = 100):
-#     # events = await some_crud_function_to_get_events(skip=skip, limit=limit)
-#     # return events
-#     return [{"id": "event1", "title": "Awesome Event"}, {"id": "event2", "title": "Another Cool Event"}] # Placeholder
 
-# Example: Create a new event (likely tied to a club and requires auth)
-# @router.post("/", response_model=EventResponse, status_code=status.HTTP_201_CREATED, summary="Create a new event")
-# async def create_event(
-#     event_in: EventCreate,
-#     current_user: AuthenticatedUser = Depends(get_current_user)
-# ):
-#     # Your logic to create an event
-#     # new_event = await some_crud_function_to_create_event(event_in=event_in, user_id=current_user.uid)
-#     # return new_event
-#     return {"id": "new_event_id", **event_in.dict()} # Placeholder
+@router.delete(
+    "/{event_id}/rsvp",
+    response_model=EventRsvp,
+    summary="Cancel an RSVP",
+    description="Gives up the user's seat (to the first person on the waitlist) or waitlist place.",
+)
+async def cancel_event_rsvp(
+    event_id: str,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncClient = Depends(get_firestore_db),
+):
+    capacity = await _require_capacity(db, event_id)
+    try:
+        changed = await rsvp_flights.run(
+            ("cancel", current_user.uid, event_id), lambda: event_rsvps.cancel(db, event_id, current_user.uid)
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many RSVP changes for this event right now. Please try again.",
+            headers={"Retry-After": "1"},
+        )
+    return await _rsvp_response(db, event_id, NOT_GOING, changed, capacity)
 
 
 # Add other event-related endpoints:
 # - Get a specific event (GET /{event_id})
 # - Update an event (PUT or PATCH /{event_id})
 # - Delete an event (DELETE /{event_id})
-# - RSVP to an event, etc.
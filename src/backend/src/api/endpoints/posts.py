@@ -1,3 +1,78 @@
-from fastapi import APIRouter
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+
+from api.deps import AuthenticatedUser, get_current_user, get_firestore_db, get_request_db
+from CRUD.documents import RequestDocumentCache
+from CRUD.users import get_user_firestore_document
+from models.club_post import PostFeedPage
+from services.post_likes import post_likes
+from services.post_timeline import post_timeline
 
 router = APIRouter()
+
+
+@router.get(
+    "/feed",
+    response_model=PostFeedPage,
+    summary="Get the current user's club post timeline",
+    description="Posts from the clubs the user has joined, newest first. "
+                "Pass the returned `nextCursor` as `cursor` to load older posts.",
+)
+async def get_my_post_feed(
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: RequestDocumentCache = Depends(get_request_db),
+):
+    user_data = await get_user_firestore_document(db, current_user.uid) or {}
+    joined_club_ids = [
+        club_id for club_id in user_data.get("joinedClubs", []) if club_id and isinstance(club_id, str)
+    ]
+    if not joined_club_ids:
+        return PostFeedPage()
+    try:
+        return await post_timeline.page(db, joined_club_ids, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+# --- Likes ---
+async def _require_post(db: AsyncClient, post_id: str) -> None:
+    if not await post_likes.post_exists(db, post_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Post with ID '{post_id}' not found.")
+
+
+@router.get("/{post_id}/like", summary="Check whether the current user liked a post")
+async def get_post_like(
+    post_id: str,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncClient = Depends(get_firestore_db),
+):
+    return {"postId": post_id, "liked": await post_likes.has_liked(db, current_user.uid, post_id)}
+
+
+@router.post("/{post_id}/like", summary="Like a post", status_code=status.HTTP_200_OK)
+async def like_post(
+    post_id: str,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncClient = Depends(get_firestore_db),
+):
+    await _require_post(db, post_id)
+    changed = await post_likes.like(db, current_user.uid, post_id)
+    return {"postId": post_id, "liked": True, "changed": changed}
+
+
+@router.delete("/{post_id}/like", summary="Remove a like from a post", status_code=status.HTTP_200_OK)
+async def unlike_post(
+    post_id: str,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncClient = Depends(get_firestore_db),
+):
+    changed = await post_likes.unlike(db, current_user.uid, post_id)
+    return {"postId": post_id, "liked": False, "changed": changed}
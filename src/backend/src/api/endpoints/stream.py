@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from api.deps import AuthenticatedUser, get_current_user, get_stream_user
+from CRUD.users import get_user_firestore_document
+from services import firebase_service
+from services.change_stream import HEARTBEAT_FRAME, change_hub
+from services.stream_ticket import stream_tickets
+
+# How long the browser waits before reconnecting a dropped stream.
+STREAM_RETRY_MILLISECONDS = 3000
+
+router = APIRouter()
+
+
+class EventStreamResponse(StreamingResponse):
+    """
+    A StreamingResponse that always closes its generator. When a client goes away while a
+    write is pending, Starlette abandons the generator mid-`yield`, and its `finally`
+    (which unsubscribes) would otherwise wait for garbage collection.
+    """
+
+    media_type = "text/event-stream"
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()
+
+
+async def _joined_clubs(uid: str) -> List[str]:
+    """
+    Reads the user's joinedClubs with a short lease of a pooled client: a stream stays open
+    for hours and must not hold a Firestore client (as get_firestore_db would) all that time.
+    """
+    await firebase_service.wait_until_ready()
+    pool = firebase_service.client_pool
+    if pool is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Firestore service is not available.",
+        )
+    async with pool.lease() as db:
+        user_data = await get_user_firestore_document(db, uid)
+    if user_data is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User profile not found.")
+    return user_data.get("joinedClubs") or []
+
+
+async def _stream_frames(uid: str, club_ids: List[str], last_event_id: Optional[str]) -> AsyncIterator[bytes]:
+    # Subscribing and computing the replay happen with no await in between, so no change
+    # published meanwhile can be both missed by the replay and queued twice.
+    subscription = change_hub.subscribe(uid, club_ids)
+    try:
+        opening = f"retry: {STREAM_RETRY_MILLISECONDS}\n\n".encode()
+        replay = change_hub.replay_after(last_event_id, subscription.club_ids) if last_event_id else None
+        if replay is not None:
+            yield opening + b"".join(replay)
+        elif last_event_id:
+            # Too old, or from another process: the client should refetch, then follow from here.
+            yield opening + change_hub.reset_frame()
+        else:
+            yield opening + f"id: {change_hub.last_event_id()}\n\n".encode()
+        while True:
+            yield await subscription.next_frames() or HEARTBEAT_FRAME
+    finally:
+        change_hub.unsubscribe(subscription)
+
+
+@router.post(
+    "/ticket",
+    response_model=Dict[str, Union[str, int]],
+    summary="Get a ticket for opening the live update stream",
+    description="Returns `{ticket, expiresIn}`. Open `GET /api/stream?ticket=...` within `expiresIn` "
+                "seconds; a ticket works once, so fetch a new one for every reconnect (passing "
+                "`lastEventId` to resume).",
+)
+async def create_stream_ticket(current_user: AuthenticatedUser = Depends(get_current_user)):
+    issued = stream_tickets.issue(current_user.uid)
+    return {"ticket": issued.ticket, "expiresIn": issued.expires_in}
+
+
+@router.get(
+    "",
+    summary="Live updates for the user's clubs (Server-Sent Events)",
+    description="A text/event-stream of `club`, `event` and `post` changes for the clubs the user "
+                "has joined. Each message's data is `{id, clubId, deleted, data}`. Reconnects "
+                "resume from Last-Event-ID (or `lastEventId`); if that isn't possible a `reset` event is sent and the "
+                "client should refetch. `: ping` comments are sent while idle. Browsers authenticate "
+                "with a `ticket` from POST /api/stream/ticket; other clients can send a Bearer token.",
+    response_class=EventStreamResponse,
+)
+async def stream_changes(
+    current_user: AuthenticatedUser = Depends(get_stream_user),
+    last_event_id: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+    last_event_id_param: Optional[str] = Query(
+        default=None, alias="lastEventId",
+        description="Resume point for a new EventSource (e.g. one opened with a new ticket).",
+    ),
+):
+    club_ids = await _joined_clubs(current_user.uid)
+    return EventStreamResponse(
+        _stream_frames(current_user.uid, club_ids, last_event_id or last_event_id_param),
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
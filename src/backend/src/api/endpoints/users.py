@@ -1,18 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from typing import List, Dict
-from google.cloud.firestore_v1.client import Client  # Added for type hinting
 
 # Corrected relative imports
 from api.deps import (  # Grouped for clarity
     AuthenticatedUser,
     get_current_user,
-    get_firestore_db
+    get_request_db
 )
-from models.clubs import ClubResponse
-from CRUD.users import get_user_joined_club_details  # Added import for CRUD function
+from CRUD.documents import RequestDocumentCache
+from models.clubs import ClubResponse, dump_clubs_json
+from models.event import UserSchedule
+from CRUD.users import get_user_firestore_document, get_user_joined_club_details  # Added import for CRUD function
+from services.club_catalog import club_catalog
+from services.club_recommendations import club_recommender
+from services.event_index import event_feed
+from services.event_schedule import build_schedule
+from services.structured_log import get_logger
 
 # Create an APIRouter instance for these user-specific endpoints
 router = APIRouter()
+log = get_logger("users")
 
 
 # This is the existing /me endpoint for basic user info
@@ -50,7 +60,7 @@ async def read_users_me(  # Renamed for clarity if this is in users.py
 )
 async def get_my_joined_clubs(
     current_user: AuthenticatedUser = Depends(get_current_user),
-    db_client: Client = Depends(get_firestore_db)  # Depends on get_firestore_db from deps.py
+    db_client: RequestDocumentCache = Depends(get_request_db)  # Request-scoped cache over get_firestore_db
 ):
     """
     Endpoint to fetch all clubs joined by the authenticated user.
@@ -67,15 +77,96 @@ async def get_my_joined_clubs(
         joined_clubs_list = await get_user_joined_club_details(
             db=db_client, user_id=current_user.uid
         )
-        return joined_clubs_list
+        # Already-validated ClubResponse objects: write JSON bytes directly instead of
+        # letting FastAPI re-validate them against response_model.
+        return Response(content=dump_clubs_json(joined_clubs_list), media_type="application/json")
     except HTTPException:
         # Re-raise HTTPExceptions if they were raised by dependencies or CRUD operations
         raise
-    except Exception as e:
+    except Exception:
         # Log the detailed error for server-side debugging
-        print(f"ERROR: Could not retrieve joined clubs for user {current_user.uid}: {e}")
+        log.exception("joined_clubs.failed", uid=current_user.uid)
         # Return a generic error to the client
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while fetching your joined clubs. Please try again later.",
         )
+
+
+@router.get(
+    "/me/recommended-clubs",
+    response_model=List[ClubResponse],
+    summary="Get Recommended Clubs for Current User",
+    description="Clubs whose members most often also belong to the clubs the user has joined, "
+                "best match first. Users who haven't joined any clubs get the most popular ones."
+)
+async def get_my_recommended_clubs(
+    limit: int = Query(default=10, ge=1, le=50),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db_client: RequestDocumentCache = Depends(get_request_db)
+):
+    """
+    Scores the user's joined clubs against the periodically built co-membership model.
+    Returns an empty list until the first model build has finished.
+    """
+    if not current_user or not current_user.uid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required. User UID not found.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    model = club_recommender.model
+    if model is None:
+        return Response(content=dump_clubs_json([]), media_type="application/json")
+    try:
+        user_data = await get_user_firestore_document(db_client, current_user.uid) or {}
+        snapshot = await club_catalog.get_snapshot(db_client.db)
+        # Ask for a few spare clubs in case some were deleted since the model was built.
+        recommended = model.recommend(user_data.get("joinedClubs") or [], limit + 5)
+        clubs = [club for club in (snapshot.get(club_id) for club_id, _ in recommended) if club is not None]
+        return Response(content=dump_clubs_json(clubs[:limit]), media_type="application/json")
+    except HTTPException:
+        raise
+    except Exception:
+        log.exception("recommended_clubs.failed", uid=current_user.uid)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while fetching recommended clubs. Please try again later.",
+        )
+
+
+@router.get(
+    "/me/schedule",
+    response_model=UserSchedule,
+    summary="Get Upcoming Events Across the Current User's Clubs",
+    description="Upcoming events from every club the user has joined, soonest first, including events "
+                "already under way. Each event lists the other events in the schedule that overlap it."
+)
+async def get_my_schedule(
+    days: int = Query(default=30, ge=1, le=180, description="How many days ahead to look."),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db_client: RequestDocumentCache = Depends(get_request_db)
+):
+    """
+    Merges the clubs' start-ordered event lists from the in-memory event index and finds
+    overlaps in a single sweep, so a user in many clubs costs O(n log n), not a pairwise check.
+    """
+    if not current_user or not current_user.uid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required. User UID not found.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        user_data = await get_user_firestore_document(db_client, current_user.uid) or {}
+        index = await event_feed.get_index(db_client.db)
+        now = datetime.now(timezone.utc)
+        return build_schedule(index, user_data.get("joinedClubs") or [], now, now + timedelta(days=days))
+    except HTTPException:
+        raise
+    except Exception:
+        log.exception("schedule.failed", uid=current_user.uid)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while fetching your schedule. Please try again later.",
+        )
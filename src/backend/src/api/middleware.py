@@ -0,0 +1,230 @@
+# File: backend/src/api/middleware.py
+import asyncio
+import gzip
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from services.club_catalog import etag_matches
+from services.metrics import RequestRpcStats, current_request_stats, http_request_firestore_rpcs, http_request_seconds
+from services.structured_log import get_logger
+
+# Responses smaller than this aren't worth the CPU (or the extra headers).
+COMPRESSION_MIN_SIZE = 1024
+# Bodies larger than this are compressed in a worker thread instead of on the event loop.
+COMPRESSION_OFFLOAD_SIZE = 256 * 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = ("application/json", "text/html", "text/plain", "text/css", "application/javascript")
+
+# Tags in-process version counters, so two workers whose counters happen to agree
+# never answer 304 for each other's content.
+PROCESS_TAG = uuid.uuid4().hex[:8]
+
+# Counters for what the middleware saved; read by the benchmark and monitoring.
+compression_stats: Dict[str, int] = {"responses": 0, "bytes_in": 0, "bytes_out": 0}
+conditional_get_stats: Dict[str, int] = {"checked": 0, "not_modified": 0}
+
+VersionProvider = Callable[[Request], Optional[str]]
+
+log = get_logger("middleware")
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Picks "br" or "gzip" from an Accept-Encoding header (honoring q=0), preferring brotli."""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding] = quality
+    for coding in ("br", "gzip"):
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """
+    Compresses complete (single-message) responses with brotli or gzip, as negotiated
+    through Accept-Encoding. Streaming responses, small bodies, non-text content and
+    responses that already carry a Content-Encoding pass through untouched. A compressed
+    response's strong ETag is made weak.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Hold the headers back until we've seen whether the body is worth compressing.
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=list(start.get("headers", [])))
+            content_type = headers.get("content-type", "")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            if len(body) > COMPRESSION_OFFLOAD_SIZE:
+                compressed = await asyncio.to_thread(_compress, body, encoding)
+            else:
+                compressed = _compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # A strong tag promises these exact bytes, and the compressed ones differ
+                # from the handler's; a weak tag still matches If-None-Match (etag_matches).
+                headers["ETag"] = f"W/{etag}"
+            headers.add_vary_header("Accept-Encoding")
+            compression_stats["responses"] += 1
+            compression_stats["bytes_in"] += len(body)
+            compression_stats["bytes_out"] += len(compressed)
+            await send({**start, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+
+class ConditionalGetMiddleware:
+    """
+    Weak ETags and early 304s for routes whose content has a cheap version stamp.
+    `versions` maps a request path to a function returning the stamp of what the route
+    would serve right now, or None when it can't tell without doing the real work.
+    A GET whose If-None-Match matches the current stamp is answered 304 before the
+    handler runs; otherwise the handler's 200 response is tagged with the stamp.
+    """
+
+    def __init__(self, app: ASGIApp, versions: Dict[str, VersionProvider]):
+        self.app = app
+        self.versions = versions
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        provider = self.versions.get(scope.get("path", "")) if scope["type"] == "http" else None
+        if provider is None or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        try:
+            stamp = provider(request)
+        except Exception as e:
+            log.warning("conditional_get.version_failed", path=scope["path"], error=str(e))
+            stamp = None
+        if stamp is None:
+            await self.app(scope, receive, send)
+            return
+
+        etag = f'W/"{stamp}"'
+        conditional_get_stats["checked"] += 1
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            conditional_get_stats["not_modified"] += 1
+            await Response(status_code=304, headers={"ETag": etag})(scope, receive, send)
+            return
+
+        async def send_with_etag(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(raw=list(message.get("headers", [])))
+                if "etag" not in headers:
+                    headers["ETag"] = etag
+                message = {**message, "headers": headers.raw}
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
+
+
+class MetricsMiddleware:
+    """
+    Records each request's latency under its route template (so /api/clubs/{club_id}
+    is one series, not one per club) and the Firestore RPCs it made, which the
+    channel interceptors add to the RequestRpcStats set here.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        rpc_stats = RequestRpcStats()
+        token = current_request_stats.set(rpc_stats)
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_request_stats.reset(token)
+            route_path = getattr(scope.get("route"), "path", None)
+            if route_path is None:
+                # Early 304s never reach the router, but only come from ConditionalGetMiddleware's fixed paths.
+                route_path = scope["path"] if status == 304 else "unmatched"
+            http_request_seconds.observe(time.perf_counter() - started, scope["method"], route_path, str(status))
+            http_request_firestore_rpcs.observe(rpc_stats.rpcs, route_path)
+
+
+async def report_request_cache(request: Request, call_next):
+    """
+    Debug middleware (REQUEST_CACHE_DEBUG): reports the request's document cache hits,
+    batched reads and distinct documents in an X-Firestore-Cache header.
+    """
+    response = await call_next(request)
+    document_cache = getattr(request.state, "document_cache", None)
+    if document_cache is not None:
+        stats = document_cache.stats()
+        response.headers["X-Firestore-Cache"] = (
+            f"hits={stats['hits']}; rpcs={stats['rpcs']}; documents={stats['documents']}"
+        )
+    return response
@@ -1,90 +1,162 @@
+import asyncio
 import os
-import json  # For parsing JSON string from env var
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv  # For loading .env file
-from firebase_admin import credentials, initialize_app, get_app
+
+# --- Load Environment Variables ---
+# Call load_dotenv() at the very beginning of your script, before the app modules
+# below are imported, so settings they read at import time see .env values.
+# It looks for a .env file in the current working directory or parent directories.
+# If you run `uvicorn src.main:app --reload` from the `backend/` directory
+# (where your .env file should be), this will load it.
+load_dotenv()
+print("INFO: Attempted to load .env file.")
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from api.endpoints import users as users_router
 from api.endpoints import clubs as clubs_router
 from api.endpoints import posts as posts_router
 from api.endpoints import events as events_router
 from api.endpoints import auth as auth_router
+from api.endpoints import stream as stream_router
+from api.middleware import (
+    CompressionMiddleware,
+    ConditionalGetMiddleware,
+    MetricsMiddleware,
+    compression_stats,
+    conditional_get_stats,
+    report_request_cache,
+)
+from services import firebase_service
+from services.change_stream import change_hub
+from services.club_cache import club_cache
+from services.club_catalog import club_catalog
+from services.club_propagation import club_propagator
+from services.club_recommendations import club_recommender
+from services.club_search import club_search
+from services.collection_watch import events_watch, posts_watch
+from services.event_calendar import event_calendar
+from services.event_index import event_feed
+from services.event_rsvp import event_rsvps
+from services.gcal_service import gcal_sync
+from services.metrics import registry
+from services.post_likes import post_likes
+from services.post_timeline import post_timeline
+from services.rate_limit import membership_rate_limiter
+from services.structured_log import get_logger, start_logging, stop_logging
+from services.token_cache import refresh_signing_keys_periodically, token_cache
 
-# --- Load Environment Variables ---
-# Call load_dotenv() at the very beginning of your script.
-# It looks for a .env file in the current working directory or parent directories.
-# If you run `uvicorn src.main:app --reload` from the `backend/` directory
-# (where your .env file should be), this will load it.
-load_dotenv()
-print("INFO: Attempted to load .env file.")
+# The Firebase Admin SDK and Firestore clients are initialized by a background
+# warm-up in the lifespan, so the server accepts connections without waiting on them.
+# Set FIREBASE_BLOCKING_STARTUP=1 to hold startup until warm-up has finished instead.
+FIREBASE_BLOCKING_STARTUP = os.getenv("FIREBASE_BLOCKING_STARTUP", "0").lower() in ("1", "true", "yes")
+# How long shutdown waits for cancelled background tasks to unwind.
+SHUTDOWN_GRACE_SECONDS = 5
+# Debug mode: report per-request document cache hits/RPCs in an X-Firestore-Cache header.
+REQUEST_CACHE_DEBUG = os.getenv("REQUEST_CACHE_DEBUG", "0").lower() in ("1", "true", "yes")
+
+log = get_logger("main")
+
+
+# --- Application Lifespan ---
+async def _start_background_tasks(background_tasks: list) -> None:
+    """Waits for the Firebase warm-up, then starts the tasks that need Firestore."""
+    await firebase_service.wait_until_ready()
+    # Keep Google's token-signing keys warm so ID token verification never waits on a fetch.
+    background_tasks.append(asyncio.create_task(refresh_signing_keys_periodically()))
+    if firebase_service.db is not None:
+        # Serve GET /api/clubs from a warm in-process snapshot.
+        background_tasks.append(asyncio.create_task(club_catalog.refresh_periodically(firebase_service.db)))
+        # Keep the club search index in step with the catalog (starting from the on-disk snapshot).
+        background_tasks.append(asyncio.create_task(club_search.sync_periodically(firebase_service.db)))
+        # Rebuild the co-membership model behind GET /api/users/me/recommended-clubs.
+        background_tasks.append(asyncio.create_task(club_recommender.refresh_periodically(firebase_service.db)))
+        # Rewrite club names/logos copied onto events and posts when a club changes
+        # (subscribes to the club listener below, so it must start first).
+        background_tasks.append(asyncio.create_task(club_propagator.run(firebase_service.db)))
+        # Fan club/event/post changes out to GET /api/stream (subscribes to the listeners below too).
+        background_tasks.append(asyncio.create_task(change_hub.run()))
+        # Push club document changes into the shared club cache.
+        background_tasks.append(asyncio.create_task(club_cache.listen(firebase_service.db)))
+        # Keep the time-sorted event index for GET /api/events and the month buckets for
+        # GET /api/events/calendar current (both subscribe to the events listener below).
+        event_calendar.subscribe()
+        background_tasks.append(asyncio.create_task(event_feed.refresh_periodically(firebase_service.db)))
+        # Drop cached club feed heads when their posts change (subscribes to the posts listener below).
+        post_timeline.subscribe()
+        # Write-behind buffer for post likesCount.
+        background_tasks.append(asyncio.create_task(post_likes.flush_periodically(firebase_service.db)))
+        # Copies the sharded RSVP counts onto event documents.
+        background_tasks.append(asyncio.create_task(event_rsvps.flush_periodically(firebase_service.db)))
+        if gcal_sync.enabled:
+            # Mirror events to and from the shared Google Calendar.
+            background_tasks.append(asyncio.create_task(gcal_sync.run(firebase_service.db)))
+        # One listener each on `events` and `clubPosts`, shared by the subscribers started above.
+        background_tasks.append(asyncio.create_task(events_watch.run(firebase_service.db)))
+        background_tasks.append(asyncio.create_task(posts_watch.run(firebase_service.db)))
 
-# --- Firebase Admin SDK Initialization ---
-# This should happen once when the application starts.
-try:
-    get_app()  # Check if "[DEFAULT]" app already exists
-    print("INFO: Firebase Admin SDK already initialized.")
-except ValueError:  # Indicates no app named "[DEFAULT]" has been created yet
-    print("INFO: Initializing Firebase Admin SDK...")
-    cred_object = None
-    firebase_credentials_json_str = os.getenv("FIREBASE_CREDENTIALS_JSON")
-    google_app_creds_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-
-    if firebase_credentials_json_str:
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Starts the Firebase warm-up and background tasks when the server boots and cancels them on shutdown.
+    """
+    start_logging()
+    firebase_service.start_warm_up()
+    background_tasks = []
+    starter = asyncio.create_task(_start_background_tasks(background_tasks))
+    if FIREBASE_BLOCKING_STARTUP:
+        await starter
+    yield
+    starter.cancel()
+    for task in background_tasks:
+        task.cancel()
+    # Let cancelled flushes put their unwritten deltas back before the final flushes below.
+    await asyncio.wait([starter, *background_tasks], timeout=SHUTDOWN_GRACE_SECONDS)
+    if firebase_service.db is not None:
         try:
-            cred_dict = json.loads(firebase_credentials_json_str)
-            cred_object = credentials.Certificate(cred_dict)
-            print("INFO: Using FIREBASE_CREDENTIALS_JSON for Firebase Admin SDK.")
-        except json.JSONDecodeError as e:
-            print(f"ERROR: Could not parse FIREBASE_CREDENTIALS_JSON: {e}")
+            await post_likes.flush(firebase_service.db)  # Don't lose buffered like counts on shutdown
         except Exception as e:
-            print(f"ERROR: Could not initialize Firebase Admin with JSON string: {e}")
-    elif google_app_creds_path:
+            log.exception("shutdown.flush_likes_failed", error=str(e))
         try:
-            # Ensure the path is treated as a file path
-            if os.path.exists(google_app_creds_path):
-                cred_object = credentials.Certificate(google_app_creds_path)
-                print("INFO: Using GOOGLE_APPLICATION_CREDENTIALS path for Firebase Admin SDK.")
-            else:
-                print(f"WARNING: GOOGLE_APPLICATION_CREDENTIALS path not found: {google_app_creds_path}")
-                # Let it fall through to default initialization which might find ADC
+            await event_rsvps.flush(firebase_service.db)
         except Exception as e:
-            print(
-                f"ERROR: Could not initialize Firebase Admin with "
-                f"GOOGLE_APPLICATION_CREDENTIALS path {google_app_creds_path}: {e}"
-            )
-            cred_object = None  # Fallback to default initialization attempt
-
-    # Initialize app
-    try:
-        if cred_object:
-            initialize_app(cred_object)
-        else:
-            # This will use GOOGLE_APPLICATION_CREDENTIALS if it's set by the environment
-            # to a valid file path AND cred_object wasn't successfully created,
-            # OR it will use Application Default Credentials (ADC) if available.
-            initialize_app()
-            print(
-                "INFO: Firebase Admin SDK initialized (using ADC or GOOGLE_APPLICATION_CREDENTIALS file "
-                "if not explicitly parsed from FIREBASE_CREDENTIALS_JSON)."
-            )
-        print("INFO: Firebase Admin SDK initialization attempt complete.")
-    except Exception as e:
-        print(f"CRITICAL: Firebase Admin SDK initialization failed: {e}")
-        # Depending on your application's needs, you might want to exit or
-        # raise the exception to prevent the app from starting in a broken state.
+            log.exception("shutdown.flush_rsvps_failed", error=str(e))
+    await firebase_service.close_firestore()
+    stop_logging()
+
 
 # --- FastAPI Application Instance ---
 app = FastAPI(
     title="SlugScene API",
     description="Backend API for the SlugScene platform.",
     version="0.1.0",
+    lifespan=lifespan,
     # You can customize docs URLs if needed, e.g., if you add a global /api prefix
     # docs_url="/api/docs",
     # redoc_url="/api/redoc",
 )
 
+# All API routes will be prefixed with /api
+API_PREFIX = "/api"
+
 # --- Middleware Configuration ---
+# Added first so they run inside CORSMiddleware: 304s and compressed bodies still get CORS headers.
+# Routes listed here answer If-None-Match with 304 before their handler runs.
+app.add_middleware(
+    ConditionalGetMiddleware,
+    versions={
+        f"{API_PREFIX}/clubs": clubs_router.catalog_version,
+        f"{API_PREFIX}/events": events_router.events_version,
+        f"{API_PREFIX}/events/calendar": events_router.calendar_version,
+    },
+)
+# gzip/brotli for responses of 1 KiB and up.
+app.add_middleware(CompressionMiddleware)
+
 # CORS (Cross-Origin Resource Sharing)
 # Ensure these origins match your frontend development and production URLs
 origins = [
@@ -104,9 +176,13 @@ app.add_middleware(
     allow_headers=["*"],     # Allows all headers
 )
 
+# Outermost, so request latency includes the time spent in every other middleware.
+app.add_middleware(MetricsMiddleware)
+
+if REQUEST_CACHE_DEBUG:
+    app.middleware("http")(report_request_cache)
+
 # --- API Routers Inclusion ---
-# All API routes will be prefixed with /api
-API_PREFIX = "/api"
 
 app.include_router(
     auth_router.router, prefix=f"{API_PREFIX}/auth", tags=["Authentication"]
@@ -123,6 +199,9 @@ app.include_router(
 app.include_router(
     events_router.router, prefix=f"{API_PREFIX}/events", tags=["Events"]
 )
+app.include_router(
+    stream_router.router, prefix=f"{API_PREFIX}/stream", tags=["Stream"]
+)
 
 
 # --- Root Endpoint & Health Check ---
@@ -140,3 +219,47 @@ async def health_check():
     Health check endpoint to verify API status.
     """
     return {"status": "ok"}
+
+
+# --- Metrics ---
+def _pool_in_flight():
+    pool = firebase_service.client_pool
+    return sum(pool.in_flight) if pool is not None else None
+
+
+registry.gauge("firestore_requests_in_flight", "Requests holding a pooled Firestore client.", _pool_in_flight)
+registry.gauge("token_cache_hits", "ID token verifications served from cache.", lambda: token_cache.hits)
+registry.gauge("token_cache_misses", "ID token verifications that hit Firebase.", lambda: token_cache.misses)
+registry.gauge("club_cache_size", "Club documents in the shared cache.", lambda: club_cache.stats()["size"])
+registry.gauge("club_cache_hits", "Club document cache hits.", lambda: club_cache.hits)
+registry.gauge("club_cache_misses", "Club document cache misses.", lambda: club_cache.misses)
+registry.gauge(
+    "club_propagation_pending",
+    "Clubs waiting for their copied fields to be rewritten.",
+    lambda: club_propagator.stats()["pending"],
+)
+registry.gauge(
+    "club_propagation_documents_updated",
+    "Event/post documents rewritten with new club fields.",
+    lambda: club_propagator.documents_updated,
+)
+registry.gauge("stream_subscribers", "Open GET /api/stream connections.", lambda: change_hub.subscriber_count)
+registry.gauge("rsvp_seat_transactions", "Seat transactions run for RSVPs.", lambda: event_rsvps.seat_transactions)
+registry.gauge("rsvp_gated", "RSVPs sent to the waitlist without a seat transaction.", lambda: event_rsvps.gated)
+registry.gauge("compressed_bytes_in", "Response bytes before compression.", lambda: compression_stats["bytes_in"])
+registry.gauge("compressed_bytes_out", "Response bytes after compression.", lambda: compression_stats["bytes_out"])
+registry.gauge("not_modified_responses", "Early 304s from ConditionalGetMiddleware.", lambda: conditional_get_stats["not_modified"])
+registry.gauge("membership_rate_limited", "Joins/leaves rejected with 429.", lambda: membership_rate_limiter.limited)
+registry.gauge(
+    "membership_requests_coalesced",
+    "Joins/leaves that shared an identical in-flight call.",
+    lambda: clubs_router.membership_flights.coalesced,
+)
+
+
+@app.get(f"{API_PREFIX}/metrics", tags=["Health Check"], response_class=PlainTextResponse)
+async def metrics():
+    """
+    Request latency, Firestore RPC and cache metrics in the Prometheus text format.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,123 @@
+# File: backend/src/manage.py
+"""
+Backend management commands. Run from backend/src:
+
+    python manage.py import-clubs orgs.csv [--dry-run] [--batch-size 500] [--concurrency 8]
+    python manage.py export-clubs clubs.jsonl [--format csv|jsonl]
+
+CSV files need a header row; `category` and `contactEmail` cells hold several
+values separated by ";". A record without a `clubId` gets one derived from its
+name. Imports record their progress in `<input>.checkpoint` and pick up from there
+if re-run after a failure; pass --restart to ignore it.
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from services import firebase_service
+from services.club_bulk import (
+    DEFAULT_CONCURRENCY,
+    EXPORT_PAGE_SIZE,
+    MAX_BATCH_SIZE,
+    Checkpoint,
+    detect_format,
+    export_clubs,
+    import_clubs,
+)
+
+MAX_ERRORS_SHOWN = 20
+
+
+def _connect():
+    firebase_service.init_firestore()
+    if firebase_service.db is None:
+        sys.exit("Firestore is not available; check FIREBASE_PROJECT_ID and credentials.")
+    return firebase_service.db
+
+
+async def import_clubs_command(args) -> None:
+    checkpoint = Checkpoint(None if args.dry_run else f"{args.path}.checkpoint")
+    if args.restart:
+        checkpoint.clear()
+        checkpoint.line = 0
+    elif checkpoint.line:
+        print(f"Resuming after record {checkpoint.line} (from {checkpoint.path}).")
+
+    db = None if args.dry_run else _connect()
+    started = time.perf_counter()
+    try:
+        with open(args.path, newline="", encoding="utf-8") as stream:
+            report = await import_clubs(
+                db, stream, args.format, checkpoint,
+                batch_size=args.batch_size, concurrency=args.concurrency, dry_run=args.dry_run,
+            )
+    except Exception as e:
+        sys.exit(f"Import stopped: {e}\nRe-run the same command to resume after record {checkpoint.line}.")
+    finally:
+        if db is not None:
+            await firebase_service.close_firestore()
+    elapsed = time.perf_counter() - started
+
+    for error in report.errors[:MAX_ERRORS_SHOWN]:
+        print(f"Invalid record, {error}")
+    if len(report.errors) > MAX_ERRORS_SHOWN:
+        print(f"... and {len(report.errors) - MAX_ERRORS_SHOWN} more invalid records.")
+    summary = (
+        f"Read {report.read} records: {report.valid} valid, {report.invalid} invalid, "
+        f"{report.skipped} already imported."
+    )
+    if args.dry_run:
+        print(f"{summary} Dry run, nothing written.")
+        return
+    checkpoint.clear()
+    rate = report.written / elapsed if elapsed else 0
+    print(f"{summary} Wrote {report.written} clubs in {elapsed:.2f}s ({rate:.0f} docs/s).")
+
+
+async def export_clubs_command(args) -> None:
+    db = _connect()
+    started = time.perf_counter()
+    try:
+        with open(args.path, "w", newline="", encoding="utf-8") as out:
+            exported = await export_clubs(db, out, args.format, page_size=args.page_size)
+    finally:
+        await firebase_service.close_firestore()
+    elapsed = time.perf_counter() - started
+    rate = exported / elapsed if elapsed else 0
+    print(f"Exported {exported} clubs to {args.path} in {elapsed:.2f}s ({rate:.0f} docs/s).")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import-clubs", help="Load clubs from a CSV or JSONL file.")
+    importer.add_argument("path")
+    importer.add_argument("--format", choices=("csv", "jsonl"))
+    importer.add_argument("--dry-run", action="store_true", help="Validate only; write nothing.")
+    importer.add_argument("--batch-size", type=int, default=MAX_BATCH_SIZE, help="Writes per batch (max 500).")
+    importer.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Batches committed at once.")
+    importer.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint.")
+    importer.set_defaults(handler=import_clubs_command)
+
+    exporter = commands.add_parser("export-clubs", help="Write every club to a CSV or JSONL file.")
+    exporter.add_argument("path")
+    exporter.add_argument("--format", choices=("csv", "jsonl"))
+    exporter.add_argument("--page-size", type=int, default=EXPORT_PAGE_SIZE)
+    exporter.set_defaults(handler=export_clubs_command)
+
+    args = parser.parse_args()
+    try:
+        args.format = args.format or detect_format(args.path)
+    except ValueError as e:
+        sys.exit(str(e))
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -15,3 +15,12 @@ class ClubPost:
     updatedAt: datetime = field(default_factory=datetime.utcnow)
     likesCount: int = 0
     likedBy: List[str] = field(default_factory=list)
+    # Denormalized from the club document so feeds render without extra lookups.
+    clubName: Optional[str] = None
+    clubAvatar: Optional[str] = None
+
+
+@dataclass
+class PostFeedPage:
+    posts: List[ClubPost] = field(default_factory=list)
+    nextCursor: Optional[str] = None  # Pass back as `cursor` for the next (older) page
@@ -1,5 +1,9 @@
-from typing import List, Optional
-from pydantic import BaseModel, HttpUrl, Field
+from typing import Annotated, Any, Dict, Iterable, List, Optional
+from pydantic import BaseModel, HttpUrl, Field, TypeAdapter, ValidationError, ValidatorFunctionWrapHandler, WrapValidator
+
+from services.structured_log import get_logger
+
+log = get_logger("clubs.model")
 
 
 # class ClubOfficerSchema(BaseModel):
@@ -47,3 +51,52 @@ class ClubResponse(ClubBase):
         """Pydantic model configuration."""
         populate_by_name = True
         from_attributes = True
+
+
+class ClubListResponse(BaseModel):
+    """
+    Pydantic model for a page of clubs from the catalog.
+    `nextCursor` is the `after` value for the following page, or None on the last page.
+    """
+    clubs: List[ClubResponse] = Field(default_factory=list)
+    nextCursor: Optional[str] = Field(default=None)
+
+
+class ClubSearchResponse(BaseModel):
+    """
+    Pydantic model for club search results, best match first.
+    """
+    query: str
+    clubs: List[ClubResponse] = Field(default_factory=list)
+
+
+def _skip_invalid_club(payload: Any, handler: ValidatorFunctionWrapHandler) -> Optional[ClubResponse]:
+    try:
+        return handler(payload)
+    except ValidationError as e:
+        club_id = payload.get("clubId", "unknown_id") if isinstance(payload, dict) else "unknown_id"
+        log.warning("club.invalid", club_id=club_id, errors=e.errors(include_url=False, include_input=False))
+        return None
+
+
+# Built once at import: a TypeAdapter compiles its validator and serializer up front,
+# so each use below is a single pydantic-core call.
+club_response_adapter = TypeAdapter(ClubResponse)
+club_response_list_adapter = TypeAdapter(List[ClubResponse])
+club_list_response_adapter = TypeAdapter(ClubListResponse)
+club_search_response_adapter = TypeAdapter(ClubSearchResponse)
+# Validates a list of club payloads, turning each malformed one into None instead of failing the list.
+_club_payloads_adapter = TypeAdapter(List[Annotated[Optional[ClubResponse], WrapValidator(_skip_invalid_club)]])
+
+
+def validate_club_payloads(payloads: Iterable[Dict[str, Any]]) -> List[ClubResponse]:
+    """
+    Validates Firestore club dicts (each carrying its 'clubId') into ClubResponse objects
+    in one pass; malformed records are logged and skipped.
+    """
+    return [club for club in _club_payloads_adapter.validate_python(list(payloads)) if club is not None]
+
+
+def dump_clubs_json(clubs: List[ClubResponse]) -> bytes:
+    """Serializes already-validated clubs straight to JSON bytes, without re-validating them."""
+    return club_response_list_adapter.dump_json(clubs)
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
 
 
 @dataclass
@@ -15,3 +15,50 @@ class Event:
     gCalEventId: Optional[str] = None
     createdAt: datetime = field(default_factory=datetime.utcnow)
     organizerId: str = ""
+    # Denormalized from the club document so feeds render without extra lookups.
+    clubName: Optional[str] = None
+    clubLogo: Optional[str] = None
+    # RSVPs: None = no limit. The counts are brought up to date every few seconds.
+    capacity: Optional[int] = None
+    attendeeCount: int = 0
+    waitlistCount: int = 0
+
+
+@dataclass
+class EventRsvp:
+    eventId: str
+    status: str  # "going", "waitlisted" or "none"
+    changed: bool = False
+    capacity: Optional[int] = None
+    attendeeCount: int = 0
+    waitlistCount: int = 0
+
+
+@dataclass
+class ScheduledEvent:
+    event: Event
+    # Other events in the schedule whose time overlaps this one, soonest first.
+    conflictsWith: List[str] = field(default_factory=list)
+
+
+@dataclass
+class UserSchedule:
+    start: datetime
+    end: datetime
+    conflictCount: int  # Overlapping pairs
+    events: List[ScheduledEvent] = field(default_factory=list)
+
+
+@dataclass
+class CalendarDay:
+    date: date
+    count: int
+    events: List[Event] = field(default_factory=list)
+
+
+@dataclass
+class CalendarMonth:
+    month: str  # YYYY-MM
+    timezone: str
+    totalEvents: int
+    days: List[CalendarDay] = field(default_factory=list)
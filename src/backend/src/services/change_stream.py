@@ -0,0 +1,292 @@
+# File: backend/src/services/change_stream.py
+# Fans club, event and post changes out to GET /api/stream (Server-Sent Events) connections.
+from __future__ import annotations
+
+import asyncio
+import itertools
+import os
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from CRUD.events import event_from_firestore
+from CRUD.posts import post_from_firestore
+from models.club_post import ClubPost
+from models.clubs import club_response_adapter
+from models.event import Event
+from services.club_cache import CachedClub, club_cache
+from services.collection_watch import DocumentChange, events_watch, posts_watch
+from services.metrics import registry
+from services.structured_log import get_logger
+
+# Messages held per connection; when a slow client falls this far behind, its oldest are dropped.
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "256"))
+# Recent messages kept for reconnecting clients that send Last-Event-ID.
+STREAM_REPLAY_SIZE = int(os.getenv("STREAM_REPLAY_SIZE", "10000"))
+# Idle connections get a comment frame this often, so proxies keep them open and dead ones are noticed.
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+
+HEARTBEAT_FRAME = b": ping\n\n"
+
+event_adapter = TypeAdapter(Event)
+post_adapter = TypeAdapter(ClubPost)
+
+stream_messages_published = registry.counter(
+    "stream_messages_published", "Changes published to SSE subscribers.", ("kind",)
+)
+stream_messages_dropped = registry.counter(
+    "stream_messages_dropped", "SSE messages dropped from full per-connection queues."
+)
+
+log = get_logger("change_stream")
+
+
+class StreamMessage(NamedTuple):
+    """One change, encoded once as a complete SSE frame and shared by every connection it goes to."""
+    seq: int
+    club_id: str
+    frame: bytes
+
+
+def encode_frame(kind: str, data: Any, event_id: Optional[str] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {kind}\n".encode() + b"data: " + to_json(data) + b"\n\n"
+
+
+class Subscription:
+    """
+    One SSE connection: the clubs it follows and a bounded queue of messages not yet written.
+    `push` never blocks; when the queue is full the oldest message is dropped, so a stalled
+    client costs at most `maxsize` references and never slows the publisher.
+    """
+
+    __slots__ = ("uid", "club_ids", "queue", "dropped", "_ready")
+
+    def __init__(self, uid: str, club_ids: Iterable[str], maxsize: int = STREAM_QUEUE_SIZE):
+        self.uid = uid
+        self.club_ids: Set[str] = set(club_ids)
+        self.queue: Deque[bytes] = deque(maxlen=maxsize)
+        self.dropped = 0
+        self._ready = asyncio.Event()
+
+    def push(self, frame: bytes) -> None:
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+            stream_messages_dropped.inc()
+        self.queue.append(frame)
+        self._ready.set()
+
+    def wake(self) -> None:
+        """Makes `next_frames` return even with nothing queued (heartbeat)."""
+        self._ready.set()
+
+    async def next_frames(self) -> bytes:
+        """Waits for queued frames and returns them joined; empty bytes if woken for a heartbeat."""
+        await self._ready.wait()
+        self._ready.clear()
+        frames = b"".join(self.queue)
+        self.queue.clear()
+        return frames
+
+
+class ChangeHub:
+    """
+    Process-wide fan-out of club, event and post changes to SSE subscribers.
+
+    The hub listens through the shared listeners (club_cache for `clubs`, collection_watch
+    for `events` and `clubPosts`), so there is one Firestore listener per collection however
+    many browsers are connected. Each change is encoded once and pushed only to subscriptions
+    following its club, found through a clubId index.
+
+    Message IDs are `{epoch}-{seq}`. The last STREAM_REPLAY_SIZE messages are kept so a
+    reconnecting client's Last-Event-ID can be replayed; a client whose ID is from another
+    epoch (another process, or before a listener restart) or older than the buffer gets a
+    `reset` event and should refetch what it shows.
+    """
+
+    def __init__(self, replay_size: int = STREAM_REPLAY_SIZE, queue_size: int = STREAM_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.epoch = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._replay: Deque[StreamMessage] = deque(maxlen=replay_size)
+        self._by_club: Dict[str, Set[Subscription]] = {}
+        self._by_user: Dict[str, Set[Subscription]] = {}
+        # clubId of every live event/post, so deletes (which carry no data) can be routed.
+        self._club_of: Dict[str, Dict[str, str]] = {"event": {}, "post": {}}
+        # Kinds whose listener has delivered its initial snapshot at least once.
+        self._primed: Set[str] = set()
+
+    # --- Subscriptions ---
+    def subscribe(self, uid: str, club_ids: Iterable[str]) -> Subscription:
+        subscription = Subscription(uid, club_ids, self.queue_size)
+        self._by_user.setdefault(uid, set()).add(subscription)
+        for club_id in subscription.club_ids:
+            self._by_club.setdefault(club_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._discard(self._by_user, subscription.uid, subscription)
+        for club_id in subscription.club_ids:
+            self._discard(self._by_club, club_id, subscription)
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[Subscription]], key: str, subscription: Subscription) -> None:
+        subscriptions = index.get(key)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del index[key]
+
+    def follow(self, uid: str, club_id: str) -> None:
+        """Called after a join, so the user's open streams start carrying the club."""
+        for subscription in self._by_user.get(uid, ()):
+            subscription.club_ids.add(club_id)
+            self._by_club.setdefault(club_id, set()).add(subscription)
+
+    def unfollow(self, uid: str, club_id: str) -> None:
+        for subscription in self._by_user.get(uid, ()):
+            subscription.club_ids.discard(club_id)
+            self._discard(self._by_club, club_id, subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._by_user.values())
+
+    # --- Publishing ---
+    def last_event_id(self) -> str:
+        return f"{self.epoch}-{self._seq}"
+
+    def publish(self, kind: str, club_id: str, data: Dict[str, Any]) -> StreamMessage:
+        self._seq += 1
+        message = StreamMessage(self._seq, club_id, encode_frame(kind, data, self.last_event_id()))
+        self._replay.append(message)
+        stream_messages_published.inc(1, kind)
+        for subscription in self._by_club.get(club_id, ()):
+            subscription.push(message.frame)
+        return message
+
+    def replay_after(self, last_event_id: str, club_ids: Set[str]) -> Optional[List[bytes]]:
+        """
+        Frames for `club_ids` published after `last_event_id`, or None if they can't all be
+        replayed (unknown epoch, or older than the buffer) and the client must reset.
+        """
+        epoch, _, seq = last_event_id.strip().rpartition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        if seq > self._seq:
+            return None
+        first = self._replay[0].seq if self._replay else self._seq + 1
+        if seq < first - 1:
+            return None
+        newer = itertools.islice(self._replay, seq - first + 1, None)
+        return [message.frame for message in newer if message.club_id in club_ids]
+
+    def reset_frame(self) -> bytes:
+        return encode_frame("reset", {}, self.last_event_id())
+
+    def broadcast_reset(self) -> None:
+        """Starts a new epoch and tells every subscriber that changes may have been missed."""
+        self.epoch = uuid.uuid4().hex[:8]
+        self._replay.clear()
+        frame = self.reset_frame()
+        for subscriptions in self._by_user.values():
+            for subscription in subscriptions:
+                subscription.queue.clear()
+                subscription.push(frame)
+
+    # --- Listener intake ---
+    def _on_initial(self, kind: str) -> None:
+        # The first snapshot is every watched document, which subscribers load over the REST API.
+        # A later one means the listener restarted and changes in between were lost.
+        if kind in self._primed:
+            log.warning("stream.listener_restarted", kind=kind, subscribers=self.subscriber_count)
+            self.broadcast_reset()
+        self._primed.add(kind)
+
+    def _publish_documents(self, kind: str, changes: List[DocumentChange], initial: bool) -> None:
+        if initial:
+            club_of = self._club_of[kind]
+            club_of.clear()
+            club_of.update((doc_id, data.get("clubId") or "") for doc_id, data in changes if data is not None)
+            self._on_initial(kind)
+            return
+        club_of = self._club_of[kind]
+        for doc_id, data in changes:
+            if data is None:
+                club_id = club_of.pop(doc_id, None)
+                if club_id:
+                    self.publish(kind, club_id, {"id": doc_id, "clubId": club_id, "deleted": True})
+                continue
+            club_id = data.get("clubId") or ""
+            club_of[doc_id] = club_id
+            if not club_id:
+                continue
+            if kind == "event":
+                event = event_from_firestore(doc_id, data)
+                payload = event_adapter.dump_python(event, mode="json") if event is not None else None
+            else:
+                post = post_from_firestore(doc_id, data)
+                # Who liked a post is private; subscribers get the count.
+                payload = post_adapter.dump_python(post, mode="json", exclude={"likedBy"}) if post is not None else None
+            if payload is not None:
+                self.publish(kind, club_id, {"id": doc_id, "clubId": club_id, "deleted": False, "data": payload})
+
+    def on_event_changes(self, changes: List[DocumentChange], initial: bool) -> None:
+        self._publish_documents("event", changes, initial)
+
+    def on_post_changes(self, changes: List[DocumentChange], initial: bool) -> None:
+        self._publish_documents("post", changes, initial)
+
+    def on_events_dropped(self, event_ids: List[str]) -> None:
+        self._forget("event", event_ids)
+
+    def on_posts_dropped(self, post_ids: List[str]) -> None:
+        self._forget("post", post_ids)
+
+    def _forget(self, kind: str, doc_ids: List[str]) -> None:
+        # Fell behind the listener's cutoff: no longer watched, so no delete will come to route.
+        club_of = self._club_of[kind]
+        for doc_id in doc_ids:
+            club_of.pop(doc_id, None)
+
+    def on_club_changes(self, updates: List[Tuple[str, Optional[CachedClub]]], initial: bool) -> None:
+        if initial:
+            self._on_initial("club")
+            return
+        for club_id, entry in updates:
+            if entry is None:
+                self.publish("club", club_id, {"id": club_id, "clubId": club_id, "deleted": True})
+            elif entry.club is not None:
+                payload = club_response_adapter.dump_python(entry.club, mode="json")
+                self.publish("club", club_id, {"id": club_id, "clubId": club_id, "deleted": False, "data": payload})
+
+    async def run(self, heartbeat_seconds: float = STREAM_HEARTBEAT_SECONDS) -> None:
+        """
+        Background task: subscribes to the shared listeners (before they start, so their
+        initial snapshots are seen) and wakes every connection for a heartbeat on one timer.
+        """
+        club_cache.subscribe(self.on_club_changes)
+        events_watch.subscribe(self.on_event_changes)
+        posts_watch.subscribe(self.on_post_changes)
+        events_watch.subscribe_dropped(self.on_events_dropped)
+        posts_watch.subscribe_dropped(self.on_posts_dropped)
+        while True:
+            await asyncio.sleep(heartbeat_seconds)
+            for subscriptions in self._by_user.values():
+                for subscription in subscriptions:
+                    subscription.wake()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": self.subscriber_count,
+            "clubs_followed": len(self._by_club),
+            "last_event_id": self.last_event_id(),
+            "replay_size": len(self._replay),
+        }
+
+
+change_hub = ChangeHub()
@@ -0,0 +1,255 @@
+# File: backend/src/services/club_bulk.py
+# Bulk import/export of the `clubs` collection, used by manage.py.
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+from pydantic import ValidationError
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+
+from models.clubs import ClubBase
+
+CLUBS_COLLECTION = "clubs"
+# Firestore's limit on writes per batch.
+MAX_BATCH_SIZE = 500
+DEFAULT_CONCURRENCY = 8
+EXPORT_PAGE_SIZE = 500
+# List-valued columns hold several values in one CSV cell, separated by this.
+CSV_LIST_SEPARATOR = ";"
+CSV_LIST_FIELDS = ("category", "contactEmail")
+EXPORT_FIELDS = ("clubId", "name", "description", "category", "contactEmail", "logoURL", "memberCount")
+
+
+@dataclass
+class ClubRecord:
+    line: int  # 1-based position in the input, for error messages and checkpoints
+    club_id: str
+    data: Dict[str, Any]
+
+
+@dataclass
+class ImportReport:
+    read: int = 0
+    valid: int = 0
+    invalid: int = 0
+    skipped: int = 0  # Already written by a previous run, per the checkpoint
+    written: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+def slugify(name: str) -> str:
+    """Document ID for a club that has no clubId column, e.g. "Slug Hackers!" -> "slug-hackers"."""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def detect_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension == ".csv":
+        return "csv"
+    raise ValueError(f"Can't tell the format of '{path}'; pass --format csv or --format jsonl.")
+
+
+def _read_raw_records(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """Yields (line, raw record) pairs one at a time, without loading the file."""
+    if fmt == "csv":
+        for line, row in enumerate(csv.DictReader(stream), start=1):
+            record: Dict[str, Any] = {key: value for key, value in row.items() if key and value not in (None, "")}
+            for list_field in CSV_LIST_FIELDS:
+                if list_field in record:
+                    record[list_field] = [
+                        item.strip() for item in record[list_field].split(CSV_LIST_SEPARATOR) if item.strip()
+                    ]
+            yield line, record
+        return
+    for line, text in enumerate(stream, start=1):
+        if text.strip():
+            try:
+                yield line, json.loads(text)
+            except json.JSONDecodeError as e:
+                yield line, e
+
+
+def parse_club_records(stream: TextIO, fmt: str, report: ImportReport) -> Iterator[ClubRecord]:
+    """
+    Validates each record against ClubBase and yields the valid ones.
+    Invalid records are counted and described in `report.errors`, then skipped.
+    Only fields present in the input are written, so an import never resets
+    e.g. a club's memberCount that the input doesn't mention.
+    """
+    for line, raw in _read_raw_records(stream, fmt):
+        report.read += 1
+        try:
+            if isinstance(raw, Exception):
+                raise ValueError(f"not valid JSON: {raw}")
+            if not isinstance(raw, dict):
+                raise ValueError("expected an object")
+            raw = dict(raw)
+            club_id = str(raw.pop("clubId", "") or "").strip()
+            club = ClubBase.model_validate(raw)
+            club_id = club_id or slugify(club.name)
+            if not club_id or "/" in club_id:
+                raise ValueError(f"invalid club ID '{club_id}'")
+        except ValidationError as e:
+            report.invalid += 1
+            problems = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+            report.errors.append(f"line {line}: {problems}")
+            continue
+        except ValueError as e:
+            report.invalid += 1
+            report.errors.append(f"line {line}: {e}")
+            continue
+        report.valid += 1
+        yield ClubRecord(line, club_id, club.model_dump(mode="json", exclude_unset=True))
+
+
+class Checkpoint:
+    """
+    Highest input line below which every record has been committed, stored as JSON.
+    Batches finish out of order, so the mark only advances over a contiguous prefix;
+    a resumed import may rewrite a few records, which is harmless because writes merge.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.line = 0
+        self._finished: Dict[int, int] = {}  # first line of a batch -> its last line
+        self._pending: Set[int] = set()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.line = int(json.load(f).get("line", 0))
+
+    def start(self, first_line: int) -> None:
+        self._pending.add(first_line)
+
+    def finish(self, first_line: int, last_line: int) -> None:
+        self._pending.discard(first_line)
+        self._finished[first_line] = last_line
+        # Everything before the oldest batch still in flight is committed.
+        horizon = min(self._pending) if self._pending else None
+        for start in sorted(self._finished):
+            if horizon is not None and start > horizon:
+                break
+            self.line = max(self.line, self._finished.pop(start))
+        self.save()
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump({"line": self.line}, f)
+        os.replace(temporary, self.path)  # Atomic, so a crash never leaves a torn checkpoint
+
+    def clear(self) -> None:
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+async def import_clubs(
+    db: Optional[AsyncClient],
+    stream: TextIO,
+    fmt: str,
+    checkpoint: Checkpoint,
+    batch_size: int = MAX_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    dry_run: bool = False,
+) -> ImportReport:
+    """
+    Streams records into `clubs` with up to `concurrency` WriteBatch commits in flight.
+    Records at or before `checkpoint.line` are skipped. With `dry_run`, records are
+    only validated and `db` may be None.
+    """
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+    report = ImportReport()
+    slots = asyncio.Semaphore(concurrency)
+    in_flight: Set[asyncio.Task] = set()
+    failures: List[BaseException] = []
+
+    async def commit(records: List[ClubRecord]) -> None:
+        try:
+            batch = db.batch()
+            for record in records:
+                batch.set(db.collection(CLUBS_COLLECTION).document(record.club_id), record.data, merge=True)
+            await batch.commit()
+            report.written += len(records)
+            checkpoint.finish(records[0].line, records[-1].line)
+        except Exception as e:
+            failures.append(e)
+        finally:
+            slots.release()
+
+    async def submit(records: List[ClubRecord]) -> None:
+        await slots.acquire()  # Bounds memory as well as load: the reader waits for a free slot
+        if failures:
+            slots.release()
+            return
+        checkpoint.start(records[0].line)
+        task = asyncio.create_task(commit(records))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    pending: List[ClubRecord] = []
+    for record in parse_club_records(stream, fmt, report):
+        if record.line <= checkpoint.line:
+            report.skipped += 1
+            continue
+        if dry_run:
+            continue
+        pending.append(record)
+        if len(pending) == batch_size:
+            await submit(pending)
+            pending = []
+        if failures:
+            break
+    if pending and not failures:
+        await submit(pending)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    if failures:
+        raise failures[0]
+    return report
+
+
+async def export_clubs(db: AsyncClient, out: TextIO, fmt: str, page_size: int = EXPORT_PAGE_SIZE) -> int:
+    """
+    Writes every club to `out`, paging through the collection in document-ID order,
+    so only one page is held in memory. Returns the number of clubs written.
+    """
+    from google.cloud.firestore_v1.field_path import FieldPath
+
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+
+    exported = 0
+    last_snapshot = None
+    while True:
+        query = db.collection(CLUBS_COLLECTION).order_by(FieldPath.document_id()).limit(page_size)
+        if last_snapshot is not None:
+            query = query.start_after(last_snapshot)
+        page_count = 0
+        async for snapshot in query.stream():
+            page_count += 1
+            last_snapshot = snapshot
+            record = {"clubId": snapshot.id, **(snapshot.to_dict() or {})}
+            if writer is not None:
+                for list_field in CSV_LIST_FIELDS:
+                    if isinstance(record.get(list_field), list):
+                        record[list_field] = CSV_LIST_SEPARATOR.join(map(str, record[list_field]))
+                writer.writerow(record)
+            else:
+                out.write(json.dumps(record, default=str) + "\n")
+        exported += page_count
+        if page_count < page_size:
+            return exported
@@ -0,0 +1,165 @@
+# File: backend/src/services/club_cache.py
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from cachetools import TLRUCache
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+
+from CRUD.documents import get_documents_by_ids
+from models.clubs import ClubResponse, validate_club_payloads
+from services.collection_watch import WATCH_CHECK_SECONDS, CollectionWatch, DocumentChange
+from services.structured_log import get_logger
+
+CLUB_CACHE_MAXSIZE = 5_000
+# Entries expire after this long while no listener is keeping them current...
+CLUB_CACHE_TTL_SECONDS = 60
+# ...and after this long while the `clubs` listener is streaming changes.
+CLUB_CACHE_LISTENER_TTL_SECONDS = 60 * 60
+CLUB_LISTENER_CHECK_SECONDS = WATCH_CHECK_SECONDS
+
+_MISSING = object()
+
+log = get_logger("club_cache")
+
+
+class CachedClub(NamedTuple):
+    """A club document as stored (`data`, without clubId) and its validated model, or None if invalid."""
+    data: Dict[str, Any]
+    club: Optional[ClubResponse]
+
+
+def _parse_clubs(documents: Dict[str, Dict[str, Any]]) -> Dict[str, CachedClub]:
+    """Builds cache entries for {clubId: data}, validating all of them in one call."""
+    clubs = validate_club_payloads({**data, "clubId": club_id} for club_id, data in documents.items())
+    valid = {club.clubId: club for club in clubs}
+    return {club_id: CachedClub(data=data, club=valid.get(club_id)) for club_id, data in documents.items()}
+
+
+def _parse_club_changes(changes: List[DocumentChange]) -> List[Tuple[str, Optional[CachedClub]]]:
+    parsed = _parse_clubs({club_id: data for club_id, data in changes if data is not None})
+    return [(club_id, None if data is None else parsed[club_id]) for club_id, data in changes]
+
+
+class ClubDocumentCache:
+    """
+    Process-wide LRU cache of club documents and their parsed ClubResponse.
+    A CollectionWatch on `clubs` pushes every add/change/delete into the cache, so entries
+    can live long. If the listener dies, the cache is cleared and entries fall back to a
+    short TTL until it is back.
+    Missing clubs are cached too (as None) so unknown IDs don't hit Firestore every time.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = CLUB_CACHE_MAXSIZE,
+        ttl: float = CLUB_CACHE_TTL_SECONDS,
+        listener_ttl: float = CLUB_CACHE_LISTENER_TTL_SECONDS,
+    ):
+        self.ttl = ttl
+        self.listener_ttl = listener_ttl
+        self.hits = 0
+        self.misses = 0
+        self.listener_updates = 0
+        self._entries: TLRUCache = TLRUCache(maxsize=maxsize, ttu=self._time_to_use, timer=time.monotonic)
+        # Bumped whenever a club's entry is replaced or dropped (and `_epoch` on clear()), so a
+        # read that was in flight meanwhile doesn't overwrite newer data with what it fetched.
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._subscribers: List[Callable[[List[Tuple[str, Optional[CachedClub]]], bool], None]] = []
+        # Validation runs on the listener's thread, not the event loop.
+        self._watch = CollectionWatch("clubs", parse=_parse_club_changes)
+        self._watch.subscribe(self._apply_updates)
+        self._watch.subscribe_stopped(self._on_listener_stopped)
+
+    @property
+    def listening(self) -> bool:
+        return self._watch.listening
+
+    def _time_to_use(self, _club_id: str, _entry: Optional[CachedClub], now: float) -> float:
+        return now + (self.listener_ttl if self.listening else self.ttl)
+
+    def _bump(self, club_id: str) -> None:
+        self._generations[club_id] = self._generations.get(club_id, 0) + 1
+
+    def invalidate(self, club_id: str) -> None:
+        self._bump(club_id)
+        self._entries.pop(club_id, None)
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._generations.clear()
+        self._entries.clear()
+
+    async def get_many(self, db: AsyncClient, club_ids: Iterable[str]) -> List[Optional[CachedClub]]:
+        """Looks up clubs in order of `club_ids`, fetching misses with one batched read. None = no such club."""
+        club_ids = list(club_ids)
+        found: Dict[str, Optional[CachedClub]] = {}
+        missing: List[str] = []
+        for club_id in dict.fromkeys(club_id for club_id in club_ids if club_id):
+            entry = self._entries.get(club_id, _MISSING)
+            if entry is not _MISSING:
+                self.hits += 1
+                found[club_id] = entry
+            else:
+                self.misses += 1
+                missing.append(club_id)
+
+        if missing:
+            epoch = self._epoch
+            generations = [self._generations.get(club_id, 0) for club_id in missing]
+            fetched = await get_documents_by_ids(db, "clubs", missing)
+            parsed = _parse_clubs({club_id: data for club_id, data in zip(missing, fetched) if data is not None})
+            for club_id, generation in zip(missing, generations):
+                entry = parsed.get(club_id)
+                if epoch == self._epoch and generation == self._generations.get(club_id, 0):
+                    self._entries[club_id] = entry
+                else:  # Changed during the read: what we fetched may already be stale
+                    entry = self._entries.get(club_id, entry)
+                found[club_id] = entry
+        return [found.get(club_id) for club_id in club_ids]
+
+    # --- Change listener ---
+    def _apply_updates(self, updates: List[Tuple[str, Optional[CachedClub]]], initial: bool) -> None:
+        # The first callback carries the whole collection; from then on the cache is authoritative.
+        for club_id, entry in updates:
+            self._bump(club_id)
+            self._entries[club_id] = entry
+        self.listener_updates += len(updates)
+        for callback in self._subscribers:
+            try:
+                callback(updates, initial)
+            except Exception as e:
+                log.exception("club_cache.subscriber_failed", error=str(e))
+
+    def subscribe(self, callback: Callable[[List[Tuple[str, Optional[CachedClub]]], bool], None]) -> None:
+        """
+        Calls `callback(updates, initial)` on the event loop with every batch of (clubId, entry or None)
+        the listener delivers; `initial` marks the first batch after the listener (re)starts,
+        which is the whole collection.
+        """
+        self._subscribers.append(callback)
+
+    def _on_listener_stopped(self) -> None:
+        # Entries were given the long TTL and may miss changes until the listener is back.
+        self.clear()
+
+    async def listen(self, db: AsyncClient, check_seconds: float = CLUB_LISTENER_CHECK_SECONDS) -> None:
+        """Background task that keeps the listener running, falling back to TTL expiry while it's down."""
+        await self._watch.run(db, check_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "maxsize": int(self._entries.maxsize),
+            "hits": self.hits,
+            "misses": self.misses,
+            "listening": self.listening,
+            "listener_updates": self.listener_updates,
+        }
+
+
+club_cache = ClubDocumentCache()
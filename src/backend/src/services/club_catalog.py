@@ -0,0 +1,227 @@
+# File: backend/src/services/club_catalog.py
+from __future__ import annotations
+
+import asyncio
+import copy
+import hashlib
+import re
+import time
+from bisect import bisect_left, bisect_right
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Optional, Tuple
+
+from cachetools import LRUCache
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+
+from models.clubs import ClubResponse, dump_clubs_json, validate_club_payloads
+from services.member_counter import member_counter
+from services.structured_log import get_logger
+
+# How long a snapshot may be served before it is rebuilt from Firestore.
+CATALOG_REFRESH_SECONDS = 60
+# Word prefixes whose matching clubs are remembered per snapshot.
+MAX_CACHED_PREFIXES = 1024
+_WORD = re.compile(r"[a-z0-9]+")
+
+log = get_logger("club_catalog")
+
+
+class ClubCatalogSnapshot:
+    """
+    Immutable view of the whole `clubs` collection, sorted by clubId.
+    Per-category and per-word indexes hold positions into `clubs`, so filtering and
+    cursor pagination are binary searches rather than scans.
+    """
+
+    def __init__(self, clubs: List[ClubResponse]):
+        self.clubs = sorted(clubs, key=lambda club: club.clubId)
+        self.club_ids = [club.clubId for club in self.clubs]
+        self.category_index: Dict[str, List[int]] = {}
+        self.word_index: Dict[str, List[int]] = {}
+        for position, club in enumerate(self.clubs):
+            for category in set(club.category):
+                self.category_index.setdefault(category.lower(), []).append(position)
+            for word in set(_WORD.findall(f"{club.name}\n{club.description}".lower())):
+                self.word_index.setdefault(word, []).append(position)
+        # Sorted vocabulary: the words starting with a prefix are one contiguous run.
+        self.words = sorted(self.word_index)
+        self._prefix_matches: LRUCache = LRUCache(maxsize=MAX_CACHED_PREFIXES)
+
+        # Query responses are a pure function of the snapshot, so its content hash
+        # doubles as a strong validator for every URL served from it.
+        self.base_version = hashlib.sha256(dump_clubs_json(self.clubs)).hexdigest()
+        self.version = self.base_version
+        # clubId -> memberCount patched in since the snapshot was built.
+        self.member_counts: Dict[str, int] = {}
+        self.built_at = time.monotonic()
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+    def get(self, club_id: str) -> Optional[ClubResponse]:
+        position = bisect_left(self.club_ids, club_id)
+        if position < len(self.club_ids) and self.club_ids[position] == club_id:
+            return self.clubs[position]
+        return None
+
+    def with_member_count(self, club_id: str, delta: int) -> Optional[ClubCatalogSnapshot]:
+        """
+        Copy of the snapshot with one club's memberCount moved by `delta`, sharing the
+        indexes (positions don't change); None if the club isn't in the snapshot.
+        """
+        position = bisect_left(self.club_ids, club_id)
+        if position == len(self.club_ids) or self.club_ids[position] != club_id:
+            return None
+        club = self.clubs[position]
+        member_count = max(0, club.memberCount + delta)
+        patched = copy.copy(self)
+        patched.clubs = list(self.clubs)
+        patched.clubs[position] = club.model_copy(update={"memberCount": member_count})
+        patched.member_counts = {**self.member_counts, club_id: member_count}
+        # Same base and same patched counts give the same version on every worker.
+        patched.version = hashlib.sha256(
+            f"{self.base_version}:{sorted(patched.member_counts.items())}".encode()
+        ).hexdigest()
+        return patched
+
+    def _prefix_positions(self, prefix: str) -> FrozenSet[int]:
+        positions = self._prefix_matches.get(prefix)
+        if positions is None:
+            matched = set()
+            for i in range(bisect_left(self.words, prefix), len(self.words)):
+                if not self.words[i].startswith(prefix):
+                    break
+                matched.update(self.word_index[self.words[i]])
+            positions = self._prefix_matches[prefix] = frozenset(matched)
+        return positions
+
+    def matching_positions(self, q: str) -> FrozenSet[int]:
+        """Positions of clubs where every word of `q` starts a word of the name or description."""
+        words = set(_WORD.findall(q.lower()))
+        if not words:
+            return frozenset()
+        return frozenset.intersection(*(self._prefix_positions(word) for word in words))
+
+    def query(
+        self,
+        category: Optional[str] = None,
+        q: Optional[str] = None,
+        limit: int = 50,
+        after: Optional[str] = None,
+    ) -> Tuple[List[ClubResponse], Optional[str]]:
+        """Returns one page of matching clubs and the cursor for the next page."""
+        if category:
+            positions = self.category_index.get(category.lower(), [])
+        else:
+            positions = range(len(self.clubs))
+        if q:
+            matches = self.matching_positions(q)
+            positions = sorted(matches.intersection(positions) if category else matches)
+
+        start = 0
+        if after is not None:
+            start = bisect_left(positions, bisect_right(self.club_ids, after))
+
+        page: List[ClubResponse] = []
+        next_cursor: Optional[str] = None
+        for i in range(start, len(positions)):
+            if len(page) == limit:
+                next_cursor = page[-1].clubId
+                break
+            page.append(self.clubs[positions[i]])
+        return page, next_cursor
+
+
+class ClubCatalog:
+    """
+    Process-wide cache of the club catalog.
+    The snapshot is rebuilt lazily after `invalidate()` or once it is older than
+    the refresh interval, and concurrent callers share a single rebuild. Member count
+    changes are patched into the snapshot without a rebuild.
+    """
+
+    def __init__(self, refresh_seconds: float = CATALOG_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._snapshot: Optional[ClubCatalogSnapshot] = None
+        self._stale = True
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """Marks the current snapshot stale; the next read rebuilds it."""
+        self._stale = True
+
+    def adjust_member_count(self, club_id: str, delta: int) -> None:
+        """Applies a join (+1) or leave (-1) to the served snapshot."""
+        patched = None
+        # A rebuild in flight may or may not have read the change; it can't be patched safely.
+        if self._snapshot is not None and not self._lock.locked():
+            patched = self._snapshot.with_member_count(club_id, delta)
+        if patched is None:
+            self.invalidate()
+        else:
+            self._snapshot = patched
+
+    def _needs_rebuild(self) -> bool:
+        return (
+            self._snapshot is None
+            or self._stale
+            or time.monotonic() - self._snapshot.built_at > self.refresh_seconds
+        )
+
+    async def get_snapshot(self, db: AsyncClient) -> ClubCatalogSnapshot:
+        if not self._needs_rebuild():
+            return self._snapshot
+        async with self._lock:
+            if self._needs_rebuild():
+                await self.refresh(db)
+        return self._snapshot
+
+    def current_version(self) -> Optional[str]:
+        """Content hash of the snapshot get_snapshot() would serve right now, or None if it would rebuild."""
+        if self._needs_rebuild():
+            return None
+        return self._snapshot.version
+
+    async def refresh(self, db: AsyncClient) -> ClubCatalogSnapshot:
+        # Clear the flag first so an invalidation during the read triggers another rebuild.
+        self._stale = False
+        member_totals = await member_counter.get_all_totals(db) if member_counter.enabled else {}
+        payloads = []
+        async for club_doc in db.collection("clubs").stream():
+            club_data = club_doc.to_dict() or {}
+            club_data["clubId"] = club_doc.id
+            if club_doc.id in member_totals:
+                club_data["memberCount"] = member_totals[club_doc.id]
+            payloads.append(club_data)
+        # Malformed clubs are logged and left out of the catalog.
+        self._snapshot = ClubCatalogSnapshot(validate_club_payloads(payloads))
+        return self._snapshot
+
+    async def refresh_periodically(self, db: AsyncClient) -> None:
+        """Background task that keeps the snapshot warm so requests rarely rebuild it."""
+        while True:
+            try:
+                if self._needs_rebuild():
+                    async with self._lock:
+                        await self.refresh(db)
+            except Exception as e:
+                log.exception("club_catalog.refresh_failed", error=str(e))
+            await asyncio.sleep(self.refresh_seconds / 2)
+
+
+club_catalog = ClubCatalog()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against `etag`, as RFC 9110 requires."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare_etag = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == bare_etag
+        for candidate in if_none_match.split(",")
+    )
@@ -0,0 +1,289 @@
+# File: backend/src/services/club_propagation.py
+# Keeps the club fields copied onto `events` and `clubPosts` documents in step with `clubs`.
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+
+from services.club_cache import CachedClub, club_cache
+from services.rate_limit import BucketLimit, MemoryRateLimitBackend
+from services.structured_log import get_logger
+from services.worker_lease import LeaseLost, WorkerLease
+
+# For each collection holding copies: {copied field: club document field}.
+DENORMALIZED_FIELDS: Dict[str, Dict[str, str]] = {
+    "events": {"clubName": "name", "clubLogo": "logoURL"},
+    "clubPosts": {"clubName": "name", "clubAvatar": "logoURL"},
+}
+# Club document fields that are copied; changes to anything else (e.g. memberCount) cost nothing.
+SOURCE_FIELDS = tuple(sorted({source for fields in DENORMALIZED_FIELDS.values() for source in fields.values()}))
+# One progress document per club, so an interrupted rewrite resumes where it stopped.
+JOBS_COLLECTION = "propagationJobs"
+# Documents read per page; each page's writes and its progress update share one batch (max 500 writes).
+PROPAGATION_PAGE_SIZE = 400
+# Budget for rewritten documents, so a popular club's rename doesn't crowd out request traffic.
+PROPAGATION_WRITES_PER_SECOND = float(os.getenv("PROPAGATION_WRITES_PER_SECOND", "200"))
+# Only the worker holding this lease propagates; the others check back this often.
+PROPAGATION_LEASE = "club-propagation"
+PROPAGATION_LEASE_CHECK_SECONDS = 5
+
+log = get_logger("club_propagation")
+
+
+def club_projection(data: Dict[str, Any]) -> Dict[str, Any]:
+    """The copied fields of a club document, e.g. {"logoURL": ..., "name": ...}."""
+    return {source: data.get(source) for source in SOURCE_FIELDS}
+
+
+def copied_fields(collection: str, projection: Dict[str, Any]) -> Dict[str, Any]:
+    """What a document in `collection` should hold for a club with `projection`."""
+    return {copied: projection.get(source) for copied, source in DENORMALIZED_FIELDS[collection].items()}
+
+
+def _holds(data: Dict[str, Any], expected: Dict[str, Any]) -> bool:
+    return all(data.get(name) == value for name, value in expected.items())
+
+
+@dataclass
+class PropagationJob:
+    """Progress of rewriting one club's copies, as stored in `propagationJobs/{clubId}`."""
+    club_id: str
+    values: Dict[str, Any]
+    cursors: Dict[str, str] = field(default_factory=dict)  # collection -> last document ID done
+    finished: List[str] = field(default_factory=list)  # collections done
+    scanned: int = 0
+    updated: int = 0
+    complete: bool = False
+
+    def to_firestore(self) -> Dict[str, Any]:
+        return {
+            "values": self.values,
+            "cursors": self.cursors,
+            "finished": self.finished,
+            "scanned": self.scanned,
+            "updated": self.updated,
+            "complete": self.complete,
+        }
+
+    @classmethod
+    def from_firestore(cls, club_id: str, data: Dict[str, Any]) -> "PropagationJob":
+        return cls(
+            club_id=club_id,
+            values=data.get("values") or {},
+            cursors=data.get("cursors") or {},
+            finished=data.get("finished") or [],
+            scanned=data.get("scanned") or 0,
+            updated=data.get("updated") or 0,
+            complete=bool(data.get("complete")),
+        )
+
+
+class ClubFieldPropagator:
+    """
+    Background worker that rewrites `clubName`/`clubLogo`/`clubAvatar` on a club's events and
+    posts when the club's name or logo changes, so feeds keep reading them off the documents.
+
+    Club changes arrive through the `clubs` listener in club_cache. A club whose copied fields
+    match its last completed job is skipped, so a change costs reads and writes only for that
+    club's documents (paged by clubId), and only documents whose copies differ are written.
+    Each page's writes are committed together with the job's cursor, so a restarted worker
+    resumes exactly where it stopped. Writes draw from a token bucket.
+
+    Every worker runs one, but only the holder of the `club-propagation` lease does any
+    work, so a change is rewritten once, one worker writes the cursors and the budget is
+    for the whole deployment. The others queue changes and take over if the holder stops.
+    """
+
+    def __init__(
+        self,
+        page_size: int = PROPAGATION_PAGE_SIZE,
+        writes_per_second: float = PROPAGATION_WRITES_PER_SECOND,
+    ):
+        self.page_size = page_size
+        self.write_budget = BucketLimit(writes_per_second, max(writes_per_second, page_size))
+        self.jobs: Dict[str, PropagationJob] = {}
+        self.jobs_completed = 0
+        self.documents_scanned = 0
+        self.documents_updated = 0
+        self._limiter = MemoryRateLimitBackend()
+        self.lease = WorkerLease(PROPAGATION_LEASE)
+        # Latest projection per club waiting to be propagated; newer changes replace older ones.
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._jobs_loaded = False
+
+    # --- Change intake ---
+    def on_club_changes(self, updates: List[Tuple[str, Optional[CachedClub]]], initial: bool = False) -> None:
+        """club_cache subscriber: queues clubs whose copied fields differ from the last propagated ones."""
+        for club_id, entry in updates:
+            if entry is None:
+                continue  # Deleted club: its events and posts keep the last copies
+            projection = club_projection(entry.data)
+            if self._propagated(club_id, projection):
+                self._pending.pop(club_id, None)
+            else:
+                self._pending[club_id] = projection
+        if self._pending and self._jobs_loaded:
+            self._wake.set()
+
+    def _propagated(self, club_id: str, projection: Dict[str, Any]) -> bool:
+        job = self.jobs.get(club_id)
+        return job is not None and job.complete and job.values == projection
+
+    async def _load_jobs(self, db: AsyncClient) -> None:
+        jobs = {}
+        async for snapshot in db.collection(JOBS_COLLECTION).stream():
+            jobs[snapshot.id] = PropagationJob.from_firestore(snapshot.id, snapshot.to_dict() or {})
+        self.jobs = jobs
+        self._jobs_loaded = True
+        # Drop what the previous lease holder already propagated.
+        self._pending = {
+            club_id: projection for club_id, projection in self._pending.items()
+            if not self._propagated(club_id, projection)
+        }
+
+    # --- Rewriting ---
+    async def _take_write_budget(self, writes: int) -> None:
+        while True:
+            retry_after = await self._limiter.consume([("propagation", self.write_budget)], writes)
+            if not retry_after:
+                return
+            await asyncio.sleep(retry_after)
+
+    async def _propagate_collection(self, db: AsyncClient, job: PropagationJob, collection: str) -> bool:
+        """
+        Pages through one collection's documents for the club. Returns False if the club changed
+        again meanwhile, in which case the job is abandoned and restarted with the new values.
+        """
+        from google.cloud.firestore_v1.base_query import FieldFilter
+        from google.cloud.firestore_v1.field_path import FieldPath
+
+        expected = copied_fields(collection, job.values)
+        job_ref = db.collection(JOBS_COLLECTION).document(job.club_id)
+        while True:
+            query = (
+                db.collection(collection)
+                .where(filter=FieldFilter("clubId", "==", job.club_id))
+                .order_by(FieldPath.document_id())
+                .limit(self.page_size)
+            )
+            cursor = job.cursors.get(collection)
+            if cursor:
+                query = query.start_after({FieldPath.document_id(): cursor})
+            page = [snapshot async for snapshot in query.stream()]
+            stale = [snapshot for snapshot in page if not _holds(snapshot.to_dict() or {}, expected)]
+            if stale:
+                await self._take_write_budget(len(stale))
+            newer = self._pending.get(job.club_id)
+            if newer is not None:
+                if newer != job.values:
+                    return False
+                del self._pending[job.club_id]  # An unrelated field changed; carry on
+            job.scanned += len(page)
+            job.updated += len(stale)
+            if page:
+                job.cursors[collection] = page[-1].id
+            if len(page) < self.page_size:
+                job.finished.append(collection)
+            if not self.lease.held:
+                raise LeaseLost(self.lease.name)
+            batch = db.batch()
+            for snapshot in stale:
+                batch.update(snapshot.reference, expected)
+            batch.set(job_ref, job.to_firestore())
+            await batch.commit()
+            self.documents_scanned += len(page)
+            self.documents_updated += len(stale)
+            if len(page) < self.page_size:
+                return True
+            log.info(
+                "propagation.progress", club_id=job.club_id, collection=collection,
+                scanned=job.scanned, updated=job.updated,
+            )
+
+    async def propagate(self, db: AsyncClient, club_id: str, projection: Dict[str, Any]) -> Optional[PropagationJob]:
+        """Runs (or resumes) the job for one club; returns it, or None if it was superseded."""
+        job = self.jobs.get(club_id)
+        if job is None or job.values != projection or job.complete:
+            job = PropagationJob(club_id=club_id, values=projection)
+            self.jobs[club_id] = job
+        started = time.perf_counter()
+        for collection in DENORMALIZED_FIELDS:
+            if collection in job.finished:
+                continue
+            if not await self._propagate_collection(db, job, collection):
+                log.info("propagation.superseded", club_id=club_id, scanned=job.scanned, updated=job.updated)
+                return None
+        job.complete = True
+        if not self.lease.held:
+            raise LeaseLost(self.lease.name)
+        await db.collection(JOBS_COLLECTION).document(club_id).set(job.to_firestore())
+        self.jobs_completed += 1
+        log.info(
+            "propagation.complete", club_id=club_id, scanned=job.scanned, updated=job.updated,
+            seconds=round(time.perf_counter() - started, 3),
+        )
+        return job
+
+    async def run(self, db: AsyncClient) -> None:
+        """
+        Background worker: subscribes to club changes, and while it holds the lease loads job
+        progress and works through them.
+        """
+        self._wake = asyncio.Event()
+        # Subscribe first so the listener's initial snapshot of every club isn't missed;
+        # changes queued before the jobs are loaded are checked against them then.
+        club_cache.subscribe(self.on_club_changes)
+        keeper = asyncio.create_task(self.lease.keep(db))
+        try:
+            while True:
+                if not self.lease.held:
+                    self._jobs_loaded = False  # The holder moves jobs on; reload them on taking over
+                    await asyncio.sleep(PROPAGATION_LEASE_CHECK_SECONDS)
+                    continue
+                if not self._jobs_loaded:
+                    try:
+                        await self._load_jobs(db)
+                    except Exception as e:
+                        log.exception("propagation.load_jobs_failed", error=str(e))
+                        await asyncio.sleep(30)
+                        continue
+                if not self._pending:
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=PROPAGATION_LEASE_CHECK_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wake.clear()
+                    continue
+                club_id = next(iter(self._pending))
+                projection = self._pending.pop(club_id)
+                try:
+                    await self.propagate(db, club_id, projection)
+                except LeaseLost:
+                    log.info("propagation.lease_lost", club_id=club_id)
+                    self._pending.setdefault(club_id, projection)
+                except Exception as e:
+                    log.exception("propagation.failed", club_id=club_id, error=str(e))
+                    # Keep the job's progress and retry later unless a newer change replaced it.
+                    self._pending.setdefault(club_id, projection)
+                    await asyncio.sleep(30)
+        finally:
+            keeper.cancel()
+            await asyncio.wait([keeper])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "jobs_completed": self.jobs_completed,
+            "documents_scanned": self.documents_scanned,
+            "documents_updated": self.documents_updated,
+        }
+
+
+club_propagator = ClubFieldPropagator()
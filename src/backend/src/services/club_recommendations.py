@@ -0,0 +1,179 @@
+# File: backend/src/services/club_recommendations.py
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# NumPy/SciPy are imported where they're used, so importing the app stays cheap.
+if TYPE_CHECKING:
+    import numpy as np
+    from google.cloud.firestore_v1.async_client import AsyncClient
+from services.structured_log import get_logger
+
+# Neighbors kept per club.
+RECOMMENDATION_TOP_K = 50
+# How often the co-membership model is rebuilt from the `users` collection.
+RECOMMENDATION_REFRESH_SECONDS = 60 * 60
+# Pairs of clubs sharing fewer members than this are not considered similar.
+MIN_SHARED_MEMBERS = 2
+USERS_PAGE_SIZE = 1000
+
+log = get_logger("club_recommendations")
+
+
+class ClubNeighbors:
+    """
+    Item-item similarity model: for each club row, its top-K most similar clubs.
+    `neighbors` and `similarities` are (clubs x K) int32/float32 arrays; rows with
+    fewer than K neighbors are padded with the club's own row and similarity 0, which
+    scoring zeroes out anyway, so no masking is needed per request.
+    """
+
+    def __init__(
+        self,
+        club_ids: List[str],
+        neighbors: "np.ndarray",
+        similarities: "np.ndarray",
+        popularity: "np.ndarray",
+    ):
+        self.club_ids = club_ids
+        self.rows: Dict[str, int] = {club_id: row for row, club_id in enumerate(club_ids)}
+        self.neighbors = neighbors
+        self.similarities = similarities
+        self.popularity = popularity  # Members per club
+        # Users with nothing joined yet get the most popular clubs; rank them once.
+        self.most_popular = [club_ids[row] for row in popularity.argsort(kind="stable")[::-1]]
+        self.built_at = time.time()
+
+    def recommend(self, joined_club_ids: Iterable[str], limit: int = 10) -> List[Tuple[str, float]]:
+        """
+        Scores every club by the summed similarity to the clubs in `joined_club_ids` and
+        returns the best `limit` (clubId, score) pairs that aren't already joined.
+        Users without any known club get the most popular clubs instead.
+        """
+        import numpy as np
+
+        rows = [self.rows[club_id] for club_id in joined_club_ids if club_id in self.rows]
+        if not rows:
+            return [(club_id, float(self.popularity[self.rows[club_id]])) for club_id in self.most_popular[:limit]]
+        rows = np.asarray(rows)
+        scores = np.bincount(
+            self.neighbors.take(rows, axis=0).ravel(),
+            weights=self.similarities.take(rows, axis=0).ravel(),
+            minlength=len(self.club_ids),
+        )
+        scores[rows] = 0.0
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(scores[candidates], -limit)[-limit:]]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.club_ids[row], float(scores[row])) for row in ranked]
+
+
+def build_club_neighbors(
+    memberships: Iterable[Sequence[str]],
+    top_k: int = RECOMMENDATION_TOP_K,
+    min_shared_members: int = MIN_SHARED_MEMBERS,
+) -> ClubNeighbors:
+    """
+    Builds the model from each user's joined clubs.
+    Users become rows of a sparse binary user x club matrix X; XᵀX counts the members
+    every pair of clubs shares, and dividing by sqrt(|A| * |B|) gives their cosine similarity.
+    """
+    import numpy as np
+    from scipy import sparse
+
+    club_rows: Dict[str, int] = {}
+    indptr = [0]
+    indices: List[int] = []
+    for joined in memberships:
+        for club_id in dict.fromkeys(joined):
+            if isinstance(club_id, str) and club_id:
+                indices.append(club_rows.setdefault(club_id, len(club_rows)))
+        indptr.append(len(indices))
+    club_ids = list(club_rows)
+    club_count = len(club_ids)
+    top_k = max(0, min(top_k, club_count - 1))
+
+    users = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(indptr) - 1, club_count),
+    )
+    shared = (users.T @ users).tocsr()  # clubs x clubs, shared member counts
+    popularity = shared.diagonal().astype(np.int32)
+    shared.setdiag(0)
+    shared.data[shared.data < min_shared_members] = 0
+    shared.eliminate_zeros()
+    norms = np.sqrt(np.maximum(popularity, 1)).astype(np.float32)
+    # Scale entry (i, j) by 1 / (norm_i * norm_j) in place.
+    shared.data /= norms[np.repeat(np.arange(club_count), np.diff(shared.indptr))] * norms[shared.indices]
+
+    neighbors = np.repeat(np.arange(club_count, dtype=np.int32)[:, None], top_k, axis=1)
+    similarities = np.zeros((club_count, top_k), dtype=np.float32)
+    for row in range(club_count):
+        start, end = shared.indptr[row], shared.indptr[row + 1]
+        row_columns, row_values = shared.indices[start:end], shared.data[start:end]
+        if len(row_values) > top_k:
+            best = np.argpartition(row_values, -top_k)[-top_k:]
+            row_columns, row_values = row_columns[best], row_values[best]
+        order = np.argsort(-row_values, kind="stable")
+        neighbors[row, :len(order)] = row_columns[order]
+        similarities[row, :len(order)] = row_values[order]
+    return ClubNeighbors(club_ids, neighbors, similarities, popularity)
+
+
+async def fetch_memberships(db: AsyncClient) -> List[List[str]]:
+    """Every user's joinedClubs, read in pages with only that field selected."""
+    from google.cloud.firestore_v1.field_path import FieldPath
+
+    memberships: List[List[str]] = []
+    last_snapshot = None
+    while True:
+        query = (
+            db.collection("users")
+            .select(["joinedClubs"])
+            .order_by(FieldPath.document_id())
+            .limit(USERS_PAGE_SIZE)
+        )
+        if last_snapshot is not None:
+            query = query.start_after(last_snapshot)
+        page_count = 0
+        async for snapshot in query.stream():
+            page_count += 1
+            last_snapshot = snapshot
+            joined = (snapshot.to_dict() or {}).get("joinedClubs")
+            if joined:
+                memberships.append(joined)
+        if page_count < USERS_PAGE_SIZE:
+            return memberships
+
+
+class ClubRecommender:
+    """Holds the current ClubNeighbors model and rebuilds it periodically."""
+
+    def __init__(self, refresh_seconds: float = RECOMMENDATION_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.model: Optional[ClubNeighbors] = None
+
+    async def refresh(self, db: AsyncClient) -> ClubNeighbors:
+        started = time.perf_counter()
+        memberships = await fetch_memberships(db)
+        # The matrix work is NumPy/SciPy and releases the GIL for most of it.
+        self.model = await asyncio.to_thread(build_club_neighbors, memberships)
+        log.info(
+            "recommendations.built", users=len(memberships), clubs=len(self.model.club_ids),
+            seconds=round(time.perf_counter() - started, 2),
+        )
+        return self.model
+
+    async def refresh_periodically(self, db: AsyncClient) -> None:
+        while True:
+            try:
+                await self.refresh(db)
+            except Exception as e:
+                log.exception("recommendations.build_failed", error=str(e))
+            await asyncio.sleep(self.refresh_seconds)
+
+
+club_recommender = ClubRecommender()
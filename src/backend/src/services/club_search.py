@@ -0,0 +1,450 @@
+# File: backend/src/services/club_search.py
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import re
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from heapq import nlargest
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+
+from models.clubs import ClubResponse
+from services.club_catalog import ClubCatalogSnapshot, club_catalog
+from services.structured_log import get_logger
+
+# Where workers share the serialized index; loading it beats re-tokenizing every club.
+CLUB_SEARCH_SNAPSHOT = os.getenv(
+    "CLUB_SEARCH_SNAPSHOT", os.path.join(tempfile.gettempdir(), "slugscene-club-search.snapshot")
+)
+SNAPSHOT_FORMAT = 2
+SNAPSHOT_MAGIC = b"SSCS"
+# How often the index is brought in line with the club catalog.
+CLUB_SEARCH_SYNC_SECONDS = 30
+
+# A term in the name counts three times as much as one in the description.
+NAME_WEIGHT = 3.0
+CATEGORY_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+# BM25 parameters.
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Query-term expansion: the last term also matches as a prefix ("robo" -> "robotics"),
+# and unknown terms match vocabulary terms with similar trigrams ("robtics").
+MAX_PREFIX_EXPANSIONS = 30
+PREFIX_MATCH_WEIGHT = 0.9
+MAX_FUZZY_EXPANSIONS = 10
+FUZZY_MIN_TERM_LENGTH = 4
+FUZZY_MIN_SIMILARITY = 0.4
+FUZZY_MATCH_WEIGHT = 0.8
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from in is it of on or our the this to we with you your".split()
+)
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+log = get_logger("club_search")
+
+# (name, description, categories): everything the index reads from a club.
+_ClubText = Tuple[str, str, Tuple[str, ...]]
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def _trigrams(term: str) -> Set[str]:
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _club_text(club: ClubResponse) -> _ClubText:
+    return (club.name, club.description, tuple(club.category))
+
+
+def _weighted_terms(text: _ClubText) -> Dict[str, float]:
+    name, description, categories = text
+    weights: Dict[str, float] = {}
+    for tokens, weight in (
+        (tokenize(name), NAME_WEIGHT),
+        (tokenize(" ".join(categories)), CATEGORY_WEIGHT),
+        (tokenize(description), DESCRIPTION_WEIGHT),
+    ):
+        for token in tokens:
+            weights[token] = weights.get(token, 0.0) + weight
+    return weights
+
+
+class ClubSearchIndex:
+    """
+    Inverted index over club name, categories and description with BM25 ranking.
+    Each term's postings are two parallel arrays (document slots and weighted term
+    frequencies), which keeps 100k clubs in tens of megabytes. Clubs are added,
+    changed and removed one at a time; a removed club's slot is reused.
+    """
+
+    def __init__(self):
+        self._slots: Dict[str, int] = {}
+        self._club_ids: List[Optional[str]] = []
+        self._texts: List[Optional[_ClubText]] = []
+        self._lengths = array("f")
+        self._free_slots: List[int] = []
+        self._total_length = 0.0
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._trigram_terms: Dict[str, Set[str]] = {}
+        # Sorted vocabulary for prefix lookups; None after bulk changes until the next query.
+        self._sorted_terms: Optional[List[str]] = []
+        # Per-slot BM25 length normalization, rebuilt on the first query after a change.
+        self._norms: Optional[List[float]] = None
+        # Catalog base_version the index was last synced to.
+        self.version: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    # --- Updates ---
+    def upsert(self, club_id: str, text: _ClubText) -> bool:
+        """Indexes the club's text, replacing what was indexed for it before. Returns False if unchanged."""
+        slot = self._slots.get(club_id)
+        if slot is not None:
+            if self._texts[slot] == text:
+                return False
+            self._unindex(slot)
+        else:
+            if self._free_slots:
+                slot = self._free_slots.pop()
+            else:
+                slot = len(self._club_ids)
+                self._club_ids.append(None)
+                self._texts.append(None)
+                self._lengths.append(0.0)
+            self._slots[club_id] = slot
+            self._club_ids[slot] = club_id
+
+        weights = _weighted_terms(text)
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("I"), array("f"))
+                self._add_term(term)
+            postings[0].append(slot)
+            postings[1].append(weight)
+        length = sum(weights.values())
+        self._norms = None
+        self._texts[slot] = text
+        self._lengths[slot] = length
+        self._total_length += length
+        return True
+
+    def remove(self, club_id: str) -> bool:
+        slot = self._slots.pop(club_id, None)
+        if slot is None:
+            return False
+        self._unindex(slot)
+        self._club_ids[slot] = None
+        self._texts[slot] = None
+        self._free_slots.append(slot)
+        return True
+
+    def _unindex(self, slot: int) -> None:
+        for term in _weighted_terms(self._texts[slot]):
+            slots, weights = self._postings[term]
+            position = slots.index(slot)
+            # Postings are unordered, so the last entry can fill the hole.
+            slots[position], weights[position] = slots[-1], weights[-1]
+            slots.pop()
+            weights.pop()
+            if not slots:
+                del self._postings[term]
+                self._remove_term(term)
+        self._total_length -= self._lengths[slot]
+        self._lengths[slot] = 0.0
+        self._norms = None
+
+    def _add_term(self, term: str) -> None:
+        for gram in _trigrams(term):
+            self._trigram_terms.setdefault(gram, set()).add(term)
+        if self._sorted_terms is not None:
+            insort(self._sorted_terms, term)
+
+    def _remove_term(self, term: str) -> None:
+        for gram in _trigrams(term):
+            terms = self._trigram_terms.get(gram)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self._trigram_terms[gram]
+        if self._sorted_terms is not None:
+            position = bisect_left(self._sorted_terms, term)
+            if position < len(self._sorted_terms) and self._sorted_terms[position] == term:
+                del self._sorted_terms[position]
+
+    def sync(self, clubs: Iterable[ClubResponse], version: Optional[str] = None) -> int:
+        """
+        Brings the index in line with `clubs`: new and edited clubs are (re)indexed,
+        missing ones removed, unchanged ones left alone. Returns the number of changes.
+        """
+        clubs = list(clubs)
+        if len(clubs) > 1000 and abs(len(clubs) - len(self)) > len(clubs) // 10:
+            self._sorted_terms = None  # Cheaper to re-sort once than to insort thousands of terms
+        seen: Set[str] = set()
+        changes = 0
+        for club in clubs:
+            seen.add(club.clubId)
+            changes += self.upsert(club.clubId, _club_text(club))
+        for club_id in [club_id for club_id in self._slots if club_id not in seen]:
+            changes += self.remove(club_id)
+        self.version = version
+        return changes
+
+    # --- Queries ---
+    def _expansions(self, token: str, allow_prefix: bool) -> Dict[str, float]:
+        """Vocabulary terms `token` should match, with how much each match counts."""
+        expansions: Dict[str, float] = {}
+        if token in self._postings:
+            expansions[token] = 1.0
+        if allow_prefix:
+            if self._sorted_terms is None:
+                self._sorted_terms = sorted(self._postings)
+            position = bisect_left(self._sorted_terms, token)
+            for term in self._sorted_terms[position:position + MAX_PREFIX_EXPANSIONS + 1]:
+                if not term.startswith(token):
+                    break
+                expansions.setdefault(term, PREFIX_MATCH_WEIGHT)
+        if not expansions and len(token) >= FUZZY_MIN_TERM_LENGTH:
+            grams = _trigrams(token)
+            shared: Counter = Counter()
+            for gram in grams:
+                shared.update(self._trigram_terms.get(gram, ()))
+            candidates = []
+            for term, common in shared.items():
+                # Jaccard similarity; a padded term of n letters has (at most) n trigrams.
+                similarity = common / (len(grams) + len(term) - common)
+                if similarity >= FUZZY_MIN_SIMILARITY:
+                    candidates.append((similarity, term))
+            for similarity, term in nlargest(MAX_FUZZY_EXPANSIONS, candidates):
+                expansions[term] = FUZZY_MATCH_WEIGHT * similarity
+        return expansions
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """
+        Returns up to `limit` (clubId, score) pairs, best first. Clubs matching more of
+        the query's terms rank above clubs matching fewer, then by BM25 score.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self._slots:
+            return []
+        club_count = len(self._slots)
+        norms = self._norms
+        if norms is None:
+            average_length = self._total_length / club_count or 1.0
+            norms = self._norms = [
+                BM25_K1 * (1 - BM25_B + BM25_B * length / average_length) for length in self._lengths
+            ]
+        # The last term may still be being typed.
+        prefix_token = tokens[-1] if not query[-1:].isspace() else None
+
+        scores: Dict[int, float] = {}
+        matched: Dict[int, int] = {}
+        for position, token in enumerate(tokens):
+            # A club's score for the token is that of its best-matching expansion.
+            best: Dict[int, float] = {}
+            for term, boost in self._expansions(token, token == prefix_token).items():
+                slots, weights = self._postings[term]
+                frequency = len(slots)
+                scale = math.log(1 + (club_count - frequency + 0.5) / (frequency + 0.5)) * boost * (BM25_K1 + 1)
+                term_scores = {slot: scale * weight / (weight + norms[slot]) for slot, weight in zip(slots, weights)}
+                if not best:
+                    best = term_scores
+                    continue
+                for slot, score in term_scores.items():
+                    if score > best.get(slot, 0.0):
+                        best[slot] = score
+            if position == 0:
+                scores = best
+                matched = dict.fromkeys(best, 1)
+                continue
+            for slot, score in best.items():
+                scores[slot] = scores.get(slot, 0.0) + score
+                matched[slot] = matched.get(slot, 0) + 1
+
+        if len(tokens) == 1:
+            top = nlargest(limit, scores, key=scores.__getitem__)
+        else:
+            # Rank one match count at a time, most query terms matched first.
+            top = []
+            for count in range(len(tokens), 0, -1):
+                candidates = [slot for slot, slot_count in matched.items() if slot_count == count]
+                top.extend(nlargest(limit - len(top), candidates, key=scores.__getitem__))
+                if len(top) == limit:
+                    break
+        return [(self._club_ids[slot], scores[slot]) for slot in top]
+
+    # --- Snapshots ---
+    def dumps(self) -> bytes:
+        """
+        The index as uncompressed snapshot bytes; compress them before writing.
+        A JSON header (club IDs, texts, terms and each term's posting count) followed by
+        the raw array bytes: lengths, then every term's slots, then every term's weights.
+        Nothing in it is executable, so loading a tampered file can't run code.
+        """
+        terms = list(self._postings)
+        header = json.dumps({
+            "format": SNAPSHOT_FORMAT,
+            "version": self.version,
+            "byteorder": sys.byteorder,
+            "club_ids": self._club_ids,
+            "texts": self._texts,
+            "terms": terms,
+            "counts": [len(self._postings[term][0]) for term in terms],
+        }, separators=(",", ":")).encode()
+        parts = [SNAPSHOT_MAGIC, struct.pack("<I", len(header)), header, self._lengths.tobytes()]
+        parts += [self._postings[term][0].tobytes() for term in terms]
+        parts += [self._postings[term][1].tobytes() for term in terms]
+        return b"".join(parts)
+
+    def loads(self, data: bytes) -> None:
+        """Replaces the index with a snapshot from dumps(); raises ValueError if it isn't a valid one."""
+        if not data.startswith(SNAPSHOT_MAGIC):
+            raise ValueError("Not a club search snapshot")
+        body_start = len(SNAPSHOT_MAGIC) + 4
+        (header_length,) = struct.unpack_from("<I", data, len(SNAPSHOT_MAGIC))
+        try:
+            state = json.loads(data[body_start:body_start + header_length])
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError(f"Unreadable club search snapshot header: {e}") from e
+        if not isinstance(state, dict) or state.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported club search snapshot format: {state.get('format')}")
+
+        club_ids, texts, terms, counts = state["club_ids"], state["texts"], state["terms"], state["counts"]
+        lengths, slots, weights = array("f"), array("I"), array("f")
+        offset = body_start + header_length
+        for values, count in ((lengths, len(club_ids)), (slots, sum(counts)), (weights, sum(counts))):
+            size = count * values.itemsize
+            values.frombytes(data[offset:offset + size])
+            offset += size
+            if state["byteorder"] != sys.byteorder:
+                values.byteswap()
+        if offset != len(data) or len(texts) != len(club_ids) or len(terms) != len(counts):
+            raise ValueError("Truncated or inconsistent club search snapshot")
+        if slots and max(slots) >= len(club_ids):
+            raise ValueError("Club search snapshot refers to a club it doesn't hold")
+
+        postings: Dict[str, Tuple[array, array]] = {}
+        first = 0
+        for term, count in zip(terms, counts):
+            postings[term] = (slots[first:first + count], weights[first:first + count])
+            first += count
+        trigram_terms: Dict[str, Set[str]] = {}
+        for term in postings:
+            for gram in _trigrams(term):
+                trigram_terms.setdefault(gram, set()).add(term)
+
+        self._club_ids = club_ids
+        # JSON has no tuples; upsert() compares texts as tuples.
+        self._texts = [
+            None if text is None else (text[0], text[1], tuple(text[2])) for text in texts
+        ]
+        self._slots = {club_id: slot for slot, club_id in enumerate(club_ids) if club_id is not None}
+        self._free_slots = [slot for slot, club_id in enumerate(club_ids) if club_id is None]
+        self._lengths = lengths
+        self._total_length = sum(lengths)
+        self._postings = postings
+        self._trigram_terms = trigram_terms
+        self._sorted_terms = None
+        self._norms = None
+        self.version = state["version"]
+
+
+class ClubSearch:
+    """
+    The process-wide search index, kept in line with the club catalog and shared
+    between workers through an on-disk snapshot.
+    """
+
+    def __init__(self, snapshot_path: Optional[str] = CLUB_SEARCH_SNAPSHOT):
+        self.snapshot_path = snapshot_path
+        self.index = ClubSearchIndex()
+
+    def sync(self, snapshot: ClubCatalogSnapshot) -> int:
+        # base_version ignores patched member counts, which the index doesn't hold.
+        if self.index.version == snapshot.base_version:
+            return 0
+        return self.index.sync(snapshot.clubs, snapshot.base_version)
+
+    def search(self, snapshot: ClubCatalogSnapshot, query: str, limit: int = 20) -> List[ClubResponse]:
+        """Ranked clubs for `query`, taken from `snapshot` so member counts are current."""
+        self.sync(snapshot)
+        clubs = []
+        for club_id, _score in self.index.search(query, limit):
+            club = snapshot.get(club_id)
+            if club is not None:
+                clubs.append(club)
+        return clubs
+
+    async def load_snapshot(self) -> bool:
+        """Replaces the index with the on-disk snapshot, if there is a usable one."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+
+        def read() -> ClubSearchIndex:
+            with open(self.snapshot_path, "rb") as f:
+                # The default path is in the shared temp dir; only trust a file this user wrote.
+                stat = os.fstat(f.fileno())
+                if hasattr(os, "getuid") and (stat.st_uid != os.getuid() or stat.st_mode & 0o022):
+                    raise ValueError("snapshot is not owned by this user, or others can write to it")
+                index = ClubSearchIndex()
+                index.loads(zlib.decompress(f.read()))
+                return index
+
+        try:
+            started = time.perf_counter()
+            index = await asyncio.to_thread(read)
+        except Exception as e:
+            log.warning("club_search.snapshot_unreadable", path=self.snapshot_path, error=str(e))
+            return False
+        if len(self.index) == 0:  # Only if nothing has been indexed in the meantime
+            self.index = index
+            log.info(
+                "club_search.snapshot_loaded", clubs=len(index), seconds=round(time.perf_counter() - started, 2)
+            )
+        return True
+
+    async def save_snapshot(self) -> None:
+        if not self.snapshot_path:
+            return
+        data = self.index.dumps()  # On the loop, so no update can interleave
+
+        def write() -> None:
+            temporary = f"{self.snapshot_path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as f:
+                f.write(zlib.compress(data, 6))
+            os.replace(temporary, self.snapshot_path)  # Readers never see a partial file
+
+        await asyncio.to_thread(write)
+
+    async def sync_periodically(self, db: AsyncClient) -> None:
+        """Background task: loads the snapshot, then follows the catalog and re-saves after changes."""
+        await self.load_snapshot()
+        while True:
+            try:
+                snapshot = await club_catalog.get_snapshot(db)
+                if self.sync(snapshot):
+                    await self.save_snapshot()
+            except Exception as e:
+                log.exception("club_search.sync_failed", error=str(e))
+            await asyncio.sleep(CLUB_SEARCH_SYNC_SECONDS)
+
+
+club_search = ClubSearch()
@@ -0,0 +1,255 @@
+# File: backend/src/services/collection_watch.py
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+
+from CRUD.posts import POST_TIME_FIELD
+from services import firebase_service
+from services.structured_log import get_logger
+
+# How often the listener's health is checked (and a dead listener restarted).
+WATCH_CHECK_SECONDS = 30
+# Time-scoped watches move their cutoff forward this often.
+WATCH_RESCOPE_SECONDS = 6 * 60 * 60
+# Events that ended longer ago than this aren't watched; older calendar months are read on demand.
+EVENT_WATCH_HISTORY = timedelta(days=int(os.getenv("EVENT_WATCH_HISTORY_DAYS", "31")))
+# Posts older than this aren't watched, so likes on them aren't streamed live.
+POST_WATCH_HISTORY = timedelta(days=int(os.getenv("POST_WATCH_HISTORY_DAYS", "7")))
+
+# (document ID, document data, or None if it was deleted)
+DocumentChange = Tuple[str, Optional[Dict[str, Any]]]
+ChangeCallback = Callable[[List[Tuple[str, Any]], bool], None]
+# Turns a batch of DocumentChanges into what subscribers receive, one (document ID, value) each.
+ParseChanges = Callable[[List[DocumentChange]], List[Tuple[str, Any]]]
+
+log = get_logger("collection_watch")
+
+
+class _Listener(NamedTuple):
+    listener_id: int
+    watch: Any
+    since: Optional[datetime]
+    started_at: float
+
+
+class CollectionWatch:
+    """
+    One Firestore `on_snapshot` listener on a collection, shared by every subscriber in the process.
+    Subscribers are called on the event loop with `(changes, initial)`; `initial` is True for the
+    first callback after the listener (re)starts, which carries every document in scope.
+    `parse`, if given, runs on the listener's thread (off the event loop) and replaces each
+    change's data with whatever subscribers should get.
+
+    With `time_field` and `history`, only documents whose time_field is within `history` of
+    now are watched, so a worker holds recent documents rather than the whole collection.
+    A listener's cutoff is fixed when it starts, so every `rescope_seconds` a second listener
+    is started with a later cutoff and takes over once its first snapshot arrives. That
+    switch isn't an initial snapshot: documents changed in between are passed on as
+    ordinary changes, and ones now behind the cutoff go to `subscribe_dropped` callbacks,
+    not reported as deleted. A document *edited* to fall behind the cutoff leaves the query
+    and is reported as deleted, since the listener can't tell the two apart.
+    """
+
+    def __init__(
+        self,
+        collection: str,
+        parse: Optional[ParseChanges] = None,
+        time_field: Optional[str] = None,
+        history: Optional[timedelta] = None,
+        rescope_seconds: float = WATCH_RESCOPE_SECONDS,
+    ):
+        self.collection = collection
+        self.time_field = time_field
+        self.history = history
+        self.rescope_seconds = rescope_seconds
+        self.listening = False
+        self.changes_seen = 0
+        self._parse = parse
+        self._subscribers: List[ChangeCallback] = []
+        self._stop_callbacks: List[Callable[[], None]] = []
+        self._drop_callbacks: List[Callable[[List[str]], None]] = []
+        self._active: Optional[_Listener] = None
+        # A listener with a later cutoff, waiting for its first snapshot to take over.
+        self._standby: Optional[_Listener] = None
+        self._next_listener_id = 0
+        # Last update_time passed on per document in scope, to skip repeats across a switch.
+        self._versions: Dict[str, Any] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def since(self) -> Optional[datetime]:
+        """The active listener's cutoff: documents before it aren't watched (None = unscoped or not running)."""
+        return self._active.since if self._active is not None else None
+
+    def subscribe(self, callback: ChangeCallback) -> None:
+        self._subscribers.append(callback)
+
+    def subscribe_stopped(self, callback: Callable[[], None]) -> None:
+        """Calls `callback()` when a listener that had been delivering stops; changes are missed until it's back."""
+        self._stop_callbacks.append(callback)
+
+    def subscribe_dropped(self, callback: Callable[[List[str]], None]) -> None:
+        """Calls `callback(document_ids)` for documents that fell behind the cutoff when it moved forward."""
+        self._drop_callbacks.append(callback)
+
+    # --- Listener thread ---
+    def _on_snapshot(self, listener_id: int, _docs, changes, _read_time) -> None:
+        # Runs on the listener's thread; hand the changes to the event loop.
+        updates: List[Tuple[str, Any]] = []
+        versions: List[Any] = []
+        for change in changes:
+            removed = change.type.name == "REMOVED"
+            updates.append((change.document.id, None if removed else change.document.to_dict() or {}))
+            versions.append(None if removed else getattr(change.document, "update_time", None))
+        if self._parse is not None:
+            updates = self._parse(updates)
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._apply_updates, listener_id, updates, versions)
+
+    # --- Event loop ---
+    def _apply_updates(self, listener_id: int, updates: List[Tuple[str, Any]], versions: List[Any]) -> None:
+        if self._standby is not None and listener_id == self._standby.listener_id:
+            self._take_over(updates, versions)
+            return
+        if self._active is None or listener_id != self._active.listener_id:
+            return  # A listener that has since been replaced
+        initial = not self.listening
+        self.listening = True
+        if initial:
+            self._versions.clear()
+        fresh = []
+        for (doc_id, value), version in zip(updates, versions):
+            if version is None:
+                self._versions.pop(doc_id, None)
+            elif not initial and self._versions.get(doc_id) == version:
+                continue  # Already passed on from the previous listener
+            else:
+                self._versions[doc_id] = version
+            fresh.append((doc_id, value))
+        if fresh or initial:
+            self._notify(fresh, initial)
+
+    def _take_over(self, updates: List[Tuple[str, Any]], versions: List[Any]) -> None:
+        """The standby listener's first snapshot: make it the active one without a reset."""
+        previous, self._active, self._standby = self._active, self._standby, None
+        known, self._versions = self._versions, {}
+        fresh = []
+        for (doc_id, value), version in zip(updates, versions):
+            seen = known.pop(doc_id, None)
+            if seen is not None and version is not None and version <= seen:
+                self._versions[doc_id] = seen  # The old listener got here first (or at the same time)
+                continue
+            self._versions[doc_id] = version
+            fresh.append((doc_id, value))
+        self._unsubscribe(previous)
+        log.info(
+            "watch.rescoped", collection=self.collection, since=self.since,
+            changed=len(fresh), dropped=len(known),
+        )
+        if known:
+            dropped = list(known)
+            for callback in self._drop_callbacks:
+                try:
+                    callback(dropped)
+                except Exception as e:
+                    log.exception("watch.drop_callback_failed", collection=self.collection, error=str(e))
+        if fresh:
+            self._notify(fresh, False)
+
+    def _notify(self, updates: List[Tuple[str, Any]], initial: bool) -> None:
+        self.changes_seen += len(updates)
+        for callback in self._subscribers:
+            try:
+                callback(updates, initial)
+            except Exception as e:
+                log.exception("watch.subscriber_failed", collection=self.collection, error=str(e))
+
+    # --- Listener lifecycle ---
+    def _cutoff(self) -> Optional[datetime]:
+        if self.time_field is None or self.history is None:
+            return None
+        return datetime.now(timezone.utc) - self.history
+
+    def _start_listener(self, db: AsyncClient, listener_id: int, since: Optional[datetime]) -> Any:
+        """Blocking: opens the watch through the process's synchronous listener client."""
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        query = firebase_service.listener_client(db.project).collection(self.collection)
+        if since is not None:
+            query = query.where(filter=FieldFilter(self.time_field, ">=", since))
+        return query.on_snapshot(partial(self._on_snapshot, listener_id))
+
+    async def _open(self, db: AsyncClient) -> _Listener:
+        self._next_listener_id += 1
+        listener_id, since = self._next_listener_id, self._cutoff()
+        watch = await asyncio.to_thread(self._start_listener, db, listener_id, since)
+        return _Listener(listener_id, watch, since, time.monotonic())
+
+    def _unsubscribe(self, listener: Optional[_Listener]) -> None:
+        if listener is None:
+            return
+        try:
+            listener.watch.unsubscribe()
+        except Exception as e:
+            log.warning("watch.stop_failed", collection=self.collection, error=str(e))
+
+    def _listener_alive(self) -> bool:
+        return self._active is not None and self._active.watch.is_active
+
+    def _rescope_due(self) -> bool:
+        return (
+            self.time_field is not None
+            and self.listening
+            and time.monotonic() - self._active.started_at > self.rescope_seconds
+        )
+
+    def stop_listener(self) -> None:
+        active, standby, self._active, self._standby = self._active, self._standby, None, None
+        was_listening, self.listening = self.listening, False
+        self._unsubscribe(active)
+        self._unsubscribe(standby)
+        if was_listening:
+            for callback in self._stop_callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    log.exception("watch.stop_callback_failed", collection=self.collection, error=str(e))
+
+    async def run(self, db: AsyncClient, check_seconds: float = WATCH_CHECK_SECONDS) -> None:
+        """Background task that keeps the listener running (and, if scoped, its cutoff current)."""
+        self._loop = asyncio.get_running_loop()
+        try:
+            while True:
+                if not self._listener_alive():
+                    if self.listening:
+                        log.warning("watch.listener_stopped", collection=self.collection)
+                    self.stop_listener()
+                    try:
+                        self._active = await self._open(db)
+                    except Exception as e:
+                        log.warning("watch.start_failed", collection=self.collection, error=str(e))
+                elif self._standby is not None:
+                    # No first snapshot within a whole check interval: give up and try again later.
+                    if time.monotonic() - self._standby.started_at > check_seconds:
+                        standby, self._standby = self._standby, None
+                        self._unsubscribe(standby)
+                elif self._rescope_due():
+                    try:
+                        self._standby = await self._open(db)
+                    except Exception as e:
+                        log.warning("watch.rescope_failed", collection=self.collection, error=str(e))
+                await asyncio.sleep(check_seconds)
+        finally:
+            self.stop_listener()
+
+
+events_watch = CollectionWatch("events", time_field="endTime", history=EVENT_WATCH_HISTORY)
+posts_watch = CollectionWatch("clubPosts", time_field=POST_TIME_FIELD, history=POST_WATCH_HISTORY)
@@ -0,0 +1,195 @@
+# File: backend/src/services/event_calendar.py
+from __future__ import annotations
+
+import os
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from cachetools import TTLCache
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+
+from CRUD.events import event_from_firestore, get_events_starting_between
+from models.event import CalendarDay, CalendarMonth, Event
+from services.collection_watch import DocumentChange, events_watch
+from services.single_flight import SingleFlight
+
+# Day boundaries are drawn in the campus time zone, not UTC.
+CAMPUS_TIMEZONE = ZoneInfo(os.getenv("CAMPUS_TIMEZONE", "America/Los_Angeles"))
+# Guards against a bad endTime spraying one event across years of buckets.
+MAX_EVENT_SPAN_DAYS = 62
+# Months read from Firestore on demand (older than the events listener's window, or while
+# it isn't delivering) are cached this long.
+EVENT_CALENDAR_MONTH_TTL_SECONDS = 300
+MAX_CACHED_MONTHS = 120
+
+_Bucket = Tuple[str, date]  # (YYYY-MM, local day)
+
+
+def month_key(day: date) -> str:
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+def month_bounds(month: str, tz: ZoneInfo = CAMPUS_TIMEZONE) -> Tuple[datetime, datetime]:
+    """Start and (exclusive) end of a YYYY-MM month in local time."""
+    year, number = int(month[:4]), int(month[5:7])
+    start = datetime(year, number, 1, tzinfo=tz)
+    end = datetime(year + number // 12, number % 12 + 1, 1, tzinfo=tz)
+    return start, end
+
+
+def local_days(event: Event, tz: ZoneInfo = CAMPUS_TIMEZONE) -> List[date]:
+    """Every local calendar day an event touches. An end exactly at midnight doesn't count the next day."""
+    first_day = event.startTime.astimezone(tz).date()
+    end = event.endTime
+    if end > event.startTime:
+        end -= timedelta(microseconds=1)
+    last_day = end.astimezone(tz).date()
+    span = min((last_day - first_day).days, MAX_EVENT_SPAN_DAYS - 1)
+    return [first_day + timedelta(days=offset) for offset in range(span + 1)]
+
+
+class EventCalendar:
+    """
+    Events pre-bucketed by month and local day.
+    Each upsert/remove only touches the buckets of the event being changed, so a
+    month view is a dictionary lookup rather than a pass over every event.
+    """
+
+    def __init__(self, tz: ZoneInfo = CAMPUS_TIMEZONE):
+        self.tz = tz
+        self._months: Dict[str, Dict[date, Dict[str, Event]]] = {}
+        self._events: Dict[str, Event] = {}
+        self._event_buckets: Dict[str, List[_Bucket]] = {}
+        # Bumped on every change to the buckets.
+        self.version = 0
+
+    def upsert(self, event: Event) -> None:
+        if self._events.get(event.eventId) == event:
+            return
+        self.remove(event.eventId)
+        self.version += 1
+        buckets = [(month_key(day), day) for day in local_days(event, self.tz)]
+        for month, day in buckets:
+            self._months.setdefault(month, {}).setdefault(day, {})[event.eventId] = event
+        self._events[event.eventId] = event
+        self._event_buckets[event.eventId] = buckets
+
+    def remove(self, event_id: str) -> None:
+        if self._events.pop(event_id, None) is not None:
+            self.version += 1
+        for month, day in self._event_buckets.pop(event_id, []):
+            days = self._months[month]
+            days[day].pop(event_id, None)
+            if not days[day]:
+                del days[day]
+            if not days:
+                del self._months[month]
+
+    def sync(self, events: Iterable[Event]) -> int:
+        """
+        Brings the calendar in line with a full listing of events (such as a listener's
+        initial snapshot), re-bucketing only the events that were added, changed or
+        deleted. Returns how many changed.
+        """
+        incoming = {event.eventId: event for event in events}
+        changed = 0
+        for event_id in list(self._events):
+            if event_id not in incoming:
+                self.remove(event_id)
+                changed += 1
+        for event in incoming.values():
+            if self._events.get(event.eventId) != event:
+                self.upsert(event)
+                changed += 1
+        return changed
+
+    def month(self, month: str) -> CalendarMonth:
+        days = self._months.get(month, {})
+        calendar_days = [
+            CalendarDay(
+                date=day,
+                count=len(day_events),
+                events=sorted(day_events.values(), key=lambda e: (e.startTime, e.eventId)),
+            )
+            for day, day_events in sorted(days.items())
+        ]
+        total = len({event_id for day_events in days.values() for event_id in day_events})
+        return CalendarMonth(month=month, timezone=str(self.tz), totalEvents=total, days=calendar_days)
+
+
+class EventCalendarFeed:
+    """
+    Process-wide EventCalendar kept current by the shared `events` listener, which watches
+    events that ended within its window: its first snapshot fills the buckets and later
+    changes re-bucket just the events that changed. A month that starts before that window
+    (or any month while the listener isn't delivering) is read from Firestore on demand
+    with a range query on startTime and cached briefly.
+    """
+
+    def __init__(self, month_ttl_seconds: float = EVENT_CALENDAR_MONTH_TTL_SECONDS):
+        self.calendar = EventCalendar()
+        self.listening = False
+        self._months: TTLCache = TTLCache(maxsize=MAX_CACHED_MONTHS, ttl=month_ttl_seconds)
+        self._flights = SingleFlight()
+
+    def _is_live(self, month: str) -> bool:
+        since = events_watch.since
+        if not self.listening or since is None:
+            return False
+        return month_bounds(month, self.calendar.tz)[0] >= since
+
+    async def get_month(self, db: AsyncClient, month: str) -> CalendarMonth:
+        if self._is_live(month):
+            return self.calendar.month(month)
+        cached = self._months.get(month)
+        if cached is None:
+            cached = await self._flights.run(month, lambda: self._load_month(db, month))
+        return cached
+
+    async def _load_month(self, db: AsyncClient, month: str) -> CalendarMonth:
+        start, end = month_bounds(month, self.calendar.tz)
+        # Events that started up to MAX_EVENT_SPAN_DAYS earlier can still run into the month.
+        events = await get_events_starting_between(db, start - timedelta(days=MAX_EVENT_SPAN_DAYS), end)
+        calendar = EventCalendar(self.calendar.tz)
+        calendar.sync(events)
+        self._months[month] = calendar.month(month)
+        return self._months[month]
+
+    def current_version(self, month: str) -> Optional[str]:
+        """Cheap stamp of what get_month() would serve right now, or None for months read on demand."""
+        if not self._is_live(month):
+            return None
+        return str(self.calendar.version)
+
+    def _on_event_changes(self, changes: List[DocumentChange], initial: bool) -> None:
+        events = ((event_id, event_from_firestore(event_id, data) if data is not None else None) for event_id, data in changes)
+        if initial:
+            self.listening = True
+            self.calendar.sync(event for _, event in events if event is not None)
+            return
+        for event_id, event in events:
+            if event is None:
+                self.calendar.remove(event_id)
+            else:
+                self.calendar.upsert(event)
+
+    def _on_events_dropped(self, event_ids: List[str]) -> None:
+        # Behind the listener's window now; their months are read on demand.
+        for event_id in event_ids:
+            self.calendar.remove(event_id)
+
+    def _on_listener_stopped(self) -> None:
+        self.listening = False
+
+    def subscribe(self) -> None:
+        """Subscribes to the shared `events` listener; call before it starts, so its initial snapshot is seen."""
+        events_watch.subscribe(self._on_event_changes)
+        events_watch.subscribe_dropped(self._on_events_dropped)
+        events_watch.subscribe_stopped(self._on_listener_stopped)
+
+
+event_calendar = EventCalendarFeed()
+
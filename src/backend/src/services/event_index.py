@@ -0,0 +1,302 @@
+# File: backend/src/services/event_index.py
+from __future__ import annotations
+
+import asyncio
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+
+from CRUD.events import event_from_firestore, get_events_ending_after
+from models.event import Event
+from services.collection_watch import DocumentChange, events_watch
+from services.structured_log import get_logger
+
+# Events that ended longer ago than this are dropped from the index (multi-day events stay while running).
+EVENT_RETENTION = timedelta(days=1)
+# How often the index is reloaded from Firestore while the events listener isn't delivering.
+EVENT_INDEX_REFRESH_SECONDS = 300
+# While it is, changes arrive through it and a reload is only a safety net.
+EVENT_INDEX_SAFETY_RELOAD_SECONDS = 3600
+
+# Sort key: (start timestamp, eventId) keeps ordering stable for equal start times.
+# Expiry uses the same shape with the end timestamp.
+_Key = Tuple[float, str]
+# (start timestamp, end timestamp, eventId), in start order like _Key.
+Interval = Tuple[float, float, str]
+
+log = get_logger("event_index")
+
+
+def _key(event: Event) -> _Key:
+    return (event.startTime.timestamp(), event.eventId)
+
+
+def _end_key(event: Event) -> _Key:
+    # A bad endTime before startTime is treated as a zero-length event.
+    return (max(event.startTime, event.endTime).timestamp(), event.eventId)
+
+
+class EventIndex:
+    """
+    In-memory index of events sorted by start time, with one sorted list per club.
+    Range lookups are binary searches; upserts and expiry only touch the affected entries,
+    and a club's cached interval list is only rebuilt when that club's event times change.
+    """
+
+    def __init__(self, events: Optional[List[Event]] = None):
+        self._events: Dict[str, Event] = {}
+        self._keys: List[_Key] = []
+        self._club_keys: Dict[str, List[_Key]] = {}
+        # Sorted by end, for expiry.
+        self._end_keys: List[_Key] = []
+        # Built on demand per club and dropped whenever that club's event times change.
+        self._club_intervals: Dict[str, List[Interval]] = {}
+        # Bumped on every change, so (index, version) identifies the current contents.
+        self.version = 0
+        # Bulk loads sort once instead of paying an insort per event.
+        for event in events or []:
+            self._events[event.eventId] = event
+        self._keys = sorted(_key(event) for event in self._events.values())
+        for key in self._keys:
+            self._club_keys.setdefault(self._events[key[1]].clubId, []).append(key)
+        self._end_keys = sorted(_end_key(event) for event in self._events.values())
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def get(self, event_id: str) -> Optional[Event]:
+        return self._events.get(event_id)
+
+    def upsert(self, event: Event) -> None:
+        current = self._events.get(event.eventId)
+        if current == event:
+            return
+        if (
+            current is not None
+            and current.clubId == event.clubId
+            and current.startTime == event.startTime
+            and current.endTime == event.endTime
+        ):
+            # Same slot (say, a new attendee count): the keys and interval lists still hold.
+            self.version += 1
+            self._events[event.eventId] = event
+            return
+        self.remove(event.eventId)
+        key = _key(event)
+        self.version += 1
+        self._events[event.eventId] = event
+        insort(self._keys, key)
+        insort(self._club_keys.setdefault(event.clubId, []), key)
+        insort(self._end_keys, _end_key(event))
+        self._club_intervals.pop(event.clubId, None)
+
+    def remove(self, event_id: str) -> Optional[Event]:
+        event = self._events.pop(event_id, None)
+        if event is None:
+            return None
+        self.version += 1
+        key = _key(event)
+        self._discard(self._keys, key)
+        self._discard(self._end_keys, _end_key(event))
+        self._club_intervals.pop(event.clubId, None)
+        club_keys = self._club_keys.get(event.clubId)
+        if club_keys is not None:
+            self._discard(club_keys, key)
+            if not club_keys:
+                del self._club_keys[event.clubId]
+        return event
+
+    @staticmethod
+    def _discard(keys: List[_Key], key: _Key) -> None:
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del keys[i]
+
+    def expire_before(self, cutoff: datetime) -> int:
+        """Drops every event that ended before `cutoff`; returns how many were removed."""
+        end = bisect_left(self._end_keys, (cutoff.timestamp(), ""))
+        expired = self._end_keys[:end]
+        if not expired:
+            return 0
+        self.version += 1
+        del self._end_keys[:end]
+        for _, event_id in expired:
+            event = self._events.pop(event_id)
+            key = _key(event)
+            self._discard(self._keys, key)
+            self._club_intervals.pop(event.clubId, None)
+            club_keys = self._club_keys[event.clubId]
+            self._discard(club_keys, key)
+            if not club_keys:
+                del self._club_keys[event.clubId]
+        return len(expired)
+
+    def sync(self, events: Iterable[Event]) -> int:
+        """
+        Brings the index in line with a full listing of events, touching only the events
+        (and club interval lists) that were added, changed or deleted. Returns how many changed.
+        """
+        incoming = {event.eventId: event for event in events}
+        changed = 0
+        for event_id in [event_id for event_id in self._events if event_id not in incoming]:
+            self.remove(event_id)
+            changed += 1
+        for event in incoming.values():
+            if self._events.get(event.eventId) != event:
+                self.upsert(event)
+                changed += 1
+        return changed
+
+    def range(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        club_id: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Event]:
+        """Events with start <= startTime < end, soonest first."""
+        keys = self._keys if club_id is None else self._club_keys.get(club_id, [])
+        lo = 0 if start is None else bisect_left(keys, (start.timestamp(), ""))
+        hi = len(keys) if end is None else bisect_left(keys, (end.timestamp(), ""))
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return [self._events[event_id] for _, event_id in keys[lo:hi]]
+
+    def club_intervals(self, club_id: str) -> List[Interval]:
+        """The club's events as (start, end, eventId) in start order. Callers must not mutate it."""
+        intervals = self._club_intervals.get(club_id)
+        if intervals is None:
+            intervals = []
+            for start, event_id in self._club_keys.get(club_id, []):
+                # A bad endTime before startTime is treated as a zero-length event.
+                intervals.append((start, max(start, self._events[event_id].endTime.timestamp()), event_id))
+            self._club_intervals[club_id] = intervals
+        return intervals
+
+    def upcoming(self, k: int, club_id: Optional[str] = None, now: Optional[datetime] = None) -> List[Event]:
+        """The next `k` events starting from `now`."""
+        return self.range(start=now or datetime.now(timezone.utc), club_id=club_id, limit=k)
+
+
+class EventFeed:
+    """
+    Process-wide EventIndex, kept current by the shared `events` listener: its first snapshot
+    is synced into the index and later changes are applied with upsert/remove, so edits show
+    up in GET /api/events as soon as the listener reports them. The index is also loaded from
+    Firestore on first use and reloaded every `refresh_seconds` while the listener isn't
+    delivering, and every `safety_reload_seconds` while it is. Full listings are synced in
+    rather than replacing the index, so unchanged clubs keep their cached interval lists.
+    Events are expired by end time, incrementally on every read.
+    """
+
+    def __init__(
+        self,
+        refresh_seconds: float = EVENT_INDEX_REFRESH_SECONDS,
+        safety_reload_seconds: float = EVENT_INDEX_SAFETY_RELOAD_SECONDS,
+    ):
+        self.refresh_seconds = refresh_seconds
+        self.safety_reload_seconds = safety_reload_seconds
+        self.index = EventIndex()
+        # Bumped whenever a full listing (reload or listener snapshot) is synced in.
+        self.generation = 0
+        self.listening = False
+        self._loaded_at: Optional[float] = None
+        # Changes reported while a reload is reading Firestore, replayed onto what it read.
+        self._during_reload: Optional[List[DocumentChange]] = None
+        self._lock = asyncio.Lock()
+
+    def _needs_reload(self) -> bool:
+        if self._loaded_at is None:
+            return True
+        interval = self.safety_reload_seconds if self.listening else self.refresh_seconds
+        return time.monotonic() - self._loaded_at > interval
+
+    @staticmethod
+    def _retention_cutoff() -> datetime:
+        return datetime.now(timezone.utc) - EVENT_RETENTION
+
+    async def get_index(self, db: AsyncClient) -> EventIndex:
+        if self._needs_reload():
+            async with self._lock:
+                if self._needs_reload():
+                    await self.reload(db)
+        self.index.expire_before(self._retention_cutoff())
+        return self.index
+
+    def current_version(self) -> Optional[str]:
+        """
+        Cheap stamp of what get_index() would serve right now, or None if it would reload first.
+        Applies the same expiry get_index() does, so the stamp matches the served contents.
+        """
+        if self._needs_reload():
+            return None
+        self.index.expire_before(self._retention_cutoff())
+        return str(self.index.version)
+
+    def _sync(self, events: Iterable[Event]) -> None:
+        self.index.sync(events)
+        self.generation += 1
+        self._loaded_at = time.monotonic()
+
+    async def reload(self, db: AsyncClient) -> EventIndex:
+        generation = self.generation
+        self._during_reload = []
+        try:
+            events = await get_events_ending_after(db, self._retention_cutoff())
+            changes = self._during_reload
+        finally:
+            self._during_reload = None
+        if self.generation != generation:
+            return self.index  # A listener snapshot was synced in meanwhile, and is newer
+        self._sync(events)
+        self._apply(changes)  # Already applied once, but the older listing just undid them
+        return self.index
+
+    def _apply(self, changes: List[DocumentChange]) -> None:
+        cutoff = self._retention_cutoff()
+        for event_id, data in changes:
+            event = event_from_firestore(event_id, data) if data is not None else None
+            if event is None or event.endTime < cutoff:
+                self.index.remove(event_id)
+            else:
+                self.index.upsert(event)
+
+    def _on_event_changes(self, changes: List[DocumentChange], initial: bool) -> None:
+        if initial:
+            # Every watched event: sync to it, since changes may have been missed before.
+            self.listening = True
+            cutoff = self._retention_cutoff()
+            events = (event_from_firestore(event_id, data) for event_id, data in changes if data is not None)
+            self._sync(event for event in events if event is not None and event.endTime >= cutoff)
+            return
+        self._apply(changes)
+        if self._during_reload is not None:
+            self._during_reload.extend(changes)
+
+    def _on_listener_stopped(self) -> None:
+        # Changes may be missed until the listener is back; fall back to periodic reloads.
+        self.listening = False
+
+    async def refresh_periodically(self, db: AsyncClient) -> None:
+        """
+        Background task: subscribes to the shared `events` listener (before it starts, so its
+        initial snapshot is seen) and reloads the index whenever it is due.
+        """
+        events_watch.subscribe(self._on_event_changes)
+        events_watch.subscribe_stopped(self._on_listener_stopped)
+        while True:
+            try:
+                if self._needs_reload():
+                    async with self._lock:
+                        if self._needs_reload():
+                            await self.reload(db)
+            except Exception as e:
+                log.exception("event_index.refresh_failed", error=str(e))
+            await asyncio.sleep(self.refresh_seconds)
+
+
+event_feed = EventFeed()
@@ -0,0 +1,495 @@
+# File: backend/src/services/event_rsvp.py
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from cachetools import TTLCache
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+
+from CRUD.documents import get_documents_by_ids
+from services.single_flight import SingleFlight
+from services.structured_log import get_logger
+
+# RSVPs live at events/{eventId}/rsvps/{uid}. Waitlisted ones carry `waitlistedAt`, so the
+# waitlist in order is `order_by("waitlistedAt")` (documents without the field are left out).
+RSVP_SUBCOLLECTION = "rsvps"
+# Attendee and waitlist counts are sharded: events/{eventId}/{collection}/{i} = {"count": n}.
+ATTENDEE_SHARD_COLLECTION = "attendeeCountShards"
+WAITLIST_SHARD_COLLECTION = "waitlistCountShards"
+# Each attendee shard admits its share of the event's capacity, so seat transactions on
+# different shards never touch the same document.
+RSVP_COUNTER_SHARDS = int(os.getenv("RSVP_COUNTER_SHARDS", "10"))
+# Attempts per seat transaction before giving up with 503.
+RSVP_TRANSACTION_ATTEMPTS = 10
+# Event capacities, summed counts and "this shard is full" are trusted for this long.
+RSVP_CACHE_SECONDS = 5
+# Summed counts are copied onto the event documents (attendeeCount/waitlistCount) this often.
+RSVP_FLUSH_SECONDS = 2
+MAX_BATCH_WRITES = 500
+# Promotions per event per flush; a sweep rarely has more than a seat or two to fill.
+MAX_PROMOTIONS_PER_SWEEP = 50
+
+GOING = "going"
+WAITLISTED = "waitlisted"
+NOT_GOING = "none"
+
+_FULL = object()
+_NO_EVENT = object()
+
+log = get_logger("event_rsvp")
+
+
+def shard_capacities(capacity: Optional[int], num_shards: int) -> List[Optional[int]]:
+    """Splits an event's seats across its attendee shards, e.g. 25 seats over 10 shards -> 3,3,3,3,3,2,2,2,2,2."""
+    if capacity is None:
+        return [None] * num_shards
+    shards = max(1, min(num_shards, capacity))
+    base, extra = divmod(capacity, shards)
+    return [base + (1 if i < extra else 0) for i in range(shards)]
+
+
+def _rsvp_status(data: Dict) -> str:
+    return WAITLISTED if data.get("status") == WAITLISTED else GOING
+
+
+class EventRsvpStore:
+    """
+    RSVPs with a capacity limit, a first-come waitlist and sharded attendee counters.
+
+    A seat is taken in a transaction that reads the user's RSVP and one attendee shard, and
+    only increments the shard if it is under its share of the capacity; the shares add up to
+    the capacity, so the event can't be overbooked however the requests interleave. Seat
+    transactions for the same shard take turns within the process, so a burst queues locally
+    instead of aborting each other in Firestore.
+
+    Once every shard has been seen full, further RSVPs skip the seat transactions (the
+    admission gate) and join the waitlist in a transaction that first re-reads every attendee
+    shard: what this process has seen full may be stale (a seat freed on another worker, or
+    by a cancel with nobody waiting), and a free seat sends the request back to take it.
+    Cancelling a seat hands it to the oldest waitlisted RSVP, and each flush sweeps events
+    with free seats and a waitlist, promoting anyone a race left behind. RSVPs are keyed by
+    user, so repeats are no-ops. The user's `eventsAttend` is only updated if their
+    `users` document exists.
+    """
+
+    def __init__(self, num_shards: int = RSVP_COUNTER_SHARDS, cache_seconds: float = RSVP_CACHE_SECONDS):
+        self.num_shards = num_shards
+        self._capacities: TTLCache = TTLCache(maxsize=10_000, ttl=cache_seconds)
+        self._totals: TTLCache = TTLCache(maxsize=10_000, ttl=cache_seconds)  # eventId -> (going, waitlisted)
+        self._full_shards: TTLCache = TTLCache(maxsize=100_000, ttl=cache_seconds)  # (eventId, shard)
+        # When registration opens, every request misses the capacity cache at once; they share one read.
+        self._capacity_flights = SingleFlight()
+        self._shard_locks: Dict[Tuple[str, int], asyncio.Lock] = {}
+        self._dirty: Set[str] = set()
+        self._flush_lock = asyncio.Lock()
+        self.seat_transactions = 0
+        self.gated = 0
+        self.promoted = 0
+
+    # --- References ---
+    def _event_ref(self, db: AsyncClient, event_id: str):
+        return db.collection("events").document(event_id)
+
+    def _rsvp_ref(self, db: AsyncClient, event_id: str, uid: str):
+        return self._event_ref(db, event_id).collection(RSVP_SUBCOLLECTION).document(uid)
+
+    def _shard_ref(self, db: AsyncClient, event_id: str, collection: str, shard_index: int):
+        return self._event_ref(db, event_id).collection(collection).document(str(shard_index))
+
+    @staticmethod
+    async def _read(db: AsyncClient, transaction, refs) -> Dict[str, object]:
+        """Snapshots of `refs` read in the transaction, by path."""
+        snapshots = {}
+        async for snapshot in db.get_all(refs, transaction=transaction):
+            snapshots[snapshot.reference.path] = snapshot
+        return snapshots
+
+    @staticmethod
+    def _count(snapshot) -> int:
+        return (snapshot.to_dict() or {}).get("count", 0) if snapshot is not None and snapshot.exists else 0
+
+    def _open_seats(self, snapshots: Dict[str, object], db: AsyncClient, event_id: str, capacities) -> List[int]:
+        """Attendee shards below their share of the capacity, from snapshots read in a transaction."""
+        return [
+            shard_index for shard_index, share in enumerate(capacities)
+            if share is None or self._count(snapshots.get(
+                self._shard_ref(db, event_id, ATTENDEE_SHARD_COLLECTION, shard_index).path
+            )) < share
+        ]
+
+    @staticmethod
+    def _update_user(transaction, user, fields: Dict) -> None:
+        # `update`, not a merge: an RSVP must not create a partial users document.
+        if user is not None and user.exists:
+            transaction.update(user.reference, fields)
+
+    # --- Event capacity and counts ---
+    async def event_capacity(self, db: AsyncClient, event_id: str):
+        """The event's `capacity` (None = unlimited), or _NO_EVENT if there is no such event."""
+        capacity = self._capacities.get(event_id, _NO_EVENT)
+        if capacity is not _NO_EVENT:
+            return capacity
+        return await self._capacity_flights.run(event_id, lambda: self._load_capacity(db, event_id))
+
+    async def _load_capacity(self, db: AsyncClient, event_id: str):
+        [event_data] = await get_documents_by_ids(db, "events", [event_id])
+        if event_data is None:
+            return _NO_EVENT
+        capacity = event_data.get("capacity")
+        capacity = max(0, int(capacity)) if isinstance(capacity, (int, float)) else None
+        self._capacities[event_id] = capacity
+        return capacity
+
+    async def event_exists(self, db: AsyncClient, event_id: str) -> bool:
+        return await self.event_capacity(db, event_id) is not _NO_EVENT
+
+    async def get_counts(self, db: AsyncClient, event_id: str, fresh: bool = False) -> Tuple[int, int]:
+        """(attendees, waitlisted), summed over the shards; served from memory for a few seconds."""
+        if not fresh and event_id in self._totals:
+            return self._totals[event_id]
+        refs = [
+            self._shard_ref(db, event_id, collection, shard_index)
+            for collection in (ATTENDEE_SHARD_COLLECTION, WAITLIST_SHARD_COLLECTION)
+            for shard_index in range(self.num_shards)
+        ]
+        going = waitlisted = 0
+        async for shard in db.get_all(refs):
+            if shard.exists:
+                count = (shard.to_dict() or {}).get("count", 0)
+                if shard.reference.parent.id == ATTENDEE_SHARD_COLLECTION:
+                    going += count
+                else:
+                    waitlisted += count
+        self._totals[event_id] = (going, waitlisted)
+        return going, waitlisted
+
+    def _adjust_counts(self, event_id: str, going: int, waitlisted: int) -> None:
+        totals = self._totals.get(event_id)
+        if totals is not None:
+            self._totals[event_id] = (totals[0] + going, totals[1] + waitlisted)
+        self._dirty.add(event_id)
+
+    def _open_shards(self, event_id: str, capacities: List[Optional[int]]) -> List[int]:
+        return [i for i in range(len(capacities)) if (event_id, i) not in self._full_shards]
+
+    def is_full(self, event_id: str, capacity: Optional[int]) -> bool:
+        """Admission gate: True once every shard has been seen full, or the cached count reaches capacity."""
+        if capacity is None:
+            return False
+        totals = self._totals.get(event_id)
+        if totals is not None and totals[0] >= capacity:
+            return True
+        return not self._open_shards(event_id, shard_capacities(capacity, self.num_shards))
+
+    # --- RSVP ---
+    async def get_status(self, db: AsyncClient, event_id: str, uid: str) -> str:
+        snapshot = await self._rsvp_ref(db, event_id, uid).get()
+        return _rsvp_status(snapshot.to_dict() or {}) if snapshot.exists else NOT_GOING
+
+    async def _take_seat(self, transaction, db: AsyncClient, event_id: str, uid: str, shard_index: int, share: Optional[int]):
+        """Transaction body: (status, changed) as for `rsvp`, or _FULL if the shard has no seat left."""
+        from google.cloud import firestore
+
+        rsvp_ref = self._rsvp_ref(db, event_id, uid)
+        shard_ref = self._shard_ref(db, event_id, ATTENDEE_SHARD_COLLECTION, shard_index)
+        user_ref = db.collection("users").document(uid)
+        snapshots = await self._read(db, transaction, [rsvp_ref, shard_ref, user_ref])
+        rsvp = snapshots.get(rsvp_ref.path)
+        if rsvp is not None and rsvp.exists:
+            return _rsvp_status(rsvp.to_dict() or {}), False
+        if share is not None and self._count(snapshots.get(shard_ref.path)) >= share:
+            return _FULL
+        transaction.set(shard_ref, {"count": firestore.Increment(1)}, merge=True)
+        transaction.set(rsvp_ref, {
+            "userId": uid,
+            "status": GOING,
+            "shard": shard_index,
+            "createdAt": firestore.SERVER_TIMESTAMP,
+        })
+        self._update_user(transaction, snapshots.get(user_ref.path), {"eventsAttend": firestore.ArrayUnion([event_id])})
+        return GOING, True
+
+    async def _join_waitlist(self, transaction, db: AsyncClient, event_id: str, uid: str, capacities: List[Optional[int]]):
+        """
+        Transaction body: adds a waitlisted RSVP once every attendee shard is confirmed full.
+        Returns (status, changed) as for `rsvp` (an existing RSVP is returned untouched), or
+        the indices of the shards that still have a seat.
+        """
+        from google.cloud import firestore
+
+        rsvp_ref = self._rsvp_ref(db, event_id, uid)
+        shard_refs = [
+            self._shard_ref(db, event_id, ATTENDEE_SHARD_COLLECTION, shard_index) for shard_index in range(len(capacities))
+        ]
+        snapshots = await self._read(db, transaction, [rsvp_ref, *shard_refs])
+        rsvp = snapshots.get(rsvp_ref.path)
+        if rsvp is not None and rsvp.exists:
+            return _rsvp_status(rsvp.to_dict() or {}), False
+        open_seats = self._open_seats(snapshots, db, event_id, capacities)
+        if open_seats:
+            return open_seats
+        shard_index = random.randrange(self.num_shards)
+        transaction.create(rsvp_ref, {
+            "userId": uid,
+            "status": WAITLISTED,
+            "shard": shard_index,
+            "createdAt": firestore.SERVER_TIMESTAMP,
+            "waitlistedAt": firestore.SERVER_TIMESTAMP,
+        })
+        transaction.set(
+            self._shard_ref(db, event_id, WAITLIST_SHARD_COLLECTION, shard_index),
+            {"count": firestore.Increment(1)},
+            merge=True,
+        )
+        return WAITLISTED, True
+
+    async def rsvp(self, db: AsyncClient, event_id: str, uid: str, capacity: Optional[int]) -> Tuple[str, bool]:
+        """
+        Takes a seat, or a waitlist place if the event is full. Returns (status, changed);
+        `changed` is False if the user had already RSVP'd, in which case nothing is written.
+        """
+        from google.cloud import firestore
+
+        capacities = shard_capacities(capacity, self.num_shards)
+        while True:
+            while not self.is_full(event_id, capacity):
+                open_shards = self._open_shards(event_id, capacities)
+                # Prefer a shard no local transaction is working on.
+                idle = [i for i in open_shards if not self._shard_lock(event_id, i).locked()]
+                shard_index = random.choice(idle or open_shards)
+                async with self._shard_lock(event_id, shard_index):
+                    if (event_id, shard_index) in self._full_shards:
+                        continue  # Filled while this request waited its turn
+                    self.seat_transactions += 1
+                    result = await firestore.async_transactional(self._take_seat)(
+                        db.transaction(max_attempts=RSVP_TRANSACTION_ATTEMPTS),
+                        db, event_id, uid, shard_index, capacities[shard_index],
+                    )
+                if result is _FULL:
+                    self._full_shards[(event_id, shard_index)] = True
+                    continue
+                if result[1]:
+                    self._adjust_counts(event_id, 1, 0)
+                return result
+            self.gated += 1
+            result = await firestore.async_transactional(self._join_waitlist)(
+                db.transaction(max_attempts=RSVP_TRANSACTION_ATTEMPTS), db, event_id, uid, capacities
+            )
+            if isinstance(result, tuple):
+                if result[1]:
+                    self._adjust_counts(event_id, 0, 1)
+                return result
+            # A seat is free after all: forget what this process thought was full and take it.
+            self._totals.pop(event_id, None)
+            for shard_index in result:
+                self._full_shards.pop((event_id, shard_index), None)
+
+    def _shard_lock(self, event_id: str, shard_index: int) -> asyncio.Lock:
+        lock = self._shard_locks.get((event_id, shard_index))
+        if lock is None:
+            lock = self._shard_locks[(event_id, shard_index)] = asyncio.Lock()
+        return lock
+
+    # --- Cancellation ---
+    async def _release(self, transaction, db: AsyncClient, event_id: str, uid: str):
+        """
+        Transaction body: removes the user's RSVP. A freed seat goes to the oldest waitlisted
+        RSVP. Returns (previous status or None, promoted uid or None, shard index or None).
+        """
+        from google.cloud import firestore
+
+        rsvp_ref = self._rsvp_ref(db, event_id, uid)
+        users = db.collection("users")
+        snapshots = await self._read(db, transaction, [rsvp_ref, users.document(uid)])
+        rsvp = snapshots.get(rsvp_ref.path)
+        if rsvp is None or not rsvp.exists:
+            return None, None, None
+        data = rsvp.to_dict() or {}
+        status = _rsvp_status(data)
+        shard_index = int(data.get("shard") or 0)
+        promoted = promoted_user = None
+        if status == GOING:
+            promoted = await self._first_waitlisted(transaction, db, event_id)
+            if promoted is not None:
+                promoted_user = (await self._read(db, transaction, [users.document(promoted.id)])).get(
+                    users.document(promoted.id).path
+                )
+
+        transaction.delete(rsvp_ref)
+        self._update_user(transaction, snapshots.get(users.document(uid).path), {"eventsAttend": firestore.ArrayRemove([event_id])})
+        if status == WAITLISTED:
+            transaction.set(
+                self._shard_ref(db, event_id, WAITLIST_SHARD_COLLECTION, shard_index),
+                {"count": firestore.Increment(-1)},
+                merge=True,
+            )
+        elif promoted is not None:
+            # The seat stays counted on its shard and changes hands.
+            self._promote(transaction, db, event_id, promoted, promoted_user, shard_index)
+        else:
+            transaction.set(
+                self._shard_ref(db, event_id, ATTENDEE_SHARD_COLLECTION, shard_index),
+                {"count": firestore.Increment(-1)},
+                merge=True,
+            )
+        return status, promoted.id if promoted is not None else None, shard_index
+
+    async def _first_waitlisted(self, transaction, db: AsyncClient, event_id: str):
+        waitlist = self._event_ref(db, event_id).collection(RSVP_SUBCOLLECTION).order_by("waitlistedAt").limit(1)
+        async for snapshot in await transaction.get(waitlist):
+            return snapshot
+        return None
+
+    def _promote(self, transaction, db: AsyncClient, event_id: str, rsvp, user, shard_index: int) -> None:
+        """Writes a waitlisted RSVP's move onto attendee shard `shard_index` (whose count the caller handles)."""
+        from google.cloud import firestore
+
+        transaction.update(rsvp.reference, {
+            "status": GOING,
+            "shard": shard_index,
+            "waitlistedAt": firestore.DELETE_FIELD,
+        })
+        transaction.set(
+            self._shard_ref(db, event_id, WAITLIST_SHARD_COLLECTION, int((rsvp.to_dict() or {}).get("shard") or 0)),
+            {"count": firestore.Increment(-1)},
+            merge=True,
+        )
+        self._update_user(transaction, user, {"eventsAttend": firestore.ArrayUnion([event_id])})
+
+    async def _fill_seat(self, transaction, db: AsyncClient, event_id: str, capacities: List[Optional[int]]) -> Optional[str]:
+        """Transaction body: gives a free seat, if any, to the oldest waitlisted RSVP; returns their uid."""
+        from google.cloud import firestore
+
+        shard_refs = [
+            self._shard_ref(db, event_id, ATTENDEE_SHARD_COLLECTION, shard_index) for shard_index in range(len(capacities))
+        ]
+        open_seats = self._open_seats(await self._read(db, transaction, shard_refs), db, event_id, capacities)
+        if not open_seats:
+            return None
+        promoted = await self._first_waitlisted(transaction, db, event_id)
+        if promoted is None:
+            return None
+        users = db.collection("users")
+        user = (await self._read(db, transaction, [users.document(promoted.id)])).get(users.document(promoted.id).path)
+        shard_index = random.choice(open_seats)
+        self._promote(transaction, db, event_id, promoted, user, shard_index)
+        transaction.set(shard_refs[shard_index], {"count": firestore.Increment(1)}, merge=True)
+        return promoted.id
+
+    async def promote_waitlisted(self, db: AsyncClient, event_id: str) -> int:
+        """
+        Fills free seats from the waitlist, oldest first, for when a race (or a capacity
+        increase) left people waiting with seats open. Returns how many were promoted.
+        """
+        from google.cloud import firestore
+
+        capacity = await self.event_capacity(db, event_id)
+        if capacity is _NO_EVENT:
+            return 0
+        capacities = shard_capacities(capacity, self.num_shards)
+        promoted = 0
+        while promoted < MAX_PROMOTIONS_PER_SWEEP:
+            uid = await firestore.async_transactional(self._fill_seat)(
+                db.transaction(max_attempts=RSVP_TRANSACTION_ATTEMPTS), db, event_id, capacities
+            )
+            if uid is None:
+                break
+            promoted += 1
+            self._adjust_counts(event_id, 1, -1)
+            log.info("rsvp.promoted", event_id=event_id, uid=uid, sweep=True)
+        self.promoted += promoted
+        return promoted
+
+    async def cancel(self, db: AsyncClient, event_id: str, uid: str) -> bool:
+        """Removes the user's RSVP; returns False if there was none."""
+        from google.cloud import firestore
+
+        status, promoted, shard_index = await firestore.async_transactional(self._release)(
+            db.transaction(max_attempts=RSVP_TRANSACTION_ATTEMPTS), db, event_id, uid
+        )
+        if status is None:
+            return False
+        if status == WAITLISTED:
+            self._adjust_counts(event_id, 0, -1)
+        elif promoted is not None:
+            self._adjust_counts(event_id, 0, -1)
+            self.promoted += 1
+            log.info("rsvp.promoted", event_id=event_id, uid=promoted)
+        else:
+            self._adjust_counts(event_id, -1, 0)
+            self._full_shards.pop((event_id, shard_index), None)
+        return True
+
+    # --- Event document counts ---
+    async def flush(self, db: AsyncClient) -> int:
+        """Writes the summed counts of events with RSVP changes onto their documents; returns how many."""
+        from google.api_core import exceptions as google_exceptions
+
+        async with self._flush_lock:
+            # Drop the shard locks no request is holding, so they don't pile up across events.
+            self._shard_locks = {key: lock for key, lock in self._shard_locks.items() if lock.locked()}
+            dirty, self._dirty = self._dirty, set()
+            counts = []
+            try:
+                for event_id in dirty:
+                    counts.append((event_id, await self.get_counts(db, event_id, fresh=True)))
+                for i in range(0, len(counts), MAX_BATCH_WRITES):
+                    chunk = counts[i:i + MAX_BATCH_WRITES]
+                    batch = db.batch()
+                    for event_id, (going, waitlisted) in chunk:
+                        batch.update(self._event_ref(db, event_id), {"attendeeCount": going, "waitlistCount": waitlisted})
+                    try:
+                        await batch.commit()
+                    except google_exceptions.NotFound:
+                        # An event was deleted; write the rest one by one.
+                        for event_id, (going, waitlisted) in chunk:
+                            try:
+                                await self._event_ref(db, event_id).update(
+                                    {"attendeeCount": going, "waitlistCount": waitlisted}
+                                )
+                            except google_exceptions.NotFound:
+                                self._capacities.pop(event_id, None)
+            except BaseException:  # Including cancellation at shutdown, before the final flush
+                self._dirty |= dirty  # Retry on the next flush
+                raise
+            await self._sweep_waitlists(db, counts)
+            return len(counts)
+
+    async def _sweep_waitlists(self, db: AsyncClient, counts: List[Tuple[str, Tuple[int, int]]]) -> None:
+        """Promotes waitlisted RSVPs of flushed events that have seats free."""
+        for event_id, (going, waitlisted) in counts:
+            if not waitlisted:
+                continue
+            try:
+                capacity = await self.event_capacity(db, event_id)
+                if capacity is not _NO_EVENT and (capacity is None or going < capacity):
+                    await self.promote_waitlisted(db, event_id)
+            except Exception as e:
+                self._dirty.add(event_id)  # Sweep it again on the next flush
+                log.warning("rsvp.sweep_failed", event_id=event_id, error=str(e))
+
+    async def flush_periodically(self, db: AsyncClient, interval_seconds: float = RSVP_FLUSH_SECONDS) -> None:
+        """Background task keeping attendeeCount/waitlistCount on the event documents current."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.flush(db)
+            except Exception as e:
+                log.exception("rsvp.flush_failed", error=str(e))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "seat_transactions": self.seat_transactions,
+            "gated": self.gated,
+            "promoted": self.promoted,
+            "full_shards": len(self._full_shards),
+            "pending_flush": len(self._dirty),
+        }
+
+
+event_rsvps = EventRsvpStore()
@@ -0,0 +1,63 @@
+# File: backend/src/services/event_schedule.py
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+
+from models.event import ScheduledEvent, UserSchedule
+from services.event_index import EventIndex, Interval
+
+
+def merge_club_intervals(index: EventIndex, club_ids: Iterable[str], start: float, end: float) -> Iterator[Interval]:
+    """
+    The clubs' events that are under way or upcoming in [start, end), in start order.
+    Each club's cached interval list is already sorted, so this is a k-way merge rather
+    than a sort of every event.
+    """
+    runs = []
+    for club_id in dict.fromkeys(club_ids):  # Dedupe, keeping order
+        intervals = index.club_intervals(club_id)
+        runs.append(islice(intervals, bisect_left(intervals, (end,))))
+    for interval in heapq.merge(*runs):
+        if interval[1] > start or interval[0] >= start:  # Not already over (zero-length events count)
+            yield interval
+
+
+def find_conflicts(intervals: List[Interval]) -> Tuple[List[List[int]], int]:
+    """
+    Sweep line over intervals sorted by start. Keeps a min-heap of the ones still running,
+    keyed by end, so each interval is compared only with those it really overlaps.
+    Returns, per interval, the positions of the intervals it overlaps (in order), and the
+    number of overlapping pairs. Touching intervals (one ends as the next starts) don't overlap.
+    """
+    conflicts: List[List[int]] = [[] for _ in intervals]
+    running: List[Tuple[float, int]] = []
+    pairs = 0
+    for position, (start, end, _) in enumerate(intervals):
+        while running and running[0][0] <= start:
+            heapq.heappop(running)
+        for _, other in running:
+            conflicts[other].append(position)
+            conflicts[position].append(other)
+        pairs += len(running)
+        if end > start:
+            heapq.heappush(running, (end, position))
+    for overlapping in conflicts:
+        overlapping.sort()
+    return conflicts, pairs
+
+
+def build_schedule(index: EventIndex, club_ids: Iterable[str], start: datetime, end: datetime) -> UserSchedule:
+    """Every event from the given clubs that overlaps [start, end), annotated with its conflicts."""
+    intervals = list(merge_club_intervals(index, club_ids, start.timestamp(), end.timestamp()))
+    conflicts, pairs = find_conflicts(intervals)
+    events = []
+    for (_, _, event_id), overlapping in zip(intervals, conflicts):
+        events.append(ScheduledEvent(
+            event=index.get(event_id),
+            conflictsWith=[intervals[other][2] for other in overlapping],
+        ))
+    return UserSchedule(start=start, end=end, conflictCount=pairs, events=events)
@@ -1,38 +1,173 @@
 # File: backend/src/services/firebase_service.py
+from __future__ import annotations
+
+import asyncio
+import json  # For parsing JSON string from env var
 import os
-# Import the AsyncClient from google.cloud.firestore_v1
-from google.cloud.firestore_v1.async_client import AsyncClient
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+# The Firebase and Firestore SDKs are imported inside the functions below so that
+# importing the app stays cheap; the lifespan loads them in the background.
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+    from google.cloud.firestore_v1.client import Client
+    from services.firestore_pool import FirestoreClientPool
 
+# Populated by init_firestore() during warm-up; None until then or on failure.
+client_pool: Optional[FirestoreClientPool] = None
 # db will now be an instance of AsyncClient or None
-db: AsyncClient | None = None
-
-try:
-    project_id = os.getenv("FIREBASE_PROJECT_ID", os.getenv("GCLOUD_PROJECT"))
-    # Optional: print the detected project_id for debugging if needed
-    # print(f"INFO: firebase_service.py - Attempting to initialize with Project ID: {project_id if project_id else 'Default (inferred)'}")
-
-    if project_id:
-        db = AsyncClient(project=project_id)  # Use AsyncClient
-    else:
-        db = AsyncClient()  # Use AsyncClient to attempt to infer project ID
-
-    if db:
-        # The .project attribute might not be immediately available or could be a coroutine itself
-        # for AsyncClient in some contexts, or it might be deferred.
-        # A simple way to check initialization is just to see if db is not None.
-        # If you need to confirm the project ID with AsyncClient, you might need an async call
-        # or check how the client is typically inspected.
-        # For now, a successful instantiation is the main goal.
+db: Optional[AsyncClient] = None
+
+_warm_up_task: Optional[asyncio.Task] = None
+# Synchronous client shared by every collection listener; created on first use.
+_listener_client: Optional[Client] = None
+_listener_client_lock = threading.Lock()
+
+
+def init_firebase_admin() -> None:
+    """Initializes the default Firebase Admin app once. Safe to call more than once."""
+    from firebase_admin import credentials, get_app, initialize_app
+
+    try:
+        get_app()  # Check if "[DEFAULT]" app already exists
+        print("INFO: Firebase Admin SDK already initialized.")
+        return
+    except ValueError:  # Indicates no app named "[DEFAULT]" has been created yet
+        print("INFO: Initializing Firebase Admin SDK...")
+
+    cred_object = None
+    firebase_credentials_json_str = os.getenv("FIREBASE_CREDENTIALS_JSON")
+    google_app_creds_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+
+    if firebase_credentials_json_str:
+        try:
+            cred_dict = json.loads(firebase_credentials_json_str)
+            cred_object = credentials.Certificate(cred_dict)
+            print("INFO: Using FIREBASE_CREDENTIALS_JSON for Firebase Admin SDK.")
+        except json.JSONDecodeError as e:
+            print(f"ERROR: Could not parse FIREBASE_CREDENTIALS_JSON: {e}")
+        except Exception as e:
+            print(f"ERROR: Could not initialize Firebase Admin with JSON string: {e}")
+    elif google_app_creds_path:
+        try:
+            # Ensure the path is treated as a file path
+            if os.path.exists(google_app_creds_path):
+                cred_object = credentials.Certificate(google_app_creds_path)
+                print("INFO: Using GOOGLE_APPLICATION_CREDENTIALS path for Firebase Admin SDK.")
+            else:
+                print(f"WARNING: GOOGLE_APPLICATION_CREDENTIALS path not found: {google_app_creds_path}")
+                # Let it fall through to default initialization which might find ADC
+        except Exception as e:
+            print(
+                f"ERROR: Could not initialize Firebase Admin with "
+                f"GOOGLE_APPLICATION_CREDENTIALS path {google_app_creds_path}: {e}"
+            )
+            cred_object = None  # Fallback to default initialization attempt
+
+    # Initialize app
+    try:
+        if cred_object:
+            initialize_app(cred_object)
+        else:
+            # This will use GOOGLE_APPLICATION_CREDENTIALS if it's set by the environment
+            # to a valid file path AND cred_object wasn't successfully created,
+            # OR it will use Application Default Credentials (ADC) if available.
+            initialize_app()
+            print(
+                "INFO: Firebase Admin SDK initialized (using ADC or GOOGLE_APPLICATION_CREDENTIALS file "
+                "if not explicitly parsed from FIREBASE_CREDENTIALS_JSON)."
+            )
+        print("INFO: Firebase Admin SDK initialization attempt complete.")
+    except Exception as e:
+        print(f"CRITICAL: Firebase Admin SDK initialization failed: {e}")
+
+
+def init_firestore() -> Optional[FirestoreClientPool]:
+    """Builds the client pool. Safe to call more than once."""
+    global client_pool, db
+    if client_pool is not None:
+        return client_pool
+    try:
+        from services.firestore_pool import FirestoreClientPool
+
+        project_id = os.getenv("FIREBASE_PROJECT_ID", os.getenv("GCLOUD_PROJECT"))
+        # A None project lets AsyncClient infer it from the environment.
+        client_pool = FirestoreClientPool(project=project_id or None)
+        db = client_pool.primary
         print(
-            f"INFO: Firestore AsyncClient initialized. Project: {db.project if hasattr(db, 'project') and db.project else 'Default/Inferred'}"
+            f"INFO: Firestore client pool initialized with {len(client_pool.clients)} channel(s) "
+            f"({client_pool.strategy}). Project: {db.project or 'Default/Inferred'}"
         )
-        # You can also print the type to be absolutely sure during startup
-        # print(f"INFO: Initialized db object type: {type(db)}")
-    else:
-        # This case should ideally not be hit if AsyncClient() constructor doesn't raise an error and returns None,
-        # which is not typical. The try/except block handles constructor errors.
-        print("ERROR: Firestore AsyncClient initialization failed to assign 'db' instance.")
-
-except Exception as e:
-    print(f"FATAL: Failed to initialize Firestore AsyncClient: {e}")
-    db = None  # Ensure db is None on failure
+    except Exception as e:
+        print(f"FATAL: Failed to initialize Firestore AsyncClient: {e}")
+        client_pool = None
+        db = None  # Ensure db is None on failure
+    return client_pool
+
+
+def listener_client(project: Optional[str]) -> Client:
+    """
+    The synchronous client that snapshot listeners run on (the async client can't listen).
+    Created once per process with the same project and credentials lookup as the pool,
+    so restarting a listener reuses its channel instead of opening a new one.
+    """
+    global _listener_client
+    with _listener_client_lock:
+        if _listener_client is None:
+            from google.cloud import firestore
+
+            _listener_client = firestore.Client(project=project)
+        return _listener_client
+
+
+async def warm_up() -> None:
+    """
+    Loads and initializes both SDKs in worker threads, concurrently, then opens the
+    gRPC channels on the event loop so the first request doesn't pay for the handshake.
+    Never raises; failures leave `client_pool`/`db` as None.
+    """
+    started = time.perf_counter()
+    await asyncio.gather(
+        asyncio.to_thread(init_firebase_admin),
+        asyncio.to_thread(init_firestore),
+    )
+    if client_pool is not None:
+        try:
+            for client in client_pool.clients:
+                client._firestore_api  # grpc.aio channels must be created on the running loop
+        except Exception as e:
+            print(f"WARNING: Could not open Firestore channels during warm-up: {e}")
+    print(f"INFO: Firebase warm-up finished in {time.perf_counter() - started:.2f}s.")
+
+
+def start_warm_up() -> asyncio.Task:
+    """Starts warm_up() in the background (once per event loop) and returns its task."""
+    global _warm_up_task
+    if _warm_up_task is None or _warm_up_task.get_loop() is not asyncio.get_running_loop():
+        _warm_up_task = asyncio.create_task(warm_up())
+    return _warm_up_task
+
+
+async def wait_until_ready() -> None:
+    """Waits for a warm-up in progress; returns immediately once it's done or if none was started."""
+    task = _warm_up_task
+    if task is not None and not task.done():
+        # Shielded so a cancelled request doesn't cancel the shared warm-up.
+        await asyncio.shield(task)
+
+
+async def close_firestore() -> None:
+    global client_pool, db, _warm_up_task, _listener_client
+    if _warm_up_task is not None and not _warm_up_task.done():
+        _warm_up_task.cancel()
+    _warm_up_task = None
+    if client_pool is not None:
+        await client_pool.close()
+    client_pool = None
+    db = None
+    with _listener_client_lock:
+        if _listener_client is not None:
+            _listener_client.close()
+        _listener_client = None
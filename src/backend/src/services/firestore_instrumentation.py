@@ -0,0 +1,125 @@
+# File: backend/src/services/firestore_instrumentation.py
+# gRPC client interceptors installed on every pooled Firestore channel. They see every
+# RPC the SDK makes (document gets, queries, commits, transactions), which a wrapper
+# around AsyncClient can't: references hold on to the underlying client directly.
+import asyncio
+import time
+from typing import List, Optional, Set
+
+from grpc import aio
+
+from services.metrics import (
+    RequestRpcStats,
+    current_request_stats,
+    firestore_documents_read_total,
+    firestore_documents_written_total,
+    firestore_rpc_seconds,
+    firestore_rpcs_total,
+)
+
+
+def _method_name(client_call_details) -> str:
+    method = client_call_details.method
+    if isinstance(method, bytes):
+        method = method.decode("ascii", "replace")
+    return method.rsplit("/", 1)[-1]
+
+
+def _written_documents(request) -> int:
+    writes = getattr(request, "writes", None)
+    return len(writes) if writes is not None else 0
+
+
+# Streaming reads, and the response field that carries a document.
+_DOCUMENT_FIELDS = {"BatchGetDocuments": "found", "RunQuery": "document"}
+
+
+class _RpcRecorder:
+    """Accumulates one RPC's numbers and files them under the method and the current request."""
+
+    def __init__(self, method: str):
+        self.method = method
+        self.started = time.perf_counter()
+        # Captured now: callbacks and stream consumers may run outside the request's context.
+        self.request_stats: Optional[RequestRpcStats] = current_request_stats.get()
+        self.documents_read = 0
+        self.finished = False
+
+    def finish(self, code: str, documents_written: int = 0) -> None:
+        if self.finished:
+            return
+        self.finished = True
+        elapsed = time.perf_counter() - self.started
+        firestore_rpcs_total.inc(1, self.method, code)
+        firestore_rpc_seconds.observe(elapsed, self.method)
+        if self.documents_read:
+            firestore_documents_read_total.inc(self.documents_read)
+        if documents_written:
+            firestore_documents_written_total.inc(documents_written)
+        stats = self.request_stats
+        if stats is not None:
+            stats.rpcs += 1
+            stats.rpc_seconds += elapsed
+            stats.documents_read += self.documents_read
+            stats.documents_written += documents_written
+
+
+async def _call_code(call) -> str:
+    try:
+        return (await call.code()).name
+    except Exception:
+        return "UNKNOWN"
+
+
+# Keeps fire-and-forget recording tasks alive until they finish.
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _spawn(coroutine) -> None:
+    task = asyncio.ensure_future(coroutine)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _record_failure(recorder: _RpcRecorder, call) -> None:
+    code = await _call_code(call)
+    if code != "OK":
+        recorder.finish(code)
+
+
+class UnaryUnaryInstrumentation(aio.UnaryUnaryClientInterceptor):
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        recorder = _RpcRecorder(_method_name(client_call_details))
+        call = await continuation(client_call_details, request)
+        try:
+            await call  # The response is cached on the call, so the caller's await is free.
+        finally:
+            recorder.finish(await _call_code(call), _written_documents(request))
+        return call
+
+
+class UnaryStreamInstrumentation(aio.UnaryStreamClientInterceptor):
+    async def intercept_unary_stream(self, continuation, client_call_details, request):
+        recorder = _RpcRecorder(_method_name(client_call_details))
+        document_field = _DOCUMENT_FIELDS.get(recorder.method)
+        call = await continuation(client_call_details, request)
+        # Failures can surface before anyone iterates the responses (the SDK waits for
+        # the stream to open first), so they are recorded from the call itself.
+        call.add_done_callback(lambda done: _spawn(_record_failure(recorder, done)))
+
+        async def counted_responses():
+            # Recorded when the consumer is done, not when the RPC is: buffered
+            # responses may still be unread when the call completes.
+            try:
+                async for response in call:
+                    if document_field is not None and document_field in response:
+                        recorder.documents_read += 1
+                    yield response
+            finally:
+                recorder.finish(await _call_code(call) if call.done() else "CANCELLED")
+
+        return counted_responses()
+
+
+def firestore_interceptors() -> List[aio.ClientInterceptor]:
+    return [UnaryUnaryInstrumentation(), UnaryStreamInstrumentation()]
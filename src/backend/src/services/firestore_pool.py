@@ -0,0 +1,172 @@
+# File: backend/src/services/firestore_pool.py
+# Imported lazily by firebase_service.init_firestore(): pulling in the Firestore
+# SDK and grpc costs a noticeable slice of startup time.
+import itertools
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+# Import the AsyncClient from google.cloud.firestore_v1
+from google.cloud.firestore_v1 import __version__ as firestore_version
+from google.cloud.firestore_v1.async_client import AsyncClient
+from google.cloud.firestore_v1.services.firestore import async_client as firestore_gapic_client
+from google.cloud.firestore_v1.services.firestore.transports import grpc_asyncio as firestore_grpc_transport
+from grpc import aio
+
+from services.firestore_instrumentation import firestore_interceptors
+from services.structured_log import get_logger
+
+# --- Pool settings (overridable through the environment) ---
+# Each client owns one gRPC channel (one HTTP/2 connection). Firestore allows ~100
+# concurrent streams per connection, so busy workers need more than one.
+FIRESTORE_CHANNELS = int(os.getenv("FIRESTORE_CHANNELS", "4"))
+FIRESTORE_KEEPALIVE_MS = int(os.getenv("FIRESTORE_KEEPALIVE_MS", "30000"))
+FIRESTORE_KEEPALIVE_TIMEOUT_MS = int(os.getenv("FIRESTORE_KEEPALIVE_TIMEOUT_MS", "10000"))
+# Requests in flight on one channel at which stats() reports it as saturated. Only a
+# gauge: the stream limit itself is set by the server.
+FIRESTORE_SATURATION_IN_FLIGHT = int(os.getenv("FIRESTORE_SATURATION_IN_FLIGHT", "100"))
+# "least_loaded" or "round_robin"
+FIRESTORE_POOL_STRATEGY = os.getenv("FIRESTORE_POOL_STRATEGY", "least_loaded")
+
+# TunedAsyncClient replaces the SDK's private channel setup (BaseClient._firestore_api_helper),
+# which has no public hook for channel options or interceptors. It was written against the
+# pinned google-cloud-firestore release; any other major version, or a client missing the
+# attributes it relies on, gets the SDK's own channel instead.
+SUPPORTED_FIRESTORE_MAJOR = "2"
+_CLIENT_INTERNALS = (
+    "_firestore_api_internal", "_emulator_host", "_target", "_credentials", "_client_options", "_client_info",
+)
+
+log = get_logger("firestore_pool")
+
+
+class TunedAsyncClient(AsyncClient):
+    """AsyncClient whose gRPC channel is built with our own channel options and interceptors."""
+
+    def __init__(
+        self,
+        *args,
+        channel_options: Optional[Dict[str, int]] = None,
+        interceptors: Optional[List[aio.ClientInterceptor]] = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self._channel_options = channel_options or {}
+        self._interceptors = interceptors or []
+        self._tuned = self._internals_supported()
+
+    def _internals_supported(self) -> bool:
+        supported = (
+            firestore_version.split(".", 1)[0] == SUPPORTED_FIRESTORE_MAJOR
+            and all(hasattr(self, name) for name in _CLIENT_INTERNALS)
+        )
+        if not supported:
+            log.warning("firestore_pool.untuned_client", firestore_version=firestore_version)
+        return supported
+
+    def _create_channel(self) -> aio.Channel:
+        if self._emulator_host is not None:
+            # Mirrors BaseClient._emulator_channel, which can't take interceptors.
+            token = getattr(self._credentials, "id_token", None) or "owner"
+            return aio.insecure_channel(
+                self._emulator_host,
+                options=[("Authorization", f"Bearer {token}"), *self._channel_options.items()],
+                interceptors=self._interceptors,
+            )
+        return firestore_grpc_transport.FirestoreGrpcAsyncIOTransport.create_channel(
+            self._target,
+            credentials=self._credentials,
+            options=list(self._channel_options.items()),
+            interceptors=self._interceptors,
+        )
+
+    @property
+    def _firestore_api(self):
+        # Mirrors BaseClient._firestore_api_helper, which hard-codes the channel options.
+        if self._tuned and self._firestore_api_internal is None:
+            self._transport = firestore_grpc_transport.FirestoreGrpcAsyncIOTransport(
+                host=self._target, channel=self._create_channel()
+            )
+            self._firestore_api_internal = firestore_gapic_client.FirestoreAsyncClient(
+                transport=self._transport, client_options=self._client_options
+            )
+            firestore_gapic_client._client_info = self._client_info
+        return super()._firestore_api
+
+    async def close(self) -> None:
+        transport = getattr(self, "_transport", None)
+        if transport is not None:
+            await transport.close()
+
+
+def channel_options() -> Dict[str, int]:
+    return {
+        "grpc.keepalive_time_ms": FIRESTORE_KEEPALIVE_MS,
+        "grpc.keepalive_timeout_ms": FIRESTORE_KEEPALIVE_TIMEOUT_MS,
+        "grpc.keepalive_permit_without_calls": 1,
+        "grpc.http2.max_pings_without_data": 0,
+        # Without this, channels with identical arguments share one subchannel (one connection).
+        "grpc.use_local_subchannel_pool": 1,
+    }
+
+
+class FirestoreClientPool:
+    """
+    A fixed set of Firestore clients, one gRPC channel each.
+    `lease()` hands out a client for the duration of a request and tracks how many
+    requests each channel is carrying, which drives least-loaded selection.
+    """
+
+    def __init__(
+        self,
+        project: Optional[str],
+        size: int = FIRESTORE_CHANNELS,
+        strategy: str = FIRESTORE_POOL_STRATEGY,
+        saturation_in_flight: int = FIRESTORE_SATURATION_IN_FLIGHT,
+    ):
+        options = channel_options()
+        self.clients: List[TunedAsyncClient] = [
+            TunedAsyncClient(project=project, channel_options=options, interceptors=firestore_interceptors())
+            for _ in range(max(1, size))
+        ]
+        self.strategy = strategy
+        self.saturation_in_flight = saturation_in_flight
+        self.in_flight = [0] * len(self.clients)
+        self.leases = [0] * len(self.clients)
+        self._round_robin = itertools.cycle(range(len(self.clients)))
+
+    @property
+    def primary(self) -> TunedAsyncClient:
+        """Client used by background tasks that aren't tied to a request."""
+        return self.clients[0]
+
+    def _pick(self) -> int:
+        if self.strategy == "round_robin":
+            return next(self._round_robin)
+        return min(range(len(self.clients)), key=self.in_flight.__getitem__)
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[AsyncClient]:
+        index = self._pick()
+        self.in_flight[index] += 1
+        self.leases[index] += 1
+        try:
+            yield self.clients[index]
+        finally:
+            self.in_flight[index] -= 1
+
+    def stats(self) -> List[Dict[str, int]]:
+        """Per-channel gauges: requests in flight now, total leases, and whether the channel is saturated."""
+        return [
+            {
+                "channel": index,
+                "in_flight": self.in_flight[index],
+                "leases": self.leases[index],
+                "saturated": int(self.in_flight[index] >= self.saturation_in_flight),
+            }
+            for index in range(len(self.clients))
+        ]
+
+    async def close(self) -> None:
+        for client in self.clients:
+            await client.close()
@@ -0,0 +1,645 @@
+# File: backend/src/services/gcal_service.py
+# Two-way mirror between the `events` collection and one shared Google Calendar.
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+
+from CRUD.documents import get_documents_by_ids
+from CRUD.events import event_from_firestore
+from models.event import Event
+from services.collection_watch import DocumentChange, events_watch
+from services.metrics import registry
+from services.structured_log import get_logger
+from services.worker_lease import WorkerLease
+
+# The sync is off unless a calendar is configured.
+GCAL_CALENDAR_ID = os.getenv("GCAL_CALENDAR_ID", "")
+# Overridable so the sync can run against a local fake of the Calendar API.
+GCAL_API_ROOT = os.getenv("GCAL_API_ROOT", "https://www.googleapis.com").rstrip("/")
+GCAL_SCOPES = ["https://www.googleapis.com/auth/calendar"]
+# Batch HTTP requests in flight at once.
+GCAL_SYNC_CONCURRENCY = int(os.getenv("GCAL_SYNC_CONCURRENCY", "4"))
+# Calls per batch request; Google recommends at most 50.
+GCAL_BATCH_SIZE = 50
+# Changes made in the Calendar UI are pulled at least this often.
+GCAL_SYNC_INTERVAL_SECONDS = 60
+GCAL_LIST_PAGE_SIZE = 2500
+# Firestore's limit on writes per batch, for Calendar edits written back.
+FIRESTORE_BATCH_SIZE = 500
+GCAL_MAX_ATTEMPTS = 6
+GCAL_BACKOFF_BASE_SECONDS = 1.0
+GCAL_BACKOFF_MAX_SECONDS = 32.0
+GCAL_HTTP_TIMEOUT_SECONDS = 60
+# Firestore document holding the Calendar sync token between restarts.
+SYNC_STATE_COLLECTION = "syncState"
+SYNC_STATE_DOCUMENT = "googleCalendar"
+# Only the worker holding this lease talks to the Calendar.
+GCAL_SYNC_LEASE = "gcal-sync"
+# Private extended property linking a Calendar event to its `events` document.
+EVENT_ID_PROPERTY = "slugsceneEventId"
+# Length limits on Calendar event IDs.
+GCAL_MIN_ID_LENGTH = 5
+GCAL_MAX_ID_LENGTH = 1024
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+gcal_requests_total = registry.counter(
+    "gcal_requests_total", "HTTP requests sent to the Google Calendar API.", ("kind", "status")
+)
+log = get_logger("gcal")
+
+
+class CalendarApiError(Exception):
+    def __init__(self, status: int, body: Any = None):
+        super().__init__(f"Calendar API returned {status}: {body}")
+        self.status = status
+        self.body = body
+
+
+class _Call(NamedTuple):
+    """One Calendar API call inside a batch request."""
+    method: str
+    path: str
+    body: Optional[Dict[str, Any]]
+
+
+class _Tracked(NamedTuple):
+    """What the mirror last agreed on for an event: its Calendar ID and content hash."""
+    gcal_id: str
+    content_hash: Optional[str]
+
+
+@dataclass
+class SyncReport:
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    pulled: int = 0  # Calendar events returned by the incremental listing
+    applied: int = 0  # ...of which were edits made in the Calendar, written back to Firestore
+    requests: int = 0
+
+
+def gcal_event_id(event_id: str) -> str:
+    """
+    Deterministic Calendar event ID for an `events` document. Calendar IDs may only use
+    base32hex characters (a-v, 0-9), so the document ID is base32hex-encoded. Inserts
+    are therefore idempotent: re-sending one after a lost response gets a 409, not a duplicate.
+    IDs must also be 5 to 1024 characters: a one-byte document ID is padded, and one too
+    long to encode is replaced by its SHA-256 (hex digits are base32hex too, and the
+    "sh" prefix keeps it apart from encoded IDs).
+    """
+    encoded = "ss" + base64.b32hexencode(event_id.encode("utf-8")).decode("ascii").lower().rstrip("=")
+    if len(encoded) > GCAL_MAX_ID_LENGTH:
+        return "sh" + hashlib.sha256(event_id.encode("utf-8")).hexdigest()
+    # Only one-byte IDs encode this short, and their padded length is unique to them.
+    return encoded.ljust(GCAL_MIN_ID_LENGTH, "0")
+
+
+def _content(name: str, description: str, location: str, start: datetime, end: datetime) -> Dict[str, str]:
+    return {
+        "summary": name,
+        "description": description,
+        "location": location,
+        "start": start.astimezone(timezone.utc).isoformat(),
+        "end": end.astimezone(timezone.utc).isoformat(),
+    }
+
+
+def content_hash(content: Dict[str, str]) -> str:
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+
+def event_content(event: Event) -> Dict[str, str]:
+    return _content(event.name, event.description, event.location, event.startTime, event.endTime)
+
+
+def _parse_gcal_time(value: Dict[str, Any]) -> Optional[datetime]:
+    raw = value.get("dateTime") or value.get("date")
+    if not raw:
+        return None
+    parsed = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def gcal_content(item: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """The same fields as event_content(), read from a Calendar event resource."""
+    start = _parse_gcal_time(item.get("start") or {})
+    end = _parse_gcal_time(item.get("end") or {}) or start
+    if start is None:
+        return None
+    return _content(item.get("summary") or "", item.get("description") or "", item.get("location") or "", start, end)
+
+
+def gcal_resource(event: Event, gcal_id: str) -> Dict[str, Any]:
+    return {
+        "id": gcal_id,
+        "status": "confirmed",  # Also revives an event that was cancelled in the Calendar
+        "summary": event.name,
+        "description": event.description,
+        "location": event.location,
+        "start": {"dateTime": event.startTime.isoformat(), "timeZone": "UTC"},
+        "end": {"dateTime": event.endTime.isoformat(), "timeZone": "UTC"},
+        "extendedProperties": {"private": {EVENT_ID_PROPERTY: event.eventId, "clubId": event.clubId}},
+    }
+
+
+def _encode_batch(calls: List[_Call], boundary: str) -> bytes:
+    parts = []
+    for i, call in enumerate(calls):
+        body = json.dumps(call.body) if call.body is not None else ""
+        parts.append(
+            f"--{boundary}\r\n"
+            "Content-Type: application/http\r\n"
+            f"Content-ID: <item{i}>\r\n\r\n"
+            f"{call.method} {call.path} HTTP/1.1\r\n"
+            "Content-Type: application/json\r\n\r\n"
+            f"{body}\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n")
+    return "".join(parts).encode("utf-8")
+
+
+def _decode_batch(content_type: str, payload: bytes, size: int) -> List[Tuple[int, Any]]:
+    """
+    Splits a multipart/mixed batch response into (status, parsed JSON body) per call,
+    in call order. Calls missing from the response come back as (0, None).
+    """
+    boundary = content_type.split("boundary=", 1)[1].split(";", 1)[0].strip().strip('"')
+    results: List[Tuple[int, Any]] = [(0, None)] * size
+    for part in payload.split(f"--{boundary}".encode("ascii"))[1:]:
+        if part.startswith(b"--"):
+            break
+        mime_headers, _, http_response = part.strip(b"\r\n").partition(b"\r\n\r\n")
+        index = None
+        for line in mime_headers.decode("latin-1").split("\r\n"):
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-id":
+                index = int(value.strip().strip("<>").rsplit("item", 1)[1])
+        head, _, body = http_response.partition(b"\r\n\r\n")
+        status = int(head.split(b"\r\n", 1)[0].split()[1])
+        try:
+            parsed = json.loads(body) if body.strip() else None
+        except ValueError:
+            parsed = body.decode("utf-8", "replace")
+        if index is not None and 0 <= index < size:
+            results[index] = (status, parsed)
+    return results
+
+
+def _is_retryable(status: int, body: Any) -> bool:
+    if status == 0 or status in RETRYABLE_STATUSES:
+        return True
+    if status == 403 and isinstance(body, dict):
+        errors = (body.get("error") or {}).get("errors") or []
+        return any(error.get("reason") in RATE_LIMIT_REASONS for error in errors)
+    return False
+
+
+def _backoff_seconds(attempt: int) -> float:
+    """Exponential backoff with jitter: ~1s, 2s, 4s, ... capped, each scaled by 0.5-1."""
+    return min(GCAL_BACKOFF_MAX_SECONDS, GCAL_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+
+class GoogleCalendarSync:
+    """
+    Mirrors `events` documents to a Google Calendar and Calendar-side edits back.
+
+    Firestore -> Calendar: the shared `events` listener queues changed documents.
+    Each document stores `gCalEventId` and `gCalHash` (a hash of the mirrored fields), so a
+    document whose hash still matches is never re-sent. Inserts, updates and deletes go out
+    as batch HTTP requests, several in flight at once, retried with exponential backoff.
+
+    Calendar -> Firestore: events are listed incrementally with the Calendar's sync token.
+    An event whose hash matches what was last mirrored is our own write coming back and is
+    skipped; anything else was edited in the Calendar and is written to its document.
+
+    Every worker follows the listener, but only the holder of the `gcal-sync` lease syncs,
+    so each change is sent once and one worker advances the stored sync token.
+    """
+
+    def __init__(
+        self,
+        calendar_id: str = GCAL_CALENDAR_ID,
+        api_root: str = GCAL_API_ROOT,
+        concurrency: int = GCAL_SYNC_CONCURRENCY,
+        interval_seconds: float = GCAL_SYNC_INTERVAL_SECONDS,
+        credentials: Any = None,
+    ):
+        self.calendar_id = calendar_id
+        self.api_root = api_root
+        self.concurrency = concurrency
+        self.interval_seconds = interval_seconds
+        self.credentials = credentials
+        self.sync_token: Optional[str] = None
+        self.listening = False
+        self._tracked: Dict[str, _Tracked] = {}
+        # Which field holds each event's name: the model's `name`, or `title` as the frontend writes it.
+        self._name_fields: Dict[str, str] = {}
+        # Latest data per changed document, or None once it's deleted; newer changes replace older ones.
+        self._pending: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._session = None
+        self._sync_lock = asyncio.Lock()
+        self.lease = WorkerLease(GCAL_SYNC_LEASE)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.calendar_id)
+
+    # --- HTTP (blocking; always called through asyncio.to_thread) ---
+    def _get_session(self):
+        if self._session is None:
+            from google.auth.transport.requests import AuthorizedSession
+
+            credentials = self.credentials
+            if credentials is None:
+                credentials_json = os.getenv("FIREBASE_CREDENTIALS_JSON")
+                if credentials_json:
+                    from google.oauth2 import service_account
+
+                    credentials = service_account.Credentials.from_service_account_info(
+                        json.loads(credentials_json), scopes=GCAL_SCOPES
+                    )
+                else:
+                    import google.auth
+
+                    credentials, _ = google.auth.default(scopes=GCAL_SCOPES)
+            self._session = AuthorizedSession(credentials)
+        return self._session
+
+    def _events_path(self, gcal_id: Optional[str] = None) -> str:
+        path = f"/calendar/v3/calendars/{quote(self.calendar_id, safe='')}/events"
+        return f"{path}/{gcal_id}" if gcal_id else path
+
+    def _post_batch(self, calls: List[_Call]) -> List[Tuple[int, Any]]:
+        boundary = f"batch_{uuid.uuid4().hex}"
+        response = self._get_session().post(
+            f"{self.api_root}/batch/calendar/v3",
+            data=_encode_batch(calls, boundary),
+            headers={"Content-Type": f"multipart/mixed; boundary={boundary}"},
+            timeout=GCAL_HTTP_TIMEOUT_SECONDS,
+        )
+        gcal_requests_total.inc(1, "batch", str(response.status_code))
+        if response.status_code != 200:
+            # The whole batch failed; report every call with the batch's status so it's retried as one.
+            return [(response.status_code, None)] * len(calls)
+        return _decode_batch(response.headers.get("Content-Type", ""), response.content, len(calls))
+
+    def _list_page(self, params: Dict[str, Any]) -> Tuple[int, Any]:
+        response = self._get_session().get(
+            f"{self.api_root}{self._events_path()}", params=params, timeout=GCAL_HTTP_TIMEOUT_SECONDS
+        )
+        gcal_requests_total.inc(1, "list", str(response.status_code))
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, None
+
+    # --- Retrying calls ---
+    async def _execute(self, calls: List[_Call], report: SyncReport) -> List[Tuple[int, Any]]:
+        """Sends `calls` as one batch, re-sending only the calls that failed transiently."""
+        results: List[Tuple[int, Any]] = [(0, None)] * len(calls)
+        remaining = list(range(len(calls)))
+        for attempt in range(GCAL_MAX_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(_backoff_seconds(attempt))
+            async with self._slots:
+                report.requests += 1
+                try:
+                    responses = await asyncio.to_thread(self._post_batch, [calls[i] for i in remaining])
+                except Exception as e:  # Connection errors: retry the whole remainder
+                    log.warning("gcal.batch_failed", attempt=attempt, error=str(e))
+                    continue
+            retry = []
+            for i, (status, body) in zip(remaining, responses):
+                results[i] = (status, body)
+                if _is_retryable(status, body):
+                    retry.append(i)
+            remaining = retry
+            if not remaining:
+                break
+        return results
+
+    async def _list(self, params: Dict[str, Any], report: SyncReport) -> Any:
+        for attempt in range(GCAL_MAX_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(_backoff_seconds(attempt))
+            report.requests += 1
+            try:
+                status, body = await asyncio.to_thread(self._list_page, params)
+            except Exception as e:
+                log.warning("gcal.list_failed", attempt=attempt, error=str(e))
+                continue
+            if status == 200:
+                return body
+            if not _is_retryable(status, body):
+                raise CalendarApiError(status, body)
+        raise CalendarApiError(0, "gave up after retries")
+
+    # --- Firestore -> Calendar ---
+    def enqueue(self, changes: List[Tuple[str, Optional[Dict[str, Any]]]]) -> None:
+        """Queues (eventId, document data or None if deleted) pairs; must run on the event loop."""
+        for event_id, data in changes:
+            self._pending[event_id] = data
+        if self._wake is not None:
+            self._wake.set()
+
+    def _plan_push(self, report: SyncReport) -> Tuple[List[_Call], List[Tuple[str, str, Optional[str]]]]:
+        """Turns queued changes into Calendar calls, plus (eventId, gcalId, new hash) for each call."""
+        pending, self._pending = self._pending, {}
+        calls: List[_Call] = []
+        targets: List[Tuple[str, str, Optional[str]]] = []
+        for event_id, data in pending.items():
+            if data is None:
+                tracked = self._untrack(event_id)
+                if tracked is not None:
+                    calls.append(_Call("DELETE", self._events_path(tracked.gcal_id), None))
+                    targets.append((event_id, tracked.gcal_id, None))
+                continue
+            event = event_from_firestore(event_id, data)
+            if event is None:
+                continue
+            self._name_fields[event_id] = "name" if data.get("name") else "title"
+            new_hash = content_hash(event_content(event))
+            gcal_id = data.get("gCalEventId") or gcal_event_id(event_id)
+            if data.get("gCalEventId") and data.get("gCalHash") == new_hash:
+                self._tracked[event_id] = _Tracked(gcal_id, new_hash)
+                report.unchanged += 1
+                continue
+            tracked = self._tracked.get(event_id)
+            if tracked is not None and tracked.content_hash == new_hash:
+                report.unchanged += 1  # Already sent; the document's gCalHash just hasn't caught up
+                continue
+            if data.get("gCalEventId") or tracked is not None:
+                calls.append(_Call("PUT", self._events_path(gcal_id), gcal_resource(event, gcal_id)))
+            else:
+                calls.append(_Call("POST", self._events_path(), gcal_resource(event, gcal_id)))
+            targets.append((event_id, gcal_id, new_hash))
+        return calls, targets
+
+    def _untrack(self, event_id: str) -> Optional[_Tracked]:
+        self._name_fields.pop(event_id, None)
+        return self._tracked.pop(event_id, None)
+
+    async def _confirm_deletions(self, db: AsyncClient) -> None:
+        """
+        The events listener only watches recent events, so an event edited to end before its
+        cutoff is reported deleted just like a real delete. Before such an event is removed
+        from the Calendar, check the document is really gone; if it isn't, stop tracking it
+        and leave the Calendar alone.
+        """
+        if events_watch.time_field is None:
+            return
+        deleted = [event_id for event_id, data in self._pending.items() if data is None and event_id in self._tracked]
+        if not deleted:
+            return
+        documents = await get_documents_by_ids(db, "events", deleted)
+        for event_id, data in zip(deleted, documents):
+            if data is not None and event_id in self._pending and self._pending[event_id] is None:
+                del self._pending[event_id]
+                self._untrack(event_id)
+
+    async def _push_batch(
+        self, db: AsyncClient, calls: List[_Call], targets: List[Tuple[str, str, Optional[str]]], report: SyncReport
+    ) -> None:
+        results = await self._execute(calls, report)
+        # An insert whose ID already exists (an earlier response was lost) or an update of a
+        # missing event is re-sent as the other kind.
+        retry_calls, retry_targets = [], []
+        for call, target, (status, _body) in zip(calls, targets, results):
+            if call.method == "POST" and status == 409:
+                retry_calls.append(_Call("PUT", self._events_path(target[1]), call.body))
+            elif call.method == "PUT" and status == 404:
+                retry_calls.append(_Call("POST", self._events_path(), call.body))
+            else:
+                continue
+            retry_targets.append(target)
+        if retry_calls:
+            retried = dict(zip(retry_targets, await self._execute(retry_calls, report)))
+            results = [retried.get(target, result) for target, result in zip(targets, results)]
+
+        written: List[Tuple[str, str, str]] = []
+        for call, (event_id, gcal_id, new_hash), (status, body) in zip(calls, targets, results):
+            if call.method == "DELETE":
+                if 200 <= status < 300 or status in (404, 410):
+                    report.deleted += 1
+                else:
+                    report.failed += 1
+                    log.warning("gcal.delete_failed", event_id=event_id, status=status, body=body)
+            elif 200 <= status < 300:
+                report.inserted += call.method == "POST"
+                report.updated += call.method == "PUT"
+                self._tracked[event_id] = _Tracked(gcal_id, new_hash)
+                written.append((event_id, gcal_id, new_hash))
+            else:
+                report.failed += 1
+                log.warning("gcal.mirror_failed", event_id=event_id, method=call.method, status=status, body=body)
+        await self._record_mirrored(db, written)
+
+    async def _record_mirrored(self, db: AsyncClient, written: List[Tuple[str, str, str]]) -> None:
+        """Stores gCalEventId/gCalHash on the documents, so unchanged events aren't sent again after a restart."""
+        if not written:
+            return
+        batch = db.batch()
+        for event_id, gcal_id, new_hash in written:
+            batch.update(db.collection("events").document(event_id), {"gCalEventId": gcal_id, "gCalHash": new_hash})
+        try:
+            await batch.commit()
+        except Exception:
+            # One document deleted meanwhile fails the whole batch; write the rest one by one.
+            results = await asyncio.gather(
+                *(
+                    db.collection("events").document(event_id).update({"gCalEventId": gcal_id, "gCalHash": new_hash})
+                    for event_id, gcal_id, new_hash in written
+                ),
+                return_exceptions=True,
+            )
+            failed = sum(isinstance(result, Exception) for result in results)
+            if failed:
+                log.warning("gcal.record_failed", documents=failed)
+
+    async def push(self, db: AsyncClient, report: SyncReport) -> None:
+        await self._confirm_deletions(db)
+        calls, targets = self._plan_push(report)
+        await asyncio.gather(*(
+            self._push_batch(db, calls[i:i + GCAL_BATCH_SIZE], targets[i:i + GCAL_BATCH_SIZE], report)
+            for i in range(0, len(calls), GCAL_BATCH_SIZE)
+        ))
+
+    # --- Calendar -> Firestore ---
+    async def _load_sync_token(self, db: AsyncClient) -> None:
+        snapshot = await db.collection(SYNC_STATE_COLLECTION).document(SYNC_STATE_DOCUMENT).get()
+        state = snapshot.to_dict() or {}
+        if state.get("calendarId") == self.calendar_id:
+            self.sync_token = state.get("syncToken")
+
+    async def _save_sync_token(self, db: AsyncClient) -> None:
+        await db.collection(SYNC_STATE_COLLECTION).document(SYNC_STATE_DOCUMENT).set(
+            {"calendarId": self.calendar_id, "syncToken": self.sync_token}
+        )
+
+    async def pull(self, db: AsyncClient, report: SyncReport) -> None:
+        """
+        Applies Calendar-side changes since the last sync token. Without a token (first run,
+        or after the Calendar expired it with 410 Gone) the whole calendar is listed once.
+        """
+        full_listing = self.sync_token is None
+        params: Dict[str, Any] = {"maxResults": GCAL_LIST_PAGE_SIZE}
+        if full_listing:
+            params["showDeleted"] = "true"
+        else:
+            params["syncToken"] = self.sync_token
+        items: List[Dict[str, Any]] = []
+        while True:
+            try:
+                page = await self._list(params, report)
+            except CalendarApiError as e:
+                if e.status != 410 or full_listing:
+                    raise
+                log.info("gcal.sync_token_expired")
+                self.sync_token = None
+                return await self.pull(db, report)
+            items.extend(page.get("items") or [])
+            if not page.get("nextPageToken"):
+                break
+            params["pageToken"] = page["nextPageToken"]
+        report.pulled += len(items)
+
+        batch = db.batch()
+        applied = 0
+        orphans: List[_Call] = []
+        orphan_targets: List[Tuple[str, str, Optional[str]]] = []
+        for item in items:
+            event_id = ((item.get("extendedProperties") or {}).get("private") or {}).get(EVENT_ID_PROPERTY)
+            if not event_id:
+                continue  # Not one of ours
+            tracked = self._tracked.get(event_id)
+            if item.get("status") == "cancelled":
+                if tracked is not None and tracked.gcal_id == item.get("id") and event_id not in self._pending:
+                    # Deleted in the Calendar: delete the event too.
+                    self._untrack(event_id)
+                    batch.delete(db.collection("events").document(event_id))
+                    applied += 1
+                    if applied % FIRESTORE_BATCH_SIZE == 0:
+                        await batch.commit()
+                        batch = db.batch()
+                continue
+            if tracked is None:
+                if self.listening and event_id not in self._pending and self._watched(item):
+                    # Its document is gone (deleted while the sync was down): remove it from the Calendar.
+                    orphans.append(_Call("DELETE", self._events_path(item["id"]), None))
+                    orphan_targets.append((event_id, item["id"], None))
+                continue
+            content = gcal_content(item)
+            if content is None or event_id in self._pending:
+                continue  # A local change is queued; it wins and will overwrite the Calendar
+            new_hash = content_hash(content)
+            if new_hash == tracked.content_hash:
+                continue  # Our own write coming back
+            fields = {
+                self._name_fields.get(event_id, "name"): content["summary"],
+                "description": content["description"],
+                "location": content["location"],
+                "startTime": datetime.fromisoformat(content["start"]),
+                "endTime": datetime.fromisoformat(content["end"]),
+                "gCalEventId": item["id"],
+                "gCalHash": new_hash,
+            }
+            self._tracked[event_id] = _Tracked(item["id"], new_hash)
+            batch.update(db.collection("events").document(event_id), fields)
+            applied += 1
+            if applied % FIRESTORE_BATCH_SIZE == 0:
+                await batch.commit()
+                batch = db.batch()
+        if applied % FIRESTORE_BATCH_SIZE:
+            await batch.commit()
+        report.applied += applied
+        if orphans:
+            await self._push_batch(db, orphans, orphan_targets, report)
+        self.sync_token = page.get("nextSyncToken") or self.sync_token
+        await self._save_sync_token(db)
+
+    async def sync_once(self, db: AsyncClient) -> SyncReport:
+        """Pushes queued Firestore changes, then pulls Calendar changes."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        report = SyncReport()
+        async with self._sync_lock:
+            if self.sync_token is None:
+                await self._load_sync_token(db)
+            await self.push(db, report)
+            await self.pull(db, report)
+        return report
+
+    # --- Change listener ---
+    @staticmethod
+    def _watched(item: Dict[str, Any]) -> bool:
+        """Whether a Calendar event's document would be in the events listener's scope if it existed."""
+        if events_watch.time_field is None:
+            return True
+        since = events_watch.since
+        end = _parse_gcal_time(item.get("end") or {}) or _parse_gcal_time(item.get("start") or {})
+        return since is not None and end is not None and end >= since
+
+    def _on_events_dropped(self, event_ids: List[str]) -> None:
+        # Past the listener's cutoff: no longer mirrored, but still in both Firestore and the Calendar.
+        for event_id in event_ids:
+            self._untrack(event_id)
+
+    def _on_event_changes(self, changes: List[DocumentChange], initial: bool) -> None:
+        # The first callback carries the whole collection, so orphan detection is safe from then on.
+        self.listening = True
+        self.enqueue(changes)
+
+    async def run(self, db: AsyncClient) -> None:
+        """
+        Background worker: while it holds the lease, syncs whenever the shared `events`
+        listener reports changes, and at least every `interval_seconds` to pick up Calendar edits.
+        """
+        self._wake = asyncio.Event()
+        events_watch.subscribe(self._on_event_changes)
+        events_watch.subscribe_dropped(self._on_events_dropped)
+        keeper = asyncio.create_task(self.lease.keep(db))
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                if not self.lease.held:
+                    self.sync_token = None  # The holder moves it on; reload it on taking over
+                    continue
+                if not self.listening:
+                    continue  # Wait for the first full snapshot before touching the Calendar
+                try:
+                    report = await self.sync_once(db)
+                    if report.requests:
+                        log.info("gcal.synced", **asdict(report))
+                except Exception as e:
+                    log.exception("gcal.sync_failed", error=str(e))
+        finally:
+            keeper.cancel()
+            await asyncio.wait([keeper])
+
+    def stats(self) -> Dict[str, Any]:
+        return {"tracked": len(self._tracked), "pending": len(self._pending), "listening": self.listening}
+
+
+gcal_sync = GoogleCalendarSync()
@@ -0,0 +1,173 @@
+# File: backend/src/services/member_counter.py
+from __future__ import annotations
+
+import os
+import random
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+from cachetools import TTLCache
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+from CRUD.documents import get_snapshots
+from services.structured_log import get_logger
+
+# Number of counter shards per club. 0 keeps the plain `memberCount` field on the
+# club document; anything higher spreads joins/leaves across that many sub-documents.
+MEMBER_COUNT_SHARDS = int(os.getenv("MEMBER_COUNT_SHARDS", "0"))
+SHARD_COLLECTION = "memberCountShards"
+# Summed totals are served from memory for this long before the shards are re-read.
+TOTAL_CACHE_SECONDS = 5
+MAX_BATCH_WRITES = 500
+
+log = get_logger("member_counter")
+
+
+class ShardedMemberCounter:
+    """
+    Distributed `memberCount` for clubs that are too hot for a single document.
+    Shard `i` of a club lives at clubs/{clubId}/memberCountShards/{i} as {"count": n}.
+    """
+
+    def __init__(self, num_shards: int, cache_seconds: float = TOTAL_CACHE_SECONDS):
+        self.num_shards = num_shards
+        # clubId -> summed total, or None for a club without shard documents.
+        self._totals: TTLCache = TTLCache(maxsize=10_000, ttl=cache_seconds)
+
+    @property
+    def enabled(self) -> bool:
+        return self.num_shards > 0
+
+    @staticmethod
+    def shard_ref(club_doc_ref, shard_index: int):
+        return club_doc_ref.collection(SHARD_COLLECTION).document(str(shard_index))
+
+    def increment(self, transaction, club_doc_ref, amount: int) -> None:
+        """Stages `amount` onto a random shard of the club inside `transaction`."""
+        from google.cloud import firestore
+
+        shard = self.shard_ref(club_doc_ref, random.randrange(self.num_shards))
+        transaction.set(shard, {"count": firestore.Increment(amount)}, merge=True)
+        self._totals.pop(club_doc_ref.id, None)
+
+    async def get_totals(self, db: AsyncClient, club_ids: Iterable[str]) -> Dict[str, int]:
+        """
+        Sums the shards of each club, reading only clubs whose total isn't cached.
+        Clubs without any shard documents (not yet migrated) are left out of the result.
+        """
+        totals: Dict[str, int] = {}
+        missing: List[str] = []
+        for club_id in dict.fromkeys(club_ids):
+            if club_id in self._totals:
+                if self._totals[club_id] is not None:
+                    totals[club_id] = self._totals[club_id]
+            else:
+                missing.append(club_id)
+        if not missing:
+            return totals
+
+        clubs_collection = db.collection("clubs")
+        refs = [
+            self.shard_ref(clubs_collection.document(club_id), shard_index)
+            for club_id in missing
+            for shard_index in range(self.num_shards)
+        ]
+        fresh: Dict[str, Optional[int]] = dict.fromkeys(missing)
+        for shard in await get_snapshots(db, refs):
+            if shard.exists:
+                club_id = shard.reference.parent.parent.id
+                fresh[club_id] = (fresh[club_id] or 0) + (shard.to_dict() or {}).get("count", 0)
+
+        for club_id, total in fresh.items():
+            self._totals[club_id] = total
+            if total is not None:
+                totals[club_id] = total
+        return totals
+
+    async def get_all_totals(self, db: AsyncClient) -> Dict[str, int]:
+        """Sums every migrated club's shards with one collection-group query."""
+        totals: Dict[str, int] = {}
+        async for shard in db.collection_group(SHARD_COLLECTION).stream():
+            club_id = shard.reference.parent.parent.id
+            totals[club_id] = totals.get(club_id, 0) + (shard.to_dict() or {}).get("count", 0)
+        for club_id, total in totals.items():
+            self._totals[club_id] = total
+        return totals
+
+    async def migrate_club(self, db: AsyncClient, club_id: str) -> Optional[int]:
+        """
+        Moves a club's `memberCount` into shard 0 and zeroes the other shards, in one
+        transaction that skips clubs which already have any shard, so a re-run never
+        overwrites live counts. Run it before enabling MEMBER_COUNT_SHARDS on the serving
+        workers. Returns the migrated count, or None if the club was skipped.
+
+        Once sharding is on, joins and leaves only touch the shards and the club's
+        `memberCount` goes stale; rolling back means running `restore_member_counts`
+        before setting MEMBER_COUNT_SHARDS back to 0.
+        """
+        from google.cloud import firestore
+
+        club_doc_ref = db.collection("clubs").document(club_id)
+        shard_refs = [self.shard_ref(club_doc_ref, shard_index) for shard_index in range(self.num_shards)]
+
+        @firestore.async_transactional
+        async def migrate(transaction) -> Optional[int]:
+            club_data = None
+            async for snapshot in db.get_all([club_doc_ref] + shard_refs, transaction=transaction):
+                if snapshot.reference.path == club_doc_ref.path:
+                    club_data = snapshot.to_dict() if snapshot.exists else None
+                elif snapshot.exists:
+                    return None  # Already migrated
+            if club_data is None:
+                return None
+            member_count = club_data.get("memberCount", 0) or 0
+            for shard_index, shard in enumerate(shard_refs):
+                transaction.create(shard, {"count": member_count if shard_index == 0 else 0})
+            return member_count
+
+        member_count = await migrate(db.transaction())
+        self._totals.pop(club_id, None)
+        return member_count
+
+    async def migrate_all_clubs(self, db: AsyncClient) -> int:
+        """Runs `migrate_club` for every club; returns how many clubs were migrated."""
+        migrated = skipped = 0
+        async for club_doc in db.collection("clubs").stream():
+            if await self.migrate_club(db, club_doc.id) is None:
+                skipped += 1
+            else:
+                migrated += 1
+        log.info("member_counter.migrated", clubs=migrated, skipped=skipped, shards=self.num_shards)
+        return migrated
+
+    async def restore_member_counts(self, db: AsyncClient) -> int:
+        """
+        Writes every migrated club's sharded total back into its `memberCount`, for rolling
+        sharding back. Stop the workers' joins and leaves (or run it after they are back
+        on MEMBER_COUNT_SHARDS=0) so no shard increment lands after its total was copied.
+        Returns how many clubs were written.
+        """
+        totals = await self.get_all_totals(db)
+        clubs_collection = db.collection("clubs")
+        # Shards outlive a deleted club document; only write clubs that still exist.
+        existing = await get_snapshots(db, [clubs_collection.document(club_id) for club_id in totals])
+        totals = [(club.id, totals[club.id]) for club in existing if club.exists]
+        for i in range(0, len(totals), MAX_BATCH_WRITES):
+            batch = db.batch()
+            for club_id, total in totals[i:i + MAX_BATCH_WRITES]:
+                batch.update(clubs_collection.document(club_id), {"memberCount": total})
+            await batch.commit()
+        log.info("member_counter.restored", clubs=len(totals))
+        return len(totals)
+
+    async def apply_totals(self, db: AsyncClient, club_dicts: List[Dict[str, Any]]) -> None:
+        """Overwrites `memberCount` in club dicts (keyed by 'clubId') with the sharded totals."""
+        if not self.enabled or not club_dicts:
+            return
+        totals = await self.get_totals(db, [club["clubId"] for club in club_dicts])
+        for club in club_dicts:
+            if club["clubId"] in totals:
+                club["memberCount"] = totals[club["clubId"]]
+
+
+member_counter = ShardedMemberCounter(MEMBER_COUNT_SHARDS)
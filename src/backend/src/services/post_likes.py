@@ -0,0 +1,156 @@
+# File: backend/src/services/post_likes.py
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Dict, Iterable, Tuple
+
+from cachetools import TTLCache
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+from services.structured_log import get_logger
+
+# Likes live at clubPosts/{postId}/likes/{uid}, one small document per like.
+LIKES_SUBCOLLECTION = "likes"
+# Pending likesCount deltas are written to the post documents this often.
+LIKE_FLUSH_SECONDS = 2
+MAX_BATCH_WRITES = 500
+# Like states are cached per process, so a like or unlike made through another worker is
+# seen here after at most this long; short enough not to matter, long enough to absorb
+# a page load asking about the same posts.
+LIKE_STATE_TTL_SECONDS = 10
+MAX_CACHED_USERS = 50_000
+# Posts seen to exist; a post deleted meanwhile only costs a like whose delta is dropped.
+KNOWN_POST_TTL_SECONDS = 600
+MAX_KNOWN_POSTS = 100_000
+
+log = get_logger("post_likes")
+
+
+class PostLikeStore:
+    """
+    Like/unlike bookkeeping without rewriting the post document on every click.
+    Membership is the likes sub-collection; the post's `likesCount` is brought up to
+    date by a write-behind buffer that coalesces deltas and flushes them in batches.
+    Each user's known like states are cached briefly, so "did I like this" is usually a dict lookup.
+    """
+
+    def __init__(self):
+        self._pending: Dict[str, int] = {}
+        # uid -> {postId: liked}
+        self._liked: TTLCache = TTLCache(maxsize=MAX_CACHED_USERS, ttl=LIKE_STATE_TTL_SECONDS)
+        self._known_posts: TTLCache = TTLCache(maxsize=MAX_KNOWN_POSTS, ttl=KNOWN_POST_TTL_SECONDS)
+        self._flush_lock = asyncio.Lock()
+
+    def _like_ref(self, db: AsyncClient, post_id: str, uid: str):
+        return db.collection("clubPosts").document(post_id).collection(LIKES_SUBCOLLECTION).document(uid)
+
+    def _remember(self, uid: str, post_id: str, liked: bool) -> None:
+        user_likes = self._liked.get(uid)
+        if user_likes is None:
+            user_likes = self._liked[uid] = {}
+        user_likes[post_id] = liked
+
+    async def post_exists(self, db: AsyncClient, post_id: str) -> bool:
+        if post_id in self._known_posts:
+            return True
+        post_snapshot = await db.collection("clubPosts").document(post_id).get()
+        if post_snapshot.exists:
+            self._known_posts[post_id] = True
+        return post_snapshot.exists
+
+    async def has_liked(self, db: AsyncClient, uid: str, post_id: str) -> bool:
+        user_likes = self._liked.get(uid)
+        if user_likes is not None and post_id in user_likes:
+            return user_likes[post_id]
+        like_snapshot = await self._like_ref(db, post_id, uid).get()
+        self._remember(uid, post_id, like_snapshot.exists)
+        return like_snapshot.exists
+
+    async def like(self, db: AsyncClient, uid: str, post_id: str) -> bool:
+        """Records a like; returns False if the user had already liked the post."""
+        from google.api_core import exceptions as google_exceptions
+        from google.cloud import firestore
+
+        try:
+            await self._like_ref(db, post_id, uid).create({
+                "userId": uid,
+                "createdAt": firestore.SERVER_TIMESTAMP,
+            })
+        except google_exceptions.AlreadyExists:
+            self._remember(uid, post_id, True)
+            return False
+        self._remember(uid, post_id, True)
+        self._pending[post_id] = self._pending.get(post_id, 0) + 1
+        return True
+
+    async def unlike(self, db: AsyncClient, uid: str, post_id: str) -> bool:
+        """Removes a like; returns False if the user hadn't liked the post."""
+        from google.api_core import exceptions as google_exceptions
+
+        try:
+            await self._like_ref(db, post_id, uid).delete(option=db.write_option(exists=True))
+        except google_exceptions.NotFound:
+            self._remember(uid, post_id, False)
+            return False
+        self._remember(uid, post_id, False)
+        self._pending[post_id] = self._pending.get(post_id, 0) - 1
+        return True
+
+    def _requeue(self, deltas: Iterable[Tuple[str, int]]) -> None:
+        # Put unwritten deltas back so the next flush retries them.
+        for post_id, delta in deltas:
+            self._pending[post_id] = self._pending.get(post_id, 0) + delta
+
+    async def flush(self, db: AsyncClient) -> int:
+        """Writes all pending deltas as batched increments; returns how many posts were updated."""
+        from google.api_core import exceptions as google_exceptions
+        from google.cloud import firestore
+
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            deltas = [(post_id, delta) for post_id, delta in pending.items() if delta]
+            posts_collection = db.collection("clubPosts")
+            for i in range(0, len(deltas), MAX_BATCH_WRITES):
+                chunk = deltas[i:i + MAX_BATCH_WRITES]
+                batch = db.batch()
+                for post_id, delta in chunk:
+                    batch.update(posts_collection.document(post_id), {"likesCount": firestore.Increment(delta)})
+                try:
+                    await batch.commit()
+                except google_exceptions.NotFound:
+                    # A post was deleted; write the rest one by one and drop its delta.
+                    error = None
+                    for j, (post_id, delta) in enumerate(chunk):
+                        try:
+                            await posts_collection.document(post_id).update(
+                                {"likesCount": firestore.Increment(delta)}
+                            )
+                        except google_exceptions.NotFound:
+                            self._known_posts.pop(post_id, None)
+                        except Exception as e:
+                            self._requeue([(post_id, delta)])
+                            error = error or e
+                        except BaseException:  # Cancelled, e.g. at shutdown: keep what's left for the last flush
+                            self._requeue(chunk[j:])
+                            self._requeue(deltas[i + MAX_BATCH_WRITES:])
+                            raise
+                    if error is not None:
+                        self._requeue(deltas[i + MAX_BATCH_WRITES:])
+                        raise error
+                except BaseException:
+                    self._requeue(deltas[i:])
+                    raise
+            return len(deltas)
+
+    async def flush_periodically(self, db: AsyncClient, interval_seconds: float = LIKE_FLUSH_SECONDS) -> None:
+        """Background task draining the write-behind buffer."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.flush(db)
+            except Exception as e:
+                log.exception("post_likes.flush_failed", error=str(e))
+
+
+post_likes = PostLikeStore()
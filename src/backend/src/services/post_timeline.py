@@ -0,0 +1,131 @@
+# File: backend/src/services/post_timeline.py
+from __future__ import annotations
+
+import asyncio
+import base64
+import heapq
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from cachetools import TTLCache
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+
+from CRUD.documents import as_utc
+from CRUD.posts import get_club_posts_after
+from models.club_post import ClubPost, PostFeedPage
+from services.collection_watch import DocumentChange, posts_watch
+
+# Newest posts kept in memory per club; first feed pages are merged from these.
+CLUB_HEAD_SIZE = 50
+CLUB_HEAD_TTL_SECONDS = 30
+MAX_CACHED_CLUBS = 5_000
+# Upper bound on per-club queries in flight for one feed page.
+MAX_CONCURRENT_CLUB_READS = 16
+
+# Timeline order is Firestore's: (timestamp, postId) descending, so pages never overlap.
+# A post's createdAt is the `timestamp` its club query ordered by.
+_SortKey = Tuple[datetime, str]
+
+
+def _sort_key(post: ClubPost) -> _SortKey:
+    return (post.createdAt, post.postId)
+
+
+def encode_cursor(post: ClubPost) -> str:
+    raw = f"{post.createdAt.isoformat()}|{post.postId}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> _SortKey:
+    """Inverse of encode_cursor; raises ValueError on malformed input."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        timestamp, post_id = raw.split("|", 1)
+        created_at = as_utc(datetime.fromisoformat(timestamp))
+    except Exception as e:
+        raise ValueError(f"Invalid feed cursor: {cursor}") from e
+    if not post_id:
+        raise ValueError(f"Invalid feed cursor: {cursor}")
+    return (created_at, post_id)
+
+
+class ClubPostTimeline:
+    """
+    Fan-out-on-read timeline: a page is a bounded k-way merge of per-club, newest-first lists.
+    Each club contributes at most `limit` posts older than the cursor. The newest posts of each
+    club are cached briefly, so first pages for popular clubs rarely touch Firestore; changes
+    from the shared `clubPosts` listener drop the cached posts of the clubs they touch.
+    """
+
+    def __init__(self, head_size: int = CLUB_HEAD_SIZE, head_ttl: float = CLUB_HEAD_TTL_SECONDS):
+        self.head_size = head_size
+        self._heads: TTLCache = TTLCache(maxsize=MAX_CACHED_CLUBS, ttl=head_ttl)
+
+    def invalidate_club(self, club_id: str) -> None:
+        self._heads.pop(club_id, None)
+
+    def _on_post_changes(self, changes: List[DocumentChange], initial: bool) -> None:
+        if initial:
+            # The listener (re)started and changes may have been missed: drop every cached head.
+            self._heads.clear()
+            return
+        deleted = set()
+        for post_id, data in changes:
+            if data is None:
+                deleted.add(post_id)
+            elif data.get("clubId"):
+                self.invalidate_club(data["clubId"])
+        if deleted:
+            # A deletion doesn't say which club the post was in; drop the heads that hold it.
+            for club_id, head in list(self._heads.items()):
+                if any(post.postId in deleted for post in head):
+                    self.invalidate_club(club_id)
+
+    def subscribe(self) -> None:
+        """Subscribes to the shared `clubPosts` listener; call before it starts, so its initial snapshot is seen."""
+        posts_watch.subscribe(self._on_post_changes)
+
+    async def _club_head(self, db: AsyncClient, club_id: str) -> List[ClubPost]:
+        head = self._heads.get(club_id)
+        if head is None:
+            head = await get_club_posts_after(db, club_id, None, self.head_size)
+            self._heads[club_id] = head
+        return head
+
+    async def _club_posts_after(
+        self, db: AsyncClient, club_id: str, cursor: Optional[_SortKey], limit: int
+    ) -> List[ClubPost]:
+        """Up to `limit` posts of one club that sort after `cursor`, newest first."""
+        head = await self._club_head(db, club_id)
+        older = [post for post in head if cursor is None or _sort_key(post) < cursor]
+        # The head is authoritative if it holds the club's whole history or enough posts past the cursor.
+        if len(older) >= limit or len(head) < self.head_size:
+            return older[:limit]
+        return await get_club_posts_after(db, club_id, cursor, limit)
+
+    async def page(
+        self,
+        db: AsyncClient,
+        club_ids: List[str],
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> PostFeedPage:
+        after = decode_cursor(cursor) if cursor else None
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_CLUB_READS)
+
+        async def read_club(club_id: str) -> List[ClubPost]:
+            async with semaphore:
+                # One extra per club tells us whether another page exists.
+                return await self._club_posts_after(db, club_id, after, limit + 1)
+
+        per_club = await asyncio.gather(*(read_club(club_id) for club_id in dict.fromkeys(club_ids)))
+        merged = heapq.merge(*per_club, key=_sort_key, reverse=True)
+        posts = [post for _, post in zip(range(limit + 1), merged)]
+
+        next_cursor = encode_cursor(posts[limit - 1]) if len(posts) > limit else None
+        return PostFeedPage(posts=posts[:limit], nextCursor=next_cursor)
+
+
+post_timeline = ClubPostTimeline()
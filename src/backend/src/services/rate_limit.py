@@ -0,0 +1,102 @@
+# File: backend/src/services/rate_limit.py
+import os
+import time
+from typing import Callable, List, NamedTuple, Sequence, Tuple
+
+from cachetools import TTLCache
+
+# Join/leave budgets. A user gets a burst of USER_BURST actions, refilled at
+# USER_RATE per second; each club absorbs CLUB_BURST at once and CLUB_RATE per second.
+MEMBERSHIP_USER_RATE = float(os.getenv("MEMBERSHIP_USER_RATE", "0.5"))
+MEMBERSHIP_USER_BURST = float(os.getenv("MEMBERSHIP_USER_BURST", "5"))
+MEMBERSHIP_CLUB_RATE = float(os.getenv("MEMBERSHIP_CLUB_RATE", "20"))
+MEMBERSHIP_CLUB_BURST = float(os.getenv("MEMBERSHIP_CLUB_BURST", "50"))
+
+# Idle buckets are dropped after this long; any bucket that refills within it is full
+# by then, so forgetting it changes nothing.
+IDLE_BUCKET_SECONDS = 300
+MAX_BUCKETS = 100_000
+
+
+class BucketLimit(NamedTuple):
+    rate: float  # Tokens added per second
+    burst: float  # Bucket capacity
+
+
+class RateLimitBackend:
+    """
+    Storage for token buckets. A backend must take tokens from all the given buckets
+    or from none of them, so one call can enforce several limits at once.
+    """
+
+    async def consume(self, buckets: Sequence[Tuple[str, BucketLimit]], tokens: float = 1) -> float:
+        """Takes `tokens` from every bucket and returns 0, or returns the seconds until that would succeed."""
+        raise NotImplementedError
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Buckets kept in this process. With several workers each one enforces its own
+    budget, so the effective limit is the configured one times the worker count.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = MAX_BUCKETS,
+        idle_seconds: float = IDLE_BUCKET_SECONDS,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self._timer = timer
+        # key -> [tokens, last refill time]
+        self._buckets: TTLCache = TTLCache(maxsize=maxsize, ttl=idle_seconds, timer=timer)
+
+    async def consume(self, buckets: Sequence[Tuple[str, BucketLimit]], tokens: float = 1) -> float:
+        # No awaits below, so checking and taking are atomic on the event loop.
+        now = self._timer()
+        states: List[list] = []
+        retry_after = 0.0
+        for key, limit in buckets:
+            state = self._buckets.get(key)
+            if state is None:
+                state = [limit.burst, now]
+            else:
+                state[0] = min(limit.burst, state[0] + (now - state[1]) * limit.rate)
+                state[1] = now
+            self._buckets[key] = state  # Re-inserting also resets the idle timer
+            states.append(state)
+            if state[0] < tokens:
+                retry_after = max(retry_after, (tokens - state[0]) / limit.rate if limit.rate > 0 else float("inf"))
+        if retry_after:
+            return retry_after
+        for state in states:
+            state[0] -= tokens
+        return 0.0
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend):
+        self.backend = backend
+        self.allowed = 0
+        self.limited = 0
+
+    async def check(self, buckets: Sequence[Tuple[str, BucketLimit]]) -> float:
+        """Returns 0 if the action may proceed, else the seconds the caller should wait."""
+        retry_after = await self.backend.consume(buckets)
+        if retry_after:
+            self.limited += 1
+        else:
+            self.allowed += 1
+        return retry_after
+
+
+# Swap `membership_rate_limiter.backend` for a shared store (e.g. Redis) to enforce
+# the budgets across workers.
+membership_rate_limiter = RateLimiter(MemoryRateLimitBackend())
+
+
+def membership_buckets(uid: str, club_id: str) -> List[Tuple[str, BucketLimit]]:
+    """The buckets one join or leave draws from: the user's and the club's."""
+    return [
+        (f"membership:user:{uid}", BucketLimit(MEMBERSHIP_USER_RATE, MEMBERSHIP_USER_BURST)),
+        (f"membership:club:{club_id}", BucketLimit(MEMBERSHIP_CLUB_RATE, MEMBERSHIP_CLUB_BURST)),
+    ]
@@ -0,0 +1,38 @@
+# File: backend/src/services/single_flight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: while a call for `key` is running, later
+    calls with the same key wait for it and get its result (or its exception)
+    instead of running again.
+    The shared call runs in its own task, so a caller that disconnects doesn't
+    cancel work the others are waiting on.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # Mark it retrieved even if every caller has gone away
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._calls), "executions": self.executions, "coalesced": self.coalesced}
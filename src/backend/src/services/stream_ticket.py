@@ -0,0 +1,84 @@
+# File: backend/src/services/stream_ticket.py
+# Short-lived tickets for opening GET /api/stream. The browser's EventSource can't send an
+# Authorization header, so the ticket travels in the URL instead of the ID token: it is only
+# good for opening a stream, for one user, once, for a few seconds.
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from typing import NamedTuple, Optional
+
+from cachetools import TTLCache
+
+from services.structured_log import get_logger
+
+# Must be the same on every worker behind the load balancer; without it each process signs
+# with its own random key and a ticket only works on the worker that issued it.
+STREAM_TICKET_SECRET = os.getenv("STREAM_TICKET_SECRET", "")
+STREAM_TICKET_TTL_SECONDS = 30
+# Tickets already redeemed by this process, kept until they would have expired anyway.
+MAX_REDEEMED_TICKETS = 100_000
+_PURPOSE = "stream"
+
+log = get_logger("stream_ticket")
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class IssuedTicket(NamedTuple):
+    ticket: str
+    expires_in: int
+
+
+class StreamTicketIssuer:
+    """
+    HMAC-signed tickets of the form `payload.signature`, where the payload carries the
+    uid, purpose, expiry and a nonce. Any worker sharing the secret can check one without
+    a lookup; each process refuses a ticket it has already redeemed.
+    """
+
+    def __init__(self, secret: str = STREAM_TICKET_SECRET, ttl_seconds: int = STREAM_TICKET_TTL_SECONDS):
+        if not secret:
+            log.warning("stream_ticket.ephemeral_secret", detail="STREAM_TICKET_SECRET is not set")
+            secret = secrets.token_hex(32)
+        self._key = secret.encode("utf-8")
+        self.ttl_seconds = ttl_seconds
+        self._redeemed: TTLCache = TTLCache(maxsize=MAX_REDEEMED_TICKETS, ttl=ttl_seconds + 1)
+
+    def _sign(self, payload: str) -> str:
+        return _b64(hmac.new(self._key, payload.encode("utf-8"), hashlib.sha256).digest())
+
+    def issue(self, uid: str, now: Optional[float] = None) -> IssuedTicket:
+        expires = int(now if now is not None else time.time()) + self.ttl_seconds
+        body = {"u": uid, "p": _PURPOSE, "e": expires, "n": secrets.token_urlsafe(12)}
+        payload = _b64(json.dumps(body, separators=(",", ":")).encode("utf-8"))
+        return IssuedTicket(f"{payload}.{self._sign(payload)}", self.ttl_seconds)
+
+    def redeem(self, ticket: str, now: Optional[float] = None) -> Optional[str]:
+        """The ticket's uid, or None if it is forged, expired, for something else, or already used."""
+        payload, _, signature = ticket.partition(".")
+        if not payload or not hmac.compare_digest(signature.encode("utf-8"), self._sign(payload).encode("utf-8")):
+            return None
+        body = json.loads(_unb64(payload))  # Signed by us, so well-formed
+        if body.get("p") != _PURPOSE or not body.get("u"):
+            return None
+        if float(body.get("e", 0)) < (now if now is not None else time.time()):
+            return None
+        if payload in self._redeemed:
+            return None
+        self._redeemed[payload] = True
+        return body["u"]
+
+
+stream_tickets = StreamTicketIssuer()
@@ -0,0 +1,109 @@
+# File: backend/src/services/structured_log.py
+# JSON-lines logging that never writes to stdout on the request path: handlers only
+# enqueue records, and a listener thread formats and writes them.
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Fraction of DEBUG records kept once DEBUG is enabled; hot paths log at DEBUG.
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))
+
+ROOT_LOGGER_NAME = "slugscene"
+logging.getLogger(ROOT_LOGGER_NAME).setLevel(LOG_LEVEL)
+
+
+class JsonLineFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        payload.update(getattr(record, "fields", None) or {})
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class _EnqueueOnlyHandler(QueueHandler):
+    """Defers formatting to the listener thread; only tracebacks are rendered up front."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            # The traceback's frames can change once the caller moves on.
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class StructuredLogger:
+    """
+    Logs an event name plus keyword fields, e.g. log.info("club.join", club_id=...).
+    Disabled levels cost one cached level check, and DEBUG records are sampled
+    before a record is even built.
+    """
+
+    def __init__(self, name: str):
+        self._logger = logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+    def debug(self, event: str, **fields: Any) -> None:
+        if self._logger.isEnabledFor(logging.DEBUG) and random.random() < LOG_DEBUG_SAMPLE_RATE:
+            self._log(logging.DEBUG, event, fields)
+
+    def info(self, event: str, **fields: Any) -> None:
+        if self._logger.isEnabledFor(logging.INFO):
+            self._log(logging.INFO, event, fields)
+
+    def warning(self, event: str, **fields: Any) -> None:
+        if self._logger.isEnabledFor(logging.WARNING):
+            self._log(logging.WARNING, event, fields)
+
+    def exception(self, event: str, **fields: Any) -> None:
+        """Logs at ERROR with the traceback of the exception being handled."""
+        self._log(logging.ERROR, event, fields, exc_info=True)
+
+    def _log(self, level: int, event: str, fields: Dict[str, Any], exc_info: bool = False) -> None:
+        self._logger.log(level, event, exc_info=exc_info, extra={"fields": fields})
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(name)
+
+
+_listener: Optional[QueueListener] = None
+
+
+def start_logging() -> None:
+    """Routes the app's loggers through the queue and starts the writer thread. Idempotent."""
+    global _listener
+    if _listener is not None:
+        return
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonLineFormatter())
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.addHandler(_EnqueueOnlyHandler(records))
+    root.propagate = False
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Flushes queued records and stops the writer thread."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()  # Drains the queue before returning
+    _listener = None
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    for handler in list(root.handlers):
+        if isinstance(handler, _EnqueueOnlyHandler):
+            root.removeHandler(handler)
+    root.propagate = True
@@ -0,0 +1,144 @@
+# File: backend/src/services/token_cache.py
+import asyncio
+import hashlib
+import time
+from typing import Any, Callable, Dict, Optional
+
+from cachetools import TLRUCache
+
+from services import firebase_service
+from services.structured_log import get_logger
+
+# Firebase ID tokens live for one hour; cached entries never outlive this
+# (nor the token's own `exp` claim, whichever comes first).
+DEFAULT_MAX_TOKENS = 10_000
+DEFAULT_TOKEN_TTL_SECONDS = 300
+# Google rotates the signing keys roughly daily; refreshing well inside the
+# Cache-Control max-age keeps a verification from ever waiting on the fetch.
+SIGNING_KEY_REFRESH_SECONDS = 60 * 60
+ID_TOKEN_CERT_URI = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/"
+    "securetoken@system.gserviceaccount.com"
+)
+
+log = get_logger("token_cache")
+
+
+class VerifiedTokenCache:
+    """
+    Bounded TTL/LRU cache of decoded ID token claims.
+    Keys are SHA-256 digests of the raw token so tokens are never held in memory.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_MAX_TOKENS,
+        ttl: float = DEFAULT_TOKEN_TTL_SECONDS,
+        timer: Callable[[], float] = time.time,
+    ):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Wall-clock seconds, the same scale as the tokens' `exp`.
+        self._cache: TLRUCache = TLRUCache(maxsize=maxsize, ttu=self._time_to_use, timer=timer)
+
+    def _time_to_use(self, _key: str, claims: Dict[str, Any], now: float) -> float:
+        expires_at = claims.get("exp")
+        ttl_deadline = now + self.ttl
+        if isinstance(expires_at, (int, float)):
+            return min(float(expires_at), ttl_deadline)
+        return ttl_deadline
+
+    @staticmethod
+    def _key(id_token: str) -> str:
+        return hashlib.sha256(id_token.encode("utf-8")).hexdigest()
+
+    def get(self, id_token: str) -> Optional[Dict[str, Any]]:
+        claims = self._cache.get(self._key(id_token))
+        if claims is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return claims
+
+    def put(self, id_token: str, claims: Dict[str, Any]) -> None:
+        self._cache[self._key(id_token)] = claims
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._cache),
+            "maxsize": int(self._cache.maxsize),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+token_cache = VerifiedTokenCache()
+
+
+async def verify_id_token_cached(id_token: str) -> Dict[str, Any]:
+    """
+    Returns the decoded claims for `id_token`, verifying it at most once per cache lifetime.
+    Signature checks run in a worker thread so the event loop is never blocked.
+    Raises the same errors as firebase_admin.auth.verify_id_token.
+    """
+    claims = token_cache.get(id_token)
+    if claims is not None:
+        return claims
+    # The Admin SDK is initialized by the startup warm-up; wait for it if it's still running.
+    await firebase_service.wait_until_ready()
+    import firebase_admin.auth
+
+    claims = await asyncio.to_thread(firebase_admin.auth.verify_id_token, id_token)
+    token_cache.put(id_token, claims)
+    return claims
+
+
+def _sdk_cert_request() -> Optional[Any]:
+    """
+    The HTTP transport the Admin SDK fetches signing certificates with, or None.
+    The SDK doesn't expose it, so it is looked up by attribute; if a library update
+    moves it, prefetching quietly stops and verifications fetch keys themselves.
+    """
+    import firebase_admin
+    import firebase_admin.auth
+    from google.auth.transport import Request
+
+    try:
+        client = firebase_admin.auth._get_client(firebase_admin.get_app())
+        request = client._token_verifier.request
+    except (AttributeError, ValueError):
+        return None
+    return request if isinstance(request, Request) else None
+
+
+def prefetch_signing_keys() -> bool:
+    """
+    GETs Google's public token-signing certificates through the Admin SDK's own
+    caching transport, so later verifications hit a warm cache.
+    Returns False (doing nothing) if that transport can't be found.
+    """
+    request = _sdk_cert_request()
+    if request is None:
+        return False
+    response = request(ID_TOKEN_CERT_URI, method="GET")
+    if response.status != 200:
+        raise RuntimeError(f"Signing key fetch returned HTTP {response.status}")
+    return True
+
+
+async def refresh_signing_keys_periodically(
+    interval_seconds: float = SIGNING_KEY_REFRESH_SECONDS,
+) -> None:
+    """Background task keeping the signing-key set fresh for the life of the app."""
+    while True:
+        try:
+            if not await asyncio.to_thread(prefetch_signing_keys):
+                log.warning("token_cache.signing_keys_prefetch_unavailable")
+                return
+        except Exception as e:
+            log.warning("token_cache.signing_keys_refresh_failed", error=str(e))
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,111 @@
+# File: backend/src/services/worker_lease.py
+# Lets one worker out of many run a background job, by holding a lease document.
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.async_client import AsyncClient
+
+from services.structured_log import get_logger
+
+LEASES_COLLECTION = "workerLeases"
+# A lease nobody renews for this long is free for another worker to take.
+LEASE_TTL_SECONDS = 60
+# The holder stops trusting its lease this long before it expires, to allow for
+# slow renewals and clock skew between workers.
+LEASE_SAFETY_SECONDS = 15
+
+log = get_logger("worker_lease")
+
+
+class LeaseLost(Exception):
+    """Raised by lease holders that notice mid-job that the lease is no longer theirs."""
+
+
+class WorkerLease:
+    """
+    A named lease in `workerLeases/{name}`: {owner, expiresAt}. Every worker tries to take it
+    and renew it; a transaction makes sure only one holds it at a time, and a crashed holder's
+    lease lapses after `ttl_seconds`. `held` goes False locally `safety_seconds` before the
+    lease could pass to someone else, so work should check it before each write.
+    """
+
+    def __init__(
+        self, name: str, ttl_seconds: float = LEASE_TTL_SECONDS, safety_seconds: float = LEASE_SAFETY_SECONDS
+    ):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.safety_seconds = safety_seconds
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._held_until = 0.0
+
+    @property
+    def held(self) -> bool:
+        return time.monotonic() < self._held_until
+
+    async def try_acquire(self, db: AsyncClient) -> bool:
+        """Takes the lease if it's free or expired, or renews it if it's ours. Returns whether we hold it."""
+        from google.cloud import firestore
+
+        lease_ref = db.collection(LEASES_COLLECTION).document(self.name)
+
+        @firestore.async_transactional
+        async def claim(transaction) -> bool:
+            data = {}
+            async for snapshot in db.get_all([lease_ref], transaction=transaction):
+                data = (snapshot.to_dict() or {}) if snapshot.exists else {}
+            now = datetime.now(timezone.utc)
+            expires_at = data.get("expiresAt")
+            if data.get("owner") not in (None, self.owner) and expires_at is not None and expires_at > now:
+                return False
+            transaction.set(lease_ref, {"owner": self.owner, "expiresAt": now + timedelta(seconds=self.ttl_seconds)})
+            return True
+
+        started = time.monotonic()
+        was_held = self.held
+        try:
+            acquired = await claim(db.transaction())
+        except Exception as e:
+            # A lease we hold stays ours until it expires; the next renewal may get through.
+            log.warning("lease.claim_failed", lease=self.name, error=str(e))
+            return self.held
+        # Counted from before the claim, so the local view never outlasts the stored expiry.
+        self._held_until = started + self.ttl_seconds - self.safety_seconds if acquired else 0.0
+        if acquired != was_held:
+            log.info("lease.acquired" if acquired else "lease.lost", lease=self.name, owner=self.owner)
+        return acquired
+
+    async def release(self, db: AsyncClient) -> None:
+        """Gives the lease up, if we hold it, so another worker can take over without waiting for expiry."""
+        from google.cloud import firestore
+
+        lease_ref = db.collection(LEASES_COLLECTION).document(self.name)
+        self._held_until = 0.0
+
+        @firestore.async_transactional
+        async def give_up(transaction) -> None:
+            async for snapshot in db.get_all([lease_ref], transaction=transaction):
+                if snapshot.exists and (snapshot.to_dict() or {}).get("owner") == self.owner:
+                    transaction.delete(lease_ref)
+
+        try:
+            await give_up(db.transaction())
+        except Exception as e:
+            log.warning("lease.release_failed", lease=self.name, error=str(e))
+
+    async def keep(self, db: AsyncClient) -> None:
+        """Background task: keeps trying to take the lease and renews it while held, releasing it when cancelled."""
+        try:
+            while True:
+                await self.try_acquire(db)
+                await asyncio.sleep(self.ttl_seconds / 4)
+        finally:
+            if self.held:
+                await asyncio.shield(self.release(db))
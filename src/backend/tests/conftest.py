@@ -0,0 +1,14 @@
+# File: backend/tests/conftest.py
+# Run from backend/: pip install -r requirements-dev.txt, then python -m pytest tests
+import os
+import sys
+
+import pytest
+
+# The app imports its packages from src/ (e.g. `from services import ...`).
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
@@ -0,0 +1,123 @@
+# A local fake of the Google Calendar API for the Calendar sync (services/gcal_service.py),
+# shared by tests/test_gcal_service.py and scripts/benchmark_gcal_sync.py.
+import json
+import random
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+class FakeCalendar:
+    """
+    Just enough of the Calendar API: batch insert/update/delete and incremental listing.
+    `requests` counts HTTP requests ("batch", "list") and `calls` the calls inside batches
+    by method; a fraction `error_rate` of calls fails with 503.
+    """
+
+    def __init__(self, error_rate: float = 0.0):
+        self.error_rate = error_rate
+        self.events = {}  # id -> (sequence, resource)
+        self.sequence = 0
+        self.requests = Counter()
+        self.calls = Counter()
+        self.lock = threading.Lock()
+        self.api_root = None  # Set by serve()
+
+    def write(self, resource):
+        self.sequence += 1
+        resource["updated"] = datetime.now(timezone.utc).isoformat()
+        self.events[resource["id"]] = (self.sequence, resource)
+
+    def call(self, method, path, body):
+        if random.random() < self.error_rate:
+            self.calls["503"] += 1
+            return 503, {"error": {"code": 503, "message": "Backend Error"}}
+        self.calls[method] += 1
+        with self.lock:
+            if method == "POST":
+                if body["id"] in self.events:
+                    return 409, {"error": {"code": 409, "message": "The requested identifier already exists."}}
+                self.write(dict(body))
+                return 200, body
+            event_id = unquote(path.rsplit("/", 1)[1])
+            current = self.events.get(event_id)
+            if current is None:
+                return 404, {"error": {"code": 404, "message": "Not Found"}}
+            if method == "PUT":
+                self.write(dict(body))
+                return 200, body
+            if current[1].get("status") == "cancelled":
+                return 410, {"error": {"code": 410, "message": "Resource has been deleted"}}
+            self.write({**current[1], "status": "cancelled"})
+            return 204, None
+
+    def list(self, query):
+        """A page of events changed since the sync token, or None if the token isn't valid (410 Gone)."""
+        with self.lock:
+            token = query.get("syncToken", ["sync-0"])[0]
+            if not token.startswith("sync-") or int(token[5:]) > self.sequence:
+                return None
+            since = int(token[5:])
+            changed = sorted((seq, resource) for seq, resource in self.events.values() if seq > since)
+            offset = int(query.get("pageToken", ["0"])[0])
+            size = int(query.get("maxResults", ["250"])[0])
+            page = {"items": [resource for _, resource in changed[offset:offset + size]]}
+            if offset + size < len(changed):
+                page["nextPageToken"] = str(offset + size)
+            else:
+                page["nextSyncToken"] = f"sync-{self.sequence}"
+            return page
+
+    def reset_counts(self):
+        self.requests.clear()
+        self.calls.clear()
+
+
+def serve(calendar: FakeCalendar) -> ThreadingHTTPServer:
+    """Serves `calendar` on a free local port from a daemon thread and sets its api_root; call shutdown() when done."""
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def reply(self, status, body, content_type="application/json"):
+            payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            calendar.requests["list"] += 1
+            page = calendar.list(parse_qs(urlparse(self.path).query))
+            if page is None:
+                self.reply(410, {"error": {"code": 410, "message": "Sync token is no longer valid."}})
+            else:
+                self.reply(200, page)
+
+        def do_POST(self):
+            calendar.requests["batch"] += 1
+            boundary = self.headers["Content-Type"].split("boundary=", 1)[1]
+            payload = self.rfile.read(int(self.headers["Content-Length"])).decode()
+            parts = []
+            for part in payload.split(f"--{boundary}")[1:-1]:
+                mime_headers, _, http_request = part.strip("\r\n").partition("\r\n\r\n")
+                content_id = [line for line in mime_headers.split("\r\n") if line.startswith("Content-ID")][0]
+                request_line, _, rest = http_request.partition("\r\n")
+                method, path, _ = request_line.split(" ")
+                body = rest.partition("\r\n\r\n")[2].strip()
+                status, result = calendar.call(method, path, json.loads(body) if body else None)
+                parts.append(
+                    f"--response\r\nContent-Type: application/http\r\n"
+                    f"Content-ID: <response-{content_id.split('<', 1)[1].rstrip('>')}>\r\n\r\n"
+                    f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n\r\n"
+                    f"{json.dumps(result) if result is not None else ''}\r\n"
+                )
+            self.reply(200, ("".join(parts) + "--response--\r\n").encode(), "multipart/mixed; boundary=response")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    calendar.api_root = f"http://127.0.0.1:{server.server_address[1]}"
+    return server
@@ -0,0 +1,176 @@
+# An in-memory Firestore with just what the services' tests use.
+import itertools
+from types import SimpleNamespace
+
+from google.api_core import exceptions as google_exceptions
+from google.cloud import firestore
+from google.cloud.firestore_v1 import transforms
+
+
+class Snapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class DocumentRef:
+    def __init__(self, db, path):
+        self._db = db
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+        parts = path.split("/")
+        owner = SimpleNamespace(id=parts[-3]) if len(parts) > 2 else None
+        self.parent = SimpleNamespace(id=parts[-2], parent=owner)
+
+    def collection(self, name):
+        return CollectionRef(self._db, f"{self.path}/{name}")
+
+    async def get(self):
+        return Snapshot(self, self._db.docs.get(self.path))
+
+    async def set(self, data, merge=False):
+        self._db.apply([("set_merge" if merge else "set", self, data)])
+
+    async def update(self, fields):
+        self._db.apply([("update", self, fields)])
+
+
+class CollectionRef:
+    def __init__(self, db, path, order=None, limit=None):
+        self._db = db
+        self.path = path
+        self._order = order
+        self._limit = limit
+
+    def document(self, doc_id):
+        return DocumentRef(self._db, f"{self.path}/{doc_id}")
+
+    def order_by(self, field):
+        return CollectionRef(self._db, self.path, field, self._limit)
+
+    def limit(self, count):
+        return CollectionRef(self._db, self.path, self._order, count)
+
+    def run(self):
+        prefix = self.path + "/"
+        docs = [
+            (path, data) for path, data in self._db.docs.items()
+            if path.startswith(prefix) and "/" not in path[len(prefix):] and self._order in data
+        ]
+        docs.sort(key=lambda item: item[1][self._order])
+        return [Snapshot(DocumentRef(self._db, path), data) for path, data in docs[:self._limit]]
+
+
+    async def stream(self):
+        prefix = self.path + "/"
+        for path, data in list(self._db.docs.items()):
+            if path.startswith(prefix) and "/" not in path[len(prefix):]:
+                yield Snapshot(DocumentRef(self._db, path), data)
+
+
+class CollectionGroup:
+    def __init__(self, db, name):
+        self._db = db
+        self._name = name
+
+    async def stream(self):
+        for path, data in list(self._db.docs.items()):
+            if path.split("/")[-2] == self._name:
+                yield Snapshot(DocumentRef(self._db, path), data)
+
+
+async def _iterate(items):
+    for item in items:
+        yield item
+
+
+class Transaction:
+    def __init__(self, db):
+        self._db = db
+        self._writes = []
+
+    async def get(self, query):
+        return _iterate(query.run())
+
+    def set(self, ref, data, merge=False):
+        self._writes.append(("set_merge" if merge else "set", ref, data))
+
+    def create(self, ref, data):
+        self._writes.append(("create", ref, data))
+
+    def update(self, ref, data):
+        self._writes.append(("update", ref, data))
+
+    def delete(self, ref):
+        self._writes.append(("delete", ref, None))
+
+    async def commit(self):
+        self._db.apply(self._writes)
+
+
+class FakeFirestore:
+    def __init__(self):
+        self.docs = {}
+        self._clock = itertools.count(1)
+
+    def collection(self, name):
+        return CollectionRef(self, name)
+
+    def collection_group(self, name):
+        return CollectionGroup(self, name)
+
+    def transaction(self, max_attempts=None):
+        return Transaction(self)
+
+    def batch(self):
+        return Transaction(self)
+
+    async def get_all(self, refs, transaction=None):
+        for ref in refs:
+            yield Snapshot(ref, self.docs.get(ref.path))
+
+    def _value(self, current, value):
+        if isinstance(value, transforms.Increment):
+            return (current or 0) + value.value
+        if isinstance(value, transforms.ArrayUnion):
+            return list(current or []) + [v for v in value.values if v not in (current or [])]
+        if isinstance(value, transforms.ArrayRemove):
+            return [v for v in current or [] if v not in value.values]
+        if value is firestore.SERVER_TIMESTAMP:
+            return next(self._clock)
+        return value
+
+    def apply(self, writes):
+        for kind, ref, data in writes:
+            current = self.docs.get(ref.path)
+            if kind == "delete":
+                self.docs.pop(ref.path, None)
+                continue
+            if kind == "create" and current is not None:
+                raise google_exceptions.AlreadyExists(ref.path)
+            if kind == "update" and current is None:
+                raise google_exceptions.NotFound(ref.path)
+            merged = dict(current or {}) if kind in ("update", "set_merge") else {}
+            for field, value in data.items():
+                if value is firestore.DELETE_FIELD:
+                    merged.pop(field, None)
+                else:
+                    merged[field] = self._value(merged.get(field), value)
+            self.docs[ref.path] = merged
+
+
+def patch_transactional(monkeypatch):
+    """Runs `firestore.async_transactional` functions once, committing their writes."""
+    def transactional(fn):
+        async def run(transaction, *args):
+            result = await fn(transaction, *args)
+            transaction._db.apply(transaction._writes)
+            return result
+        return run
+
+    monkeypatch.setattr(firestore, "async_transactional", transactional)
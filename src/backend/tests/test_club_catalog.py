@@ -0,0 +1,65 @@
+import asyncio
+
+from models.clubs import ClubResponse
+from services.club_catalog import ClubCatalog, ClubCatalogSnapshot
+
+
+def club(club_id, name, description="", category=(), members=0):
+    return ClubResponse(clubId=club_id, name=name, description=description,
+                        category=list(category), memberCount=members)
+
+
+SNAPSHOT = ClubCatalogSnapshot([
+    club("a", "Chess Club", "Weekly blitz and rapid games", ["Games"]),
+    club("b", "Robotics", "Build robots for competitions", ["Engineering"]),
+    club("c", "Go Club", "Board games from East Asia", ["Games"]),
+    club("d", "Rock Climbing", "Bouldering trips", ["Sports"]),
+])
+
+
+def ids(result):
+    clubs, next_cursor = result
+    return [c.clubId for c in clubs], next_cursor
+
+
+def test_every_query_word_matches_a_word_prefix():
+    assert ids(SNAPSHOT.query(q="games")) == (["a", "c"], None)
+    assert ids(SNAPSHOT.query(q="ro")) == (["b", "d"], None)  # Robotics, robots, Rock
+    assert ids(SNAPSHOT.query(q="BOARD ga")) == (["c"], None)
+    assert ids(SNAPSHOT.query(q="hess")) == ([], None)  # Not a word prefix
+    assert ids(SNAPSHOT.query(q="!!")) == ([], None)
+
+
+def test_word_matches_combine_with_category_and_cursor():
+    assert ids(SNAPSHOT.query(category="games", q="club", limit=1)) == (["a"], "a")
+    assert ids(SNAPSHOT.query(category="games", q="club", after="a")) == (["c"], None)
+
+
+def test_member_counts_are_patched_without_a_rebuild():
+    catalog = ClubCatalog()
+    catalog._snapshot, catalog._stale = SNAPSHOT, False
+    catalog.adjust_member_count("b", 1)
+    patched = catalog._snapshot
+    assert patched.get("b").memberCount == 1
+    assert SNAPSHOT.get("b").memberCount == 0  # Readers of the old snapshot are unaffected
+    assert catalog.current_version() not in (None, SNAPSHOT.version)
+    assert ids(patched.query(q="robots")) == (["b"], None)
+
+    other_worker = SNAPSHOT.with_member_count("b", 1)
+    assert other_worker.version == patched.version
+
+    catalog.adjust_member_count("new", 1)  # Not in the snapshot: rebuild on the next read
+    assert catalog.current_version() is None
+
+
+def test_a_change_during_a_rebuild_marks_the_snapshot_stale():
+    catalog = ClubCatalog()
+    catalog._snapshot, catalog._stale = SNAPSHOT, False
+
+    async def during_rebuild():
+        async with catalog._lock:
+            catalog.adjust_member_count("b", 1)
+
+    asyncio.run(during_rebuild())
+    assert catalog._snapshot is SNAPSHOT
+    assert catalog.current_version() is None
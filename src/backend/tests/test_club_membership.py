@@ -0,0 +1,112 @@
+import asyncio
+import math
+
+import pytest
+from fastapi import HTTPException
+
+from api.deps import AuthenticatedUser
+from api.endpoints import clubs
+from CRUD.documents import RequestDocumentCache
+from fake_firestore import FakeFirestore, patch_transactional
+from services.member_counter import member_counter
+from services.rate_limit import (
+    MEMBERSHIP_USER_BURST,
+    MEMBERSHIP_USER_RATE,
+    MemoryRateLimitBackend,
+    membership_rate_limiter,
+)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    patch_transactional(monkeypatch)
+    monkeypatch.setattr(member_counter, "num_shards", 0)
+    monkeypatch.setattr(membership_rate_limiter, "backend", MemoryRateLimitBackend())
+    fake = FakeFirestore()
+    fake.docs["clubs/chess"] = {"name": "Chess Club", "memberCount": 3}
+    fake.docs["users/ann"] = {"joinedClubs": []}
+    return fake
+
+
+async def join(db, club_id, uid="ann"):
+    return await clubs.join_club_endpoint(club_id, RequestDocumentCache(db), AuthenticatedUser(uid))
+
+
+async def leave(db, club_id, uid="ann"):
+    return await clubs.leave_club_endpoint(club_id, RequestDocumentCache(db), AuthenticatedUser(uid))
+
+
+@pytest.mark.anyio
+async def test_joining_twice_counts_the_member_once(db):
+    assert await join(db, "chess") == {"message": "Successfully joined club: Chess Club"}
+    assert await join(db, "chess") == {"message": "Already a member of club: Chess Club"}
+    assert db.docs["users/ann"]["joinedClubs"] == ["chess"]
+    assert db.docs["clubs/chess"]["memberCount"] == 4
+
+
+@pytest.mark.anyio
+async def test_leaving_a_club_the_user_is_not_in_changes_nothing(db):
+    assert await leave(db, "chess") == {"message": "Not a member of club: Chess Club"}
+    assert db.docs["users/ann"] == {"joinedClubs": []}
+    assert db.docs["clubs/chess"]["memberCount"] == 3
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("action", [join, leave])
+async def test_missing_user_is_not_found(db, action):
+    with pytest.raises(HTTPException) as raised:
+        await action(db, "chess", uid="nobody")
+    assert raised.value.status_code == 404
+    assert "users/nobody" not in db.docs
+    assert db.docs["clubs/chess"]["memberCount"] == 3
+
+
+@pytest.mark.anyio
+async def test_joining_a_missing_club_is_not_found(db):
+    with pytest.raises(HTTPException) as raised:
+        await join(db, "knitting")
+    assert raised.value.status_code == 404
+    assert db.docs["users/ann"] == {"joinedClubs": []}
+    assert "clubs/knitting" not in db.docs
+
+
+@pytest.mark.anyio
+async def test_join_and_leave_keep_the_user_and_the_count_in_step(db):
+    db.docs["users/bob"] = {"joinedClubs": ["chess"]}
+    for action, uid in ((join, "ann"), (leave, "bob"), (leave, "bob"), (leave, "ann"), (join, "bob"), (join, "ann")):
+        await action(db, "chess", uid=uid)
+        members = sum("chess" in db.docs[f"users/{member}"]["joinedClubs"] for member in ("ann", "bob"))
+        assert db.docs["clubs/chess"]["memberCount"] == 3 - 1 + members  # bob was counted in the initial 3
+    assert db.docs["clubs/chess"]["memberCount"] == 4
+
+
+@pytest.mark.anyio
+async def test_identical_joins_in_flight_share_one_transaction(db, monkeypatch):
+    transactions = []
+    run_transaction = clubs._run_transaction
+
+    async def counting_run_transaction(callback, *args):
+        transactions.append(callback.__name__)
+        return await run_transaction(callback, *args)
+
+    monkeypatch.setattr(clubs, "_run_transaction", counting_run_transaction)
+    allowed = membership_rate_limiter.allowed
+    results = await asyncio.gather(*(join(db, "chess") for _ in range(3)))
+    assert results == [{"message": "Successfully joined club: Chess Club"}] * 3
+    assert transactions == ["_join_club_transaction_callback"]
+    assert db.docs["clubs/chess"]["memberCount"] == 4
+    assert membership_rate_limiter.allowed == allowed + 1  # The shared call is charged once
+
+    await join(db, "chess")  # Once it's done, the next join runs on its own
+    assert len(transactions) == 2
+
+
+@pytest.mark.anyio
+async def test_membership_changes_past_the_burst_get_429_with_retry_after(db):
+    for i in range(int(MEMBERSHIP_USER_BURST)):
+        await (join if i % 2 == 0 else leave)(db, "chess")
+    with pytest.raises(HTTPException) as raised:
+        await leave(db, "chess")
+    assert raised.value.status_code == 429
+    assert raised.value.headers == {"Retry-After": str(math.ceil(1 / MEMBERSHIP_USER_RATE))}  # Until one token is back
+    assert db.docs["users/ann"]["joinedClubs"] == ["chess"]  # The rejected leave changed nothing
@@ -0,0 +1,64 @@
+import os
+import pickle
+import zlib
+
+import pytest
+
+from models.clubs import ClubResponse
+from services.club_catalog import ClubCatalogSnapshot
+from services.club_search import ClubSearch
+
+
+def club(club_id, name, description="", category=(), members=0):
+    return ClubResponse(clubId=club_id, name=name, description=description,
+                        category=list(category), memberCount=members)
+
+
+SNAPSHOT = ClubCatalogSnapshot([
+    club("chess", "Chess Club", "Weekly blitz and rapid games", ["Games"]),
+    club("robotics", "Robotics", "Build robots for competitions", ["Engineering"]),
+    club("go", "Go Club", "Board games from East Asia", ["Games"]),
+])
+
+
+def test_member_count_changes_do_not_resync_the_index(monkeypatch):
+    search = ClubSearch(snapshot_path=None)
+    assert search.sync(SNAPSHOT) == 3
+    full_syncs = []
+    monkeypatch.setattr(search.index, "sync", lambda clubs, version=None: full_syncs.append(version) or 0)
+    patched = SNAPSHOT.with_member_count("go", 5)
+    assert patched.version != SNAPSHOT.version
+    assert search.sync(patched) == 0
+    assert full_syncs == []  # Not even a walk over the catalog
+    assert [(c.clubId, c.memberCount) for c in search.search(patched, "board")] == [("go", 5)]
+
+
+@pytest.mark.anyio
+async def test_snapshot_round_trip_gives_the_same_index(tmp_path):
+    path = str(tmp_path / "search.snapshot")
+    search = ClubSearch(snapshot_path=path)
+    search.sync(SNAPSHOT)
+    search.index.remove("robotics")  # A freed slot survives the round trip too
+    await search.save_snapshot()
+
+    loaded = ClubSearch(snapshot_path=path)
+    assert await loaded.load_snapshot()
+    assert loaded.index.version == SNAPSHOT.base_version
+    for query in ("games", "club", "boar", "chses"):
+        assert loaded.index.search(query) == search.index.search(query)
+    assert not loaded.index.upsert("go", ("Go Club", "Board games from East Asia", ("Games",)))  # Unchanged
+
+
+@pytest.mark.anyio
+async def test_snapshots_that_are_not_ours_are_ignored(tmp_path):
+    path = tmp_path / "search.snapshot"
+    search = ClubSearch(snapshot_path=str(path))
+    path.write_bytes(zlib.compress(pickle.dumps({"format": 1})))  # The old, executable format
+    assert not await search.load_snapshot()
+
+    search.sync(SNAPSHOT)
+    await search.save_snapshot()
+    os.chmod(path, 0o666)  # Anyone could have replaced it
+    assert not await ClubSearch(snapshot_path=str(path)).load_snapshot()
+    os.chmod(path, 0o644)
+    assert await ClubSearch(snapshot_path=str(path)).load_snapshot()
@@ -0,0 +1,13 @@
+from models.clubs import dump_clubs_json, validate_club_payloads
+
+
+def test_malformed_clubs_are_skipped_and_the_rest_kept_in_order():
+    payloads = [
+        {"clubId": "a", "name": "A", "description": "", "logoURL": "https://example.com/a.png"},
+        {"clubId": "b", "name": "B", "description": "", "memberCount": "lots"},
+        {"clubId": "c", "name": "C", "description": "", "logoURL": "not a url"},
+        {"clubId": "d", "name": "D", "description": ""},
+    ]
+    clubs = validate_club_payloads(payloads)
+    assert [club.clubId for club in clubs] == ["a", "d"]
+    assert dump_clubs_json(clubs).startswith(b'[{"name":"A"')
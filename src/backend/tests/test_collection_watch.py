@@ -0,0 +1,170 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from services.club_cache import ClubDocumentCache
+from services.collection_watch import CollectionWatch, _Listener
+
+
+def change(doc_id, data=None, kind="ADDED", version=1):
+    document = SimpleNamespace(id=doc_id, to_dict=lambda: data, update_time=version)
+    return SimpleNamespace(type=SimpleNamespace(name=kind), document=document)
+
+
+class FakeListener:
+    is_active = True
+
+    def unsubscribe(self):
+        self.is_active = False
+
+
+def attach(watch, listener_id=1, since=None):
+    """Stands in for `_open`: a started listener, without Firestore."""
+    watch._loop = asyncio.get_running_loop()
+    return _Listener(listener_id, FakeListener(), since, time.monotonic())
+
+
+async def deliver(watch, changes, listener_id=1):
+    """Feeds a snapshot callback the way the listener thread would, then lets the loop run it."""
+    watch._on_snapshot(listener_id, None, changes, None)
+    await asyncio.sleep(0)
+
+
+@pytest.mark.anyio
+async def test_first_batch_is_initial_and_parse_runs_before_subscribers():
+    watch = CollectionWatch("things", parse=lambda changes: [(doc_id, data and data["n"] * 2) for doc_id, data in changes])
+    watch._active = attach(watch)
+    seen = []
+    watch.subscribe(lambda updates, initial: seen.append((updates, initial)))
+    await deliver(watch, [change("a", {"n": 1}), change("b", {"n": 2})])
+    await deliver(watch, [change("a", {"n": 5}, "MODIFIED", version=2), change("b", {"n": 2}, "REMOVED")])
+    assert seen == [([("a", 2), ("b", 4)], True), ([("a", 10), ("b", None)], False)]
+
+
+@pytest.mark.anyio
+async def test_stopping_a_live_listener_notifies_and_the_next_batch_is_initial_again():
+    watch = CollectionWatch("things")
+    stopped, initials = [], []
+    watch.subscribe_stopped(lambda: stopped.append(True))
+    watch.subscribe(lambda updates, initial: initials.append(initial))
+    watch._active = first = attach(watch)
+    await deliver(watch, [change("a", {})])
+    watch.stop_listener()
+    watch.stop_listener()  # Already stopped: no second notification
+    assert not first.watch.is_active
+    await deliver(watch, [change("a", {})])  # Late callback from the stopped listener: ignored
+    watch._active = attach(watch, listener_id=2)
+    await deliver(watch, [change("a", {})], listener_id=2)
+    assert stopped == [True]
+    assert initials == [True, True]
+
+
+@pytest.mark.anyio
+async def test_rescope_passes_on_only_newer_versions_and_reports_dropped_documents():
+    since = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    watch = CollectionWatch("events", time_field="endTime")
+    seen, dropped, stopped = [], [], []
+    watch.subscribe(lambda updates, initial: seen.append((updates, initial)))
+    watch.subscribe_dropped(dropped.append)
+    watch.subscribe_stopped(lambda: stopped.append(True))
+    watch._active = old = attach(watch)
+    await deliver(watch, [change("old", {"v": 1}), change("same", {"v": 1}), change("edited", {"v": 1})])
+
+    watch._standby = attach(watch, listener_id=2, since=since)
+    # The old listener passes on an edit before the new one delivers its first snapshot.
+    await deliver(watch, [change("same", {"v": 2}, "MODIFIED", version=2)])
+    await deliver(watch, [
+        change("same", {"v": 2}, version=2),
+        change("edited", {"v": 3}, version=3),
+        change("new", {"v": 1}),
+    ], listener_id=2)
+    assert seen[1:] == [
+        ([("same", {"v": 2})], False),
+        ([("edited", {"v": 3}), ("new", {"v": 1})], False),
+    ]
+    assert dropped == [["old"]]
+    assert watch.since == since and watch.listening and stopped == []
+    assert not old.watch.is_active
+
+    await deliver(watch, [change("late", {})])  # From the replaced listener: ignored
+    await deliver(watch, [change("new", {"v": 1})], listener_id=2)  # Already passed on
+    await deliver(watch, [change("edited", None, "REMOVED")], listener_id=2)
+    assert seen[3:] == [([("edited", None)], False)]
+    assert set(watch._versions) == {"same", "new"}
+
+
+@pytest.mark.anyio
+async def test_club_cache_is_fed_by_its_watch_and_cleared_when_it_stops():
+    cache = ClubDocumentCache()
+    cache._watch._active = attach(cache._watch)
+    forwarded = []
+    cache.subscribe(lambda updates, initial: forwarded.append(([club_id for club_id, _ in updates], initial)))
+    await deliver(cache._watch, [
+        change("chess", {"name": "Chess Club", "description": "Chess"}),
+        change("broken", {"name": "No description"}),
+    ])
+    assert cache.listening
+    assert cache._entries["chess"].club.name == "Chess Club"
+    assert cache._entries["broken"].club is None  # Stored, but not a valid ClubResponse
+    await deliver(cache._watch, [change("chess", None, "REMOVED")])
+    assert cache._entries["chess"] is None
+    assert forwarded == [(["chess", "broken"], True), (["chess"], False)]
+
+    cache._watch.stop_listener()
+    assert not cache.listening
+    assert len(cache._entries) == 0
+
+
+@pytest.mark.anyio
+async def test_club_cache_read_does_not_overwrite_a_newer_listener_update(monkeypatch):
+    cache = ClubDocumentCache()
+    cache._watch._active = attach(cache._watch)
+    await deliver(cache._watch, [])
+    fetch_started, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_read(db, collection, doc_ids):
+        fetch_started.set()
+        await release.wait()
+        return [{"name": "Old Name", "description": "Chess"} for _ in doc_ids]
+
+    monkeypatch.setattr("services.club_cache.get_documents_by_ids", slow_read)
+    read = asyncio.create_task(cache.get_many(None, ["chess", "go"]))
+    await fetch_started.wait()
+    await deliver(cache._watch, [change("chess", {"name": "New Name", "description": "Chess"}, "MODIFIED")])
+    release.set()
+    chess, go = await read
+    assert chess.club.name == "New Name"
+    assert cache._entries["chess"].club.name == "New Name"
+    assert go.club.name == "Old Name" and cache._entries["go"] is go  # Unchanged meanwhile: cached
+
+
+@pytest.mark.anyio
+async def test_listener_restarts_reuse_one_client_that_close_firestore_closes(monkeypatch):
+    from google.cloud import firestore
+
+    from services import firebase_service
+
+    created = []
+
+    class FakeClient:
+        def __init__(self, project):
+            self.project, self.closed = project, False
+            created.append(self)
+
+        def collection(self, name):
+            return SimpleNamespace(on_snapshot=lambda callback: FakeListener())
+
+        def close(self):
+            self.closed = True
+
+    monkeypatch.setattr(firestore, "Client", FakeClient)
+    watch = CollectionWatch("things")
+    db = SimpleNamespace(project="demo")
+    watch._start_listener(db, 1, None)
+    watch._start_listener(db, 2, None)
+    assert len(created) == 1 and created[0].project == "demo"
+    await firebase_service.close_firestore()
+    assert created[0].closed and firebase_service._listener_client is None
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import services.event_calendar as event_calendar
+from models.event import Event
+from services.collection_watch import _Listener, events_watch
+from services.event_calendar import CAMPUS_TIMEZONE, EventCalendarFeed, month_bounds
+
+SINCE = datetime(2026, 3, 15, tzinfo=timezone.utc)
+
+
+def event_data(day, club_id="chess"):
+    start = datetime(2026, 4, day, 18, tzinfo=CAMPUS_TIMEZONE)
+    return {"clubId": club_id, "name": "Meeting", "startTime": start, "endTime": start + timedelta(hours=2)}
+
+
+@pytest.fixture
+def watching(monkeypatch):
+    monkeypatch.setattr(events_watch, "_active", _Listener(1, None, SINCE, 0.0))
+
+
+def test_month_bounds_are_local_and_roll_over_the_year():
+    assert month_bounds("2026-12") == (
+        datetime(2026, 12, 1, tzinfo=CAMPUS_TIMEZONE),
+        datetime(2027, 1, 1, tzinfo=CAMPUS_TIMEZONE),
+    )
+
+
+@pytest.mark.anyio
+async def test_months_inside_the_listener_window_follow_its_changes(watching):
+    feed = EventCalendarFeed()
+    assert feed.current_version("2026-04") is None  # Not listening yet
+    feed._on_event_changes([("a", event_data(2)), ("b", event_data(3))], True)
+    version = feed.current_version("2026-04")
+    assert (await feed.get_month(None, "2026-04")).totalEvents == 2
+
+    feed._on_event_changes([("a", None), ("c", event_data(9))], False)
+    april = await feed.get_month(None, "2026-04")
+    assert [day.date.day for day in april.days] == [3, 9]
+    assert feed.current_version("2026-04") != version
+
+    feed._on_listener_stopped()
+    assert feed.current_version("2026-04") is None
+
+
+@pytest.mark.anyio
+async def test_older_months_are_read_on_demand_and_cached(watching, monkeypatch):
+    reads = []
+
+    async def fake_query(_db, start, end):
+        reads.append((start, end))
+        start = datetime(2026, 2, 28, 23, tzinfo=CAMPUS_TIMEZONE)  # Runs into March
+        return [Event(eventId="late", clubId="chess", name="Late", description="", startTime=start,
+                      endTime=start + timedelta(hours=3), location="")]
+
+    monkeypatch.setattr(event_calendar, "get_events_starting_between", fake_query)
+    feed = EventCalendarFeed()
+    feed._on_event_changes([], True)
+    march = await feed.get_month(None, "2026-03")  # Starts before the listener's window
+    await feed.get_month(None, "2026-03")
+    assert [day.date.day for day in march.days] == [1]
+    assert feed.current_version("2026-03") is None
+    assert reads == [(datetime(2026, 3, 1, tzinfo=CAMPUS_TIMEZONE) - timedelta(days=62),
+                      datetime(2026, 4, 1, tzinfo=CAMPUS_TIMEZONE))]
@@ -0,0 +1,59 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import services.event_index as event_index
+from models.event import Event
+from services.event_index import EventFeed
+
+NOW = datetime.now(timezone.utc)
+
+
+def event_data(club_id, hours_from_now, name="Meeting"):
+    start = NOW + timedelta(hours=hours_from_now)
+    return {"clubId": club_id, "name": name, "startTime": start, "endTime": start + timedelta(hours=1)}
+
+
+def test_listener_changes_are_applied_without_a_reload():
+    feed = EventFeed()
+    assert feed.current_version() is None  # Nothing loaded yet
+    feed._on_event_changes([("a", event_data("chess", 1)), ("old", event_data("chess", -48))], True)
+    assert [event.eventId for event in feed.index.range()] == ["a"]
+    version = feed.current_version()
+    assert version is not None
+
+    feed._on_event_changes([("b", event_data("go", 2)), ("a", event_data("chess", 3, name="Moved"))], False)
+    assert [event.eventId for event in feed.index.range()] == ["b", "a"]
+    assert feed.index.get("a").name == "Moved"
+    assert feed.current_version() not in (None, version)
+
+    feed._on_event_changes([("b", None)], False)
+    assert [event.eventId for event in feed.index.range()] == ["a"]
+
+
+@pytest.mark.anyio
+async def test_changes_during_a_reload_are_replayed_onto_it(monkeypatch):
+    feed = EventFeed()
+    read = asyncio.Event()
+    release = asyncio.Event()
+
+    async def fake_query(_db, _start):
+        read.set()
+        await release.wait()
+        start = NOW + timedelta(hours=1)
+        return [
+            Event(eventId="a", clubId="chess", name="Stale", description="", startTime=start,
+                  endTime=start + timedelta(hours=1), location=""),
+            Event(eventId="gone", clubId="chess", name="Deleted", description="", startTime=start,
+                  endTime=start + timedelta(hours=1), location=""),
+        ]
+
+    monkeypatch.setattr(event_index, "get_events_ending_after", fake_query)
+    reload = asyncio.create_task(feed.reload(None))
+    await read.wait()
+    feed._on_event_changes([("a", event_data("chess", 1, name="Fresh")), ("gone", None)], False)
+    release.set()
+    index = await reload
+    assert [event.eventId for event in index.range()] == ["a"]
+    assert index.get("a").name == "Fresh"
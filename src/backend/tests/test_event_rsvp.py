@@ -0,0 +1,64 @@
+import pytest
+
+from fake_firestore import FakeFirestore, patch_transactional
+from services.event_rsvp import GOING, WAITLISTED, EventRsvpStore, shard_capacities
+
+
+@pytest.fixture
+def db(monkeypatch):
+    patch_transactional(monkeypatch)
+    fake = FakeFirestore()
+    fake.docs["events/talk"] = {"capacity": 1}
+    for uid in ("ann", "bob"):
+        fake.docs[f"users/{uid}"] = {"eventsAttend": []}
+    return fake
+
+
+def test_shard_capacities_split_seats_across_shards():
+    assert shard_capacities(25, 10) == [3, 3, 3, 3, 3, 2, 2, 2, 2, 2]
+    assert shard_capacities(3, 10) == [1, 1, 1]  # No shard without a seat
+    assert shard_capacities(0, 10) == [0]
+    assert shard_capacities(None, 3) == [None, None, None]
+
+
+@pytest.mark.anyio
+async def test_cancel_hands_the_seat_to_the_oldest_waitlisted(db):
+    store = EventRsvpStore(num_shards=4)
+    assert await store.rsvp(db, "talk", "ann", 1) == (GOING, True)
+    assert await store.rsvp(db, "talk", "bob", 1) == (WAITLISTED, True)
+    assert await store.rsvp(db, "talk", "cat", 1) == (WAITLISTED, True)
+    assert await store.rsvp(db, "talk", "bob", 1) == (WAITLISTED, False)
+
+    assert await store.cancel(db, "talk", "ann")
+    assert await store.get_status(db, "talk", "bob") == GOING
+    assert await store.get_status(db, "talk", "cat") == WAITLISTED
+    assert await store.get_counts(db, "talk", fresh=True) == (1, 1)
+    assert db.docs["users/ann"]["eventsAttend"] == []
+    assert db.docs["users/bob"]["eventsAttend"] == ["talk"]
+    assert "users/cat" not in db.docs  # No partial users document for a user without one
+
+
+@pytest.mark.anyio
+async def test_a_seat_freed_on_another_worker_is_taken_not_waitlisted(db):
+    this_worker, other_worker = EventRsvpStore(num_shards=4), EventRsvpStore(num_shards=4)
+    await this_worker.rsvp(db, "talk", "ann", 1)
+    await this_worker.get_counts(db, "talk")  # Cached: one going, so full
+    assert this_worker.is_full("talk", 1)
+    await other_worker.cancel(db, "talk", "ann")  # Nobody waiting: the seat is just freed
+    assert this_worker.is_full("talk", 1)  # ...which this worker hasn't seen
+    assert await this_worker.rsvp(db, "talk", "bob", 1) == (GOING, True)
+
+
+@pytest.mark.anyio
+async def test_flush_promotes_waitlisted_rsvps_when_seats_are_free(db):
+    store = EventRsvpStore(num_shards=4)
+    await store.rsvp(db, "talk", "ann", 1)
+    await store.rsvp(db, "talk", "bob", 1)
+    db.docs["events/talk"]["capacity"] = 2  # More seats, with someone already waiting
+    store._capacities.clear()
+    store._dirty.add("talk")
+    await store.flush(db)
+    assert await store.get_status(db, "talk", "bob") == GOING
+    assert store.promoted == 1
+    await store.flush(db)  # The promotion's counts are written on the next flush
+    assert (db.docs["events/talk"]["attendeeCount"], db.docs["events/talk"]["waitlistCount"]) == (2, 0)
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+
+from models.event import Event
+from services.event_index import EventIndex
+from services.event_schedule import build_schedule, find_conflicts
+
+T0 = datetime(2026, 5, 1, 12, tzinfo=timezone.utc)
+
+
+def event(event_id, club_id, start_hours, end_hours, **fields):
+    return Event(
+        eventId=event_id, clubId=club_id, name="Meeting", description="", location="",
+        startTime=T0 + timedelta(hours=start_hours), endTime=T0 + timedelta(hours=end_hours), createdAt=T0, **fields,
+    )
+
+
+def test_sweep_finds_each_overlapping_pair_once():
+    intervals = [
+        (0.0, 10.0, "long"),
+        (1.0, 2.0, "a"),
+        (2.0, 3.0, "touches-a"),  # Starts as `a` ends: no overlap with it
+        (2.5, 2.5, "instant"),  # Zero-length, inside `long` and `touches-a`
+        (11.0, 12.0, "alone"),
+    ]
+    conflicts, pairs = find_conflicts(intervals)
+    assert conflicts == [[1, 2, 3], [0], [0, 3], [0, 2], []]
+    assert pairs == 4
+
+
+def test_schedule_merges_clubs_and_keeps_running_multi_day_events():
+    index = EventIndex([
+        event("retreat", "hiking", -48, 24),  # Started two days ago, still running
+        event("done", "hiking", -5, -1),
+        event("chess-night", "chess", 2, 4),
+        event("go-night", "go", 3, 5),
+        event("unjoined", "fencing", 2, 4),
+    ])
+    schedule = build_schedule(index, ["chess", "hiking", "go", "chess"], T0, T0 + timedelta(days=7))
+    assert [item.event.eventId for item in schedule.events] == ["retreat", "chess-night", "go-night"]
+    assert schedule.events[0].conflictsWith == ["chess-night", "go-night"]
+    assert schedule.conflictCount == 3
+
+
+def test_expiry_is_by_end_time_and_only_touches_affected_clubs():
+    index = EventIndex([
+        event("retreat", "hiking", -48, 24),
+        event("done", "chess", -30, -26),
+        event("go-night", "go", 3, 5),
+    ])
+    for club_id in ("hiking", "chess", "go"):
+        index.club_intervals(club_id)
+    assert index.expire_before(T0 - timedelta(days=1)) == 1
+    assert index.get("retreat") is not None and index.get("done") is None
+    assert set(index._club_intervals) == {"hiking", "go"}
+
+
+def test_same_slot_edits_keep_the_club_interval_list():
+    index = EventIndex([event("chess-night", "chess", 2, 4), event("go-night", "go", 3, 5)])
+    cached = index.club_intervals("chess")
+    version = index.version
+    index.upsert(event("chess-night", "chess", 2, 4, attendeeCount=12))
+    assert index.club_intervals("chess") is cached
+    assert index.get("chess-night").attendeeCount == 12 and index.version > version
+
+    index.upsert(event("chess-night", "chess", 6, 7))
+    assert index.club_intervals("chess") is not cached
+
+    go = index.club_intervals("go")
+    assert index.sync([event("chess-night", "chess", 6, 7), event("go-night", "go", 3, 5)]) == 0
+    assert index.club_intervals("go") is go
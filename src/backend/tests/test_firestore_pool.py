@@ -0,0 +1,61 @@
+import pytest
+from google.auth.credentials import AnonymousCredentials
+from grpc import aio
+
+import services.firestore_pool as firestore_pool
+from services.firestore_pool import TunedAsyncClient
+
+
+@pytest.fixture
+def channels(monkeypatch):
+    monkeypatch.delenv("FIRESTORE_EMULATOR_HOST", raising=False)
+    created = []
+
+    def create_channel(self):
+        created.append(self)
+        return aio.insecure_channel("localhost:1")
+
+    monkeypatch.setattr(TunedAsyncClient, "_create_channel", create_channel)
+    return created
+
+
+def client():
+    return TunedAsyncClient(project="demo", credentials=AnonymousCredentials(),
+                            channel_options={"grpc.keepalive_time_ms": 1234})
+
+
+@pytest.mark.anyio
+async def test_supported_sdk_gets_the_tuned_channel(channels):
+    db = client()
+    assert db._tuned
+    assert db._firestore_api is not None
+    assert channels == [db]
+    await db.close()
+
+
+@pytest.mark.anyio
+async def test_unknown_sdk_versions_fall_back_to_the_stock_channel(channels, monkeypatch):
+    monkeypatch.setattr(firestore_pool, "firestore_version", "3.0.0")
+    db = client()
+    assert not db._tuned
+    assert db._firestore_api is not None  # Built by the SDK itself
+    assert channels == []
+    await db.close()
+
+
+@pytest.mark.anyio
+async def test_emulator_channels_get_the_channel_options(monkeypatch):
+    # Without them every pooled client shares one connection to the emulator.
+    monkeypatch.setenv("FIRESTORE_EMULATOR_HOST", "localhost:1")
+    seen = {}
+    insecure_channel = aio.insecure_channel
+
+    def record(target, options=None, interceptors=None):
+        seen.update(options)
+        return insecure_channel(target, options=options, interceptors=interceptors)
+
+    monkeypatch.setattr(firestore_pool.aio, "insecure_channel", record)
+    db = client()
+    assert db._firestore_api is not None
+    assert seen["grpc.keepalive_time_ms"] == 1234
+    await db.close()
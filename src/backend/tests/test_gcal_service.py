@@ -0,0 +1,136 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from google.auth.credentials import AnonymousCredentials
+
+from CRUD.events import event_from_firestore
+from fake_calendar import FakeCalendar, serve
+from fake_firestore import FakeFirestore
+from services.gcal_service import (
+    SYNC_STATE_COLLECTION,
+    SYNC_STATE_DOCUMENT,
+    GoogleCalendarSync,
+    _decode_batch,
+    gcal_event_id,
+    gcal_resource,
+)
+
+CALENDAR_ID = "test@group.calendar.google.com"
+
+
+def test_gcal_event_ids_are_valid_deterministic_and_distinct():
+    ids = [gcal_event_id(event_id) for event_id in ("a", "A", "evt_01/ü", "x" * 200)]
+    for gcal_id in ids:
+        assert re.fullmatch(r"[a-v0-9]{5,1024}", gcal_id)  # Calendar's event ID rules
+    assert len(set(ids)) == len(ids)
+    assert gcal_event_id("a") == ids[0]
+
+
+def test_decode_batch_maps_parts_back_to_calls():
+    payload = (
+        b"--batch_xyz\r\n"
+        b"Content-Type: application/http\r\n"
+        b"Content-ID: <response-item1>\r\n\r\n"
+        b"HTTP/1.1 404 Not Found\r\n"
+        b"Content-Type: application/json\r\n\r\n"
+        b'{"error": {"code": 404}}\r\n'
+        b"--batch_xyz\r\n"
+        b"Content-Type: application/http\r\n"
+        b"Content-ID: <response-item0>\r\n\r\n"
+        b"HTTP/1.1 204 No Content\r\n\r\n\r\n"
+        b"--batch_xyz--\r\n"
+    )
+    results = _decode_batch('multipart/mixed; boundary="batch_xyz"', payload, 3)
+    assert results == [(204, None), (404, {"error": {"code": 404}}), (0, None)]
+
+
+@pytest.fixture
+def calendar():
+    calendar = FakeCalendar()
+    server = serve(calendar)
+    yield calendar
+    server.shutdown()
+
+
+def _engine(calendar) -> GoogleCalendarSync:
+    engine = GoogleCalendarSync(calendar_id=CALENDAR_ID, api_root=calendar.api_root, credentials=AnonymousCredentials())
+    engine.listening = True  # The documents are fed in directly instead of by the listener
+    return engine
+
+
+def _add_events(db, count):
+    start = datetime(2030, 1, 1, 18, tzinfo=timezone.utc)
+    for i in range(count):
+        db.docs[f"events/event-{i}"] = {
+            "clubId": f"club-{i % 20}", "title": f"Event {i}", "description": "Weekly meeting",
+            "location": "Quarry Plaza", "startTime": start + timedelta(hours=i), "endTime": start + timedelta(hours=i + 2),
+        }
+
+
+def _changes(db, event_ids=None):
+    return [
+        (path.split("/", 1)[1], dict(data)) for path, data in db.docs.items()
+        if path.startswith("events/") and (event_ids is None or path.split("/", 1)[1] in event_ids)
+    ]
+
+
+async def _sync(engine, db, calendar, changes):
+    calendar.reset_counts()
+    engine.enqueue(changes)
+    return await engine.sync_once(db)
+
+
+@pytest.mark.anyio
+async def test_initial_sync_batches_every_event_and_a_delta_sends_only_the_edits(calendar):
+    db = FakeFirestore()
+    _add_events(db, 5000)
+    engine = _engine(calendar)
+    report = await _sync(engine, db, calendar, _changes(db))
+    assert calendar.requests == {"batch": 100, "list": 2}  # 50 calls per batch; 2,500 events per page
+    assert calendar.calls == {"POST": 5000}
+    assert (report.inserted, report.failed, report.applied) == (5000, 0, 0)  # Our own writes aren't pulled back
+    assert all("gCalHash" in data for path, data in db.docs.items() if path.startswith("events/"))
+
+    engine = _engine(calendar)  # A restart re-reads every document and finds nothing to send
+    report = await _sync(engine, db, calendar, _changes(db))
+    assert calendar.requests == {"list": 1}
+    assert report.unchanged == 5000
+
+    edited = {f"event-{i}" for i in range(0, 5000, 500)}
+    for event_id in edited:
+        db.docs[f"events/{event_id}"]["title"] = "Renamed"
+    report = await _sync(engine, db, calendar, _changes(db, edited))
+    assert calendar.requests == {"batch": 1, "list": 1}
+    assert calendar.calls == {"PUT": 10}
+    assert report.updated == 10
+    assert calendar.events[gcal_event_id("event-500")][1]["summary"] == "Renamed"
+
+
+@pytest.mark.anyio
+async def test_insert_of_an_existing_event_and_update_of_a_missing_one_switch_method(calendar):
+    db = FakeFirestore()
+    _add_events(db, 2)
+    engine = _engine(calendar)
+    # event-0 reached the Calendar but its response was lost; event-1's Calendar event was deleted by hand.
+    calendar.write(gcal_resource(event_from_firestore("event-0", db.docs["events/event-0"]), gcal_event_id("event-0")))
+    db.docs["events/event-1"].update(gCalEventId=gcal_event_id("event-1"), gCalHash="stale")
+    report = await _sync(engine, db, calendar, _changes(db))
+    assert calendar.requests["batch"] == 2  # The first attempt, then the two calls re-sent as the other kind
+    assert calendar.calls == {"POST": 2, "PUT": 2}  # POST 409 -> PUT, PUT 404 -> POST
+    assert (report.inserted, report.updated, report.failed) == (1, 1, 0)
+    assert set(calendar.events) == {gcal_event_id("event-0"), gcal_event_id("event-1")}
+
+
+@pytest.mark.anyio
+async def test_expired_sync_token_falls_back_to_a_full_listing(calendar):
+    db = FakeFirestore()
+    _add_events(db, 3)
+    engine = _engine(calendar)
+    await _sync(engine, db, calendar, _changes(db))
+    engine.sync_token = "expired"
+    report = await _sync(engine, db, calendar, [])
+    assert calendar.requests == {"list": 2}  # 410 Gone, then the whole calendar
+    assert (report.pulled, report.applied) == (3, 0)
+    assert engine.sync_token == f"sync-{calendar.sequence}"
+    assert db.docs[f"{SYNC_STATE_COLLECTION}/{SYNC_STATE_DOCUMENT}"]["syncToken"] == engine.sync_token
@@ -0,0 +1,43 @@
+import pytest
+
+from fake_firestore import FakeFirestore, patch_transactional
+from services.member_counter import ShardedMemberCounter
+
+
+@pytest.fixture
+def db(monkeypatch):
+    patch_transactional(monkeypatch)
+    fake = FakeFirestore()
+    fake.docs["clubs/chess"] = {"memberCount": 7}
+    fake.docs["clubs/go"] = {"memberCount": 3}
+    return fake
+
+
+@pytest.mark.anyio
+async def test_migration_never_overwrites_live_shards(db):
+    counter = ShardedMemberCounter(num_shards=4)
+    assert await counter.get_totals(db, ["chess"]) == {}  # Not migrated yet
+    assert await counter.migrate_all_clubs(db) == 2
+    db.docs["clubs/chess/memberCountShards/2"]["count"] += 1  # A join after the migration
+    assert await counter.migrate_club(db, "chess") is None  # Re-run skips the club
+    assert await counter.get_totals(db, ["chess", "go"]) == {"chess": 8, "go": 3}
+    assert db.docs["clubs/chess"]["memberCount"] == 7  # Stale once sharding is on
+
+
+@pytest.mark.anyio
+async def test_clubs_without_shards_are_cached_too(db):
+    counter = ShardedMemberCounter(num_shards=4)
+    assert await counter.get_totals(db, ["chess"]) == {}
+    db.docs["clubs/chess/memberCountShards/0"] = {"count": 7}
+    assert await counter.get_totals(db, ["chess"]) == {}  # Served from the cache
+
+
+@pytest.mark.anyio
+async def test_restore_writes_the_sharded_totals_back(db):
+    counter = ShardedMemberCounter(num_shards=4)
+    await counter.migrate_all_clubs(db)
+    db.docs["clubs/go/memberCountShards/1"]["count"] += 2
+    db.docs["clubs/gone/memberCountShards/0"] = {"count": 5}  # Shards of a deleted club
+    assert await counter.restore_member_counts(db) == 2
+    assert db.docs["clubs/go"]["memberCount"] == 5
+    assert "clubs/gone" not in db.docs
@@ -0,0 +1,83 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from api.middleware import CompressionMiddleware, ConditionalGetMiddleware, negotiate_encoding
+from services.club_catalog import etag_matches
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip;q=0.5", "gzip"),
+    ("*", "br"),
+    ("*;q=0, gzip", "gzip"),
+    ("identity", None),
+    ("br;q=bogus", None),
+    ("", None),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def app_with_version(version):
+    calls = []
+
+    async def clubs(request):
+        calls.append(request.method)
+        return PlainTextResponse("clubs")
+
+    app = Starlette(routes=[Route("/api/clubs", clubs, methods=["GET", "POST"])])
+    app.add_middleware(ConditionalGetMiddleware, versions={"/api/clubs": lambda request: version[0]})
+    return TestClient(app), calls
+
+
+def test_matching_if_none_match_is_answered_before_the_handler():
+    version = ["v1"]
+    client, calls = app_with_version(version)
+    first = client.get("/api/clubs")
+    assert first.status_code == 200 and first.headers["etag"] == 'W/"v1"'
+
+    again = client.get("/api/clubs", headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert calls == ["GET"]
+
+    version[0] = "v2"
+    changed = client.get("/api/clubs", headers={"If-None-Match": first.headers["etag"]})
+    assert changed.status_code == 200 and changed.headers["etag"] == 'W/"v2"'
+
+
+def test_unknown_versions_and_other_methods_pass_through():
+    version = [None]
+    client, calls = app_with_version(version)
+    response = client.get("/api/clubs", headers={"If-None-Match": "*"})
+    assert response.status_code == 200 and "etag" not in response.headers
+
+    version[0] = "v1"
+    assert client.post("/api/clubs", headers={"If-None-Match": 'W/"v1"'}).status_code == 200
+    assert calls == ["GET", "POST"]
+
+
+def test_compressed_responses_carry_a_weak_etag_that_still_matches():
+    etag = '"catalog-v1"'
+
+    async def clubs(request):
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(b'{"clubs": []}' + b" " * 4096, media_type="application/json", headers={"ETag": etag})
+
+    app = Starlette(routes=[Route("/api/clubs", clubs)])
+    app.add_middleware(CompressionMiddleware)
+    client = TestClient(app)
+
+    plain = client.get("/api/clubs", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and plain.headers["etag"] == etag
+
+    compressed = client.get("/api/clubs", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] == 'W/"catalog-v1"'
+
+    again = client.get("/api/clubs", headers={"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["etag"]})
+    assert again.status_code == 304
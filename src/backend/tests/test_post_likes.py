@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+import services.post_likes as post_likes_module
+from services.post_likes import PostLikeStore
+
+
+class FakePosts:
+    """`clubPosts` where batches fail with NotFound and single updates fail as scripted."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.written = {}
+
+    def collection(self, _name):
+        return self
+
+    def document(self, post_id):
+        return FakePost(self, post_id)
+
+    def batch(self):
+        return FakeBatch()
+
+
+class FakePost:
+    def __init__(self, posts, post_id):
+        self.posts = posts
+        self.post_id = post_id
+
+    async def update(self, fields):
+        error = self.posts.failures.get(self.post_id)
+        if error is not None:
+            raise error
+        self.posts.written[self.post_id] = fields["likesCount"].value
+
+
+class FakeBatch:
+    def update(self, _ref, _fields):
+        pass
+
+    async def commit(self):
+        raise google_exceptions.NotFound("a post in the batch was deleted")
+
+
+@pytest.mark.anyio
+async def test_flush_requeues_deltas_it_could_not_write(monkeypatch):
+    monkeypatch.setattr(post_likes_module, "MAX_BATCH_WRITES", 2)
+    db = FakePosts({
+        "deleted": google_exceptions.NotFound("deleted"),
+        "flaky": google_exceptions.ServiceUnavailable("try again"),
+    })
+    store = PostLikeStore()
+    store._known_posts["deleted"] = True
+    # Batches of two: [ok, deleted], [flaky, same-batch], [next-batch]
+    store._pending = {"ok": 2, "deleted": -1, "unchanged": 0, "flaky": 1, "same-batch": 3, "next-batch": 4}
+
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        await store.flush(db)
+    assert db.written == {"ok": 2, "same-batch": 3}
+    # The failed write and the batches after it are retried; the deleted post's delta is dropped.
+    assert store._pending == {"flaky": 1, "next-batch": 4}
+    assert "deleted" not in store._known_posts
+
+    store._pending["flaky"] += 1  # Another like while the write was failing
+    del db.failures["flaky"]
+    assert await store.flush(db) == 2
+    assert db.written == {"ok": 2, "same-batch": 3, "flaky": 2, "next-batch": 4}
+    assert store._pending == {}
+
+
+class StalledBatch(FakeBatch):
+    def __init__(self, started):
+        self.started = started
+
+    async def commit(self):
+        self.started.set()
+        await asyncio.Event().wait()  # Never returns; the flush is cancelled here
+
+
+@pytest.mark.anyio
+async def test_flush_cancelled_mid_commit_keeps_its_deltas_for_the_shutdown_flush():
+    started = asyncio.Event()
+    db = FakePosts({})
+    db.batch = lambda: StalledBatch(started)
+    store = PostLikeStore()
+    store._pending = {"a": 2, "b": -1}
+
+    flushing = asyncio.create_task(store.flush(db))
+    await started.wait()
+    store._pending["a"] = store._pending.get("a", 0) + 1  # A like arriving during the flush
+    flushing.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await flushing
+    assert store._pending == {"a": 3, "b": -1}
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import services.post_timeline as post_timeline
+from models.club_post import ClubPost
+from services.post_timeline import ClubPostTimeline, decode_cursor, encode_cursor
+
+T0 = datetime(2026, 5, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+
+def post(post_id, club_id, seconds_ago):
+    return ClubPost(postId=post_id, clubId=club_id, authorId="u", content="",
+                    createdAt=T0 - timedelta(seconds=seconds_ago))
+
+
+def test_cursor_round_trips_the_exact_timestamp():
+    cursor = encode_cursor(post("p/1|x", "chess", 0))
+    assert decode_cursor(cursor) == (T0, "p/1|x")
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", "bm8tc2VwYXJhdG9y", "eHl6fHA="])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.anyio
+async def test_pages_walk_posts_that_share_a_timestamp(monkeypatch):
+    posts = {
+        "chess": [post(f"c{i}", "chess", 0) for i in range(5)],  # All at the same instant
+        "go": [post("g0", "go", 0), post("g1", "go", 10)],
+    }
+
+    async def fake_query(_db, club_id, after, limit):
+        ordered = sorted(posts[club_id], key=lambda p: (p.createdAt, p.postId), reverse=True)
+        return [p for p in ordered if after is None or (p.createdAt, p.postId) < after][:limit]
+
+    monkeypatch.setattr(post_timeline, "get_club_posts_after", fake_query)
+    timeline = ClubPostTimeline(head_size=2)
+    seen, cursor = [], None
+    while True:
+        page = await timeline.page(None, ["chess", "go"], limit=2, cursor=cursor)
+        seen += [p.postId for p in page.posts]
+        assert len(page.posts) == 2 or page.nextCursor is None  # No short pages mid-feed
+        cursor = page.nextCursor
+        if cursor is None:
+            break
+    assert seen == ["g0", "c4", "c3", "c2", "c1", "c0", "g1"]
+
+
+@pytest.mark.anyio
+async def test_post_changes_drop_the_cached_heads_of_their_clubs(monkeypatch):
+    posts = {"chess": [post("c0", "chess", 0)], "go": [post("g0", "go", 10)]}
+    reads = []
+
+    async def fake_query(_db, club_id, after, limit):
+        reads.append(club_id)
+        return list(posts[club_id])
+
+    monkeypatch.setattr(post_timeline, "get_club_posts_after", fake_query)
+    timeline = ClubPostTimeline()
+
+    async def feed():
+        return [p.postId for p in (await timeline.page(None, ["chess", "go"], limit=10)).posts]
+
+    assert await feed() == ["c0", "g0"]
+    posts["chess"].insert(0, post("c1", "chess", -5))
+    timeline._on_post_changes([("c1", {"clubId": "chess"})], False)
+    assert await feed() == ["c1", "c0", "g0"]
+    assert reads == ["chess", "go", "chess"]
+
+    posts["go"] = []
+    timeline._on_post_changes([("g0", None)], False)  # A deletion carries no clubId
+    assert await feed() == ["c1", "c0"]
+    assert reads[3:] == ["go"]
+
+    timeline._on_post_changes([], True)  # A restarted listener may have missed changes
+    await feed()
+    assert sorted(reads[4:]) == ["chess", "go"]
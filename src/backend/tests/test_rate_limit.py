@@ -0,0 +1,59 @@
+import pytest
+
+from services.rate_limit import (
+    MEMBERSHIP_CLUB_BURST,
+    MEMBERSHIP_CLUB_RATE,
+    MEMBERSHIP_USER_BURST,
+    MEMBERSHIP_USER_RATE,
+    MemoryRateLimitBackend,
+    RateLimiter,
+    membership_buckets,
+)
+
+
+@pytest.fixture
+def clock():
+    return [0.0]
+
+
+@pytest.fixture
+def limiter(clock):
+    return RateLimiter(MemoryRateLimitBackend(timer=lambda: clock[0]))
+
+
+@pytest.mark.anyio
+async def test_a_user_past_their_burst_waits_for_the_refill(limiter, clock):
+    for i in range(int(MEMBERSHIP_USER_BURST)):
+        assert await limiter.check(membership_buckets("ann", f"club-{i}")) == 0
+    assert await limiter.check(membership_buckets("ann", "club-x")) == pytest.approx(1 / MEMBERSHIP_USER_RATE)
+    assert await limiter.check(membership_buckets("bob", "club-x")) == 0  # Other users have their own bucket
+
+    clock[0] += 1 / MEMBERSHIP_USER_RATE / 2
+    assert await limiter.check(membership_buckets("ann", "club-x")) == pytest.approx(1 / MEMBERSHIP_USER_RATE / 2)
+    clock[0] += 1 / MEMBERSHIP_USER_RATE / 2
+    assert await limiter.check(membership_buckets("ann", "club-x")) == 0  # One token back, one action
+    assert await limiter.check(membership_buckets("ann", "club-x")) > 0
+    assert (limiter.allowed, limiter.limited) == (MEMBERSHIP_USER_BURST + 2, 3)
+
+
+@pytest.mark.anyio
+async def test_a_busy_club_limits_everyone_without_spending_their_tokens(limiter, clock):
+    for i in range(int(MEMBERSHIP_CLUB_BURST)):
+        assert await limiter.check(membership_buckets(f"user-{i}", "chess")) == 0
+    assert await limiter.check(membership_buckets("ann", "chess")) == pytest.approx(1 / MEMBERSHIP_CLUB_RATE)
+
+    clock[0] += 1 / MEMBERSHIP_CLUB_RATE
+    assert await limiter.check(membership_buckets("ann", "chess")) == 0
+    # The rejected attempt took nothing from ann's bucket: her whole burst minus one is left.
+    for i in range(int(MEMBERSHIP_USER_BURST) - 1):
+        assert await limiter.check(membership_buckets("ann", f"club-{i}")) == 0
+    assert await limiter.check(membership_buckets("ann", "go")) > 0
+
+
+@pytest.mark.anyio
+async def test_buckets_refill_only_up_to_the_burst(limiter, clock):
+    assert await limiter.check(membership_buckets("ann", "chess")) == 0
+    clock[0] += 3600
+    for i in range(int(MEMBERSHIP_USER_BURST)):
+        assert await limiter.check(membership_buckets("ann", f"club-{i}")) == 0
+    assert await limiter.check(membership_buckets("ann", "go")) > 0
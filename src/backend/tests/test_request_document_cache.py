@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from api.deps import get_firestore_db, get_request_db
+from api.middleware import report_request_cache
+from CRUD.documents import RequestDocumentCache
+from fake_firestore import FakeFirestore
+
+
+class CountingFirestore(FakeFirestore):
+    """Counts get_all calls, and yields to the event loop in each so concurrent reads overlap."""
+
+    def __init__(self):
+        super().__init__()
+        self.get_all_calls = 0
+
+    async def get_all(self, refs, transaction=None):
+        self.get_all_calls += 1
+        await asyncio.sleep(0)
+        async for snapshot in super().get_all(refs, transaction):
+            yield snapshot
+
+
+@pytest.fixture
+def db():
+    fake = CountingFirestore()
+    fake.docs["users/ann"] = {"name": "Ann", "joinedClubs": ["chess"]}
+    fake.docs["users/bob"] = {"name": "Bob", "joinedClubs": []}
+    return fake
+
+
+@pytest.mark.anyio
+async def test_concurrent_reads_of_one_document_share_one_rpc(db):
+    cache = RequestDocumentCache(db)
+    first, second = await asyncio.gather(cache.get_documents("users", ["ann"]), cache.get_documents("users", ["ann"]))
+    assert first == second == [{"name": "Ann", "joinedClubs": ["chess"]}]
+    assert db.get_all_calls == 1
+    assert cache.stats() == {"documents": 1, "hits": 1, "rpcs": 1}
+
+    first[0]["joinedClubs"].append("go")  # Callers get copies; the cached document is untouched
+    assert await cache.get_documents("users", ["ann"]) == [{"name": "Ann", "joinedClubs": ["chess"]}]
+    assert db.get_all_calls == 1
+
+
+@pytest.mark.anyio
+async def test_invalidated_documents_are_read_again(db):
+    cache = RequestDocumentCache(db)
+    await cache.get_documents("users", ["ann"])
+    db.docs["users/ann"]["name"] = "Ann B."
+    cache.invalidate("users", "ann")
+    assert await cache.get_documents("users", ["ann"], id_field="uid") == [
+        {"name": "Ann B.", "joinedClubs": ["chess"], "uid": "ann"}
+    ]
+    assert cache.stats() == {"documents": 1, "hits": 0, "rpcs": 2}
+
+
+def test_debug_header_reports_the_requests_cache_counts(db):
+    app = FastAPI()
+    app.middleware("http")(report_request_cache)
+
+    async def firestore():
+        yield db
+
+    @app.get("/people")
+    async def people(request_db: RequestDocumentCache = Depends(get_request_db)):
+        await asyncio.gather(
+            request_db.get_documents("users", ["ann"]),
+            request_db.get_documents("users", ["ann", "bob"]),
+        )
+        return await request_db.get_documents("users", ["bob", "nobody"])
+
+    app.dependency_overrides[get_firestore_db] = firestore
+    response = TestClient(app).get("/people")
+    assert response.json() == [{"name": "Bob", "joinedClubs": []}, None]
+    # ann is read once for both gathered calls; bob's repeat read is served from memory.
+    assert response.headers["X-Firestore-Cache"] == "hits=2; rpcs=3; documents=3"
+    assert db.get_all_calls == 3
@@ -0,0 +1,31 @@
+from services.stream_ticket import StreamTicketIssuer
+
+
+def test_ticket_redeems_once_for_its_user():
+    issuer = StreamTicketIssuer(secret="test-secret")
+    issued = issuer.issue("user-1", now=1000)
+    assert issued.expires_in == issuer.ttl_seconds
+    assert issuer.redeem(issued.ticket, now=1001) == "user-1"
+    assert issuer.redeem(issued.ticket, now=1002) is None
+
+
+def test_expired_ticket_is_refused():
+    issuer = StreamTicketIssuer(secret="test-secret", ttl_seconds=30)
+    issued = issuer.issue("user-1", now=1000)
+    assert issuer.redeem(issued.ticket, now=1031) is None
+
+
+def test_tampered_or_foreign_ticket_is_refused():
+    issuer = StreamTicketIssuer(secret="test-secret")
+    payload, _, signature = issuer.issue("user-1", now=1000).ticket.partition(".")
+    other = StreamTicketIssuer(secret="test-secret").issue("user-2", now=1000).ticket
+    assert issuer.redeem(f"{payload}.{signature[:-2]}xx", now=1001) is None
+    assert issuer.redeem(f"{other.partition('.')[0]}.{signature}", now=1001) is None
+    assert StreamTicketIssuer(secret="other-secret").redeem(f"{payload}.{signature}", now=1001) is None
+    assert issuer.redeem("", now=1001) is None
+    assert issuer.redeem("not-a-ticket", now=1001) is None
+
+
+def test_workers_sharing_the_secret_accept_each_others_tickets():
+    ticket = StreamTicketIssuer(secret="shared").issue("user-1", now=1000).ticket
+    assert StreamTicketIssuer(secret="shared").redeem(ticket, now=1001) == "user-1"
@@ -0,0 +1,104 @@
+import time
+from types import SimpleNamespace
+
+import firebase_admin
+import firebase_admin.auth
+import pytest
+from firebase_admin import credentials
+from google.auth.credentials import AnonymousCredentials
+
+import services.token_cache as token_cache
+from services import firebase_service
+from services.token_cache import ID_TOKEN_CERT_URI, VerifiedTokenCache, prefetch_signing_keys, verify_id_token_cached
+
+
+class Anonymous(credentials.Base):
+    def get_credential(self):
+        return AnonymousCredentials()
+
+
+@pytest.fixture
+def verifier(monkeypatch):
+    """Stands in for the Admin SDK's verify_id_token; `verifier.result` is returned or raised."""
+    verifier = SimpleNamespace(calls=[], result=None)
+
+    def verify_id_token(id_token):
+        verifier.calls.append(id_token)
+        if isinstance(verifier.result, Exception):
+            raise verifier.result
+        return verifier.result
+
+    async def ready():
+        pass
+
+    monkeypatch.setattr(firebase_admin.auth, "verify_id_token", verify_id_token)
+    monkeypatch.setattr(firebase_service, "wait_until_ready", ready)
+    monkeypatch.setattr(token_cache, "token_cache", VerifiedTokenCache())
+    return verifier
+
+
+@pytest.fixture
+def firebase_app():
+    app = firebase_admin.initialize_app(Anonymous(), {"projectId": "demo"})
+    yield app
+    firebase_admin.delete_app(app)
+
+
+def test_the_sdk_transport_is_found_on_the_pinned_admin_sdk(firebase_app):
+    assert token_cache._sdk_cert_request() is not None
+
+
+def test_prefetch_is_a_no_op_without_the_sdk_transport():
+    assert not firebase_admin._apps  # get_app() raises, as a changed SDK layout would
+    assert prefetch_signing_keys() is False
+
+
+def test_prefetch_gets_the_public_certificates(monkeypatch):
+    calls = []
+
+    def request(url, method):
+        calls.append((url, method))
+        return SimpleNamespace(status=200)
+
+    monkeypatch.setattr(token_cache, "_sdk_cert_request", lambda: request)
+    assert prefetch_signing_keys() is True
+    assert calls == [(ID_TOKEN_CERT_URI, "GET")]
+
+
+@pytest.mark.anyio
+async def test_a_verified_token_is_served_from_the_cache(verifier):
+    verifier.result = {"uid": "ann", "exp": time.time() + 3600}
+    assert await verify_id_token_cached("token-a") == verifier.result
+    assert await verify_id_token_cached("token-a") == verifier.result
+    assert verifier.calls == ["token-a"]
+    assert token_cache.token_cache.stats()["hits"] == 1
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("error", [
+    firebase_admin.auth.ExpiredIdTokenError("Token expired", None),
+    firebase_admin.auth.RevokedIdTokenError("Token revoked"),
+])
+async def test_tokens_that_fail_verification_are_never_cached(verifier, error):
+    verifier.result = error
+    for _ in range(2):
+        with pytest.raises(type(error)):
+            await verify_id_token_cached("token-a")
+    assert verifier.calls == ["token-a", "token-a"]
+    assert token_cache.token_cache.stats()["size"] == 0
+
+
+def test_entries_expire_with_the_token_or_the_ttl_whichever_is_first():
+    now = [1000.0]
+    cache = VerifiedTokenCache(ttl=300, timer=lambda: now[0])
+    cache.put("short-lived", {"uid": "ann", "exp": 1060})
+    cache.put("long-lived", {"uid": "bob", "exp": 5000})
+
+    now[0] = 1059.0
+    assert cache.get("short-lived") is not None
+    now[0] = 1060.0
+    assert cache.get("short-lived") is None  # Expired tokens are never served
+    now[0] = 1299.0
+    assert cache.get("long-lived") is not None
+    now[0] = 1300.0
+    assert cache.get("long-lived") is None
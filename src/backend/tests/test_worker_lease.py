@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from fake_firestore import FakeFirestore, patch_transactional
+from services.worker_lease import LEASES_COLLECTION, WorkerLease
+
+
+@pytest.mark.anyio
+async def test_only_one_worker_holds_the_lease_until_it_lapses_or_is_released(monkeypatch):
+    patch_transactional(monkeypatch)
+    db = FakeFirestore()
+    first, second = WorkerLease("job"), WorkerLease("job")
+
+    assert await first.try_acquire(db) and first.held
+    assert not await second.try_acquire(db) and not second.held
+    assert await first.try_acquire(db)  # Renewal
+    assert db.docs[f"{LEASES_COLLECTION}/job"]["owner"] == first.owner
+
+    # The first worker stops renewing and its lease runs out.
+    db.docs[f"{LEASES_COLLECTION}/job"]["expiresAt"] = datetime.now(timezone.utc) - timedelta(seconds=1)
+    assert await second.try_acquire(db)
+    assert not await first.try_acquire(db) and not first.held
+
+    await second.release(db)
+    assert not second.held and f"{LEASES_COLLECTION}/job" not in db.docs
+    assert await first.try_acquire(db)
+
+
+@pytest.mark.anyio
+async def test_a_failed_renewal_keeps_the_lease_until_it_would_expire(monkeypatch):
+    patch_transactional(monkeypatch)
+    db = FakeFirestore()
+    lease = WorkerLease("job", ttl_seconds=60, safety_seconds=15)
+    assert await lease.try_acquire(db)
+
+    def unavailable(max_attempts=None):
+        raise ConnectionError("Firestore unavailable")
+
+    monkeypatch.setattr(db, "transaction", unavailable)
+    assert await lease.try_acquire(db) and lease.held
+    lease._held_until = 0.0  # Time passes without a successful renewal
+    assert not await lease.try_acquire(db)